@@ -16,7 +16,7 @@ from app.analytics_models import (
     Alert, AlertInstance, AnalyticsExport, AnalyticsCache,
     AggregationPeriod, MetricType, AlertSeverity, AlertType
 )
-from app.models import ClientUsageLog, ClientApiKey
+from app.models import ClientUsageLog, ClientApiKey, SDK_USAGE_SOURCE
 from app.database import get_db
 
 logger = structlog.get_logger(__name__)
@@ -38,6 +38,7 @@ class AnalyticsService:
         # Get all usage logs for the hour
         logs = self.db.query(ClientUsageLog).filter(
             and_(
+                ClientUsageLog.source != SDK_USAGE_SOURCE,
                 ClientUsageLog.timestamp >= hour_start,
                 ClientUsageLog.timestamp < hour_end
             )
@@ -1,7 +1,11 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from typing import Any, Dict
+from app.auth.token_cache import token_digest, token_verification_cache
 from app.config import settings
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -67,7 +71,88 @@ def validate_jwt_structure(token: str) -> bool:
 
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+DEV_TOKEN_SIGNATURE = 'dev-signature-not-for-production'
+
+def _user_from_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the current-user dict from verified token claims"""
+    user_id: str = payload.get("sub") or payload.get("user_id")
+    tenant: str = payload.get("tenant") or payload.get("tenant_id")
+
+    roles_claim = payload.get("roles")
+    roles: list[str] = []
+
+    if isinstance(roles_claim, list) and roles_claim:
+        roles = [str(r).lower() for r in roles_claim if r]
+    else:
+        role = payload.get("role")
+        if role:
+            roles = [str(role).lower()]
+
+    if user_id is None:
+        raise JWTError("No user_id in payload")
+
+    return {
+        "user_id": user_id,
+        "tenant": tenant,
+        "tenant_id": tenant,
+        "roles": roles
+    }
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """Fully verify a token and return its payload"""
+    if not validate_jwt_structure(token):
+        raise JWTError("JWT structure validation failed")
+
+    # Development tokens are decoded without signature verification
+    if DEV_TOKEN_SIGNATURE in token:
+        logger.info("Development token detected - using development authentication")
+        try:
+            _, payload_b64, _ = token.split('.')
+            payload_b64 += '=' * (-len(payload_b64) % 4)
+            return json.loads(base64.b64decode(payload_b64).decode('utf-8'))
+        except (ValueError, TypeError) as e:
+            raise JWTError(f"Development token decode error: {str(e)}")
+
+    # Proper signature verification for production tokens
+    return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+def verify_token_claims(token: str) -> Dict[str, Any]:
+    """
+    Fully verify a bearer token and return its claims, bypassing the cache
+
+    Raises:
+        JWTError: If the token is malformed, invalid, expired or revoked
+    """
+    payload = _decode_token(token)
+    if token_verification_cache.is_revoked(token_digest(token), payload.get("jti")):
+        raise JWTError("Token has been revoked")
+    return payload
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a bearer token and return the current-user dict
+
+    Verified claims are served from the token verification cache until the
+    cache TTL or the token's exp, whichever comes first. Revoked tokens are
+    rejected on both paths.
+
+    Raises:
+        JWTError: If the token is malformed, invalid, expired or revoked
+    """
+    digest = token_digest(token)
+    user = token_verification_cache.get(digest)
+    if user is not None:
+        return user
+
+    payload = _decode_token(token)
+    if token_verification_cache.is_revoked(digest, payload.get("jti")):
+        raise JWTError("Token has been revoked")
+
+    user = _user_from_payload(payload)
+    token_verification_cache.put(digest, user, exp=payload.get("exp"), jti=payload.get("jti"))
+    return user
+
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Validate JWT token and return current user"""
 
     credentials_exception = HTTPException(
@@ -76,89 +161,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # Pre-validate token structure
-        if not validate_jwt_structure(credentials.credentials):
-            logger.error("JWT structure validation failed")
-            raise credentials_exception
+    token = credentials.credentials
 
-        # Check if this is a development token
-        if 'dev-signature-not-for-production' in credentials.credentials:
-            logger.info("Development token detected - using development authentication")
-            # For development tokens, decode without signature verification
-            try:
-                import base64
-                import json
-
-                # Split token and decode payload manually
-                _, payload_b64, _ = credentials.credentials.split('.')
-                payload_b64 += '=' * (-len(payload_b64) % 4)
-                payload_data = base64.b64decode(payload_b64).decode('utf-8')
-                payload = json.loads(payload_data)
-
-                user_id: str = payload.get("sub") or payload.get("user_id")
-                tenant: str = payload.get("tenant") or payload.get("tenant_id")
-
-                roles_claim = payload.get("roles")
-                roles: list[str] = []
-
-                if isinstance(roles_claim, list) and roles_claim:
-                    roles = [str(r).lower() for r in roles_claim if r]
-                else:
-                    role = payload.get("role")
-                    if role:
-                        roles = [str(role).lower()]
-
-                if user_id is None:
-                    logger.error("Development token missing user_id in payload")
-                    raise credentials_exception
-
-                logger.info(f"Development user authenticated: {user_id}")
-                return {
-                    "user_id": user_id,
-                    "tenant": tenant,
-                    "tenant_id": tenant,
-                    "roles": roles
-                }
-
-            except Exception as e:
-                logger.error(f"Development token decode error: {str(e)}")
-                raise credentials_exception
-
-        # Decode JWT token with proper signature verification for production tokens
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.secret_key,
-            algorithms=[settings.algorithm]
-        )
-
-        user_id: str = payload.get("sub")
-        tenant: str = payload.get("tenant") or payload.get("tenant_id")
-
-        roles_claim = payload.get("roles")
-        roles: list[str] = []
-
-        if isinstance(roles_claim, list) and roles_claim:
-            roles = [str(r).lower() for r in roles_claim if r]
-        else:
-            role = payload.get("role")
-            if role:
-                roles = [str(role).lower()]
-
-        if user_id is None:
-            logger.error("JWT validation failed: No user_id in payload")
+    # Dependencies that resolve the user more than once per request reuse the first result
+    verified = getattr(request.state, "verified_user", None) if request is not None else None
+    if verified is None or verified[0] != token:
+        try:
+            verified = (token, verify_token(token))
+        except JWTError as e:
+            logger.error(f"JWT decode error: {str(e)}")
+            raise credentials_exception
+        except Exception as e:
+            logger.error(f"Unexpected JWT validation error: {str(e)}")
             raise credentials_exception
 
-    except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
-        raise credentials_exception
-    except Exception as e:
-        logger.error(f"Unexpected JWT validation error: {str(e)}")
-        raise credentials_exception
+        if request is not None:
+            request.state.verified_user = verified
 
-    return {
-        "user_id": user_id,
-        "tenant": tenant,
-        "tenant_id": tenant,
-        "roles": roles
-    }
+    user = verified[1]
+    return {**user, "roles": list(user["roles"])}
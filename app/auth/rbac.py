@@ -1,16 +1,20 @@
-from typing import List, Dict, Any, Set, Optional, Tuple, Union
+from typing import List, Dict, Any, Set, FrozenSet, Optional, Tuple, Union, Iterable, Callable
 from enum import Enum
 import structlog
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 import uuid
 from dataclasses import dataclass
 from collections import defaultdict
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
+from app.config import settings
 from app.database import SessionLocal
-from app.models import CustomRole, UserRoleAssignment, PermissionTemplate as PermissionTemplateModel, RolePermission, User, UserRole as UserRoleEnum
+from app.models import CustomRole, CustomRoleStatus, UserRoleAssignment, PermissionTemplate as PermissionTemplateModel, RolePermission, User, UserRole as UserRoleEnum
 
 logger = structlog.get_logger()
 
@@ -272,6 +276,316 @@ class AccessReview:
         if self.created_at is None:
             self.created_at = datetime.utcnow()
 
+class PermissionResolver:
+    """Compiled permission sets for custom roles, cached by RBAC generation.
+
+    Every custom role's effective permissions - its own permissions, its permission
+    template, its `role_permissions` rows and everything it inherits - are compiled
+    in one pass into interned frozensets. Checks are then set-membership tests with
+    no database access. Any change to roles, templates, role permissions or
+    inheritance bumps the generation counter, and the next check recompiles.
+    Compiled sets also expire after `rbac_cache_max_age_seconds` so changes made by
+    other worker processes are picked up. `extra_edges` supplies (parent, child)
+    inheritance pairs held outside the database; it is only called when recompiling.
+    """
+
+    def __init__(
+        self,
+        system_role_permissions: Dict[str, Set[str]],
+        max_age_seconds: Optional[float] = None,
+        extra_edges: Optional[Callable[[], Iterable[Tuple[str, str]]]] = None
+    ):
+        self.system_role_permissions = system_role_permissions
+        self.extra_edges = extra_edges
+        self.max_age_seconds = settings.rbac_cache_max_age_seconds if max_age_seconds is None else max_age_seconds
+        self._generation = 0
+        self._compiled_generation = -1
+        self._compiled_at = 0.0
+        self._role_sets: Dict[str, FrozenSet[str]] = {}
+        self._combined: Dict[FrozenSet[str], FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Bump the generation so the next check recompiles"""
+        with self._lock:
+            self._generation += 1
+
+    def _is_stale(self) -> bool:
+        return (
+            self._compiled_generation != self._generation
+            or (self.max_age_seconds and time.monotonic() - self._compiled_at > self.max_age_seconds)
+        )
+
+    def _load(self, db: Session) -> Tuple[Dict[str, Set[str]], Dict[str, List[str]]]:
+        """Load direct permissions and inheritance edges for every active custom role in three queries"""
+        templates = {
+            template.id: {perm.get("action") for perm in (template.permissions or []) if perm.get("action")}
+            for template in db.query(PermissionTemplateModel).filter(PermissionTemplateModel.is_active == True).all()
+        }
+
+        direct: Dict[str, Set[str]] = defaultdict(set)
+        parents: Dict[str, List[str]] = defaultdict(list)
+        for role in db.query(CustomRole).filter(CustomRole.status == CustomRoleStatus.ACTIVE).all():
+            direct[role.name].update(role.permissions or [])
+            if role.permission_template_id:
+                direct[role.name].update(templates.get(role.permission_template_id, ()))
+            parents[role.name].extend(role.inherited_roles or [])
+
+        for role_name, action in db.query(RolePermission.role_name, RolePermission.action).filter(
+            RolePermission.is_active == True
+        ).all():
+            if role_name in direct and action:
+                direct[role_name].add(action)
+
+        for parent_role, child_role in (self.extra_edges() if self.extra_edges else ()):
+            parents[child_role].append(parent_role)
+
+        return direct, parents
+
+    def _compile(self, direct: Dict[str, Set[str]], parents: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+        """
+        Resolve inheritance for every role
+
+        Roles are grouped into strongly connected components (Tarjan's
+        algorithm), which are emitted parents first; every role in an
+        inheritance cycle gets the union of the whole cycle's permissions.
+        """
+        compiled: Dict[str, FrozenSet[str]] = {}
+        interned: Dict[FrozenSet[str], FrozenSet[str]] = {}
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+
+        def own_permissions(role_name: str) -> Set[str]:
+            permissions = set(direct.get(role_name, ()))
+            system_permissions = self.system_role_permissions.get(role_name.lower() if role_name else role_name)
+            if system_permissions and role_name not in direct:
+                permissions.update(system_permissions)
+            return permissions
+
+        def visit(role_name: str) -> None:
+            index[role_name] = lowlink[role_name] = len(index)
+            stack.append(role_name)
+            on_stack.add(role_name)
+            for parent_role in parents.get(role_name, ()):
+                if parent_role not in index:
+                    visit(parent_role)
+                    lowlink[role_name] = min(lowlink[role_name], lowlink[parent_role])
+                elif parent_role in on_stack:
+                    lowlink[role_name] = min(lowlink[role_name], index[parent_role])
+
+            if lowlink[role_name] != index[role_name]:
+                return
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == role_name:
+                    break
+
+            # Parents outside the component are already compiled
+            members = set(component)
+            permissions: Set[str] = set()
+            for member in component:
+                permissions.update(own_permissions(member))
+                for parent_role in parents.get(member, ()):
+                    if parent_role not in members:
+                        permissions.update(compiled[parent_role])
+            frozen = frozenset(permissions)
+            frozen = interned.setdefault(frozen, frozen)
+            for member in component:
+                compiled[member] = frozen
+
+        for role_name in list(direct) + list(parents):
+            if role_name not in index:
+                visit(role_name)
+
+        # Inherited names that are neither custom nor system roles contribute nothing
+        return {role_name: permissions for role_name, permissions in compiled.items() if role_name in direct}
+
+    def _ensure_compiled(self, db: Optional[Session]) -> None:
+        if not self._is_stale():
+            return
+
+        with self._lock:
+            if not self._is_stale():
+                return
+            generation = self._generation
+            should_close_db = db is None
+            if should_close_db:
+                db = SessionLocal()
+            try:
+                direct, parents = self._load(db)
+            finally:
+                if should_close_db:
+                    db.close()
+
+            self._role_sets = self._compile(direct, parents)
+            self._combined = {}
+            self._compiled_generation = generation
+            self._compiled_at = time.monotonic()
+            logger.info("RBAC permissions compiled", roles=len(self._role_sets), generation=generation)
+
+    def role_permissions(self, role_name: str, db: Optional[Session] = None) -> FrozenSet[str]:
+        """Get the compiled permission set of one custom role"""
+        self._ensure_compiled(db)
+        return self._role_sets.get(role_name, frozenset())
+
+    def resolve(self, role_names: Iterable[str], db: Optional[Session] = None) -> FrozenSet[str]:
+        """Get the union of the compiled permission sets of several custom roles"""
+        self._ensure_compiled(db)
+        key = frozenset(role_names)
+        combined = self._combined.get(key)
+        if combined is None:
+            combined = frozenset().union(*(self._role_sets.get(name, frozenset()) for name in key))
+            self._combined[key] = combined
+        return combined
+
+class ResourcePermissionIndex:
+    """Resource-specific grants indexed by (resource_type, action).
+
+    Each bucket maps exact resource ids, id prefixes (grants whose resource_id
+    ends in `*`) and the `*` wildcard to the grants of each role, so finding
+    the grants that apply to a resource is a handful of dict lookups instead
+    of a scan over every grant in the tenant.
+    """
+
+    WILDCARD = "*"
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return sum(bucket["size"] for bucket in self._buckets.values())
+
+    def _bucket(self, resource_type: str, action: str, create: bool = False) -> Optional[Dict[str, Any]]:
+        key = (resource_type, action)
+        bucket = self._buckets.get(key)
+        if bucket is None and create:
+            bucket = {"exact": {}, "prefix": {}, "prefix_lengths": [], "wildcard": defaultdict(list), "size": 0}
+            self._buckets[key] = bucket
+        return bucket
+
+    def add(self, permission: ResourceSpecificPermission) -> None:
+        """Index a grant"""
+        bucket = self._bucket(permission.resource_type, permission.action, create=True)
+        resource_id = permission.resource_id
+
+        if resource_id == self.WILDCARD:
+            bucket["wildcard"][permission.role_name].append(permission)
+        elif resource_id.endswith(self.WILDCARD):
+            prefix = resource_id[:-1]
+            bucket["prefix"].setdefault(prefix, defaultdict(list))[permission.role_name].append(permission)
+            if len(prefix) not in bucket["prefix_lengths"]:
+                bucket["prefix_lengths"].append(len(prefix))
+                bucket["prefix_lengths"].sort()
+        else:
+            bucket["exact"].setdefault(resource_id, defaultdict(list))[permission.role_name].append(permission)
+        bucket["size"] += 1
+
+    def remove(self, permission: ResourceSpecificPermission) -> None:
+        """Drop a grant from the index"""
+        bucket = self._bucket(permission.resource_type, permission.action)
+        if bucket is None:
+            return
+
+        resource_id = permission.resource_id
+        if resource_id == self.WILDCARD:
+            container, key = None, None
+            by_role = bucket["wildcard"]
+        elif resource_id.endswith(self.WILDCARD):
+            container, key = bucket["prefix"], resource_id[:-1]
+            by_role = container.get(key, {})
+        else:
+            container, key = bucket["exact"], resource_id
+            by_role = container.get(key, {})
+
+        grants = by_role.get(permission.role_name, [])
+        if permission not in grants:
+            return
+        grants.remove(permission)
+        bucket["size"] -= 1
+        if not grants:
+            del by_role[permission.role_name]
+
+        if container is not None and not by_role:
+            del container[key]
+            if container is bucket["prefix"] and not any(len(prefix) == len(key) for prefix in container):
+                bucket["prefix_lengths"].remove(len(key))
+
+    def rebuild(self, permissions: Iterable[ResourceSpecificPermission]) -> None:
+        """Re-index a complete list of grants"""
+        self._buckets = {}
+        for permission in permissions:
+            self.add(permission)
+
+    def has_grants(self, resource_type: str, action: str) -> bool:
+        bucket = self._bucket(resource_type, action)
+        return bool(bucket and bucket["size"])
+
+    def wildcard_grants(self, resource_type: str, action: str, role_names: Iterable[str]) -> List[ResourceSpecificPermission]:
+        """Grants of the roles that cover every resource of the type"""
+        bucket = self._bucket(resource_type, action)
+        if bucket is None:
+            return []
+        return [grant for role_name in role_names for grant in bucket["wildcard"].get(role_name, ())]
+
+    def grants_for(
+        self,
+        resource_type: str,
+        resource_id: str,
+        action: str,
+        role_names: Iterable[str]
+    ) -> List[ResourceSpecificPermission]:
+        """Grants of the roles that apply to one resource: exact, then prefix, then wildcard"""
+        bucket = self._bucket(resource_type, action)
+        if bucket is None:
+            return []
+
+        role_names = list(role_names)
+        matches: List[ResourceSpecificPermission] = []
+
+        exact = bucket["exact"].get(resource_id)
+        if exact:
+            for role_name in role_names:
+                matches.extend(exact.get(role_name, ()))
+
+        for length in bucket["prefix_lengths"]:
+            if length > len(resource_id):
+                break
+            by_role = bucket["prefix"].get(resource_id[:length])
+            if by_role:
+                for role_name in role_names:
+                    matches.extend(by_role.get(role_name, ()))
+
+        for role_name in role_names:
+            matches.extend(bucket["wildcard"].get(role_name, ()))
+
+        return matches
+
+# Models whose changes alter compiled permission sets
+_RBAC_MODELS = (CustomRole, RolePermission, PermissionTemplateModel)
+
+@event.listens_for(Session, "after_flush")
+def _track_rbac_changes(session, flush_context):
+    if any(isinstance(obj, _RBAC_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["rbac_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _bump_rbac_generation(session):
+    if session.info.pop("rbac_changed", False):
+        rbac_service.permission_resolver.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rbac_changes(session):
+    session.info.pop("rbac_changed", None)
+
 class RBACService:
     """Role-Based Access Control service for PromptOps"""
 
@@ -370,6 +684,7 @@ class RBACService:
 
         # Resource-specific permissions
         self.resource_specific_permissions: List[ResourceSpecificPermission] = []
+        self.resource_permission_index = ResourcePermissionIndex()
 
         # Access reviews
         self.access_reviews: Dict[str, AccessReview] = {}
@@ -393,6 +708,38 @@ class RBACService:
         # Initialize system permission templates
         self._initialize_system_templates()
 
+        # Compiled custom role permission sets
+        self.permission_resolver = PermissionResolver(
+            {role.value: permissions for role, permissions in self.role_permissions.items()},
+            extra_edges=self._inheritance_edges
+        )
+
+        # Parsed role strings: system role enum, or None for custom roles
+        self._parsed_roles: Dict[str, Optional[UserRole]] = {}
+
+    def _parse_role(self, role: str) -> Optional[UserRole]:
+        """Map a role string to a system role (case-insensitive), or None for custom roles"""
+        if role in self._parsed_roles:
+            return self._parsed_roles[role]
+
+        parsed = None
+        for candidate in (role, role.lower() if role else role):
+            try:
+                parsed = UserRole(candidate)
+                break
+            except ValueError:
+                continue
+        self._parsed_roles[role] = parsed
+        return parsed
+
+    def _inheritance_edges(self) -> List[Tuple[str, str]]:
+        """Active in-memory inheritance relationships as (parent, child) pairs"""
+        return [
+            (inheritance.parent_role, inheritance.child_role)
+            for inheritance in self.role_inheritance
+            if inheritance.is_active
+        ]
+
     def can_perform_action(
         self,
         user_roles: List[str],
@@ -404,59 +751,34 @@ class RBACService:
     ) -> bool:
         """
         Check if user can perform action on resource
+
+        Custom role permissions come from the compiled permission resolver, so
+        the database is only touched when the compiled sets are stale.
         """
         try:
-            # Use provided session or create a new one
-            if db is None:
-                db = SessionLocal()
-                should_close_db = True
-            else:
-                should_close_db = False
-
-            # Convert role strings to enums with case-insensitive matching
-            user_role_enums = []
             custom_role_names = []
 
-            for role in user_roles:
-                try:
-                    # Try direct conversion first
-                    user_role_enums.append(UserRole(role))
-                except ValueError:
-                    # Try case-insensitive matching
-                    try:
-                        normalized_role = role.lower() if role else role
-                        user_role_enums.append(UserRole(normalized_role))
-                    except ValueError:
-                        # This is likely a custom role
-                        custom_role_names.append(role)
-
             # Check system role permissions
-            for role in user_role_enums:
+            for role_name in user_roles:
+                role = self._parse_role(role_name)
+                if role is None:
+                    # This is likely a custom role
+                    custom_role_names.append(role_name)
+                    continue
+
                 if self._role_has_permission(role, action):
                     # Check resource-specific permissions
-                    if resource_id:
-                        resource_allowed = self._check_resource_permission(
-                            role, action, resource_type, resource_id, context
-                        )
-                        if resource_allowed:
-                            if should_close_db:
-                                db.close()
-                            return True
-                    else:
-                        if should_close_db:
-                            db.close()
+                    if not resource_id or self._check_resource_permission(
+                        role, action, resource_type, resource_id, context
+                    ):
                         return True
 
             # Check custom role permissions
             if custom_role_names:
                 custom_permissions = self._get_custom_role_permissions(custom_role_names, db)
                 if action in custom_permissions:
-                    if should_close_db:
-                        db.close()
                     return True
 
-            if should_close_db:
-                db.close()
             return False
 
         except Exception as e:
@@ -468,39 +790,9 @@ class RBACService:
         role_permissions = self.role_permissions.get(role, set())
         return action in role_permissions
 
-    def _get_custom_role_permissions(self, custom_role_names: List[str], db: Session) -> Set[str]:
-        """Get all permissions from custom roles"""
-        permissions = set()
-
-        # Query custom roles and their permissions
-        custom_roles = db.query(CustomRole).filter(
-            CustomRole.name.in_(custom_role_names),
-            CustomRole.status == "ACTIVE"
-        ).all()
-
-        for role in custom_roles:
-            # Add direct permissions from the role
-            if role.permissions:
-                permissions.update(role.permissions)
-
-            # Add permissions from permission template
-            if role.permission_template_id:
-                template = db.query(PermissionTemplateModel).filter(
-                    PermissionTemplateModel.id == role.permission_template_id,
-                    PermissionTemplateModel.is_active == True
-                ).first()
-                if template and template.permissions:
-                    permissions.update([perm.get("action") for perm in template.permissions if perm.get("action")])
-
-            # Add permissions from role_permissions table
-            role_perms = db.query(RolePermission).filter(
-                RolePermission.role_name == role.name,
-                RolePermission.is_active == True
-            ).all()
-            for perm in role_perms:
-                permissions.add(perm.action)
-
-        return permissions
+    def _get_custom_role_permissions(self, custom_role_names: List[str], db: Optional[Session] = None) -> FrozenSet[str]:
+        """Get all permissions from custom roles, including templates and inherited roles"""
+        return self.permission_resolver.resolve(custom_role_names, db)
 
     def _check_resource_permission(
         self,
@@ -1215,6 +1507,7 @@ class RBACService:
                     return False, f"Cannot delete role '{role_name}' as it is assigned to specific resources"
 
             del self.custom_roles[role_name]
+            self.permission_resolver.invalidate()
             logger.info("Deleted custom role", role=role_name, deleted_by=deleted_by)
             return True, f"Role '{role_name}' deleted successfully"
 
@@ -1498,6 +1791,7 @@ class RBACService:
             )
 
             self.role_inheritance.append(inheritance)
+            self.permission_resolver.invalidate()
             logger.info("Added role inheritance", parent=parent_role, child=child_role, type=inheritance_type.value)
             return True, inheritance
 
@@ -1511,6 +1805,7 @@ class RBACService:
             for i, inheritance in enumerate(self.role_inheritance):
                 if inheritance.parent_role == parent_role and inheritance.child_role == child_role:
                     del self.role_inheritance[i]
+                    self.permission_resolver.invalidate()
                     logger.info("Removed role inheritance", parent=parent_role, child=child_role)
                     return True, f"Inheritance between '{parent_role}' and '{child_role}' removed"
 
@@ -1552,25 +1847,12 @@ class RBACService:
 
     def _get_inherited_permissions(self, role_name: str, visited: Optional[Set[str]] = None) -> Set[str]:
         """Get all permissions inherited by a role"""
-        if visited is None:
-            visited = set()
-
-        if role_name in visited:
-            return set()
+        permissions = set(self.permission_resolver.role_permissions(role_name))
 
-        visited.add(role_name)
-        permissions = set()
-
-        # Get direct role permissions
+        # Roles only known in memory are not part of the compiled sets
         if role_name in self.custom_roles:
             permissions.update(self.custom_roles[role_name].permissions)
 
-        # Get inherited permissions
-        for inheritance in self.role_inheritance:
-            if inheritance.child_role == role_name:
-                parent_permissions = self._get_inherited_permissions(inheritance.parent_role, visited.copy())
-                permissions.update(parent_permissions)
-
         return permissions
 
     # ========== RESOURCE-SPECIFIC PERMISSIONS ==========
@@ -1606,6 +1888,7 @@ class RBACService:
             )
 
             self.resource_specific_permissions.append(permission)
+            self.resource_permission_index.add(permission)
             logger.info("Granted resource permission", role=role_name, resource=resource_id, action=action)
             return True, permission
 
@@ -1631,6 +1914,7 @@ class RBACService:
                     perm.resource_id == resource_id):
 
                     if action is None or perm.action == action:
+                        self.resource_permission_index.remove(perm)
                         removed_count += 1
                         continue
 
@@ -1860,6 +2144,50 @@ class RBACService:
 
     # ========== ENHANCED PERMISSION CHECKING ==========
 
+    def _get_effective_permissions(self, user_roles: List[str], db: Session) -> Tuple[Set[str], List[str]]:
+        """Collect permissions granted by system and custom roles, with the inheritance chain"""
+        effective_permissions = set()
+        inheritance_chain = []
+        custom_role_names = []
+
+        for role_name in user_roles:
+            # Check system roles (case-insensitive)
+            role_enum = self._parse_role(role_name)
+            if role_enum is None:
+                # This is a custom role
+                custom_role_names.append(role_name)
+                continue
+            effective_permissions.update(self.role_permissions.get(role_enum, set()))
+            inheritance_chain.append(f"system:{role_enum.value}")
+
+        # Get custom role permissions
+        if custom_role_names:
+            effective_permissions.update(self._get_custom_role_permissions(custom_role_names, db))
+            for role_name in custom_role_names:
+                inheritance_chain.append(f"custom:{role_name}")
+
+                # Add inherited permissions
+                effective_permissions.update(self._get_inherited_permissions(role_name))
+
+        return effective_permissions, inheritance_chain
+
+    def _grant_applies(
+        self,
+        grant: ResourceSpecificPermission,
+        context: Optional[Dict[str, Any]],
+        conditions_met: Dict[str, bool],
+        now: datetime
+    ) -> bool:
+        """Check that a resource grant is active, unexpired and its conditions hold"""
+        if not grant.is_active or (grant.expires_at is not None and grant.expires_at <= now):
+            return False
+        if not grant.conditions:
+            return True
+
+        results = self._check_permission_conditions(grant.conditions, context)
+        conditions_met.update(results)
+        return all(results.values())
+
     def can_perform_action_enhanced(
         self,
         user_roles: List[str],
@@ -1888,41 +2216,7 @@ class RBACService:
 
         try:
             # Get all effective permissions including inheritance
-            effective_permissions = set()
-            inheritance_chain = []
-            custom_role_names = []
-
-            for role_name in user_roles:
-                # Check system roles
-                try:
-                    # Try direct conversion first
-                    role_enum = UserRole(role_name)
-                    role_permissions = self.role_permissions.get(role_enum, set())
-                    effective_permissions.update(role_permissions)
-                    inheritance_chain.append(f"system:{role_name}")
-                except ValueError:
-                    # Try case-insensitive matching
-                    try:
-                        normalized_role = role_name.lower() if role_name else role_name
-                        role_enum = UserRole(normalized_role)
-                        role_permissions = self.role_permissions.get(role_enum, set())
-                        effective_permissions.update(role_permissions)
-                        inheritance_chain.append(f"system:{normalized_role}")
-                    except ValueError:
-                        # This is a custom role
-                        custom_role_names.append(role_name)
-
-            # Get custom role permissions
-            if custom_role_names:
-                custom_permissions = self._get_custom_role_permissions(custom_role_names, db)
-                effective_permissions.update(custom_permissions)
-                for role_name in custom_role_names:
-                    inheritance_chain.append(f"custom:{role_name}")
-
-                    # Add inherited permissions
-                    inherited_perms = self._get_inherited_permissions(role_name)
-                    effective_permissions.update(inherited_perms)
-
+            effective_permissions, inheritance_chain = self._get_effective_permissions(user_roles, db)
             result["effective_permissions"] = effective_permissions
             result["inheritance_chain"] = inheritance_chain
 
@@ -1933,30 +2227,9 @@ class RBACService:
 
             # Check resource-specific permissions if resource_id provided
             if resource_id:
-                resource_allowed = False
-                for role_name in user_roles:
-                    resource_perms = [
-                        perm for perm in self.resource_specific_permissions
-                        if (perm.role_name == role_name and
-                            perm.resource_type == resource_type and
-                            perm.resource_id == resource_id and
-                            perm.is_active)
-                    ]
-
-                    for perm in resource_perms:
-                        if perm.action == action:
-                            # Check conditions
-                            conditions_met = self._check_permission_conditions(perm.conditions, context)
-                            result["conditions_met"].update(conditions_met)
-
-                            if all(conditions_met.values()) and (perm.expires_at is None or perm.expires_at > datetime.utcnow()):
-                                resource_allowed = True
-                                break
-
-                    if resource_allowed:
-                        break
-
-                if not resource_allowed:
+                now = datetime.utcnow()
+                grants = self.resource_permission_index.grants_for(resource_type, resource_id, action, user_roles)
+                if not any(self._grant_applies(grant, context, result["conditions_met"], now) for grant in grants):
                     result["reason"] = f"No resource-specific permission for '{action}' on resource '{resource_id}'"
                     return result
 
@@ -1982,6 +2255,67 @@ class RBACService:
             if should_close_db:
                 db.close()
 
+    def filter_accessible_resources(
+        self,
+        user_roles: List[str],
+        action: str,
+        resource_type: str,
+        resource_ids: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        db: Optional[Session] = None
+    ) -> List[str]:
+        """
+        Filter resource ids to those the user may perform an action on
+
+        Same rules as can_perform_action_enhanced with a resource id, but role
+        permissions are resolved once for the whole list, so listing endpoints
+        can authorize a page of resources in one call. Order is preserved.
+        """
+        if not resource_ids:
+            return []
+
+        # Use provided session or create a new one
+        if db is None:
+            db = SessionLocal()
+            should_close_db = True
+        else:
+            should_close_db = False
+
+        try:
+            effective_permissions, _ = self._get_effective_permissions(user_roles, db)
+            if action not in effective_permissions:
+                return []
+            if not all(self._check_permission_conditions({}, context).values()):
+                return []
+
+            index = self.resource_permission_index
+            if not index.has_grants(resource_type, action):
+                return []
+
+            now = datetime.utcnow()
+            conditions_met: Dict[str, bool] = {}
+            if any(
+                self._grant_applies(grant, context, conditions_met, now)
+                for grant in index.wildcard_grants(resource_type, action, user_roles)
+            ):
+                return list(resource_ids)
+
+            return [
+                resource_id for resource_id in resource_ids
+                if any(
+                    self._grant_applies(grant, context, conditions_met, now)
+                    for grant in index.grants_for(resource_type, resource_id, action, user_roles)
+                )
+            ]
+
+        except Exception as e:
+            logger.error(f"Resource filter failed: {str(e)}", action=action, resource_type=resource_type)
+            return []
+
+        finally:
+            if should_close_db:
+                db.close()
+
     # ========== CONDITION CHECKING HELPERS ==========
 
     def _check_permission_conditions(self, conditions: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Dict[str, bool]:
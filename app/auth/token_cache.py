@@ -0,0 +1,143 @@
+"""
+Verified JWT claims cache
+
+Verifying a token (structure check, signature check, claim parsing) is
+repeated on every request that carries it. Verified user claims are kept here
+keyed by a SHA-256 digest of the token, for at most the configured TTL and
+never past the token's own `exp`. Revoked tokens are rejected before the
+cache is consulted.
+"""
+
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+
+def token_digest(token: str) -> str:
+    """Digest used as the cache key, so raw tokens are never held as keys"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenVerificationCache:
+    """Bounded LRU of verified claims with TTL capped at token expiry and a revocation list"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 max_revocations: Optional[int] = None):
+        self.max_size = settings.auth_token_cache_size if max_size is None else max_size
+        self.ttl_seconds = settings.auth_token_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_revocations = (
+            settings.auth_revocation_max_entries if max_revocations is None else max_revocations
+        )
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, Optional[str]]]" = OrderedDict()
+        # Revoked token digests and JWT ids, each kept until the token would have expired
+        self._revoked_digests: Dict[str, float] = {}
+        self._revoked_jtis: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Get verified claims for a token digest, or None if absent, expired or revoked"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, expires_at, jti = entry
+            if expires_at <= now or self._is_revoked(digest, jti, now):
+                del self._entries[digest]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def put(self, digest: str, claims: Dict[str, Any], exp: Optional[float] = None, jti: Optional[str] = None) -> None:
+        """Cache verified claims until the TTL elapses or the token expires, whichever is first"""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+
+        with self._lock:
+            self._entries[digest] = (claims, expires_at, jti)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token: Optional[str] = None, jti: Optional[str] = None, exp: Optional[float] = None) -> None:
+        """
+        Revoke a token by value or JWT id
+
+        Args:
+            token: Raw token to revoke
+            jti: JWT id to revoke (covers every token carrying it)
+            exp: Token expiry; the revocation is forgotten after it, and never later than one
+                access token lifetime from now
+        """
+        now = time.time()
+        forget_at = now + settings.access_token_expire_minutes * 60
+        if isinstance(exp, (int, float)):
+            forget_at = min(forget_at, float(exp))
+        if forget_at <= now:
+            return
+
+        with self._lock:
+            self._prune_revocations(now)
+            if token:
+                digest = token_digest(token)
+                self._revoked_digests[digest] = forget_at
+                self._entries.pop(digest, None)
+                self._cap_revocations(self._revoked_digests)
+            if jti:
+                self._revoked_jtis[jti] = forget_at
+                for digest in [d for d, entry in self._entries.items() if entry[2] == jti]:
+                    del self._entries[digest]
+                self._cap_revocations(self._revoked_jtis)
+
+    def is_revoked(self, digest: str, jti: Optional[str] = None) -> bool:
+        """Check a token digest and JWT id against the revocation list"""
+        with self._lock:
+            return self._is_revoked(digest, jti, time.time())
+
+    def _is_revoked(self, digest: str, jti: Optional[str], now: float) -> bool:
+        forget_at = self._revoked_digests.get(digest)
+        if forget_at is None and jti:
+            forget_at = self._revoked_jtis.get(jti)
+        return forget_at is not None and forget_at > now
+
+    def _prune_revocations(self, now: float) -> None:
+        for revoked in (self._revoked_digests, self._revoked_jtis):
+            for key in [key for key, forget_at in revoked.items() if forget_at <= now]:
+                del revoked[key]
+
+    def _cap_revocations(self, revoked: Dict[str, float]) -> None:
+        """Drop the revocations closest to expiry once past max_revocations"""
+        excess = len(revoked) - self.max_revocations
+        if excess > 0:
+            for key in heapq.nsmallest(excess, revoked, key=revoked.get):
+                del revoked[key]
+
+    def clear(self) -> None:
+        """Drop every cached verification (revocations are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+
+token_verification_cache = TokenVerificationCache()
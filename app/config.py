@@ -16,6 +16,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     access_token_expire_minutes: int = 1440  # 24 hours instead of 30 minutes
+    # Verified token claims are cached by token digest, never past the token's exp
+    auth_token_cache_size: int = 10000
+    auth_token_cache_ttl_seconds: int = 300
+    # Revoked tokens remembered until they expire; those expiring soonest are dropped past this many
+    auth_revocation_max_entries: int = 100000
     
     # Google OAuth Configuration
     google_client_id: str = ""
@@ -46,6 +51,42 @@ class Settings(BaseSettings):
     # Cache settings
     cache_ttl: int = 3600  # 1 hour
 
+    # Response compression - payloads smaller than this are sent uncompressed
+    compression_minimum_size: int = 1024
+
+    # Prompt update stream - events retained for resuming clients and idle heartbeat interval
+    prompt_update_stream_maxlen: int = 10000
+    prompt_update_heartbeat_seconds: int = 15
+
+    # RBAC - compiled permission sets are rebuilt after any role change, or after this age
+    # so changes made by other worker processes are picked up
+    rbac_cache_max_age_seconds: int = 60
+
+    # A/B testing - upper bound on events per batch ingestion call, whether stateless
+    # assignments are written for audit, how long experiment config is cached and how
+    # long events for stateless assignments are accepted after an experiment stops
+    ab_event_batch_max_events: int = 10000
+    ab_assignment_audit: bool = True
+    ab_assignment_config_ttl_seconds: int = 30
+    ab_event_grace_seconds: int = 86400
+
+    # Model testing - per-provider timeout, concurrent requests per provider type and
+    # the size of the shared HTTP connection pool
+    model_test_timeout_seconds: float = 30.0
+    model_test_provider_concurrency: int = 4
+    model_test_max_connections: int = 100
+
+    # Compatibility testing - how long results are reused for identical prompt content
+    # and how many prompts a batch tests at once
+    compatibility_cache_ttl_hours: int = 24
+    compatibility_batch_concurrency: int = 4
+
+    # Compliance scanning - content scans cached by content hash, and batches of at least
+    # this many distinct contents scanned in worker processes (0 workers = one per CPU)
+    compliance_scan_cache_size: int = 10000
+    compliance_scan_workers: int = 0
+    compliance_parallel_min_batch: int = 256
+
     # API Key Encryption
     promptops_encryption_key: str = ""
 
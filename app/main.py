@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Security, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.middleware import ClientAPIMiddleware, SecurityHeadersMiddleware, RequestIDMiddleware
 from app.security_middleware import SecurityMonitoringMiddleware
@@ -7,9 +8,17 @@ from app.auth import get_current_user
 import structlog
 from contextlib import asynccontextmanager
 
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    # Brotli is optional; responses are gzip-compressed without it
+    BrotliMiddleware = None
+
 from app.config import settings
 from app.database import engine
 from app.models import Base
+from app.services.prompt_search_service import ensure_search_index
+from app.services.provider_test_executor import provider_test_executor
 from app.routers import templates, render, aliases, evals, policies, auth, projects, modules, prompts, model_compatibilities, approval_requests, delivery, dashboard, users, client_api, analytics, governance, model_testing, roles, approval_flows, ab_testing
 
 # Configure structured logging
@@ -38,8 +47,10 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     logger.info("Starting up PromptOps Registry")
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
     yield
     logger.info("Shutting down PromptOps Registry")
+    await provider_test_executor.aclose()
 
 app = FastAPI(
     title=settings.app_name,
@@ -63,6 +74,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add response compression middleware (brotli when available, gzip otherwise)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.compression_minimum_size, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.compression_minimum_size)
+
 # Add client API middleware
 app.add_middleware(ClientAPIMiddleware)
 
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, JSON, ForeignKey, Enum, ForeignKeyConstraint, UniqueConstraint, text, select, func, Index
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, JSON, ForeignKey, Enum, ForeignKeyConstraint, UniqueConstraint, text, select, func, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.database import Base
+from app.utils import parse_semver, get_base_prompt_id
 import enum
 
 try:
@@ -318,12 +319,31 @@ class Prompt(Base):
     activated_by = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     activation_reason = Column(String, nullable=True)
 
+    # Normalized semantic version, maintained from `id`/`version` for indexed latest lookups.
+    # Versions that are not plain MAJOR.MINOR.PATCH leave the components NULL.
+    base_prompt_id = Column(String, nullable=True)
+    version_major = Column(Integer, nullable=True)
+    version_minor = Column(Integer, nullable=True)
+    version_patch = Column(Integer, nullable=True)
+
     # Foreign key
     __table_args__ = (
         ForeignKeyConstraint(['module_id'], ['modules.id'], ondelete='CASCADE'),
         UniqueConstraint('id', name='uq_prompts_id'),
+        Index('idx_prompt_base_semver', 'base_prompt_id', 'version_major', 'version_minor', 'version_patch'),
+        Index('idx_prompt_module_semver', 'module_id', 'version_major', 'version_minor', 'version_patch'),
     )
 
+    @validates('id')
+    def _sync_base_prompt_id(self, key, value):
+        self.base_prompt_id = get_base_prompt_id(value) if value else None
+        return value
+
+    @validates('version')
+    def _sync_version_components(self, key, value):
+        self.version_major, self.version_minor, self.version_patch = parse_semver(value) or (None, None, None)
+        return value
+
     # Relationships
     module = relationship("Module", back_populates="prompts")
     provider = relationship("AIAssistantProvider", backref="prompts")
@@ -332,6 +352,19 @@ class Prompt(Base):
     creator_user = relationship("User", foreign_keys=[created_by], back_populates="created_prompts")
     activator_user = relationship("User", foreign_keys=[activated_by], back_populates="activated_prompts")
 
+class PromptVersionPointer(Base):
+    """Materialized latest/active version pointer for each prompt family"""
+    __tablename__ = "prompt_version_pointers"
+
+    base_prompt_id = Column(String, primary_key=True)
+    module_id = Column(String, nullable=False, index=True)
+    latest_prompt_id = Column(String, nullable=False)
+    latest_version = Column(String, nullable=False)
+    active_prompt_id = Column(String, nullable=True)
+    active_version = Column(String, nullable=True)
+    version_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class ModelCompatibility(Base):
     __tablename__ = "model_compatibilities"
 
@@ -343,9 +376,21 @@ class ModelCompatibility(Base):
     compatibility_notes = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Typed results of automated compatibility tests. Rows are append-only so history
+    # feeds trends; content_hash lets identical prompt content share cached results.
+    prompt_version = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    status = Column(String, nullable=True)
+    response_time = Column(Float, nullable=True)
+    quality_score = Column(Float, nullable=True)
+    estimated_cost = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+
     # Foreign key
     __table_args__ = (
         ForeignKeyConstraint(['prompt_id'], ['prompts.id']),
+        Index('idx_model_compat_prompt_created', 'prompt_id', 'created_at'),
+        Index('idx_model_compat_hash_provider_created', 'content_hash', 'model_provider', 'created_at'),
     )
 
     # Relationships
@@ -429,6 +474,10 @@ class ClientApiKey(Base):
         ForeignKeyConstraint(['user_id'], ['users.id']),
     )
 
+# Usage source of SDK telemetry uploads; the server logs the requests themselves,
+# so request counts and usage analytics leave these rows out
+SDK_USAGE_SOURCE = "sdk"
+
 class ClientUsageLog(Base):
     __tablename__ = "client_usage_logs"
 
@@ -460,6 +509,8 @@ class ClientUsageLog(Base):
     user_agent = Column(String, nullable=True)
     ip_address = Column(String, nullable=True)
     request_id = Column(String, nullable=True)
+    # "request" for API calls logged by the server, "sdk" for telemetry uploaded by the SDK
+    source = Column(String, nullable=False, default="request", server_default="request")
 
     # Timestamps
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1556,6 +1607,7 @@ class Experiment(Base):
     # Traffic allocation
     traffic_percentage = Column(Integer, default=50, nullable=False)  # 0-100
     allocation_strategy = Column(Enum(TrafficAllocationStrategy), default=TrafficAllocationStrategy.UNIFORM, nullable=False)
+    assignment_salt = Column(String, nullable=True)  # Re-randomizes bucketing without changing the experiment id
 
     # Targeting and segmentation
     target_audience = Column(JSON, nullable=True)  # User segments, demographics, etc.
@@ -1624,6 +1676,7 @@ class ExperimentAssignment(Base):
     __table_args__ = (
         Index('idx_assignment_experiment_user', 'experiment_id', 'user_id'),
         Index('idx_assignment_session_time', 'session_id', 'assigned_at'),
+        Index('idx_assignment_experiment_time', 'experiment_id', 'assigned_at'),
     )
 
     # Relationships
@@ -1637,7 +1690,10 @@ class ExperimentEvent(Base):
 
     id = Column(String, primary_key=True)
     experiment_id = Column(String, ForeignKey("experiments.id", ondelete="CASCADE"), nullable=False, index=True)
-    assignment_id = Column(String, ForeignKey("experiment_assignments.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Not a foreign key: stateless assignment ids are valid before, or without, an assignment row
+    assignment_id = Column(String, nullable=True, index=True)
+    # Variant the event counts toward, resolved at ingest from the assignment row or the assignment hash
+    variant_id = Column(String, nullable=True)
 
     # Event details
     event_type = Column(Enum(EventType), nullable=False, index=True)
@@ -1666,13 +1722,19 @@ class ExperimentEvent(Base):
     # Indexes for analytics performance
     __table_args__ = (
         Index('idx_event_experiment_type', 'experiment_id', 'event_type'),
+        Index('idx_event_experiment_created', 'experiment_id', 'created_at'),
         Index('idx_event_user_session', 'user_id', 'session_id'),
         Index('idx_event_time_range', 'occurred_at'),
+        Index('idx_event_experiment_variant', 'experiment_id', 'variant_id'),
     )
 
     # Relationships
     experiment = relationship("Experiment", back_populates="events")
-    assignment = relationship("ExperimentAssignment", backref="events")
+    assignment = relationship(
+        "ExperimentAssignment",
+        primaryjoin="foreign(ExperimentEvent.assignment_id) == ExperimentAssignment.id",
+        viewonly=True
+    )
 
 class ExperimentResult(Base):
     """
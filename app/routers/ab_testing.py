@@ -2,7 +2,7 @@
 A/B Testing Framework API Router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, BackgroundTasks, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, select
 from typing import List, Optional, Dict, Any
@@ -12,6 +12,7 @@ import hashlib
 from datetime import datetime, timezone, timedelta
 import logging
 
+from app.config import settings
 from app.database import get_db
 from app.models import (
     Experiment, ExperimentAssignment, ExperimentEvent, ExperimentResult,
@@ -20,8 +21,8 @@ from app.models import (
 )
 from app.schemas import (
     ExperimentCreate, ExperimentUpdate, ExperimentResponse, ExperimentStats,
-    ExperimentAssignmentCreate, ExperimentAssignmentResponse,
-    ExperimentEventCreate, ExperimentEventResponse, ExperimentResultResponse,
+    ExperimentAssignmentCreate, ExperimentAssignmentResponse, ExperimentAssignRequest,
+    ExperimentEventCreate, ExperimentEventResponse, ExperimentEventBatchResponse, ExperimentResultResponse,
     FeatureFlagCreate, FeatureFlagUpdate, FeatureFlagResponse,
     UserSegmentCreate, UserSegmentUpdate, UserSegmentResponse,
     VariantPerformance
@@ -29,6 +30,13 @@ from app.schemas import (
 from app.auth import get_current_user
 from app.auth.rbac import rbac_service, Permission
 from app.services.auth_service import AuthService
+from app.services.experiment_analytics_service import ExperimentAnalyticsService, experiment_result_cache
+from app.services.experiment_assignment_service import (
+    ExperimentAssignmentService, experiment_config_cache, record_assignment_audit
+)
+from app.services.experiment_event_ingest import (
+    EventBatchError, ExperimentEventIngestService, decode_event_batch, experiment_assignment_map
+)
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +154,7 @@ async def update_experiment(
     experiment.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(experiment)
+    experiment_config_cache.invalidate(experiment_id)
 
     logger.info(f"Updated experiment {experiment_id}")
     return experiment
@@ -167,6 +176,9 @@ async def delete_experiment(
 
     db.delete(experiment)
     db.commit()
+    experiment_assignment_map.forget_experiment(experiment_id)
+    experiment_result_cache.invalidate(experiment_id)
+    experiment_config_cache.invalidate(experiment_id)
 
     logger.info(f"Deleted experiment {experiment_id}")
     return {"message": "Experiment deleted successfully"}
@@ -192,6 +204,7 @@ async def start_experiment(
 
     db.commit()
     db.refresh(experiment)
+    experiment_config_cache.invalidate(experiment_id)
 
     logger.info(f"Started experiment {experiment_id}")
     return {"message": "Experiment started successfully"}
@@ -216,6 +229,7 @@ async def pause_experiment(
 
     db.commit()
     db.refresh(experiment)
+    experiment_config_cache.invalidate(experiment_id)
 
     logger.info(f"Paused experiment {experiment_id}")
     return {"message": "Experiment paused successfully"}
@@ -241,10 +255,13 @@ async def complete_experiment(
     experiment.status = ExperimentStatus.COMPLETED
     experiment.end_time = datetime.now(timezone.utc)
     experiment.results = results
+    experiment.winning_variant = results.get("winning_variant")
+    experiment.winner_determined = experiment.winning_variant is not None
     experiment.updated_at = datetime.now(timezone.utc)
 
     db.commit()
     db.refresh(experiment)
+    experiment_config_cache.invalidate(experiment_id)
 
     logger.info(f"Completed experiment {experiment_id}")
     return {"message": "Experiment completed successfully", "results": results}
@@ -286,9 +303,35 @@ async def create_assignment(
     db.add(db_assignment)
     db.commit()
     db.refresh(db_assignment)
+    experiment_result_cache.invalidate(assignment.experiment_id)
 
     return db_assignment
 
+@router.post("/experiments/{experiment_id}/assign", response_model=ExperimentAssignmentResponse)
+async def assign_variant(
+    experiment_id: str,
+    request: ExperimentAssignRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Assign a user/session to a variant without a database round trip
+
+    The variant is derived by hashing the experiment id, its assignment salt
+    and the user (or device, or session) id, the same way the SDK assigns
+    locally. The assignment row is written after the response for audit.
+    """
+    assignment = ExperimentAssignmentService(db).assign(
+        experiment_id, request.session_id, user_id=request.user_id, device_id=request.device_id
+    )
+    if assignment is None:
+        raise HTTPException(status_code=404, detail="Active experiment not found")
+
+    if settings.ab_assignment_audit:
+        background_tasks.add_task(record_assignment_audit, db, dict(assignment))
+
+    return assignment
+
 @router.get("/assignments/{session_id}", response_model=List[ExperimentAssignmentResponse])
 async def get_session_assignments(
     session_id: str,
@@ -319,16 +362,18 @@ async def track_event(
     if not experiment:
         raise HTTPException(status_code=404, detail="Experiment not found")
 
-    # If assignment_id is provided, verify it exists
+    # If assignment_id is provided, resolve the variant it assigned
+    variant_id = None
     if event.assignment_id:
-        assignment = db.query(ExperimentAssignment).filter(
-            ExperimentAssignment.id == event.assignment_id
-        ).first()
-        if not assignment:
+        variant_id = ExperimentEventIngestService(db).assignment_variant(event)
+        if variant_id is None:
             raise HTTPException(status_code=404, detail="Assignment not found")
 
     # Create event
     event_data = event.model_dump()
+    event_data['id'] = str(uuid.uuid4())
+    event_data['event_type'] = EventType(event.event_type.value)
+    event_data['variant_id'] = variant_id
     if event_data.get('occurred_at') is None:
         event_data['occurred_at'] = datetime.now(timezone.utc)
 
@@ -336,9 +381,28 @@ async def track_event(
     db.add(db_event)
     db.commit()
     db.refresh(db_event)
+    experiment_result_cache.invalidate(event.experiment_id)
 
     return db_event
 
+@router.post("/events/batch", response_model=ExperimentEventBatchResponse)
+async def track_events_batch(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Track a batch of events
+
+    The body is JSON Lines (application/x-ndjson), msgpack (application/msgpack)
+    or a JSON array of event objects. Valid events are stored in one multi-row
+    insert; invalid ones are returned by position in `rejected`.
+    """
+    try:
+        records = decode_event_batch(await request.body(), request.headers.get("content-type", ""))
+        return ExperimentEventIngestService(db).ingest(records)
+    except EventBatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/events", response_model=List[ExperimentEventResponse])
 async def list_events(
     experiment_id: str,
@@ -606,93 +670,32 @@ async def list_user_segments(
 async def calculate_experiment_results(experiment_id: str, db: Session) -> Dict[str, Any]:
     """Calculate statistical results for an experiment"""
 
-    # Get all events for this experiment
-    events = db.query(ExperimentEvent).filter(ExperimentEvent.experiment_id == experiment_id).all()
-
-    # Group events by variant
-    variant_events = {}
-    for event in events:
-        # Find the assignment for this event
-        if event.assignment_id:
-            assignment = db.query(ExperimentAssignment).filter(
-                ExperimentAssignment.id == event.assignment_id
-            ).first()
-            if assignment:
-                variant_id = assignment.variant_id
-                if variant_id not in variant_events:
-                    variant_events[variant_id] = []
-                variant_events[variant_id].append(event)
-
-    # Calculate metrics for each variant
-    results = {}
-    for variant_id, variant_event_list in variant_events.items():
-        conversion_events = [e for e in variant_event_list if e.event_type == EventType.CONVERSION]
-        sample_size = len(variant_event_list)
-        conversion_count = len(conversion_events)
-        conversion_rate = conversion_count / sample_size if sample_size > 0 else 0
-
-        results[variant_id] = {
-            "sample_size": sample_size,
-            "conversion_count": conversion_count,
-            "conversion_rate": conversion_rate,
-            "events": len(variant_event_list)
-        }
+    experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if not experiment:
+        return {}
 
-    return results
+    return ExperimentAnalyticsService(db).analyze(experiment)
 
 async def calculate_variant_performance(experiment_id: str, db: Session) -> List[VariantPerformance]:
     """Calculate performance metrics for each variant"""
 
-    # This is a simplified implementation
-    # In production, you'd want to use proper statistical libraries
-
     experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
     if not experiment:
         return []
 
-    # Get all events and assignments
-    events = db.query(ExperimentEvent).filter(ExperimentEvent.experiment_id == experiment_id).all()
-    assignments = db.query(ExperimentAssignment).filter(ExperimentAssignment.experiment_id == experiment_id).all()
-
-    # Group by variant
-    variant_stats = {}
-    for assignment in assignments:
-        variant_id = assignment.variant_id
-        if variant_id not in variant_stats:
-            variant_stats[variant_id] = {
-                "sample_size": 0,
-                "conversions": 0,
-                "variant_name": assignment.variant_name
-            }
-        variant_stats[variant_id]["sample_size"] += 1
-
-    # Count conversions
-    for event in events:
-        if event.assignment_id and event.event_type == EventType.CONVERSION:
-            assignment = db.query(ExperimentAssignment).filter(
-                ExperimentAssignment.id == event.assignment_id
-            ).first()
-            if assignment:
-                variant_id = assignment.variant_id
-                if variant_id in variant_stats:
-                    variant_stats[variant_id]["conversions"] += 1
-
-    # Convert to VariantPerformance objects
-    performance_list = []
-    for variant_id, stats in variant_stats.items():
-        conversion_rate = stats["conversions"] / stats["sample_size"] if stats["sample_size"] > 0 else 0
-
-        performance = VariantPerformance(
+    analysis = ExperimentAnalyticsService(db).analyze(experiment)
+
+    return [
+        VariantPerformance(
             variant_id=variant_id,
-            variant_name=stats["variant_name"],
-            sample_size=stats["sample_size"],
-            conversion_rate=conversion_rate,
-            confidence_interval_lower=0,  # Placeholder
-            confidence_interval_upper=0,  # Placeholder
-            p_value=0.5,  # Placeholder
-            is_winner=False,  # Placeholder
-            improvement_over_control=0  # Placeholder
+            variant_name=result["variant_name"],
+            sample_size=result["sample_size"],
+            conversion_rate=result["conversion_rate"],
+            confidence_interval_lower=result["confidence_interval_lower"],
+            confidence_interval_upper=result["confidence_interval_upper"],
+            p_value=result["p_value"],
+            is_winner=variant_id == analysis["winning_variant"],
+            improvement_over_control=result["improvement_over_control"]
         )
-        performance_list.append(performance)
-
-    return performance_list
\ No newline at end of file
+        for variant_id, result in analysis["variants"].items()
+    ]
@@ -21,6 +21,8 @@ from app.auth.workflow_approval_permissions import (
     get_workflow_approval_context,
     check_workflow_initiation_permission
 )
+from app.services.prompt_update_stream import publish_prompt_change
+from app.services.prompt_version_service import PromptVersionService
 from app.services.workflow_approval_service import WorkflowApprovalService
 
 router = APIRouter()
@@ -669,11 +671,13 @@ async def update_approval_request(
             raise HTTPException(status_code=400, detail=f"Status must be one of {valid_statuses}")
 
         # Update approved_at timestamp when status changes to approved
-        if update_data["status"] == "approved" and request_obj.status != "approved":
+        # Compare with the status before this update; request_obj already holds the new one
+        if update_data["status"] == "approved" and before_data["status"] != "approved":
             update_data["approved_at"] = datetime.now(timezone.utc)
 
     # Auto-activate prompt when approval is granted
-    if update_data.get("status") == "approved" and request_obj.status != "approved":
+    activated_prompt = None
+    if update_data.get("status") == "approved" and before_data["status"] != "approved":
         prompt = db.query(Prompt).filter(Prompt.id == request_obj.prompt_id).first()
         if prompt:
             # Validate that prompt has all required fields before activation
@@ -709,6 +713,8 @@ async def update_approval_request(
                 prompt.activated_by = request_obj.approver or approval_user["user_id"]
                 prompt.activation_reason = "Auto-activated upon approval"
                 prompt.updated_at = datetime.now(timezone.utc)
+                PromptVersionService(db).refresh_pointer(prompt.id)
+                activated_prompt = prompt
 
                 # Log the auto-activation
                 activation_audit_log = AuditLog(
@@ -758,6 +764,9 @@ async def update_approval_request(
     db.add(audit_log)
     db.commit()
 
+    if activated_prompt:
+        await publish_prompt_change(db, activated_prompt, "activate")
+
     # Get prompt information for the response
     prompt = db.query(Prompt).filter(Prompt.id == request_obj.prompt_id).first()
 
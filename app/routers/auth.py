@@ -7,8 +7,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from jose import JWTError
 import structlog
 
+from app.auth.authentication import DEV_TOKEN_SIGNATURE, verify_token_claims
+from app.auth.token_cache import token_verification_cache
 from app.database import get_db
 from app.services.auth_service import AuthService
 
@@ -170,8 +173,20 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     return current_user
 
 @router.post("/logout")
-async def logout():
-    """Logout endpoint (client-side token clearing)"""
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Logout endpoint - revokes the presented access token"""
+    try:
+        claims = verify_token_claims(credentials.credentials)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Unsigned development tokens can carry any jti, so only their own digest is revoked
+    jti = None if DEV_TOKEN_SIGNATURE in credentials.credentials else claims.get("jti")
+    token_verification_cache.revoke(token=credentials.credentials, jti=jti, exp=claims.get("exp"))
     return {"message": "Successfully logged out"}
 
 @router.get("/health")
@@ -1,24 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from typing import List, Optional, Dict, Any
+from pydantic import ValidationError
+import json
 import uuid
 import time
+import zlib
 from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models import (
-    ClientApiKey, ClientUsageLog, RateLimitRecord,
+    ClientApiKey, ClientUsageLog, RateLimitRecord, SDK_USAGE_SOURCE,
     ClientApiKeyStatus, Prompt, Module, Project
 )
 from app.schemas import (
     ClientApiKeyCreate, ClientApiKeyResponse, ClientApiKeyUpdate,
-    ClientApiKeyCreateResponse, UsageLogCreate, UsageLogResponse,
+    ClientApiKeyCreateResponse, UsageLogCreate, UsageLogBatchRecord, UsageLogResponse,
     UsageStatsRequest, UsageStatsResponse, UsageLimitsResponse,
     APIKeyValidationRequest, APIKeyValidationResponse,
     BatchPromptRequest, BatchPromptResponse,
-    PromptSearchRequest, PromptSearchResponse
+    PromptSearchRequest, PromptSearchResponse, ProjectSnapshotDeltaRequest
 )
 from app.client_auth import (
     get_current_client_user, require_scope, require_project_access,
@@ -27,15 +30,25 @@ from app.client_auth import (
 from app.utils import (
     generate_api_key_pair, hash_api_key, hash_secret_key, extract_api_key_prefix,
     create_hmac_signature, format_timestamp, validate_prompt_id,
-    validate_project_id, get_client_ip, encrypt_secret_key, decrypt_secret_key
+    validate_project_id, get_client_ip, encrypt_secret_key, decrypt_secret_key,
+    compute_prompt_etag, etag_matches
 )
 from app.auth import get_current_user
+from app.services.prompt_version_service import PromptVersionService
+from app.services.prompt_search_service import PromptSearchService
+from app.services.prompt_snapshot_service import PromptSnapshotService, serialize_snapshot_prompt
+from app.services.prompt_update_stream import SSE_RETRY_MS, prompt_update_broker, parse_event_id
+from app.services.redis_service import get_redis_service
 from fastapi import Request
 import structlog
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Limits for batched usage uploads
+MAX_USAGE_BATCH_BYTES = 16 * 1024 * 1024
+MAX_USAGE_BATCH_RECORDS = 10000
+
 # Unprotected routes for web UI (using user auth instead of API key auth)
 @router.get("/web/auth/api-keys", response_model=List[ClientApiKeyResponse])
 async def list_api_keys_web(
@@ -334,6 +347,8 @@ async def validate_api_key_endpoint(
 @router.get("/prompts/{prompt_id}")
 async def get_prompt(
     prompt_id: str,
+    request: Request,
+    response: Response,
     project_id: Optional[str] = None,
     db: Session = Depends(get_db),
     user: dict = Depends(require_scope("read")),
@@ -358,25 +373,8 @@ async def get_prompt(
     if project_id:
         user = await require_project_access(project_id)(user)
 
-    # Get latest version of the prompt
-    # Support both old and new ID patterns for backward compatibility
-    import re
-
-    # Check if prompt_id has a version suffix
-    if re.match(r'^.+-v\d+\.\d+\.\d+$', prompt_id):
-        # Extract the base prompt ID
-        base_prompt_id = re.sub(r'-v\d+\.\d+\.\d+$', '', prompt_id)
-        # Find all versions of this base prompt
-        prompt = db.query(Prompt).filter(
-            (Prompt.id == base_prompt_id) |
-            (Prompt.id.like(f"{base_prompt_id}-v%"))
-        ).order_by(Prompt.version.desc()).first()
-    else:
-        # Find all versions of this prompt (original pattern and versioned pattern)
-        prompt = db.query(Prompt).filter(
-            (Prompt.id == prompt_id) |
-            (Prompt.id.like(f"{prompt_id}-v%"))
-        ).order_by(Prompt.version.desc()).first()
+    # Get latest version of the prompt (base ID or versioned `-vX.Y.Z` ID)
+    prompt = PromptVersionService(db).get_latest_prompt(prompt_id)
 
     if not prompt:
         raise HTTPException(
@@ -393,7 +391,14 @@ async def get_prompt(
                 detail="No access to this prompt"
             )
 
-    return {
+    # Answer conditional requests before the body is built
+    etag = compute_prompt_etag(prompt.id, prompt.version, prompt.updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    body = {
         "id": prompt.id,
         "version": prompt.version,
         "name": prompt.name,
@@ -412,6 +417,8 @@ async def get_prompt(
         "mas_risk_level": prompt.mas_risk_level
     }
 
+    return body
+
 @router.get("/prompts/{prompt_id}/versions")
 async def get_prompt_versions(
     prompt_id: str,
@@ -479,6 +486,8 @@ async def get_prompt_versions(
 async def get_prompt_version(
     prompt_id: str,
     version: str,
+    request: Request,
+    response: Response,
     project_id: Optional[str] = None,
     db: Session = Depends(get_db),
     user: dict = Depends(require_scope("read")),
@@ -519,7 +528,14 @@ async def get_prompt_version(
                 detail="No access to this prompt"
             )
 
-    return {
+    # Answer conditional requests before the body is built
+    etag = compute_prompt_etag(prompt.id, prompt.version, prompt.updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    body = {
         "id": prompt.id,
         "version": prompt.version,
         "name": prompt.name,
@@ -533,6 +549,8 @@ async def get_prompt_version(
         "updated_at": prompt.updated_at
     }
 
+    return body
+
 @router.get("/prompts", response_model=PromptSearchResponse)
 async def search_prompts(
     query: Optional[str] = None,
@@ -540,13 +558,56 @@ async def search_prompts(
     module_id: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
     db: Session = Depends(get_db),
     user: dict = Depends(require_scope("read")),
     project_user: dict = Depends(optional_project_access)
 ):
-    """Search and list prompts"""
+    """Search and list prompts
+
+    Text queries are served from the full-text index and ranked by relevance;
+    pass the returned `next_cursor` as `cursor` to fetch the following page.
+    """
+
+    if query:
+        try:
+            results = PromptSearchService(db).search(
+                query,
+                project_id=project_id,
+                module_id=module_id,
+                limit=limit,
+                offset=offset,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        return PromptSearchResponse(
+            prompts=[
+                {
+                    "id": prompt.id,
+                    "version": prompt.version,
+                    "name": prompt.name,
+                    "description": prompt.description,
+                    "module_id": prompt.module_id,
+                    "created_by": prompt.created_by,
+                    "created_at": prompt.created_at,
+                    "updated_at": prompt.updated_at,
+                    "score": score
+                }
+                for prompt, score in zip(results["prompts"], results["scores"])
+            ],
+            total=results["total"],
+            limit=limit,
+            offset=offset,
+            has_more=results["has_more"],
+            next_cursor=results["next_cursor"]
+        )
 
     # Build query
     db_query = db.query(Prompt)
@@ -558,15 +619,6 @@ async def search_prompts(
     if module_id:
         db_query = db_query.filter(Prompt.module_id == module_id)
 
-    if query:
-        db_query = db_query.filter(
-            or_(
-                Prompt.name.ilike(f"%{query}%"),
-                Prompt.description.ilike(f"%{query}%"),
-                Prompt.content.ilike(f"%{query}%")
-            )
-        )
-
     # Get total count
     total = db_query.count()
 
@@ -619,25 +671,8 @@ async def get_model_specific_prompt(
 ):
     """Get model-specific version of a prompt"""
 
-    # Get latest version of the prompt
-    # Support both old and new ID patterns for backward compatibility
-    import re
-
-    # Check if prompt_id has a version suffix
-    if re.match(r'^.+-v\d+\.\d+\.\d+$', prompt_id):
-        # Extract the base prompt ID
-        base_prompt_id = re.sub(r'-v\d+\.\d+\.\d+$', '', prompt_id)
-        # Find all versions of this base prompt
-        prompt = db.query(Prompt).filter(
-            (Prompt.id == base_prompt_id) |
-            (Prompt.id.like(f"{base_prompt_id}-v%"))
-        ).order_by(Prompt.version.desc()).first()
-    else:
-        # Find all versions of this prompt (original pattern and versioned pattern)
-        prompt = db.query(Prompt).filter(
-            (Prompt.id == prompt_id) |
-            (Prompt.id.like(f"{prompt_id}-v%"))
-        ).order_by(Prompt.version.desc()).first()
+    # Get latest version of the prompt (base ID or versioned `-vX.Y.Z` ID)
+    prompt = PromptVersionService(db).get_latest_prompt(prompt_id)
 
     if not prompt:
         raise HTTPException(
@@ -703,25 +738,8 @@ async def batch_get_prompts(
 
     for prompt_id in batch_request.prompt_ids:
         try:
-            # Get latest version of the prompt
-            # Support both old and new ID patterns for backward compatibility
-            import re
-
-            # Check if prompt_id has a version suffix
-            if re.match(r'^.+-v\d+\.\d+\.\d+$', prompt_id):
-                # Extract the base prompt ID
-                base_prompt_id = re.sub(r'-v\d+\.\d+\.\d+$', '', prompt_id)
-                # Find all versions of this base prompt
-                prompt = db.query(Prompt).filter(
-                    (Prompt.id == base_prompt_id) |
-                    (Prompt.id.like(f"{base_prompt_id}-v%"))
-                ).order_by(Prompt.version.desc()).first()
-            else:
-                # Find all versions of this prompt (original pattern and versioned pattern)
-                prompt = db.query(Prompt).filter(
-                    (Prompt.id == prompt_id) |
-                    (Prompt.id.like(f"{prompt_id}-v%"))
-                ).order_by(Prompt.version.desc()).first()
+            # Get latest version of the prompt (base ID or versioned `-vX.Y.Z` ID)
+            prompt = PromptVersionService(db).get_latest_prompt(prompt_id)
 
             if not prompt:
                 errors.append({"prompt_id": prompt_id, "error": "Prompt not found"})
@@ -750,16 +768,8 @@ async def batch_get_prompts(
                 ]
 
             if batch_request.include_metadata:
-                prompt_data.update({
-                    "description": prompt.description,
-                    "module_id": prompt.module_id,
-                    "created_by": prompt.created_by,
-                    "created_at": prompt.created_at,
-                    "updated_at": prompt.updated_at,
-                    "target_models": prompt.target_models,
-                    "mas_intent": prompt.mas_intent,
-                    "mas_risk_level": prompt.mas_risk_level
-                })
+                # The full client API shape, so SDKs can cache batched prompts as-is
+                prompt_data.update(serialize_snapshot_prompt(prompt))
 
             prompts[prompt_id] = prompt_data
 
@@ -773,6 +783,121 @@ async def batch_get_prompts(
         total_found=len(prompts)
     )
 
+# Project Snapshot Endpoints
+
+@router.get("/projects/{project_id}/snapshot")
+async def get_project_snapshot(
+    project_id: str,
+    request: Request,
+    response: Response,
+    module_id: Optional[str] = None,
+    tag: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_scope("read"))
+):
+    """Get every active prompt of a project as one versioned bundle
+
+    The bundle's `snapshot_id` is the hash of its manifest and doubles as the
+    ETag, so an unchanged project answers `If-None-Match` with 304.
+    """
+
+    if not validate_project_id(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project ID format"
+        )
+
+    user = await require_project_access(project_id)(user)
+
+    snapshot = PromptSnapshotService(db).build_snapshot(project_id, module_id=module_id, tag=tag)
+
+    etag = f'"{snapshot["snapshot_id"]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    logger.info("Project snapshot served", project_id=project_id, prompts=snapshot["total"])
+    return snapshot
+
+@router.post("/projects/{project_id}/snapshot/delta")
+async def get_project_snapshot_delta(
+    project_id: str,
+    delta_request: ProjectSnapshotDeltaRequest,
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_scope("read"))
+):
+    """Get the changes since a snapshot, given the manifest the client holds"""
+
+    if not validate_project_id(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project ID format"
+        )
+
+    user = await require_project_access(project_id)(user)
+
+    return PromptSnapshotService(db).build_delta(
+        project_id,
+        delta_request.manifest,
+        module_id=delta_request.module_id,
+        tag=delta_request.tag
+    )
+
+@router.get("/projects/{project_id}/updates")
+async def stream_project_updates(
+    project_id: str,
+    request: Request,
+    last_event_id: Optional[str] = None,
+    user: dict = Depends(require_scope("read")),
+    redis_service = Depends(get_redis_service)
+):
+    """Stream prompt change events for a project as server-sent events
+
+    Each event's `id` is a resume token. Reconnecting clients send it back in the
+    `Last-Event-ID` header (or `last_event_id` query parameter) to receive the
+    events they missed. A `reset` event means history was lost and cached
+    prompts for the project should be dropped. Idle connections get heartbeat
+    comments.
+    """
+
+    if not validate_project_id(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project ID format"
+        )
+
+    user = await require_project_access(project_id)(user)
+
+    resume_token = request.headers.get("last-event-id") or last_event_id
+    if resume_token:
+        try:
+            parse_event_id(resume_token)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    if not await prompt_update_broker.available():
+        # SDKs fall back to polling with cache TTLs until the stream is back
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prompt update stream is unavailable",
+            headers={"Retry-After": str(SSE_RETRY_MS // 1000)}
+        )
+
+    return StreamingResponse(
+        prompt_update_broker.stream(project_id, last_event_id=resume_token),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Bypass response compression and proxy buffering so events flush immediately
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 # Usage Analytics Endpoints
 
 @router.post("/usage/log")
@@ -809,6 +934,82 @@ async def log_usage_endpoint(
 
     return {"message": "Usage logged successfully"}
 
+def _decode_usage_batch(body: bytes, content_encoding: Optional[str]) -> List[str]:
+    """Split a usage upload into JSON lines, inflating gzip bodies up to the size limit"""
+    if content_encoding and content_encoding.lower() == "gzip":
+        try:
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = inflater.decompress(body, MAX_USAGE_BATCH_BYTES)
+        except zlib.error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip body")
+        if inflater.unconsumed_tail:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Usage batch too large")
+    elif content_encoding and content_encoding.lower() != "identity":
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported content encoding")
+
+    lines = [line for line in body.decode("utf-8", errors="replace").splitlines() if line.strip()]
+    if len(lines) > MAX_USAGE_BATCH_RECORDS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many usage records")
+    return lines
+
+@router.post("/usage/batch")
+async def log_usage_batch(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: dict = Depends(require_scope("write"))
+):
+    """Log a batch of SDK telemetry records sent as (optionally gzip-compressed) JSON Lines"""
+
+    body = await request.body()
+    if len(body) > MAX_USAGE_BATCH_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Usage batch too large")
+    lines = _decode_usage_batch(body, request.headers.get("content-encoding"))
+
+    user_agent = request.headers.get("user-agent")
+    ip_address = get_client_ip(request)
+    usage_logs = []
+    rejected = 0
+    for line in lines:
+        try:
+            record = UsageLogBatchRecord(**json.loads(line))
+        except (ValueError, TypeError, ValidationError):
+            rejected += 1
+            continue
+
+        usage_log = ClientUsageLog(
+            id=str(uuid.uuid4()),
+            api_key_id=user["api_key_id"],
+            user_id=user["user_id"],
+            tenant_id=user["tenant_id"],
+            endpoint=record.endpoint,
+            method=record.method,
+            prompt_id=record.prompt_id,
+            project_id=record.project_id,
+            tokens_requested=record.tokens_requested,
+            tokens_used=record.tokens_used,
+            response_size=record.response_size,
+            processing_time_ms=record.processing_time_ms,
+            estimated_cost_usd=record.estimated_cost_usd,
+            status_code=record.status_code,
+            error_message=record.error_message,
+            user_agent=record.user_agent or user_agent,
+            ip_address=record.ip_address or ip_address,
+            request_id=record.request_id,
+            source=SDK_USAGE_SOURCE
+        )
+        if record.timestamp:
+            usage_log.timestamp = record.timestamp
+        usage_logs.append(usage_log)
+
+    if usage_logs:
+        db.add_all(usage_logs)
+        db.commit()
+
+    if rejected:
+        logger.warning("Rejected usage records in batch", rejected=rejected, accepted=len(usage_logs))
+
+    return {"accepted": len(usage_logs), "rejected": rejected}
+
 @router.get("/usage/stats", response_model=UsageStatsResponse)
 async def get_usage_stats(
     start_date: Optional[datetime] = None,
@@ -833,6 +1034,7 @@ async def get_usage_stats(
     query = db.query(ClientUsageLog).filter(
         and_(
             ClientUsageLog.user_id == user["user_id"],
+            ClientUsageLog.source != SDK_USAGE_SOURCE,
             ClientUsageLog.timestamp >= start_date,
             ClientUsageLog.timestamp <= end_date
         )
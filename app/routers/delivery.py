@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 import structlog
@@ -6,7 +6,9 @@ import structlog
 from app.database import get_db
 from app.models import Prompt
 from app.services.redis_service import get_redis_service
+from app.services.prompt_version_service import PromptVersionService
 from app.auth import get_current_user
+from app.utils import compute_prompt_etag, etag_matches
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -15,6 +17,8 @@ router = APIRouter()
 async def get_prompt_runtime(
     prompt_id: str,
     version: str,
+    request: Request,
+    response: Response,
     provider_id: Optional[str] = Query(None, description="Optional provider ID to get provider-specific prompt"),
     redis_service = Depends(get_redis_service),
     db: Session = Depends(get_db),
@@ -30,6 +34,12 @@ async def get_prompt_runtime(
         cached_prompt = await redis_service.get_cached_prompt(prompt_id, version)
 
         if cached_prompt:
+            etag = compute_prompt_etag(cached_prompt["id"], version, cached_prompt.get("updated_at"))
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
+
             logger.info("Prompt served from cache", prompt_id=prompt_id, version=version)
             return {
                 "source": "cache",
@@ -60,6 +70,13 @@ async def get_prompt_runtime(
         if not prompt:
             raise HTTPException(status_code=404, detail="Prompt not found")
 
+        # Same validator as the cache path, checked before the body is built
+        etag = compute_prompt_etag(prompt.id, version, prompt.updated_at)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
         # Prepare prompt data
         prompt_data = {
             "id": prompt.id,
@@ -115,22 +132,17 @@ async def get_latest_prompt_runtime(
                 "latency": "low"
             }
 
-        # Fallback to database - get latest version
-        query = db.query(Prompt).filter(Prompt.id == prompt_id)
+        # Fallback to database - resolve the latest version through the version pointer
+        version_service = PromptVersionService(db)
+        latest_prompt = None
 
         # If provider_id is specified, try to get provider-specific prompt first
         if provider_id:
-            latest_prompt = query.filter(Prompt.provider_id == provider_id).order_by(Prompt.updated_at.desc()).first()
-            # If no provider-specific prompt found, fall back to default (null provider_id)
-            if not latest_prompt:
-                latest_prompt = query.filter(Prompt.provider_id.is_(None)).order_by(Prompt.updated_at.desc()).first()
-        else:
-            # Get provider-specific prompt or default (null provider_id)
-            latest_prompt = query.order_by(Prompt.updated_at.desc()).first()
+            latest_prompt = version_service.get_latest_prompt(prompt_id, provider_id=provider_id)
 
-        # If still no prompt found, try any version of this prompt
+        # Fall back to the latest version of the prompt family
         if not latest_prompt:
-            latest_prompt = query.filter(Prompt.provider_id.is_(None)).order_by(Prompt.updated_at.desc()).first()
+            latest_prompt = version_service.get_latest_prompt(prompt_id)
 
         if not latest_prompt:
             raise HTTPException(status_code=404, detail="Prompt not found")
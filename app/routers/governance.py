@@ -45,6 +45,7 @@ from app.schemas import (
     BulkRoleAssignmentRequest, BulkRoleAssignmentResponse,
     BulkPermissionUpdateRequest, BulkPermissionUpdateResponse,
     EnhancedPermissionCheckRequest, EnhancedPermissionCheckResponse,
+    ResourceAccessFilterRequest, ResourceAccessFilterResponse,
     AuditLogResponse, AuditLogFilter, AuditLogExportRequest, AuditLogExportResponse, AuditLogStats,
     WorkflowStepCreate, WorkflowStepResponse, WorkflowStepUpdate,
     WorkflowStepExecutionCreate, WorkflowStepExecutionResponse, WorkflowStepExecutionUpdate,
@@ -860,6 +861,31 @@ async def check_permission(
         conditions_met=conditions_met
     )
 
+@router.post("/permissions/filter-resources", response_model=ResourceAccessFilterResponse)
+async def filter_accessible_resources(
+    request: Request,
+    filter_data: ResourceAccessFilterRequest = Body(...),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Filter a page of resource ids to those the current user can act on"""
+    user_roles = current_user.get("roles") or [current_user.get("role", "user")]
+    allowed_ids = rbac_service.filter_accessible_resources(
+        user_roles=user_roles,
+        action=filter_data.action,
+        resource_type=filter_data.resource_type,
+        resource_ids=filter_data.resource_ids,
+        context={**(filter_data.context or {}), "user_id": current_user["user_id"], "tenant_id": current_user["tenant"]},
+        db=db
+    )
+
+    return ResourceAccessFilterResponse(
+        action=filter_data.action,
+        resource_type=filter_data.resource_type,
+        allowed_ids=allowed_ids,
+        denied_count=len(filter_data.resource_ids) - len(allowed_ids)
+    )
+
 # ============ SECURITY EVENT ENDPOINTS ============
 
 @router.post("/security-events", response_model=SecurityEventResponse)
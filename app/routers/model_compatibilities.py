@@ -26,7 +26,7 @@ async def list_model_compatibilities(
     if prompt_id:
         query = query.filter(ModelCompatibility.prompt_id == prompt_id)
     if provider_type:
-        query = query.filter(ModelCompatibility.provider_type == provider_type)
+        query = query.filter(ModelCompatibility.model_provider == provider_type)
 
     compatibilities = query.offset(skip).limit(limit).all()
     return compatibilities
@@ -147,8 +147,8 @@ async def delete_model_compatibility(
 
     # Store compatibility data for audit log
     compatibility_data = {
-        "provider_name": compatibility.provider_name,
-        "provider_type": compatibility.provider_type,
+        "model_name": compatibility.model_name,
+        "model_provider": compatibility.model_provider,
         "is_compatible": compatibility.is_compatible,
         "prompt_id": compatibility.prompt_id
     }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.model_testing_service import ModelTestingService
@@ -31,6 +32,31 @@ async def test_prompt_across_providers(
         raise HTTPException(status_code=500, detail="Failed to test prompt across providers")
 
 
+@router.post("/test-prompt-across-providers/stream")
+async def stream_prompt_across_providers(
+    test_request: ModelTestRequest,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Test a prompt across providers, streaming each result as a server-sent event when it completes"""
+    try:
+        service = ModelTestingService(db)
+        events = await service.stream_prompt_across_providers(current_user["user_id"], test_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/user-providers")
 async def get_user_providers(
     request: Request,
@@ -13,6 +13,8 @@ from app.auth import get_current_user
 from app.services.auth_service import AuthService
 from app.config import settings
 from app.auth.rbac import rbac_service, Permission
+from app.services.prompt_version_service import PromptVersionService
+from app.services.prompt_update_stream import publish_prompt_change
 
 # Configure logging for authentication debugging
 logger = logging.getLogger(__name__)
@@ -31,33 +33,6 @@ def increment_version(version: str) -> str:
         # Return original version if invalid format
         return version
 
-def get_latest_version_from_prompts(prompts: List[Any]) -> str:
-    """Get the latest version from a list of prompt objects"""
-    if not prompts:
-        return "1.0.0"
-
-    latest_version = "1.0.0"
-    for prompt in prompts:
-        try:
-            parts = prompt.version.split('.')
-            if len(parts) == 3:
-                current = [int(parts[0]), int(parts[1]), int(parts[2])]
-                latest_parts = latest_version.split('.')
-                latest = [int(latest_parts[0]), int(latest_parts[1]), int(latest_parts[2])]
-
-                # Compare versions
-                for i in range(3):
-                    if current[i] > latest[i]:
-                        latest_version = prompt.version
-                        break
-                    elif current[i] < latest[i]:
-                        break
-        except (ValueError, IndexError):
-            # Skip invalid version formats
-            continue
-
-    return latest_version
-
 router = APIRouter()
 
 @router.get("/modules/{module_id}/latest-version")
@@ -72,9 +47,7 @@ async def get_latest_module_version(
     if not module:
         raise HTTPException(status_code=404, detail="Module not found")
 
-    # Get all prompts in the module
-    prompts = db.query(Prompt).filter(Prompt.module_id == module_id).all()
-    latest_version = get_latest_version_from_prompts(prompts)
+    latest_version = PromptVersionService(db).get_latest_module_version(module_id)
 
     return {"latest_version": latest_version}
 
@@ -234,6 +207,7 @@ async def create_prompt(
     )
 
     db.add(prompt)
+    PromptVersionService(db).refresh_pointer(prompt.id)
     db.commit()
     db.refresh(prompt)
 
@@ -345,6 +319,8 @@ async def create_prompt(
             db.add(error_audit_log)
             db.commit()
 
+    await publish_prompt_change(db, prompt, "create")
+
     return prompt
 
 @router.put("/{prompt_id}/{version}", response_model=PromptResponse)
@@ -446,6 +422,7 @@ async def update_prompt(
                     setattr(new_prompt, field, value)
 
                 db.add(new_prompt)
+                PromptVersionService(db).refresh_pointer(new_prompt.id)
                 db.commit()
                 db.refresh(new_prompt)
 
@@ -487,6 +464,7 @@ async def update_prompt(
                 setattr(prompt, field, value)
 
             prompt.updated_at = datetime.now(timezone.utc)
+            PromptVersionService(db).refresh_pointer(prompt.id)
             db.commit()
             db.refresh(prompt)
 
@@ -546,6 +524,8 @@ async def update_prompt(
         db.add(audit_log)
         db.commit()
 
+        await publish_prompt_change(db, prompt, "update")
+
         return prompt
 
     # Regular update (no version change)
@@ -557,6 +537,7 @@ async def update_prompt(
         setattr(prompt, field, value)
 
     prompt.updated_at = datetime.now(timezone.utc)
+    PromptVersionService(db).refresh_pointer(prompt.id)
 
     db.commit()
     db.refresh(prompt)
@@ -586,6 +567,8 @@ async def update_prompt(
     db.add(audit_log)
     db.commit()
 
+    await publish_prompt_change(db, prompt, "update")
+
     return prompt
 
 @router.delete("/{prompt_id}/{version}")
@@ -639,6 +622,7 @@ async def delete_prompt(
         db.delete(approval_request)
 
     db.delete(prompt)
+    PromptVersionService(db).refresh_pointer(prompt.id)
     db.commit()
 
     # Log the deletion
@@ -657,6 +641,8 @@ async def delete_prompt(
     db.add(audit_log)
     db.commit()
 
+    await publish_prompt_change(db, prompt, "delete")
+
     return {"message": "Prompt version deleted successfully"}
 
 @router.post("/{prompt_id}/{version}/activate", response_model=PromptResponse)
@@ -711,6 +697,7 @@ async def activate_prompt(
     prompt.activated_by = current_user["user_id"] if current_user else "demo-user"
     prompt.activation_reason = reason
     prompt.updated_at = datetime.now(timezone.utc)
+    PromptVersionService(db).refresh_pointer(prompt.id)
 
     db.commit()
     db.refresh(prompt)
@@ -745,6 +732,8 @@ async def activate_prompt(
     db.add(audit_log)
     db.commit()
 
+    await publish_prompt_change(db, prompt, "activate")
+
     return prompt
 
 @router.post("/{prompt_id}/{version}/deactivate", response_model=PromptResponse)
@@ -786,6 +775,7 @@ async def deactivate_prompt(
     prompt.activated_by = current_user["user_id"] if current_user else "demo-user"
     prompt.activation_reason = reason
     prompt.updated_at = datetime.now(timezone.utc)
+    PromptVersionService(db).refresh_pointer(prompt.id)
 
     db.commit()
     db.refresh(prompt)
@@ -820,4 +810,6 @@ async def deactivate_prompt(
     db.add(audit_log)
     db.commit()
 
+    await publish_prompt_change(db, prompt, "deactivate")
+
     return prompt
@@ -276,6 +276,12 @@ class ModelCompatibilityResponse(BaseModel):
     is_compatible: bool
     compatibility_notes: Optional[str] = None
     created_at: datetime
+    prompt_version: Optional[str] = None
+    status: Optional[str] = None
+    response_time: Optional[float] = None
+    quality_score: Optional[float] = None
+    estimated_cost: Optional[float] = None
+    error: Optional[str] = None
 
     model_config = ConfigDict(
         protected_namespaces=(),
@@ -526,6 +532,10 @@ class UsageLogCreate(BaseModel):
     ip_address: Optional[str] = None
     request_id: Optional[str] = None
 
+class UsageLogBatchRecord(UsageLogCreate):
+    """One line of a batched usage upload; the timestamp is when the client recorded it"""
+    timestamp: Optional[datetime] = None
+
 class UsageLogResponse(BaseModel):
     id: str
     api_key_id: str
@@ -618,15 +628,22 @@ class PromptSearchRequest(BaseModel):
     module_id: Optional[str] = None
     limit: int = Field(default=50, ge=1, le=1000)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None
     sort_by: str = Field(default="created_at", pattern="^(created_at|updated_at|name)$")
     sort_order: str = Field(default="desc", pattern="^(asc|desc)$")
 
 class PromptSearchResponse(BaseModel):
     prompts: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None  # Not counted on cursor pages
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None
+
+class ProjectSnapshotDeltaRequest(BaseModel):
+    manifest: Dict[str, str] = Field(default_factory=dict)
+    module_id: Optional[str] = None
+    tag: Optional[str] = None
 
 # AI Assistant Schemas
 
@@ -1309,6 +1326,18 @@ class EnhancedPermissionCheckResponse(BaseModel):
     reason: str
     conditions_met: Dict[str, bool]
 
+class ResourceAccessFilterRequest(BaseModel):
+    action: str = Field(..., min_length=1, max_length=50)
+    resource_type: str = Field(..., min_length=1, max_length=50)
+    resource_ids: List[str] = Field(..., max_items=1000)
+    context: Optional[Dict[str, Any]] = None
+
+class ResourceAccessFilterResponse(BaseModel):
+    action: str
+    resource_type: str
+    allowed_ids: List[str]
+    denied_count: int
+
 # ============ AUDIT LOG SCHEMAS ============
 
 class AuditLogResponse(BaseModel):
@@ -2267,6 +2296,7 @@ class ExperimentCreate(BaseModel):
     end_time: Optional[datetime] = None
     traffic_percentage: int = Field(default=50, ge=1, le=100)
     allocation_strategy: TrafficAllocationStrategy = TrafficAllocationStrategy.UNIFORM
+    assignment_salt: Optional[str] = Field(None, max_length=64)
     target_audience: Optional[Dict[str, Any]] = None
     geographic_targeting: Optional[Dict[str, Any]] = None
     user_attributes: Optional[Dict[str, Any]] = None
@@ -2303,6 +2333,7 @@ class ExperimentResponse(BaseModel):
     end_time: Optional[datetime]
     traffic_percentage: int
     allocation_strategy: TrafficAllocationStrategy
+    assignment_salt: Optional[str] = None
     target_audience: Optional[Dict[str, Any]]
     geographic_targeting: Optional[Dict[str, Any]]
     user_attributes: Optional[Dict[str, Any]]
@@ -2332,6 +2363,11 @@ class ExperimentAssignmentCreate(BaseModel):
     assignment_reason: Optional[str] = None
     is_consistent: bool = True
 
+class ExperimentAssignRequest(BaseModel):
+    session_id: str
+    user_id: Optional[str] = None
+    device_id: Optional[str] = None
+
 class ExperimentAssignmentResponse(BaseModel):
     id: str
     experiment_id: str
@@ -2364,10 +2400,15 @@ class ExperimentEventCreate(BaseModel):
     error_message: Optional[str] = None
     occurred_at: Optional[datetime] = None
 
+class ExperimentEventBatchResponse(BaseModel):
+    accepted: int
+    rejected: List[Dict[str, Any]]
+
 class ExperimentEventResponse(BaseModel):
     id: str
     experiment_id: str
     assignment_id: Optional[str]
+    variant_id: Optional[str] = None
     event_type: EventType
     event_name: str
     event_data: Optional[Dict[str, Any]]
@@ -322,6 +322,12 @@ class AuthService:
             # Decode JWT token with proper signature verification for production tokens
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
 
+            # Tokens revoked at logout are rejected
+            from app.auth.token_cache import token_digest, token_verification_cache
+            if token_verification_cache.is_revoked(token_digest(token), payload.get("jti")):
+                logger.error("JWT verification failed: Token has been revoked", token_type=token_type)
+                raise Exception("Invalid token")
+
             if payload.get("type") != token_type:
                 logger.error("JWT verification failed: Invalid token type", expected=token_type, actual=payload.get("type"))
                 raise Exception(f"Invalid token type. Expected: {token_type}")
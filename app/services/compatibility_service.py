@@ -1,20 +1,50 @@
-import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import asyncio
+import hashlib
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 import structlog
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Prompt, ModelCompatibility
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Prompt, Module, ModelCompatibility
 from app.services.model_service import ModelProviderService, CompatibilityStatus
 
 logger = structlog.get_logger()
 
+PromptKey = Tuple[str, str]
+
+def content_hash(content: str) -> str:
+    """Hash prompt content so identical prompts share compatibility results"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _is_compatible(status: str) -> bool:
+    return status in [CompatibilityStatus.WORKS.value, CompatibilityStatus.NEEDS_TUNING.value]
+
+def _row_result(row) -> Dict[str, Any]:
+    return {
+        "status": row.status,
+        "response_time": row.response_time or 0,
+        "quality_score": row.quality_score or 0,
+        "estimated_cost": row.estimated_cost or 0,
+        "error": row.error
+    }
+
 class CompatibilityService:
-    """Service for managing prompt compatibility testing"""
+    """Service for managing prompt compatibility testing.
+
+    Tests are scheduled by prompt content hash: identical content is tested
+    once, providers with results younger than the cache TTL are skipped, and
+    distinct contents are tested with bounded concurrency. Results are appended
+    as typed rows, so history is kept for trends. No database session is held
+    while provider calls are in flight.
+    """
 
-    def __init__(self):
-        self.model_service = ModelProviderService()
+    def __init__(self, session_factory=SessionLocal, model_service: Optional[ModelProviderService] = None):
+        self.session_factory = session_factory
+        self.model_service = model_service or ModelProviderService()
 
     async def test_prompt_compatibility(
         self,
@@ -24,132 +54,172 @@ class CompatibilityService:
         force_refresh: bool = False
     ) -> Dict[str, Any]:
         """Test compatibility of a specific prompt with model providers"""
-        db = next(get_db())
-
-        # Get the prompt from database
-        prompt = db.query(Prompt).filter(
-            Prompt.id == prompt_id,
-            Prompt.version == version
-        ).first()
-
-        if not prompt:
-            raise ValueError(f"Prompt {prompt_id}@{version} not found")
-
         # Use all providers if not specified
         if providers is None:
             providers = self.model_service.get_supported_providers()
 
-        # Check if we need to run tests (based on cache age or force refresh)
-        if not force_refresh:
-            cached_results = self._get_cached_results(prompt_id, version, providers)
-            if cached_results:
-                return cached_results
+        with self.session_factory() as db:
+            prompt = db.query(Prompt.content).filter(
+                Prompt.id == prompt_id,
+                Prompt.version == version
+            ).first()
 
-        # Run compatibility tests
-        test_results = await self.model_service.run_compatibility_tests(prompt.content)
+            if not prompt:
+                raise ValueError(f"Prompt {prompt_id}@{version} not found")
 
-        # Store results in database
-        await self._store_compatibility_results(prompt_id, version, test_results)
+        results, errors = await self._schedule({(prompt_id, version): prompt.content}, providers, force_refresh)
 
+        if errors:
+            raise RuntimeError(errors[(prompt_id, version)])
+
+        test_results = results[(prompt_id, version)]
         logger.info(
             "Compatibility tests completed",
             prompt_id=prompt_id,
             version=version,
-            working_count=len(test_results["summary"]["working_providers"])
+            cached=test_results["cached"],
+            working_count=test_results["summary"]["working_count"]
         )
-
         return test_results
 
-    async def _store_compatibility_results(
+    async def _schedule(
         self,
-        prompt_id: str,
-        version: str,
-        test_results: Dict[str, Any]
+        contents: Dict[PromptKey, str],
+        providers: List[str],
+        force_refresh: bool = False
+    ) -> Tuple[Dict[PromptKey, Dict[str, Any]], Dict[PromptKey, str]]:
+        """Test prompt contents, reusing fresh results and testing each distinct content once"""
+        by_hash: Dict[str, List[PromptKey]] = {}
+        content_by_hash: Dict[str, str] = {}
+        for key, content in contents.items():
+            digest = content_hash(content)
+            by_hash.setdefault(digest, []).append(key)
+            content_by_hash[digest] = content
+
+        cached = {}
+        if not force_refresh:
+            with self.session_factory() as db:
+                cached = self._get_cached_results(db, list(by_hash), providers)
+        missing = {
+            digest: [p for p in providers if p not in cached.get(digest, {})]
+            for digest in by_hash
+        }
+        pending = [digest for digest, untested in missing.items() if untested]
+
+        semaphore = asyncio.Semaphore(settings.compatibility_batch_concurrency)
+
+        async def run(digest: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.model_service.run_compatibility_tests(content_by_hash[digest], missing[digest])
+
+        outcomes = await asyncio.gather(*[run(digest) for digest in pending], return_exceptions=True)
+
+        tested: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[PromptKey, str] = {}
+        for digest, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Compatibility test failed: {str(outcome)}", content_hash=digest)
+                for key in by_hash[digest]:
+                    errors[key] = str(outcome)
+            else:
+                tested[digest] = outcome["results"]
+
+        if tested:
+            with self.session_factory() as db:
+                self._store_compatibility_results(db, {digest: by_hash[digest] for digest in tested}, tested)
+
+        results: Dict[PromptKey, Dict[str, Any]] = {}
+        for digest, keys in by_hash.items():
+            if digest in pending and digest not in tested:
+                continue
+            merged = dict(cached.get(digest, {}))
+            merged.update(tested.get(digest, {}))
+            formatted = self._format_results(
+                {p: merged[p] for p in providers if p in merged},
+                content_by_hash[digest],
+                cached=digest not in tested
+            )
+            for key in keys:
+                results[key] = formatted
+
+        return results, errors
+
+    def _store_compatibility_results(
+        self,
+        db: Session,
+        prompts_by_hash: Dict[str, List[PromptKey]],
+        tested: Dict[str, Dict[str, Any]]
     ):
-        """Store compatibility test results in database"""
-        db = next(get_db())
+        """Append compatibility test results; earlier results are kept as history"""
+        tested_at = datetime.utcnow()
+        rows = []
+        for digest, results in tested.items():
+            for prompt_id, version in prompts_by_hash[digest]:
+                for provider, result in results.items():
+                    rows.append(ModelCompatibility(
+                        id=str(uuid.uuid4()),
+                        prompt_id=prompt_id,
+                        prompt_version=version,
+                        content_hash=digest,
+                        model_name=result.get("model_used") or provider,
+                        model_provider=provider,
+                        is_compatible=_is_compatible(result["status"]),
+                        status=result["status"],
+                        response_time=result.get("response_time", 0),
+                        quality_score=result.get("quality_score", 0),
+                        estimated_cost=result.get("estimated_cost", 0),
+                        error=result.get("error"),
+                        created_at=tested_at
+                    ))
 
         try:
-            # Clear existing results for this prompt
-            db.query(ModelCompatibility).filter(
-                ModelCompatibility.prompt_id == prompt_id
-            ).delete()
-
-            # Store new results
-            for provider, result in test_results["results"].items():
-                compatibility = ModelCompatibility(
-                    id=f"{prompt_id}_{provider}_{datetime.utcnow().timestamp()}",
-                    prompt_id=prompt_id,
-                    provider_name=provider,
-                    provider_type=provider,  # Using provider as type for now
-                    is_compatible=result["status"] in [CompatibilityStatus.WORKS.value, CompatibilityStatus.NEEDS_TUNING.value],
-                    compatibility_notes=json.dumps({
-                        "status": result["status"],
-                        "response_time": result.get("response_time", 0),
-                        "quality_score": result.get("quality_score", 0),
-                        "estimated_cost": result.get("estimated_cost", 0),
-                        "error": result.get("error")
-                    })
-                )
-                db.add(compatibility)
-
+            db.add_all(rows)
             db.commit()
-            logger.info("Compatibility results stored", prompt_id=prompt_id, results_count=len(test_results["results"]))
-
+            logger.info("Compatibility results stored", results_count=len(rows))
         except Exception as e:
             db.rollback()
-            logger.error(f"Failed to store compatibility results: {str(e)}", prompt_id=prompt_id)
+            logger.error(f"Failed to store compatibility results: {str(e)}")
             raise
 
     def _get_cached_results(
         self,
-        prompt_id: str,
-        version: str,
+        db: Session,
+        hashes: List[str],
         providers: List[str]
-    ) -> Optional[Dict[str, Any]]:
-        """Get cached compatibility results if recent enough"""
-        db = next(get_db())
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Get the newest result per content hash and provider tested within the cache TTL"""
+        cutoff_time = datetime.utcnow() - timedelta(hours=settings.compatibility_cache_ttl_hours)
+
+        rows = db.query(
+            ModelCompatibility.content_hash,
+            ModelCompatibility.model_provider,
+            ModelCompatibility.status,
+            ModelCompatibility.response_time,
+            ModelCompatibility.quality_score,
+            ModelCompatibility.estimated_cost,
+            ModelCompatibility.error
+        ).filter(
+            ModelCompatibility.content_hash.in_(hashes),
+            ModelCompatibility.model_provider.in_(providers),
+            ModelCompatibility.created_at >= cutoff_time
+        ).order_by(ModelCompatibility.created_at.desc()).all()
 
-        # Get recent results (last 24 hours)
-        from datetime import timedelta
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
+        cached: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in rows:
+            cached.setdefault(row.content_hash, {}).setdefault(row.model_provider, _row_result(row))
+        return cached
 
-        results = db.query(ModelCompatibility).filter(
-            ModelCompatibility.prompt_id == prompt_id,
-            ModelCompatibility.created_at >= cutoff_time
-        ).all()
-
-        if not results or len(results) < len(providers):
-            return None
-
-        # Convert to expected format
-        formatted_results = {}
-        for result in results:
-            try:
-                notes = json.loads(result.compatibility_notes or "{}")
-                formatted_results[result.provider_name] = {
-                    "status": notes.get("status", "not_supported"),
-                    "response_time": notes.get("response_time", 0),
-                    "quality_score": notes.get("quality_score", 0),
-                    "estimated_cost": notes.get("estimated_cost", 0),
-                    "error": notes.get("error")
-                }
-            except:
-                formatted_results[result.provider_name] = {
-                    "status": "not_supported",
-                    "error": "Invalid cached data"
-                }
-
-        # Generate summary
-        working = [p for p, r in formatted_results.items() if r["status"] == CompatibilityStatus.WORKS.value]
-        needs_tuning = [p for p, r in formatted_results.items() if r["status"] == CompatibilityStatus.NEEDS_TUNING.value]
-        not_supported = [p for p, r in formatted_results.items() if r["status"] == CompatibilityStatus.NOT_SUPPORTED.value]
+    def _format_results(self, results: Dict[str, Dict[str, Any]], content: str, cached: bool) -> Dict[str, Any]:
+        """Build the compatibility response for a set of per-provider results"""
+        working = [p for p, r in results.items() if r["status"] == CompatibilityStatus.WORKS.value]
+        needs_tuning = [p for p, r in results.items() if r["status"] == CompatibilityStatus.NEEDS_TUNING.value]
+        not_supported = [p for p, r in results.items() if r["status"] == CompatibilityStatus.NOT_SUPPORTED.value]
 
         return {
-            "prompt_preview": "Cached results",
-            "results": formatted_results,
+            "prompt_preview": content[:100] + "..." if len(content) > 100 else content,
+            "results": results,
             "summary": {
-                "total_providers": len(providers),
+                "total_providers": len(results),
                 "working_count": len(working),
                 "needs_tuning_count": len(needs_tuning),
                 "not_supported_count": len(not_supported),
@@ -157,8 +227,8 @@ class CompatibilityService:
                 "needs_tuning": needs_tuning,
                 "not_supported": not_supported
             },
-            "recommendations": self.model_service._generate_recommendations(formatted_results),
-            "cached": True
+            "recommendations": self.model_service._generate_recommendations(results),
+            "cached": cached
         }
 
     async def get_prompt_compatibility_matrix(
@@ -166,75 +236,111 @@ class CompatibilityService:
         prompt_id: str,
         version: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get compatibility matrix for a prompt"""
-        db = next(get_db())
-
-        if version:
-            # Get specific version
-            results = db.query(ModelCompatibility).filter(
-                ModelCompatibility.prompt_id == prompt_id
-            ).all()
-        else:
-            # Get all versions
-            # This would need to be implemented based on your versioning strategy
-            results = db.query(ModelCompatibility).filter(
-                ModelCompatibility.prompt_id == prompt_id
-            ).all()
-
-        if not results:
+        """Get compatibility matrix for a prompt: the latest result per provider and version"""
+        with self.session_factory() as db:
+            latest = db.query(
+                ModelCompatibility.model_provider,
+                ModelCompatibility.prompt_version,
+                func.max(ModelCompatibility.created_at).label("created_at")
+            ).filter(
+                ModelCompatibility.prompt_id == prompt_id,
+                ModelCompatibility.status.isnot(None)
+            )
+            if version:
+                latest = latest.filter(ModelCompatibility.prompt_version == version)
+            latest = latest.group_by(
+                ModelCompatibility.model_provider,
+                ModelCompatibility.prompt_version
+            ).subquery()
+
+            rows = db.query(ModelCompatibility).join(
+                latest,
+                (ModelCompatibility.prompt_id == prompt_id)
+                & (ModelCompatibility.model_provider == latest.c.model_provider)
+                & (ModelCompatibility.prompt_version == latest.c.prompt_version)
+                & (ModelCompatibility.created_at == latest.c.created_at)
+            ).order_by(ModelCompatibility.created_at).all()
+
+            content = None
+            if version:
+                content = db.query(Prompt.content).filter(
+                    Prompt.id == prompt_id, Prompt.version == version
+                ).scalar()
+
+        if not rows:
             return {"error": "No compatibility data found for this prompt"}
 
-        # Group by version and provider
         matrix = {}
-        for result in results:
-            try:
-                notes = json.loads(result.compatibility_notes or "{}")
-                matrix.setdefault(result.provider_name, {})[result.provider_type] = {
-                    "status": notes.get("status", "not_supported"),
-                    "is_compatible": result.is_compatible,
-                    "response_time": notes.get("response_time", 0),
-                    "quality_score": notes.get("quality_score", 0),
-                    "estimated_cost": notes.get("estimated_cost", 0),
-                    "last_tested": result.created_at.isoformat(),
-                    "notes": notes.get("error", "")
-                }
-            except Exception as e:
-                logger.error(f"Failed to parse compatibility notes: {str(e)}", compatibility_id=result.id)
-
-        return {
+        newest = {}
+        for row in rows:
+            result = _row_result(row)
+            matrix.setdefault(row.model_provider, {})[row.prompt_version] = dict(
+                result,
+                is_compatible=row.is_compatible,
+                last_tested=row.created_at.isoformat()
+            )
+            # Rows are in test order, so the last one per provider is its newest result
+            newest[row.model_provider] = result
+
+        response = self._format_results(newest, content or "", cached=True)
+        response.update({
             "prompt_id": prompt_id,
             "version": version,
             "matrix": matrix,
             "providers_tested": list(matrix.keys()),
-            "last_updated": max(r.created_at for r in results).isoformat() if results else None
-        }
+            "last_updated": rows[-1].created_at.isoformat()
+        })
+        return response
 
     async def get_project_compatibility_summary(self, project_id: str) -> Dict[str, Any]:
-        """Get compatibility summary for all prompts in a project"""
-        db = next(get_db())
-
-        # This would need to join with prompts, modules, and projects
-        # For now, we'll implement a simpler version
-        query = db.query(
-            ModelCompatibility.provider_name,
-            ModelCompatibility.is_compatible,
-            db.func.count(ModelCompatibility.id).label('count')
-        ).group_by(
-            ModelCompatibility.provider_name,
-            ModelCompatibility.is_compatible
-        ).all()
+        """Get compatibility summary for all prompts in a project from the latest result per prompt version and provider"""
+        with self.session_factory() as db:
+            latest = db.query(
+                ModelCompatibility.prompt_id,
+                ModelCompatibility.prompt_version,
+                ModelCompatibility.model_provider,
+                func.max(ModelCompatibility.created_at).label("created_at")
+            ).join(
+                Prompt,
+                (Prompt.id == ModelCompatibility.prompt_id)
+                & (Prompt.version == ModelCompatibility.prompt_version)
+            ).join(
+                Module, Module.id == Prompt.module_id
+            ).filter(
+                Module.project_id == project_id,
+                ModelCompatibility.status.isnot(None)
+            ).group_by(
+                ModelCompatibility.prompt_id,
+                ModelCompatibility.prompt_version,
+                ModelCompatibility.model_provider
+            ).subquery()
+
+            counts = db.query(
+                ModelCompatibility.model_provider,
+                ModelCompatibility.is_compatible,
+                func.count(ModelCompatibility.id)
+            ).join(
+                latest,
+                (ModelCompatibility.prompt_id == latest.c.prompt_id)
+                & (ModelCompatibility.prompt_version == latest.c.prompt_version)
+                & (ModelCompatibility.model_provider == latest.c.model_provider)
+                & (ModelCompatibility.created_at == latest.c.created_at)
+            ).group_by(
+                ModelCompatibility.model_provider,
+                ModelCompatibility.is_compatible
+            ).all()
 
         summary = {}
-        for provider, is_compatible, count in query:
+        for provider, is_compatible, count in counts:
             if provider not in summary:
                 summary[provider] = {"compatible": 0, "incompatible": 0}
             key = "compatible" if is_compatible else "incompatible"
-            summary[provider][key] = count
+            summary[provider][key] += count
 
         return {
             "project_id": project_id,
             "provider_summary": summary,
-            "total_tests": sum(r.count for r in query)
+            "total_tests": sum(count for _, _, count in counts)
         }
 
     async def run_batch_compatibility_tests(
@@ -247,45 +353,36 @@ class CompatibilityService:
         if versions and len(versions) != len(prompt_ids):
             raise ValueError("If versions provided, must match prompt_ids length")
 
-        results = {}
+        if providers is None:
+            providers = self.model_service.get_supported_providers()
+
+        requested = list(zip(prompt_ids, versions)) if versions else [(prompt_id, None) for prompt_id in prompt_ids]
         errors = {}
 
-        for i, prompt_id in enumerate(prompt_ids):
-            version = versions[i] if versions else None
-            try:
-                # Get latest version if not specified
-                if not version:
-                    db = next(get_db())
-                    latest = db.query(Prompt).filter(
-                        Prompt.id == prompt_id
-                    ).order_by(Prompt.updated_at.desc()).first()
-                    if not latest:
-                        errors[prompt_id] = "Prompt not found"
-                        continue
-                    version = latest.version
-
-                result = await self.test_prompt_compatibility(prompt_id, version, providers)
-                results[f"{prompt_id}@{version}"] = result
-
-            except Exception as e:
-                logger.error(f"Batch compatibility test failed: {str(e)}", prompt_id=prompt_id)
-                errors[f"{prompt_id}@{version or 'latest'}"] = str(e)
+        with self.session_factory() as db:
+            contents = self._resolve_prompts(db, requested)
+            found_ids = {prompt_id for prompt_id, _ in contents}
+            for prompt_id, version in requested:
+                if version is None and prompt_id not in found_ids:
+                    errors[prompt_id] = "Prompt not found"
+                elif version is not None and (prompt_id, version) not in contents:
+                    errors[f"{prompt_id}@{version}"] = f"Prompt {prompt_id}@{version} not found"
+
+        tested, failed = await self._schedule(contents, providers)
+
+        results = {f"{prompt_id}@{version}": result for (prompt_id, version), result in tested.items()}
+        for (prompt_id, version), error in failed.items():
+            errors[f"{prompt_id}@{version}"] = error
 
         # Generate batch summary
         total_tests = len(results)
         all_providers = set()
         working_counts = {}
-        needs_tuning_counts = {}
 
         for result in results.values():
-            all_providers.update(result["summary"]["working_providers"])
-            all_providers.update(result["summary"]["needs_tuning"])
-
-            for provider in all_providers:
-                if provider in result["summary"]["working_providers"]:
-                    working_counts[provider] = working_counts.get(provider, 0) + 1
-                elif provider in result["summary"]["needs_tuning"]:
-                    needs_tuning_counts[provider] = needs_tuning_counts.get(provider, 0) + 1
+            all_providers.update(result["results"])
+            for provider in result["summary"]["working_providers"]:
+                working_counts[provider] = working_counts.get(provider, 0) + 1
 
         return {
             "batch_id": f"batch_{datetime.utcnow().timestamp()}",
@@ -293,7 +390,7 @@ class CompatibilityService:
             "results": results,
             "errors": errors,
             "summary": {
-                "providers_tested": list(all_providers),
+                "providers_tested": sorted(all_providers),
                 "provider_success_rates": {
                     provider: working_counts.get(provider, 0) / total_tests
                     for provider in all_providers
@@ -302,47 +399,74 @@ class CompatibilityService:
             }
         }
 
+    def _resolve_prompts(self, db: Session, requested: List[Tuple[str, Optional[str]]]) -> Dict[PromptKey, str]:
+        """Load the content of every requested prompt in one query per kind of lookup"""
+        pinned = [(prompt_id, version) for prompt_id, version in requested if version is not None]
+        # Prompt ids are unique, so an id without a version names exactly one prompt
+        unpinned = {prompt_id for prompt_id, version in requested if version is None}
+        contents: Dict[PromptKey, str] = {}
+
+        if pinned:
+            rows = db.query(Prompt.id, Prompt.version, Prompt.content).filter(
+                tuple_(Prompt.id, Prompt.version).in_(pinned)
+            ).all()
+            contents.update({(row.id, row.version): row.content for row in rows})
+
+        if unpinned:
+            rows = db.query(Prompt.id, Prompt.version, Prompt.content).filter(Prompt.id.in_(unpinned)).all()
+            contents.update({(row.id, row.version): row.content for row in rows})
+
+        return contents
+
     async def get_compatibility_trends(
         self,
         prompt_id: str,
         days: int = 30
     ) -> Dict[str, Any]:
-        """Get compatibility trends over time for a prompt"""
-        db = next(get_db())
-
-        from datetime import timedelta
+        """Get compatibility trends over time for a prompt, aggregated per day and provider"""
         cutoff_time = datetime.utcnow() - timedelta(days=days)
-
-        results = db.query(ModelCompatibility).filter(
-            ModelCompatibility.prompt_id == prompt_id,
-            ModelCompatibility.created_at >= cutoff_time
-        ).order_by(ModelCompatibility.created_at).all()
-
-        if not results:
+        day = func.date(ModelCompatibility.created_at)
+
+        with self.session_factory() as db:
+            daily = db.query(
+                day.label("day"),
+                ModelCompatibility.model_provider,
+                func.avg(ModelCompatibility.quality_score).label("quality_score"),
+                func.avg(ModelCompatibility.response_time).label("response_time"),
+                func.count(ModelCompatibility.id).label("tests"),
+                func.max(ModelCompatibility.created_at).label("last_tested")
+            ).filter(
+                ModelCompatibility.prompt_id == prompt_id,
+                ModelCompatibility.status.isnot(None),
+                ModelCompatibility.created_at >= cutoff_time
+            ).group_by(day, ModelCompatibility.model_provider).subquery()
+
+            rows = db.query(daily, ModelCompatibility.status).join(
+                ModelCompatibility,
+                (ModelCompatibility.prompt_id == prompt_id)
+                & (ModelCompatibility.model_provider == daily.c.model_provider)
+                & (ModelCompatibility.created_at == daily.c.last_tested)
+            ).order_by(daily.c.day).all()
+
+        if not rows:
             return {"error": "No historical data found"}
 
         trends = {}
-        for result in results:
-            date = result.created_at.strftime("%Y-%m-%d")
-            if date not in trends:
-                trends[date] = {}
-
-            try:
-                notes = json.loads(result.compatibility_notes or "{}")
-                trends[date][result.provider_name] = {
-                    "status": notes.get("status", "not_supported"),
-                    "quality_score": notes.get("quality_score", 0),
-                    "response_time": notes.get("response_time", 0)
-                }
-            except:
-                pass
+        for row in rows:
+            # The day's status is the provider's last result that day
+            trends.setdefault(str(row.day), {})[row.model_provider] = {
+                "status": row.status,
+                "quality_score": row.quality_score or 0,
+                "response_time": row.response_time or 0,
+                "tests": row.tests
+            }
 
         return {
             "prompt_id": prompt_id,
             "period_days": days,
             "trends": trends,
-            "data_points": len(results)
+            "data_points": sum(data["tests"] for providers in trends.values() for data in providers.values())
         }
 
 # Global service instance
-compatibility_service = CompatibilityService()
\ No newline at end of file
+compatibility_service = CompatibilityService()
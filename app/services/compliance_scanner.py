@@ -0,0 +1,148 @@
+"""
+Compiled compliance content scanner
+
+Every content rule is a keyword alternation at a word boundary followed by an
+optional tail, e.g. `(personal|private)` + `\\s+(information|data)`. The
+keywords of all rules are compiled into one union pattern that locates
+candidate positions in a single pass; only at those positions are the full
+rules matched. Results are identical to running `re.finditer` once per rule.
+
+The scanner module has no application imports so batch scans can run in
+worker processes.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def content_digest(content: str) -> str:
+    """Digest of prompt content, used as the scan cache key"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ContentRule:
+    """A keyword rule reported as a compliance issue of one type and severity"""
+
+    __slots__ = ("issue_type", "severity", "label", "keywords", "tail")
+
+    def __init__(self, issue_type: str, severity: str, label: str, keywords: Sequence[str], tail: str = r"\b"):
+        self.issue_type = issue_type
+        self.severity = severity
+        self.label = label
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.tail = tail
+
+    def __reduce__(self):
+        return (ContentRule, (self.issue_type, self.severity, self.label, self.keywords, self.tail))
+
+    @property
+    def pattern(self) -> str:
+        return r"\b(" + "|".join(re.escape(keyword) for keyword in self.keywords) + ")" + self.tail
+
+
+class ComplianceScanner:
+    """Scans content against all rules in one pass over the text"""
+
+    def __init__(self, rules: Sequence[ContentRule]):
+        self.rules = list(rules)
+        keywords = sorted({keyword for rule in self.rules for keyword in rule.keywords}, key=len, reverse=True)
+        union = r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + ")"
+
+        # Content is lowercased once and matched case-sensitively, which is much faster than
+        # IGNORECASE. The folded patterns cover text whose length changes when lowercased.
+        self._candidates = re.compile(union)
+        self._patterns = [re.compile(rule.pattern) for rule in self.rules]
+        self._folded_candidates = re.compile(union, re.IGNORECASE)
+        self._folded_patterns = [re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules]
+
+    def scan(self, content: str) -> List[Tuple[int, int, int]]:
+        """Return (rule index, start, end) for every match, ordered by rule then position"""
+        text = content.lower()
+        candidates, patterns = self._candidates, self._patterns
+        if len(text) != len(content):
+            text = content
+            candidates, patterns = self._folded_candidates, self._folded_patterns
+
+        # A rule's matches never overlap each other, as with re.finditer
+        next_start = [0] * len(patterns)
+        matches = []
+        for candidate in candidates.finditer(text):
+            position = candidate.start()
+            for index, pattern in enumerate(patterns):
+                if position < next_start[index]:
+                    continue
+                match = pattern.match(text, position)
+                if match:
+                    matches.append((index, position, match.end()))
+                    next_start[index] = match.end()
+
+        matches.sort()
+        return matches
+
+    def issues(self, content: str) -> List[Dict[str, Any]]:
+        """Scan content and describe each match as a compliance issue"""
+        issues = []
+        for index, start, end in self.scan(content):
+            rule = self.rules[index]
+            issues.append({
+                "type": rule.issue_type,
+                "field": "content",
+                "message": f"{rule.label}: '{content[start:end]}'",
+                "severity": rule.severity,
+                "context": content[max(0, start - 20):end + 20]
+            })
+        return issues
+
+
+class ComplianceScanCache:
+    """Bounded LRU of content scan results keyed by content digest"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[List[Dict[str, Any]]]:
+        """Get a copy of the cached issues for a digest, or None"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        return [dict(issue) for issue in entry]
+
+    def put(self, digest: str, issues: Iterable[Dict[str, Any]]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = tuple(dict(issue) for issue in issues)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Worker process state for batch scans
+_worker_scanner: Optional[ComplianceScanner] = None
+
+
+def init_worker(rules: Sequence[ContentRule]) -> None:
+    global _worker_scanner
+    _worker_scanner = ComplianceScanner(rules)
+
+
+def scan_chunk(contents: List[str]) -> List[List[Dict[str, Any]]]:
+    return [_worker_scanner.issues(content) for content in contents]
@@ -1,10 +1,17 @@
-import json
-import re
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 import structlog
 from enum import Enum
 
+from app.config import settings
+from app.services.compliance_scanner import (
+    ComplianceScanCache, ComplianceScanner, ContentRule, content_digest, init_worker, scan_chunk
+)
+
 logger = structlog.get_logger()
 
 class RiskLevel(Enum):
@@ -26,29 +33,41 @@ class MASComplianceService:
     """Service for MAS FEAT compliance validation and reporting"""
 
     def __init__(self):
-        # Keywords and patterns for compliance checks
-        self.inappropriate_patterns = [
-            r'\b(discriminat|prejudic|bias|stereotype|offens|inappropriat|unethical)\b',
-            r'\b(hate|harass|threat|intimidat|bully)\b',
-            r'\b(violent|abuse|harm|dangerous|illegal)\b'
-        ]
-
-        self.privacy_concern_patterns = [
-            r'\b(personal|private|confidential|sensitive)\s+(information|data|details?)\b',
-            r'\b(health|medical|financial|legal)\s+(information|data|records?)\b',
-            r'\b(address|phone|email|ssn|passport|credit card)\b'
-        ]
-
-        self.bias_indicators = [
-            r'\b(all|every|always|never)\s+\w+',
-            r'\b(obviously|clearly|naturally)\b',
-            r'\b(men|women|boys|girls)\s+(should|must|are)\b'
+        # Keywords and patterns for compliance checks, compiled into one scanner
+        self.content_rules = [
+            ContentRule(ComplianceIssue.INAPPROPRIATE_LANGUAGE.value, "high", "Potentially inappropriate language detected",
+                        ["discriminat", "prejudic", "bias", "stereotype", "offens", "inappropriat", "unethical"]),
+            ContentRule(ComplianceIssue.INAPPROPRIATE_LANGUAGE.value, "high", "Potentially inappropriate language detected",
+                        ["hate", "harass", "threat", "intimidat", "bully"]),
+            ContentRule(ComplianceIssue.INAPPROPRIATE_LANGUAGE.value, "high", "Potentially inappropriate language detected",
+                        ["violent", "abuse", "harm", "dangerous", "illegal"]),
+            ContentRule(ComplianceIssue.PRIVACY_CONCERNS.value, "medium", "Potential privacy concern detected",
+                        ["personal", "private", "confidential", "sensitive"], r"\s+(information|data|details?)\b"),
+            ContentRule(ComplianceIssue.PRIVACY_CONCERNS.value, "medium", "Potential privacy concern detected",
+                        ["health", "medical", "financial", "legal"], r"\s+(information|data|records?)\b"),
+            ContentRule(ComplianceIssue.PRIVACY_CONCERNS.value, "medium", "Potential privacy concern detected",
+                        ["address", "phone", "email", "ssn", "passport", "credit card"]),
+            ContentRule(ComplianceIssue.BIAS_DETECTED.value, "medium", "Potential bias indicator detected",
+                        ["all", "every", "always", "never"], r"\s+\w+"),
+            ContentRule(ComplianceIssue.BIAS_DETECTED.value, "medium", "Potential bias indicator detected",
+                        ["obviously", "clearly", "naturally"]),
+            ContentRule(ComplianceIssue.BIAS_DETECTED.value, "medium", "Potential bias indicator detected",
+                        ["men", "women", "boys", "girls"], r"\s+(should|must|are)\b"),
         ]
-
-    def validate_prompt_compliance(self, prompt_data: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        self.scanner = ComplianceScanner(self.content_rules)
+        self.scan_cache = ComplianceScanCache(settings.compliance_scan_cache_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def validate_prompt_compliance(
+        self,
+        prompt_data: Dict[str, Any],
+        content_issues: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
         """
         Validate prompt against MAS FEAT requirements
         Returns (is_compliant, list_of_issues)
+        `content_issues` are the already scanned content issues, as from a batch scan
         """
         issues = []
 
@@ -89,7 +108,8 @@ class MASComplianceService:
             })
 
         # Content quality checks
-        content_issues = self._analyze_content_quality(content)
+        if content_issues is None:
+            content_issues = self._analyze_content_quality(content or "")
         issues.extend(content_issues)
 
         # MAS FEAT field quality checks
@@ -101,45 +121,68 @@ class MASComplianceService:
 
     def _analyze_content_quality(self, content: str) -> List[Dict[str, Any]]:
         """Analyze prompt content for compliance issues"""
-        issues = []
-
-        # Check for inappropriate language
-        for pattern in self.inappropriate_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                issues.append({
-                    "type": ComplianceIssue.INAPPROPRIATE_LANGUAGE.value,
-                    "field": "content",
-                    "message": f"Potentially inappropriate language detected: '{match.group()}'",
-                    "severity": "high",
-                    "context": content[max(0, match.start()-20):match.end()+20]
-                })
+        return self._analyze_contents([content])[0]
+
+    def _analyze_contents(self, contents: List[str]) -> List[List[Dict[str, Any]]]:
+        """Scan many contents, once per distinct content, reusing cached scans"""
+        digests = [content_digest(content) for content in contents]
+        scanned: Dict[str, List[Dict[str, Any]]] = {}
+        pending: Dict[str, str] = {}
+
+        for digest, content in zip(digests, contents):
+            if digest in scanned or digest in pending:
+                continue
+            cached = self.scan_cache.get(digest)
+            if cached is not None:
+                scanned[digest] = cached
+            else:
+                pending[digest] = content
 
-        # Check for privacy concerns
-        for pattern in self.privacy_concern_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                issues.append({
-                    "type": ComplianceIssue.PRIVACY_CONCERNS.value,
-                    "field": "content",
-                    "message": f"Potential privacy concern detected: '{match.group()}'",
-                    "severity": "medium",
-                    "context": content[max(0, match.start()-20):match.end()+20]
-                })
+        if pending:
+            for digest, issues in zip(pending, self._scan(list(pending.values()))):
+                self.scan_cache.put(digest, issues)
+                scanned[digest] = issues
 
-        # Check for bias indicators
-        for pattern in self.bias_indicators:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                issues.append({
-                    "type": ComplianceIssue.BIAS_DETECTED.value,
-                    "field": "content",
-                    "message": f"Potential bias indicator detected: '{match.group()}'",
-                    "severity": "medium",
-                    "context": content[max(0, match.start()-20):match.end()+20]
-                })
-
-        return issues
+        # Every prompt gets its own issue dicts, even when contents repeat
+        results = []
+        seen = set()
+        for digest in digests:
+            issues = scanned[digest]
+            results.append([dict(issue) for issue in issues] if digest in seen else issues)
+            seen.add(digest)
+        return results
+
+    def _scan(self, contents: List[str]) -> List[List[Dict[str, Any]]]:
+        """Scan contents inline, or across worker processes for large batches"""
+        workers = settings.compliance_scan_workers or os.cpu_count() or 1
+        if workers <= 1 or len(contents) < settings.compliance_parallel_min_batch:
+            return [self.scanner.issues(content) for content in contents]
+
+        chunk_size = max(1, min(256, len(contents) // (workers * 4)))
+        chunks = [contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size)]
+        results = []
+        for chunk_issues in self._get_pool(workers).map(scan_chunk, chunks):
+            results.extend(chunk_issues)
+        return results
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned workers import only the scanner module, never the web application
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(self.content_rules,)
+                )
+            return self._pool
+
+    def close(self):
+        """Shut down the batch scan worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
 
     def _validate_mas_fields_quality(self, prompt_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Validate the quality and completeness of MAS FEAT fields"""
@@ -177,9 +220,13 @@ class MASComplianceService:
 
         return issues
 
-    def generate_compliance_report(self, prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_compliance_report(
+        self,
+        prompt_data: Dict[str, Any],
+        content_issues: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """Generate comprehensive MAS FEAT compliance report"""
-        is_compliant, issues = self.validate_prompt_compliance(prompt_data)
+        is_compliant, issues = self.validate_prompt_compliance(prompt_data, content_issues)
 
         # Calculate risk score
         risk_score = self._calculate_risk_score(issues)
@@ -332,8 +379,9 @@ class MASComplianceService:
         total_issues = 0
         compliant_count = 0
 
-        for prompt in prompts:
-            report = self.generate_compliance_report(prompt)
+        content_issues = self._analyze_contents([prompt.get("content") or "" for prompt in prompts])
+        for prompt, issues in zip(prompts, content_issues):
+            report = self.generate_compliance_report(prompt, issues)
             results.append(report)
             total_issues += len(report["issues"])
             if report["is_compliant"]:
@@ -363,7 +411,8 @@ class MASComplianceService:
             return {"error": "No prompts provided"}
 
         # Generate reports for all prompts
-        reports = [self.generate_compliance_report(prompt) for prompt in prompts]
+        content_issues = self._analyze_contents([prompt.get("content") or "" for prompt in prompts])
+        reports = [self.generate_compliance_report(prompt, issues) for prompt, issues in zip(prompts, content_issues)]
 
         # Calculate statistics
         total_prompts = len(reports)
@@ -0,0 +1,335 @@
+import math
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+from sqlalchemy import Float, case, cast, distinct, func, select, union
+from sqlalchemy.orm import Session
+
+from app.models import Experiment, ExperimentAssignment, ExperimentEvent, EventType
+
+logger = structlog.get_logger()
+
+_STANDARD_NORMAL = NormalDist()
+
+# ---------------------------------------------------------------------------
+# Closed-form statistics from sufficient statistics (n, sum, sum of squares)
+# ---------------------------------------------------------------------------
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-14:
+            break
+    return h
+
+def regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    """I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def student_t_two_sided_p(t: float, df: float) -> float:
+    """Two-sided p-value of Student's t distribution"""
+    if df <= 0 or math.isnan(t):
+        return 1.0
+    if math.isinf(t):
+        return 0.0
+    return regularized_incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+def normal_two_sided_p(z: float) -> float:
+    """Two-sided p-value of the standard normal distribution"""
+    return 2.0 * (1.0 - _STANDARD_NORMAL.cdf(abs(z)))
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    if n <= 0:
+        return 0.0, 0.0
+    z = _STANDARD_NORMAL.inv_cdf(1.0 - (1.0 - confidence) / 2.0)
+    p = successes / n
+    denominator = 1.0 + z * z / n
+    centre = (p + z * z / (2.0 * n)) / denominator
+    margin = z * math.sqrt(p * (1.0 - p) / n + z * z / (4.0 * n * n)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def two_proportion_z_test(successes_a: int, n_a: int, successes_b: int, n_b: int) -> Tuple[float, float]:
+    """Pooled two-proportion z-test of B against A. Returns (z, two-sided p)"""
+    if n_a <= 0 or n_b <= 0:
+        return 0.0, 1.0
+    pooled = (successes_a + successes_b) / (n_a + n_b)
+    standard_error = math.sqrt(pooled * (1.0 - pooled) * (1.0 / n_a + 1.0 / n_b))
+    if standard_error == 0:
+        return 0.0, 1.0
+    z = (successes_b / n_b - successes_a / n_a) / standard_error
+    return z, normal_two_sided_p(z)
+
+def sample_variance(n: int, total: float, sum_squares: float) -> float:
+    """Unbiased sample variance from sufficient statistics"""
+    if n < 2:
+        return 0.0
+    return max(0.0, (sum_squares - total * total / n) / (n - 1))
+
+def welch_t_test(
+    n_a: int, sum_a: float, sum_squares_a: float,
+    n_b: int, sum_b: float, sum_squares_b: float
+) -> Dict[str, float]:
+    """Welch's unequal-variance t-test of B against A from sufficient statistics"""
+    if n_a < 2 or n_b < 2:
+        return {"t": 0.0, "df": 0.0, "p_value": 1.0, "mean_difference": 0.0}
+
+    mean_a, mean_b = sum_a / n_a, sum_b / n_b
+    se_a = sample_variance(n_a, sum_a, sum_squares_a) / n_a
+    se_b = sample_variance(n_b, sum_b, sum_squares_b) / n_b
+    standard_error = math.sqrt(se_a + se_b)
+    if standard_error == 0:
+        return {"t": 0.0, "df": float(n_a + n_b - 2), "p_value": 1.0, "mean_difference": mean_b - mean_a}
+
+    t = (mean_b - mean_a) / standard_error
+    df = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+    return {"t": t, "df": df, "p_value": student_t_two_sided_p(t, df), "mean_difference": mean_b - mean_a}
+
+# ---------------------------------------------------------------------------
+# Result cache keyed by event watermark
+# ---------------------------------------------------------------------------
+
+class _ExperimentResultCache:
+    """Bounded per-process cache of analyses, valid while the experiment's watermark is unchanged"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, experiment_id: str, watermark: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(experiment_id)
+            if entry is None or entry[0] != watermark:
+                return None
+            self._entries.move_to_end(experiment_id)
+            return entry[1]
+
+    def put(self, experiment_id: str, watermark: Tuple, analysis: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[experiment_id] = (watermark, analysis)
+            self._entries.move_to_end(experiment_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, experiment_id: str) -> None:
+        with self._lock:
+            self._entries.pop(experiment_id, None)
+
+experiment_result_cache = _ExperimentResultCache()
+
+class ExperimentAnalyticsService:
+    """Experiment results computed from per-variant sufficient statistics.
+
+    One GROUP BY over events, keyed by the variant resolved at ingest, yields
+    per variant event counts, converting units and the sum and sum of squares
+    of conversion value and response time; a second counts distinct assignment
+    ids across stored assignments and events for exposure counts. The
+    z-test, Welch t-tests and Wilson intervals are closed-form on those totals,
+    so no event rows are loaded. Analyses are cached until the experiment's
+    watermark (latest event and assignment timestamps) moves.
+    """
+
+    def __init__(self, db: Session, cache: Optional[_ExperimentResultCache] = None):
+        self.db = db
+        self.cache = experiment_result_cache if cache is None else cache
+
+    def watermark(self, experiment_id: str) -> Tuple:
+        """Latest event and assignment write times - served from the (experiment_id, time) indexes"""
+        latest_event = self.db.query(func.max(ExperimentEvent.created_at)).filter(
+            ExperimentEvent.experiment_id == experiment_id
+        ).scalar()
+        latest_assignment = self.db.query(func.max(ExperimentAssignment.assigned_at)).filter(
+            ExperimentAssignment.experiment_id == experiment_id
+        ).scalar()
+        return (str(latest_event), str(latest_assignment))
+
+    def variant_statistics(self, experiment: Experiment) -> Dict[str, Dict[str, Any]]:
+        """Sufficient statistics per variant"""
+        experiment_id = experiment.id
+        is_conversion = ExperimentEvent.event_type == EventType.CONVERSION
+        value = cast(ExperimentEvent.conversion_value, Float)
+        conversion_value = case((is_conversion, value))
+        response_time = cast(ExperimentEvent.response_time_ms, Float)
+
+        rows = self.db.query(
+            ExperimentEvent.variant_id,
+            func.count(ExperimentEvent.id),
+            func.count(distinct(case((is_conversion, ExperimentEvent.assignment_id)))),
+            func.sum(case((is_conversion, 1), else_=0)),
+            func.count(conversion_value),
+            func.sum(conversion_value),
+            func.sum(conversion_value * conversion_value),
+            func.count(response_time),
+            func.sum(response_time),
+            func.sum(response_time * response_time),
+            func.count(ExperimentEvent.tokens_used),
+            func.sum(ExperimentEvent.tokens_used),
+            func.sum(cast(ExperimentEvent.cost_usd, Float))
+        ).filter(
+            ExperimentEvent.experiment_id == experiment_id,
+            ExperimentEvent.variant_id.isnot(None)
+        ).group_by(ExperimentEvent.variant_id).all()
+
+        # Stateless assignments may have no row, so units seen only in events count too
+        units = union(
+            select(ExperimentAssignment.variant_id, ExperimentAssignment.id.label("assignment_id")).where(
+                ExperimentAssignment.experiment_id == experiment_id
+            ),
+            select(ExperimentEvent.variant_id, ExperimentEvent.assignment_id).where(
+                ExperimentEvent.experiment_id == experiment_id,
+                ExperimentEvent.variant_id.isnot(None),
+                ExperimentEvent.assignment_id.isnot(None)
+            )
+        ).subquery()
+        exposures = self.db.query(
+            units.c.variant_id, func.count(units.c.assignment_id)
+        ).group_by(units.c.variant_id).all()
+
+        variant_names = {
+            variant.get("id"): variant.get("name")
+            for variant in [experiment.control_variant or {}, *(experiment.treatment_variants or [])]
+        }
+
+        stats: Dict[str, Dict[str, Any]] = {
+            variant_id: {
+                "variant_name": variant_names.get(variant_id) or variant_id,
+                "sample_size": count,
+                "events": 0,
+                "converted_units": 0,
+                "conversion_events": 0,
+                "conversion_value": {"n": 0, "sum": 0.0, "sum_squares": 0.0},
+                "response_time_ms": {"n": 0, "sum": 0.0, "sum_squares": 0.0},
+                "tokens": {"n": 0, "sum": 0},
+                "total_cost": 0.0
+            }
+            for variant_id, count in exposures
+        }
+
+        for (variant_id, events, converted_units, conversion_events, value_n, value_sum, value_sq,
+             rt_n, rt_sum, rt_sq, tokens_n, tokens_sum, cost) in rows:
+            entry = stats.get(variant_id)
+            if entry is None:
+                continue
+            entry.update({
+                "events": events,
+                "converted_units": converted_units,
+                "conversion_events": int(conversion_events or 0),
+                "conversion_value": {"n": value_n, "sum": float(value_sum or 0), "sum_squares": float(value_sq or 0)},
+                "response_time_ms": {"n": rt_n, "sum": float(rt_sum or 0), "sum_squares": float(rt_sq or 0)},
+                "tokens": {"n": tokens_n, "sum": int(tokens_sum or 0)},
+                "total_cost": float(cost or 0)
+            })
+
+        return stats
+
+    def analyze(self, experiment: Experiment) -> Dict[str, Any]:
+        """Per-variant results with significance tests against the control variant"""
+        watermark = self.watermark(experiment.id)
+        cached = self.cache.get(experiment.id, watermark)
+        if cached is not None:
+            return cached
+
+        confidence = (experiment.statistical_significance or 95) / 100.0
+        alpha = 1.0 - confidence
+        control_id = (experiment.control_variant or {}).get("id")
+        stats = self.variant_statistics(experiment)
+        control = stats.get(control_id)
+
+        variants: Dict[str, Dict[str, Any]] = {}
+        for variant_id, entry in stats.items():
+            n = entry["sample_size"]
+            conversions = min(entry["converted_units"], n)
+            rate = conversions / n if n else 0.0
+            lower, upper = wilson_interval(conversions, n, confidence)
+            value, rt = entry["conversion_value"], entry["response_time_ms"]
+
+            result = {
+                "variant_name": entry["variant_name"],
+                "is_control": variant_id == control_id,
+                "sample_size": n,
+                "conversion_count": conversions,
+                "conversion_rate": rate,
+                "confidence_interval_lower": lower,
+                "confidence_interval_upper": upper,
+                "events": entry["events"],
+                "mean_conversion_value": value["sum"] / value["n"] if value["n"] else None,
+                "average_response_time": rt["sum"] / rt["n"] if rt["n"] else None,
+                "average_tokens_used": entry["tokens"]["sum"] / entry["tokens"]["n"] if entry["tokens"]["n"] else None,
+                "total_cost": entry["total_cost"],
+                "z_score": 0.0,
+                "p_value": 1.0,
+                "statistical_significance": False,
+                "improvement_over_control": 0.0,
+                "welch_tests": {}
+            }
+
+            if control is not None and variant_id != control_id:
+                control_n = control["sample_size"]
+                control_conversions = min(control["converted_units"], control_n)
+                z, p_value = two_proportion_z_test(control_conversions, control_n, conversions, n)
+                control_rate = control_conversions / control_n if control_n else 0.0
+                result.update({
+                    "z_score": z,
+                    "p_value": p_value,
+                    "statistical_significance": p_value < alpha,
+                    "improvement_over_control": (rate - control_rate) / control_rate if control_rate else 0.0
+                })
+                for metric in ("conversion_value", "response_time_ms"):
+                    base, treatment = control[metric], entry[metric]
+                    test = welch_t_test(
+                        base["n"], base["sum"], base["sum_squares"],
+                        treatment["n"], treatment["sum"], treatment["sum_squares"]
+                    )
+                    test["statistical_significance"] = test["p_value"] < alpha
+                    result["welch_tests"][metric] = test
+
+            variants[variant_id] = result
+
+        # The winner is the significant, improving treatment with the highest conversion rate
+        candidates = [
+            (result["conversion_rate"], variant_id) for variant_id, result in variants.items()
+            if result["statistical_significance"] and result["improvement_over_control"] > 0
+        ]
+        winner = max(candidates)[1] if candidates else None
+
+        analysis = {
+            "control_variant_id": control_id,
+            "confidence_level": confidence,
+            "calculation_method": "frequentist",
+            "watermark": list(watermark),
+            "winning_variant": winner,
+            "variants": variants
+        }
+        self.cache.put(experiment.id, watermark, analysis)
+        logger.info("Experiment results calculated", experiment_id=experiment.id, variants=len(variants))
+        return analysis
@@ -0,0 +1,204 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Sequence, Tuple
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Experiment, ExperimentAssignment, ExperimentStatus, TrafficAllocationStrategy
+from app.services.experiment_analytics_service import experiment_result_cache
+
+logger = structlog.get_logger()
+
+# ---------------------------------------------------------------------------
+# Deterministic bucketing. promptops-client/promptops/ab_testing/bucketing.py
+# implements the same scheme; tests/test_experiment_assignment.py checks that
+# both produce identical buckets, variants and assignment ids.
+# ---------------------------------------------------------------------------
+
+BUCKET_COUNT = 10000
+STATELESS_ASSIGNMENT_PREFIX = "sa_"
+
+def assignment_unit(user_id: Optional[str], session_id: str, device_id: Optional[str] = None) -> str:
+    """The key a unit is bucketed by: user, then device, then session"""
+    return user_id or device_id or session_id
+
+def bucket(namespace: str, experiment_id: str, salt: str, unit: str) -> int:
+    """Map a unit to one of BUCKET_COUNT buckets"""
+    digest = hashlib.sha256(f"{namespace}:{experiment_id}:{salt}:{unit}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % BUCKET_COUNT
+
+def stateless_assignment_id(experiment_id: str, salt: str, unit: str) -> str:
+    """Stable assignment id, so events can reference an assignment that was never stored"""
+    digest = hashlib.sha256(f"assignment:{experiment_id}:{salt}:{unit}".encode("utf-8")).hexdigest()
+    return f"{STATELESS_ASSIGNMENT_PREFIX}{digest[:32]}"
+
+def choose_variant(
+    experiment_id: str,
+    salt: str,
+    unit: str,
+    traffic_percentage: int,
+    weights: Sequence[int]
+) -> Tuple[int, str]:
+    """
+    Pick a variant index for a unit.
+
+    Traffic and variant selection hash under different namespaces so that the
+    variant split is independent of the traffic cut. Returns index 0 (control)
+    with reason "control_fallback" for units outside the traffic percentage.
+    """
+    if bucket("traffic", experiment_id, salt, unit) >= traffic_percentage * BUCKET_COUNT // 100:
+        return 0, "control_fallback"
+
+    total = sum(weights)
+    point = bucket("variant", experiment_id, salt, unit) * total // BUCKET_COUNT
+    accumulated = 0
+    for index, weight in enumerate(weights):
+        accumulated += weight
+        if point < accumulated:
+            return index, "weighted_allocation"
+    return 0, "control_fallback"
+
+# Stopped experiments whose events are still ingested within the grace window
+STOPPED_STATUSES = (ExperimentStatus.PAUSED, ExperimentStatus.COMPLETED)
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class _ExperimentConfigCache:
+    """Per-process TTL cache of the configuration of running and recently stopped experiments"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, experiment_id: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(experiment_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        experiment = db.query(Experiment).filter(
+            Experiment.id == experiment_id,
+            Experiment.status.in_((ExperimentStatus.RUNNING, *STOPPED_STATUSES))
+        ).first()
+        config = None
+        if experiment:
+            running = experiment.status == ExperimentStatus.RUNNING
+            stopped_at = None if running else _as_utc(experiment.end_time or experiment.updated_at)
+            variants = [experiment.control_variant, *experiment.treatment_variants]
+            uniform = experiment.allocation_strategy == TrafficAllocationStrategy.UNIFORM
+            config = {
+                "salt": experiment.assignment_salt or "",
+                "traffic_percentage": experiment.traffic_percentage,
+                "variants": variants,
+                "weights": [1 if uniform else int(variant.get("weight", 1)) for variant in variants],
+                "running": running,
+                "events_until": stopped_at + timedelta(seconds=settings.ab_event_grace_seconds) if stopped_at else None
+            }
+
+        with self._lock:
+            self._entries[experiment_id] = (now + settings.ab_assignment_config_ttl_seconds, config)
+        return config
+
+    def invalidate(self, experiment_id: Optional[str] = None) -> None:
+        with self._lock:
+            if experiment_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(experiment_id, None)
+
+experiment_config_cache = _ExperimentConfigCache()
+
+class ExperimentAssignmentService:
+    """Stateless variant assignment for running experiments.
+
+    The variant is a pure function of the experiment id, its salt and the
+    unit key, so assignment never reads the assignment table. Rows are only
+    written afterwards for audit, and writing them is idempotent because the
+    assignment id is derived from the same inputs. Event ingest uses a row
+    when it exists and otherwise recomputes the variant from the same hash,
+    so analytics never waits on the rows.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def assign(
+        self,
+        experiment_id: str,
+        session_id: str,
+        user_id: Optional[str] = None,
+        device_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Compute an assignment, or None if the experiment is not running"""
+        config = experiment_config_cache.get(self.db, experiment_id)
+        if config is None or not config["running"]:
+            return None
+
+        unit = assignment_unit(user_id, session_id, device_id)
+        index, reason = choose_variant(
+            experiment_id, config["salt"], unit, config["traffic_percentage"], config["weights"]
+        )
+        variant = config["variants"][index]
+
+        return {
+            "id": stateless_assignment_id(experiment_id, config["salt"], unit),
+            "experiment_id": experiment_id,
+            "user_id": user_id,
+            "session_id": session_id,
+            "device_id": device_id,
+            "variant_id": variant["id"],
+            "variant_name": variant["name"],
+            "variant_config": variant.get("prompt_config") or {},
+            "assigned_at": datetime.now(timezone.utc),
+            "assignment_reason": reason,
+            "is_consistent": True
+        }
+
+def stateless_variant_id(
+    db: Session,
+    experiment_id: str,
+    assignment_id: str,
+    session_id: str,
+    user_id: Optional[str] = None,
+    device_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Variant behind a stateless assignment id, recomputed from the unit of the event
+
+    Returns None unless the id is the one the unit hashes to, so an event cannot
+    claim another unit's assignment. Events for a paused or completed experiment
+    are accepted for `ab_event_grace_seconds` after it stopped. Ingest prefers
+    the audit row of the assignment when there is one, since it records the
+    variant that was actually served.
+    """
+    config = experiment_config_cache.get(db, experiment_id)
+    if config is None:
+        return None
+    if not config["running"] and (
+        config["events_until"] is None or datetime.now(timezone.utc) > config["events_until"]
+    ):
+        return None
+    unit = assignment_unit(user_id, session_id, device_id)
+    if stateless_assignment_id(experiment_id, config["salt"], unit) != assignment_id:
+        return None
+    index, _ = choose_variant(experiment_id, config["salt"], unit, config["traffic_percentage"], config["weights"])
+    return config["variants"][index]["id"]
+
+def record_assignment_audit(db: Session, assignment: Dict[str, Any]) -> None:
+    """Store an assignment row unless one with the same id already exists"""
+    try:
+        if db.query(ExperimentAssignment.id).filter(ExperimentAssignment.id == assignment["id"]).first():
+            return
+        db.add(ExperimentAssignment(**assignment))
+        db.commit()
+        experiment_result_cache.invalidate(assignment["experiment_id"])
+    except Exception as e:
+        db.rollback()
+        logger.warning("Failed to record assignment audit row", assignment_id=assignment["id"], error=str(e))
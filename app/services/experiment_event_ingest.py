@@ -0,0 +1,221 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Set, Tuple
+import structlog
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import EventType, Experiment, ExperimentAssignment, ExperimentEvent
+from app.schemas import ExperimentEventCreate
+from app.services.experiment_analytics_service import experiment_result_cache
+from app.services.experiment_assignment_service import STATELESS_ASSIGNMENT_PREFIX, stateless_variant_id
+
+try:
+    import msgpack
+except ImportError:  # msgpack bodies are rejected when the package is missing
+    msgpack = None
+
+logger = structlog.get_logger()
+
+JSONL_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/x-jsonlines")
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+class EventBatchError(ValueError):
+    """Raised when a batch body cannot be decoded as a whole"""
+
+def decode_event_batch(body: bytes, content_type: str) -> List[Any]:
+    """Decode a JSON Lines, msgpack or JSON array body into raw event records"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+
+    if media_type in MSGPACK_CONTENT_TYPES:
+        if msgpack is None:
+            raise EventBatchError("msgpack bodies are not supported on this server")
+        try:
+            records = msgpack.unpackb(body, raw=False, timestamp=3)
+        except Exception as e:
+            raise EventBatchError(f"Invalid msgpack body: {str(e)}")
+        if not isinstance(records, list):
+            raise EventBatchError("msgpack body must be an array of events")
+        return records
+
+    if media_type == "application/json":
+        try:
+            records = json.loads(body)
+        except ValueError as e:
+            raise EventBatchError(f"Invalid JSON body: {str(e)}")
+        if not isinstance(records, list):
+            raise EventBatchError("JSON body must be an array of events")
+        return records
+
+    if media_type in JSONL_CONTENT_TYPES:
+        records = []
+        for line in body.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Keep the slot so rejections report the right line
+                records.append(None)
+        return records
+
+    raise EventBatchError(f"Unsupported content type: {media_type or 'none'}")
+
+class _ExperimentAssignmentMap:
+    """Per-process cache of known experiments and stored assignment -> (experiment, variant)"""
+
+    def __init__(self, experiment_ttl_seconds: float = 60.0, max_assignments: int = 100000):
+        self.experiment_ttl_seconds = experiment_ttl_seconds
+        self.max_assignments = max_assignments
+        self._experiments: Dict[str, float] = {}
+        self._assignments: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(
+        self, db: Session, experiment_ids: Set[str], assignment_ids: Set[str]
+    ) -> Tuple[Set[str], Dict[str, Tuple[str, str]]]:
+        """Return the existing experiment ids and the experiment and variant of each stored assignment"""
+        now = time.monotonic()
+        with self._lock:
+            known_experiments = {
+                experiment_id for experiment_id in experiment_ids
+                if self._experiments.get(experiment_id, 0) > now
+            }
+            owners = {
+                assignment_id: self._assignments[assignment_id]
+                for assignment_id in assignment_ids if assignment_id in self._assignments
+            }
+
+        missing_experiments = experiment_ids - known_experiments
+        if missing_experiments:
+            found = {row[0] for row in db.query(Experiment.id).filter(Experiment.id.in_(missing_experiments)).all()}
+            known_experiments |= found
+            with self._lock:
+                for experiment_id in found:
+                    self._experiments[experiment_id] = now + self.experiment_ttl_seconds
+
+        missing_assignments = assignment_ids - owners.keys()
+        if missing_assignments:
+            rows = db.query(
+                ExperimentAssignment.id, ExperimentAssignment.experiment_id, ExperimentAssignment.variant_id
+            ).filter(
+                ExperimentAssignment.id.in_(missing_assignments)
+            ).all()
+            with self._lock:
+                for assignment_id, experiment_id, variant_id in rows:
+                    owners[assignment_id] = (experiment_id, variant_id)
+                    self._assignments[assignment_id] = (experiment_id, variant_id)
+                    self._assignments.move_to_end(assignment_id)
+                while len(self._assignments) > self.max_assignments:
+                    self._assignments.popitem(last=False)
+
+        return known_experiments, owners
+
+    def forget_experiment(self, experiment_id: str) -> None:
+        with self._lock:
+            self._experiments.pop(experiment_id, None)
+
+experiment_assignment_map = _ExperimentAssignmentMap()
+
+def is_stored_assignment(assignment_id: Optional[str]) -> bool:
+    """Whether an assignment id refers to a stored row rather than a stateless hash"""
+    return bool(assignment_id) and not assignment_id.startswith(STATELESS_ASSIGNMENT_PREFIX)
+
+def has_assignment_row(assignment_id: Optional[str]) -> bool:
+    """Whether an assignment may have a stored row: always for stored ids, for stateless ids when audited"""
+    return is_stored_assignment(assignment_id) or (bool(assignment_id) and settings.ab_assignment_audit)
+
+class ExperimentEventIngestService:
+    """Validates and stores batches of A/B testing events.
+
+    Experiments and stored assignments referenced by a batch are checked
+    against a cached map, with one IN query for whatever the cache does not
+    know. Stateless assignment ids need no row: their audit row is used when
+    one was written, otherwise the variant is recomputed from the event's unit. Accepted events are written in a single multi-row
+    insert; invalid ones are reported by position and do not fail the rest
+    of the batch.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest(self, records: List[Any]) -> Dict[str, Any]:
+        if len(records) > settings.ab_event_batch_max_events:
+            raise EventBatchError(
+                f"Batch has {len(records)} events; the limit is {settings.ab_event_batch_max_events}"
+            )
+
+        rejected: List[Dict[str, Any]] = []
+        events: List[Tuple[int, ExperimentEventCreate]] = []
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                rejected.append({"index": index, "error": "Event must be an object"})
+                continue
+            try:
+                events.append((index, ExperimentEventCreate.model_validate(record)))
+            except ValidationError as e:
+                rejected.append({"index": index, "error": str(e.errors()[0].get("msg", "Invalid event"))})
+
+        experiments, owners = experiment_assignment_map.resolve(
+            self.db,
+            {event.experiment_id for _, event in events},
+            {event.assignment_id for _, event in events if has_assignment_row(event.assignment_id)}
+        )
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        touched = set()
+        for index, event in events:
+            if event.experiment_id not in experiments:
+                rejected.append({"index": index, "error": "Experiment not found"})
+                continue
+            variant_id = None
+            if event.assignment_id:
+                variant_id = self.assignment_variant(event, owners)
+                if variant_id is None:
+                    rejected.append({"index": index, "error": "Assignment not found"})
+                    continue
+
+            row = event.model_dump()
+            row["variant_id"] = variant_id
+            row["id"] = str(uuid.uuid4())
+            row["event_type"] = EventType(event.event_type.value)
+            row["occurred_at"] = row["occurred_at"] or now
+            row["created_at"] = now
+            rows.append(row)
+            touched.add(event.experiment_id)
+
+        if rows:
+            self.db.execute(insert(ExperimentEvent), rows)
+            self.db.commit()
+            for experiment_id in touched:
+                experiment_result_cache.invalidate(experiment_id)
+
+        rejected.sort(key=lambda item: item["index"])
+        logger.info("Experiment events ingested", accepted=len(rows), rejected=len(rejected))
+        return {"accepted": len(rows), "rejected": rejected}
+
+    def assignment_variant(
+        self, event: ExperimentEventCreate, owners: Optional[Dict[str, Tuple[str, str]]] = None
+    ) -> Optional[str]:
+        """Variant of the assignment an event references, or None if the experiment has no such assignment"""
+        if owners is None:
+            assignment_ids = {event.assignment_id} if has_assignment_row(event.assignment_id) else set()
+            _, owners = experiment_assignment_map.resolve(self.db, set(), assignment_ids)
+        if event.assignment_id in owners:
+            experiment_id, variant_id = owners[event.assignment_id]
+            return variant_id if experiment_id == event.experiment_id else None
+
+        if is_stored_assignment(event.assignment_id):
+            return None
+        return stateless_variant_id(
+            self.db, event.experiment_id, event.assignment_id, event.session_id,
+            user_id=event.user_id, device_id=event.device_id
+        )
@@ -293,13 +293,14 @@ class ModelProviderService:
                 "quality_score": 0
             }
 
-    async def run_compatibility_tests(self, prompt: str) -> Dict[str, Any]:
-        """Run compatibility tests across all providers"""
+    async def run_compatibility_tests(self, prompt: str, providers: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run compatibility tests across the given providers, or all providers"""
         results = {}
+        providers = providers if providers is not None else list(self.providers.keys())
 
         # Test all providers concurrently
         tasks = []
-        for provider in self.providers.keys():
+        for provider in providers:
             task = self.test_prompt_compatibility(prompt, provider)
             tasks.append((provider, task))
 
@@ -325,7 +326,7 @@ class ModelProviderService:
             "prompt_preview": prompt[:100] + "..." if len(prompt) > 100 else prompt,
             "results": results,
             "summary": {
-                "total_providers": len(self.providers),
+                "total_providers": len(providers),
                 "working_count": len(working_providers),
                 "needs_tuning_count": len(needs_tuning),
                 "not_supported_count": len(not_supported),
@@ -0,0 +1,239 @@
+import base64
+import json
+import re
+from typing import Dict, Any, Optional, Tuple
+import structlog
+from sqlalchemy import Float, and_, or_, cast, column, func, literal, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Prompt, Module
+
+logger = structlog.get_logger()
+
+# Text search configuration used for the Postgres tsvector column
+SEARCH_CONFIG = "english"
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""ALTER TABLE prompts ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_prompt_search_vector ON prompts USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_prompt_name_trgm ON prompts USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_prompt_description_trgm ON prompts USING GIN (description gin_trgm_ops)",
+]
+
+# prompts has a composite string key and no INTEGER PRIMARY KEY, so its implicit
+# rowids can be renumbered by VACUUM. The FTS rows are keyed on prompts_fts_keys
+# instead, whose INTEGER PRIMARY KEY is stable, and store their own text.
+_FTS_KEY = "(SELECT key_id FROM prompts_fts_keys WHERE id = {row}.id AND version = {row}.version)"
+
+SQLITE_SEARCH_DDL = [
+    """CREATE TABLE IF NOT EXISTS prompts_fts_keys (
+        key_id INTEGER PRIMARY KEY,
+        id VARCHAR NOT NULL,
+        version VARCHAR NOT NULL,
+        UNIQUE (id, version)
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+        name, description, content, tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS prompts_fts_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO prompts_fts_keys(id, version) VALUES (new.id, new.version);
+        INSERT INTO prompts_fts(rowid, name, description, content)
+        VALUES ({_FTS_KEY.format(row="new")}, new.name, new.description, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS prompts_fts_ad AFTER DELETE ON prompts BEGIN
+        DELETE FROM prompts_fts WHERE rowid = {_FTS_KEY.format(row="old")};
+        DELETE FROM prompts_fts_keys WHERE id = old.id AND version = old.version;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS prompts_fts_au AFTER UPDATE OF id, version, name, description, content
+    ON prompts BEGIN
+        DELETE FROM prompts_fts WHERE rowid = {_FTS_KEY.format(row="old")};
+        UPDATE prompts_fts_keys SET id = new.id, version = new.version
+        WHERE id = old.id AND version = old.version;
+        INSERT INTO prompts_fts(rowid, name, description, content)
+        VALUES ({_FTS_KEY.format(row="new")}, new.name, new.description, new.content);
+    END""",
+]
+
+SQLITE_SEARCH_BACKFILL = [
+    "INSERT INTO prompts_fts_keys(id, version) SELECT id, version FROM prompts",
+    """INSERT INTO prompts_fts(rowid, name, description, content)
+    SELECT k.key_id, p.name, p.description, p.content
+    FROM prompts p JOIN prompts_fts_keys k ON k.id = p.id AND k.version = p.version""",
+]
+
+# Objects of the earlier index, which used content='prompts' keyed on its implicit rowid
+SQLITE_LEGACY_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS prompts_fts_ai",
+    "DROP TRIGGER IF EXISTS prompts_fts_ad",
+    "DROP TRIGGER IF EXISTS prompts_fts_au",
+    "DROP TABLE IF EXISTS prompts_fts",
+]
+
+# Dialects whose search index has been created in this process
+_search_index_ready: Dict[str, bool] = {}
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the full-text search index for the engine's dialect
+
+    Postgres gets a weighted tsvector column with a GIN index plus pg_trgm indexes
+    for substring matches on name and description. SQLite gets an FTS5 table keyed
+    on a stable integer key per (id, version), kept in sync by triggers. Other
+    dialects fall back to ILIKE scans.
+    """
+    dialect = engine.dialect.name
+    statements = {"postgresql": POSTGRES_SEARCH_DDL, "sqlite": SQLITE_SEARCH_DDL}.get(dialect)
+    if statements is None:
+        logger.warning("Full-text search index not supported, using ILIKE scans", dialect=dialect)
+        return False
+
+    try:
+        with engine.begin() as conn:
+            needs_backfill = dialect == "sqlite" and conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'prompts_fts_keys'")
+            ).first() is None
+            if needs_backfill:
+                for statement in SQLITE_LEGACY_SEARCH_DROP:
+                    conn.execute(text(statement))
+            for statement in statements:
+                conn.execute(text(statement))
+            if needs_backfill:
+                # Index rows that existed before the FTS table was created
+                for statement in SQLITE_SEARCH_BACKFILL:
+                    conn.execute(text(statement))
+        _search_index_ready[dialect] = True
+        logger.info("Prompt search index ready", dialect=dialect)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create prompt search index: {str(e)}", dialect=dialect)
+        return False
+
+def encode_cursor(score: float, prompt_id: str) -> str:
+    """Encode a keyset pagination cursor"""
+    payload = json.dumps([score, prompt_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Decode a keyset pagination cursor"""
+    try:
+        score, prompt_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), str(prompt_id)
+    except Exception:
+        raise ValueError("Invalid search cursor")
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _fts5_match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query with every token quoted"""
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+class PromptSearchService:
+    """Ranked prompt search with keyset pagination over the full-text index"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def _base_query(self, *columns, project_id: Optional[str] = None, module_id: Optional[str] = None):
+        query = self.db.query(*columns).select_from(Prompt)
+        if project_id:
+            query = query.join(Module, Module.id == Prompt.module_id).filter(Module.project_id == project_id)
+        if module_id:
+            query = query.filter(Prompt.module_id == module_id)
+        return query
+
+    def _match(self, query: str):
+        """Return (score expression, predicate, join targets) for the active backend"""
+        if _search_index_ready.get(self.dialect) and self.dialect == "postgresql":
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            search_vector = literal_column("prompts.search_vector")
+            pattern = f"%{_escape_like(query)}%"
+            # Cast to double precision so cursor scores round-trip exactly
+            score = cast(func.ts_rank_cd(search_vector, tsquery) + func.similarity(Prompt.name, query), Float)
+            predicate = or_(
+                search_vector.op("@@")(tsquery),
+                Prompt.name.ilike(pattern, escape="\\"),
+                Prompt.description.ilike(pattern, escape="\\")
+            )
+            return score, predicate, []
+
+        if _search_index_ready.get(self.dialect) and self.dialect == "sqlite":
+            match_expression = _fts5_match_expression(query)
+            if match_expression is not None:
+                keys = table("prompts_fts_keys", column("key_id"), column("id"), column("version"))
+                fts = table("prompts_fts", column("rowid"))
+                score = -func.bm25(literal_column("prompts_fts"))
+                predicate = literal_column("prompts_fts").op("MATCH")(match_expression)
+                return score, predicate, [
+                    (keys, and_(keys.c.id == Prompt.id, keys.c.version == Prompt.version)),
+                    (fts, fts.c.rowid == keys.c.key_id)
+                ]
+
+        pattern = f"%{_escape_like(query)}%"
+        predicate = or_(
+            Prompt.name.ilike(pattern, escape="\\"),
+            Prompt.description.ilike(pattern, escape="\\"),
+            Prompt.content.ilike(pattern, escape="\\")
+        )
+        return literal(0.0), predicate, []
+
+    def search(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Search prompts by relevance
+
+        Results are ordered by score, then prompt ID. When a cursor is given the
+        page starts strictly after it and `offset` is ignored. `total` is only
+        counted for requests without a cursor and is None on cursor pages.
+        """
+        score, predicate, join_targets = self._match(query)
+
+        def build(*columns):
+            q = self._base_query(*columns, project_id=project_id, module_id=module_id)
+            for target, onclause in join_targets:
+                q = q.join(target, onclause)
+            return q.filter(predicate)
+
+        total = None if cursor else build(func.count(Prompt.id)).scalar() or 0
+
+        page_query = build(Prompt, score.label("score"))
+        if cursor:
+            last_score, last_id = decode_cursor(cursor)
+            page_query = page_query.filter(
+                or_(score < last_score, and_(score == last_score, Prompt.id > last_id))
+            )
+        elif offset:
+            page_query = page_query.offset(offset)
+
+        rows = page_query.order_by(score.desc(), Prompt.id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more and rows:
+            last_prompt, last_score = rows[-1]
+            next_cursor = encode_cursor(float(last_score), last_prompt.id)
+
+        return {
+            "prompts": [prompt for prompt, _ in rows],
+            "scores": [float(row_score) for _, row_score in rows],
+            "total": total,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        }
@@ -0,0 +1,198 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.models import Prompt, Module, PromptVersionPointer
+from app.services.prompt_version_service import PromptVersionService
+from app.utils import compute_prompt_etag
+
+logger = structlog.get_logger()
+
+# Bumped whenever the bundle layout changes so clients can reject bundles they cannot read
+SNAPSHOT_FORMAT_VERSION = 1
+
+def compute_manifest_hash(manifest: Dict[str, str]) -> str:
+    """Hash a snapshot manifest (prompt key -> ETag) independent of key order"""
+    payload = json.dumps(sorted(manifest.items()), separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def serialize_snapshot_prompt(prompt: Prompt) -> Dict[str, Any]:
+    """Serialize a prompt the way the client API returns it"""
+    return {
+        "id": prompt.id,
+        "version": prompt.version,
+        "name": prompt.name,
+        "description": prompt.description,
+        "content": prompt.content,
+        "provider_id": prompt.provider_id,
+        "target_models": prompt.target_models,
+        "model_specific_prompts": prompt.model_specific_prompts,
+        "module_id": prompt.module_id,
+        "created_by": prompt.created_by,
+        "created_at": prompt.created_at,
+        "updated_at": prompt.updated_at,
+        "mas_intent": prompt.mas_intent,
+        "mas_fairness_notes": prompt.mas_fairness_notes,
+        "mas_testing_notes": prompt.mas_testing_notes,
+        "mas_risk_level": prompt.mas_risk_level,
+        "mas_approval_log": prompt.mas_approval_log
+    }
+
+class PromptSnapshotService:
+    """Builds versioned bundles of a project's active prompts for SDK warm start.
+
+    A snapshot holds the active version of every prompt family in a project, keyed
+    by base prompt ID. Its manifest maps each key to the prompt's ETag and the
+    manifest hash is the snapshot ID, so two snapshots with the same content have
+    the same ID. Clients that already hold a snapshot send back its manifest and
+    receive only the prompts that changed or disappeared since.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _backfill_missing_pointers(self, project_id: str) -> None:
+        """Build pointers for prompt families created before the pointer table existed"""
+        missing = self.db.query(Prompt.base_prompt_id).join(
+            Module, Module.id == Prompt.module_id
+        ).outerjoin(
+            PromptVersionPointer, PromptVersionPointer.base_prompt_id == Prompt.base_prompt_id
+        ).filter(
+            Module.project_id == project_id,
+            Prompt.base_prompt_id.isnot(None),
+            PromptVersionPointer.base_prompt_id.is_(None)
+        ).distinct().all()
+
+        if not missing:
+            return
+
+        service = PromptVersionService(self.db)
+        for (base_prompt_id,) in missing:
+            service.refresh_pointer(base_prompt_id)
+        # Flush so the snapshot query sees them; committing is left to the caller's transaction
+        self.db.flush()
+        logger.info("Prompt version pointers backfilled for snapshot", project_id=project_id, count=len(missing))
+
+    def _active_prompts(
+        self,
+        project_id: str,
+        module_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> List[Tuple[str, Prompt, bool]]:
+        """Resolve (prompt key, active prompt, active is latest) triples through the version pointers"""
+        self._backfill_missing_pointers(project_id)
+
+        is_latest = and_(
+            PromptVersionPointer.latest_prompt_id == PromptVersionPointer.active_prompt_id,
+            PromptVersionPointer.latest_version == PromptVersionPointer.active_version
+        )
+        query = self.db.query(PromptVersionPointer.base_prompt_id, Prompt, Module.metadata_json, is_latest).join(
+            Prompt, and_(
+                Prompt.id == PromptVersionPointer.active_prompt_id,
+                Prompt.version == PromptVersionPointer.active_version
+            )
+        ).join(
+            Module, Module.id == Prompt.module_id
+        ).filter(Module.project_id == project_id)
+
+        if module_id:
+            query = query.filter(Prompt.module_id == module_id)
+
+        rows = query.order_by(PromptVersionPointer.base_prompt_id).all()
+
+        if tag:
+            # Module tags live in free-form JSON metadata, so match them here
+            rows = [
+                row for row in rows
+                if isinstance(row[2], dict) and tag in (row[2].get("tags") or [])
+            ]
+
+        return [(base_prompt_id, prompt, bool(latest)) for base_prompt_id, prompt, _, latest in rows]
+
+    def _entries(self, project_id: str, module_id: Optional[str], tag: Optional[str]) -> Dict[str, Tuple[str, Prompt, bool]]:
+        """ETag, active prompt and whether it is the latest version, by base prompt ID
+
+        ETags come from the prompt's identity and update time, so deltas only
+        serialize the prompts that changed.
+        """
+        return {
+            key: (compute_prompt_etag(prompt.id, prompt.version, prompt.updated_at, is_latest), prompt, is_latest)
+            for key, prompt, is_latest in self._active_prompts(project_id, module_id, tag)
+        }
+
+    @staticmethod
+    def _serialize(prompt: Prompt, is_latest: bool) -> Dict[str, Any]:
+        """Serialize a snapshot prompt
+
+        `is_latest` tells clients whether the active version is also what
+        `GET /prompts/{id}` returns (the highest version), so they only cache
+        it under the latest-version key when the two agree.
+        """
+        serialized = serialize_snapshot_prompt(prompt)
+        serialized["is_latest"] = is_latest
+        return serialized
+
+    def _bundle_header(self, project_id: str, module_id: Optional[str], tag: Optional[str], manifest: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "snapshot_id": compute_manifest_hash(manifest),
+            "project_id": project_id,
+            "module_id": module_id,
+            "tag": tag,
+            "generated_at": datetime.utcnow()
+        }
+
+    def build_snapshot(
+        self,
+        project_id: str,
+        module_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the full snapshot bundle for a project"""
+        entries = self._entries(project_id, module_id, tag)
+        manifest = {key: etag for key, (etag, _, _) in entries.items()}
+
+        bundle = self._bundle_header(project_id, module_id, tag, manifest)
+        bundle.update({
+            "manifest": manifest,
+            "prompts": {key: self._serialize(prompt, is_latest) for key, (_, prompt, is_latest) in entries.items()},
+            "total": len(entries)
+        })
+        return bundle
+
+    def build_delta(
+        self,
+        project_id: str,
+        since_manifest: Dict[str, str],
+        module_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the changes between a client's manifest and the current snapshot
+
+        `changed` holds every prompt that is new or whose ETag differs from the
+        client's copy; `removed` lists keys the client should drop. Applying both to
+        the client's snapshot yields the snapshot identified by `snapshot_id`.
+        """
+        entries = self._entries(project_id, module_id, tag)
+        manifest = {key: etag for key, (etag, _, _) in entries.items()}
+
+        changed = {
+            key: self._serialize(prompt, is_latest)
+            for key, (etag, prompt, is_latest) in entries.items()
+            if since_manifest.get(key) != etag
+        }
+        removed = sorted(key for key in since_manifest if key not in entries)
+
+        delta = self._bundle_header(project_id, module_id, tag, manifest)
+        delta.update({
+            "base_snapshot_id": compute_manifest_hash(since_manifest),
+            "manifest": {key: manifest[key] for key in changed},
+            "changed": changed,
+            "removed": removed,
+            "total": len(entries)
+        })
+        return delta
@@ -0,0 +1,244 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Prompt, Module
+from app.services.redis_service import PROMPT_UPDATE_STREAM, redis_service
+
+logger = structlog.get_logger()
+
+# Client reconnect delay advertised in the SSE `retry` field
+SSE_RETRY_MS = 3000
+
+def parse_event_id(event_id: str) -> Tuple[int, int]:
+    """Parse a Redis stream entry ID (`<ms>-<seq>`) for ordering comparisons"""
+    try:
+        milliseconds, _, sequence = event_id.partition("-")
+        return int(milliseconds), int(sequence or 0)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid event ID: {event_id}")
+
+def format_sse(data: Dict[str, Any], event: str = "prompt_update", event_id: Optional[str] = None) -> str:
+    """Format a server-sent event frame"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+def _decode_entry(fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(fields["data"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class _Subscriber:
+    """Bounded per-connection event queue"""
+
+    def __init__(self, project_id: str, queue_size: int):
+        self.project_id = project_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def offer(self, event_id: str, event: Dict[str, Any]) -> None:
+        if event.get("project_id") != self.project_id:
+            return
+        try:
+            self.queue.put_nowait((event_id, event))
+        except asyncio.QueueFull:
+            # The connection catches up from the stream instead of growing the queue
+            self.lagged = True
+
+class PromptUpdateBroker:
+    """Fans prompt update events out to streaming clients.
+
+    One reader task per process tails the Redis prompt update stream and copies
+    each event into the queues of connected subscribers for the event's project.
+    Stream entry IDs are the resume tokens: a reconnecting client passes the last
+    ID it saw and first receives the retained events after it. When the token is
+    older than the retained history the client is told to reset its cache.
+    """
+
+    def __init__(self, service=None, block_ms: int = 5000, queue_size: int = 1000, batch_size: int = 100):
+        self.service = service or redis_service
+        self.block_ms = block_ms
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._subscribers: Set[_Subscriber] = set()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def available(self) -> bool:
+        """Check that Redis is reachable before a stream is opened"""
+        try:
+            if not self.service.redis_client:
+                await self.service.initialize()
+            else:
+                await self.service.redis_client.ping()
+            return True
+        except Exception as e:
+            logger.warning(f"Prompt update stream unavailable: {str(e)}")
+            return False
+
+    def _ensure_reader(self) -> None:
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        """Tail the stream and dispatch events until the last subscriber leaves
+
+        Returns straight away when Redis is not connected; subscribers notice the
+        stopped reader at their next heartbeat and are told to reconnect.
+        """
+        client = self.service.redis_client
+        if client is None:
+            logger.warning("Prompt update reader stopped: Redis is not connected")
+            return
+
+        last_id = "$"
+        try:
+            newest = await client.xrevrange(PROMPT_UPDATE_STREAM, count=1)
+            if newest:
+                last_id = newest[0][0]
+        except Exception as e:
+            logger.error(f"Failed to read prompt update stream head: {str(e)}")
+
+        while self._subscribers:
+            try:
+                result = await client.xread({PROMPT_UPDATE_STREAM: last_id}, block=self.block_ms, count=self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to read prompt update stream: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            for _, entries in result or []:
+                for event_id, fields in entries:
+                    last_id = event_id
+                    event = _decode_entry(fields)
+                    if event is None:
+                        continue
+                    for subscriber in list(self._subscribers):
+                        subscriber.offer(event_id, event)
+
+    async def _backlog(self, project_id: str, after_id: str) -> Tuple[bool, List[Tuple[str, Dict[str, Any]]]]:
+        """Read retained events after a resume token
+
+        Returns (complete, events). `complete` is False when the stream has been
+        trimmed past the token, so events in between may have been lost.
+        """
+        client = self.service.redis_client
+        oldest = await client.xrange(PROMPT_UPDATE_STREAM, count=1)
+        complete = not oldest or parse_event_id(oldest[0][0]) <= parse_event_id(after_id)
+
+        events = []
+        start = f"({after_id}"
+        while True:
+            entries = await client.xrange(PROMPT_UPDATE_STREAM, min=start, count=self.batch_size)
+            for event_id, fields in entries:
+                event = _decode_entry(fields)
+                if event is not None and event.get("project_id") == project_id:
+                    events.append((event_id, event))
+            if len(entries) < self.batch_size:
+                break
+            start = f"({entries[-1][0]}"
+
+        return complete, events
+
+    async def stream(
+        self,
+        project_id: str,
+        last_event_id: Optional[str] = None,
+        heartbeat_seconds: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Yield SSE frames for a project's prompt updates
+
+        The subscriber is registered before the backlog is read so no event falls
+        between the two; events already delivered from the backlog are skipped.
+        """
+        if last_event_id:
+            parse_event_id(last_event_id)
+        heartbeat_seconds = heartbeat_seconds or settings.prompt_update_heartbeat_seconds
+
+        subscriber = _Subscriber(project_id, self.queue_size)
+        self._subscribers.add(subscriber)
+        self._ensure_reader()
+        logger.info("Prompt update subscriber connected", project_id=project_id, subscribers=self.subscriber_count)
+
+        cursor = last_event_id
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            yield format_sse({"project_id": project_id, "resumed_from": last_event_id}, event="ready")
+
+            if last_event_id:
+                complete, backlog = await self._backlog(project_id, last_event_id)
+                if not complete:
+                    yield format_sse({"project_id": project_id, "reason": "history_expired"}, event="reset")
+                for event_id, event in backlog:
+                    yield format_sse(event, event_id=event_id)
+                    cursor = event_id
+
+            while True:
+                if subscriber.lagged and cursor:
+                    # Fell behind the live queue - drop it and replay from the stream
+                    subscriber.lagged = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    _, backlog = await self._backlog(project_id, cursor)
+                    for event_id, event in backlog:
+                        yield format_sse(event, event_id=event_id)
+                        cursor = event_id
+                elif subscriber.lagged:
+                    subscriber.lagged = False
+                    yield format_sse({"project_id": project_id, "reason": "subscriber_lagged"}, event="reset")
+
+                try:
+                    event_id, event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if self._reader_task.done():
+                        # Clients reconnect after the retry delay and get a 503 until Redis is back
+                        yield format_sse({"project_id": project_id, "reason": "stream_unavailable"}, event="reset")
+                        return
+                    yield f": heartbeat {datetime.utcnow().isoformat()}\n\n"
+                    continue
+
+                if cursor and parse_event_id(event_id) <= parse_event_id(cursor):
+                    continue
+                yield format_sse(event, event_id=event_id)
+                cursor = event_id
+        finally:
+            self._subscribers.discard(subscriber)
+            logger.info("Prompt update subscriber disconnected", project_id=project_id, subscribers=self.subscriber_count)
+
+async def publish_prompt_change(db: Session, prompt: Prompt, action: str) -> Optional[str]:
+    """Publish a prompt change to streaming clients without failing the caller
+
+    Write endpoints call this after committing; an unavailable Redis only
+    delays propagation until SDK cache entries expire.
+    """
+    try:
+        if not redis_service.redis_client:
+            await redis_service.initialize()
+        module = db.query(Module).filter(Module.id == prompt.module_id).first()
+        return await redis_service.publish_prompt_update(
+            prompt.id,
+            prompt.version,
+            action,
+            project_id=module.project_id if module else None,
+            module_id=prompt.module_id
+        )
+    except Exception as e:
+        logger.warning(f"Prompt change not published: {str(e)}", prompt_id=prompt.id, action=action)
+        return None
+
+# Global broker shared by all streaming connections
+prompt_update_broker = PromptUpdateBroker()
@@ -0,0 +1,143 @@
+from typing import Dict, Optional
+import structlog
+from sqlalchemy.orm import Session
+
+from app.models import Prompt, PromptVersionPointer
+from app.utils import get_base_prompt_id, parse_semver
+
+logger = structlog.get_logger()
+
+class PromptVersionService:
+    """Maintains and reads the materialized latest/active version pointers for prompts.
+
+    Every prompt row carries normalized integer version components, indexed together
+    with its base prompt ID and module ID. The pointer table stores the resolved
+    latest and active version of each prompt family so runtime lookups are a single
+    primary-key read. Pointers are refreshed inside the caller's transaction whenever
+    a version is created, activated, deactivated or deleted.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _semver_ordered(self, query):
+        """Order a prompt query by semantic version, highest first"""
+        return query.filter(Prompt.version_major.isnot(None)).order_by(
+            Prompt.version_major.desc(),
+            Prompt.version_minor.desc(),
+            Prompt.version_patch.desc()
+        )
+
+    def _find_latest(self, query) -> Optional[Prompt]:
+        """Resolve the highest semantic version, falling back to creation time for non-semver families"""
+        prompt = self._semver_ordered(query).first()
+        if prompt is None:
+            prompt = query.order_by(Prompt.created_at.desc()).first()
+        return prompt
+
+    def refresh_pointer(self, prompt_id: str) -> Optional[PromptVersionPointer]:
+        """Recompute the pointer for a prompt family without committing
+
+        The session is flushed first so pending inserts, updates and deletes made by
+        the caller are visible. The caller's commit makes the pointer change atomic
+        with the prompt change.
+        """
+        base_prompt_id = get_base_prompt_id(prompt_id)
+        self.db.flush()
+
+        family = self.db.query(Prompt).filter(Prompt.base_prompt_id == base_prompt_id)
+        pointer = self.db.get(PromptVersionPointer, base_prompt_id)
+
+        latest = self._find_latest(family)
+        if latest is None:
+            if pointer is not None:
+                self.db.delete(pointer)
+            return None
+
+        active = self._find_latest(family.filter(Prompt.is_active == True))
+
+        if pointer is None:
+            pointer = PromptVersionPointer(base_prompt_id=base_prompt_id)
+            self.db.add(pointer)
+
+        pointer.module_id = latest.module_id
+        pointer.latest_prompt_id = latest.id
+        pointer.latest_version = latest.version
+        pointer.active_prompt_id = active.id if active else None
+        pointer.active_version = active.version if active else None
+        pointer.version_count = family.count()
+
+        return pointer
+
+    def get_pointer(self, prompt_id: str) -> Optional[PromptVersionPointer]:
+        """Get the pointer for a prompt family, building it on first access
+
+        A backfilled pointer is only flushed; it is stored if the caller's
+        transaction commits, and rebuilt on a later access if it does not.
+        `rebuild_index` stores pointers for every family up front.
+        """
+        base_prompt_id = get_base_prompt_id(prompt_id)
+        pointer = self.db.get(PromptVersionPointer, base_prompt_id)
+        if pointer is None:
+            pointer = self.refresh_pointer(base_prompt_id)
+            if pointer is not None:
+                self.db.flush()
+                logger.info("Prompt version pointer backfilled", base_prompt_id=base_prompt_id)
+        return pointer
+
+    def get_latest_prompt(
+        self,
+        prompt_id: str,
+        active_only: bool = False,
+        provider_id: Optional[str] = None
+    ) -> Optional[Prompt]:
+        """Get the latest (or latest active) version of a prompt family
+
+        Provider-specific lookups cannot use the family pointer, so they resolve
+        through the semantic version index instead.
+        """
+        if provider_id is not None:
+            query = self.db.query(Prompt).filter(
+                Prompt.base_prompt_id == get_base_prompt_id(prompt_id),
+                Prompt.provider_id == provider_id
+            )
+            if active_only:
+                query = query.filter(Prompt.is_active == True)
+            return self._find_latest(query)
+
+        pointer = self.get_pointer(prompt_id)
+        if pointer is None:
+            return None
+
+        if active_only:
+            if pointer.active_prompt_id is None:
+                return None
+            return self.db.get(Prompt, (pointer.active_prompt_id, pointer.active_version))
+        return self.db.get(Prompt, (pointer.latest_prompt_id, pointer.latest_version))
+
+    def get_latest_module_version(self, module_id: str, default: str = "1.0.0") -> str:
+        """Get the highest semantic version across all prompts in a module"""
+        prompt = self._semver_ordered(
+            self.db.query(Prompt).filter(Prompt.module_id == module_id)
+        ).first()
+        if prompt is None or parse_semver(prompt.version) < parse_semver(default):
+            return default
+        return prompt.version
+
+    def rebuild_index(self) -> Dict[str, int]:
+        """Backfill normalized version columns and pointers for every existing prompt"""
+        base_prompt_ids = set()
+        prompts = self.db.query(Prompt).all()
+        for prompt in prompts:
+            prompt.base_prompt_id = get_base_prompt_id(prompt.id)
+            prompt.version_major, prompt.version_minor, prompt.version_patch = (
+                parse_semver(prompt.version) or (None, None, None)
+            )
+            base_prompt_ids.add(prompt.base_prompt_id)
+
+        for base_prompt_id in base_prompt_ids:
+            self.refresh_pointer(base_prompt_id)
+
+        self.db.commit()
+        logger.info("Prompt version index rebuilt", prompts=len(prompts), pointers=len(base_prompt_ids))
+        return {"prompts": len(prompts), "pointers": len(base_prompt_ids)}
@@ -0,0 +1,261 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+import structlog
+
+from app.config import settings
+from app.schemas import ModelTestResult
+
+logger = structlog.get_logger()
+
+ANTHROPIC_VERSION = "2023-06-01"
+TEST_MAX_TOKENS = 256
+
+def provider_target(provider) -> Dict[str, Any]:
+    """Copy what a test needs off the ORM object, so tasks never touch the session"""
+    provider_type = provider.provider_type
+    return {
+        "id": provider.id,
+        "name": provider.name,
+        "provider_type": getattr(provider_type, "value", str(provider_type)).lower(),
+        "api_key": provider.api_key,
+        "api_base_url": provider.api_base_url,
+        "model_name": provider.model_name,
+        "organization": provider.organization
+    }
+
+def build_provider_request(target: Dict[str, Any], system_prompt: str, user_message: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Return the URL, headers and JSON body of a chat request to the provider's REST API"""
+    provider_type = target["provider_type"]
+    base_url = (target.get("api_base_url") or "").rstrip("/")
+    api_key = target.get("api_key") or ""
+    headers = {"Content-Type": "application/json"}
+    chat_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+    if provider_type == "openai":
+        headers["Authorization"] = f"Bearer {api_key}"
+        if target.get("organization"):
+            headers["OpenAI-Organization"] = target["organization"]
+        return (f"{base_url or 'https://api.openai.com/v1'}/chat/completions", headers, {
+            "model": target.get("model_name") or settings.default_openai_model,
+            "messages": chat_messages,
+            "max_tokens": TEST_MAX_TOKENS
+        })
+
+    if provider_type == "anthropic":
+        headers["x-api-key"] = api_key
+        headers["anthropic-version"] = ANTHROPIC_VERSION
+        return (f"{base_url or 'https://api.anthropic.com'}/v1/messages", headers, {
+            "model": target.get("model_name") or settings.default_anthropic_model,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_message}],
+            "max_tokens": TEST_MAX_TOKENS
+        })
+
+    if provider_type == "gemini":
+        headers["x-goog-api-key"] = api_key
+        model = target.get("model_name") or settings.default_gemini_model
+        return (f"{base_url or 'https://generativelanguage.googleapis.com'}/v1beta/models/{model}:generateContent", headers, {
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
+            "contents": [{"role": "user", "parts": [{"text": user_message}]}],
+            "generationConfig": {"maxOutputTokens": TEST_MAX_TOKENS}
+        })
+
+    # The remaining providers take a full endpoint URL, as in AIAssistantService
+    headers["Authorization"] = f"Bearer {api_key}"
+    if provider_type == "qwen":
+        return (base_url or "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation", headers, {
+            "model": target.get("model_name") or "qwen-turbo",
+            "input": {"messages": chat_messages}
+        })
+    if provider_type == "openrouter":
+        return (base_url or "https://openrouter.ai/api/v1/chat/completions", headers, {
+            "model": target.get("model_name") or settings.default_openrouter_model,
+            "messages": chat_messages,
+            "max_tokens": TEST_MAX_TOKENS
+        })
+    if provider_type == "ollama":
+        return (base_url or "http://localhost:11434/api/generate", headers, {
+            "model": target.get("model_name") or "llama2",
+            "system": system_prompt,
+            "prompt": user_message,
+            "stream": False
+        })
+
+    if not base_url:
+        raise ValueError("No API base URL configured for this provider type")
+    return (base_url, headers, {
+        "model": target.get("model_name") or settings.default_generic_model,
+        "messages": chat_messages
+    })
+
+def parse_provider_response(provider_type: str, data: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+    """Extract the response text and total tokens from a provider response body"""
+    if provider_type == "anthropic":
+        content = "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+        usage = data.get("usage") or {}
+        tokens = usage.get("input_tokens", 0) + usage.get("output_tokens", 0) if usage else None
+        return content, tokens
+
+    if provider_type == "gemini":
+        candidates = data.get("candidates") or []
+        parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+        return "".join(part.get("text", "") for part in parts), (data.get("usageMetadata") or {}).get("totalTokenCount")
+
+    if provider_type == "qwen":
+        output = data.get("output") or {}
+        return output.get("text") or "", (data.get("usage") or {}).get("total_tokens")
+
+    if provider_type == "ollama":
+        tokens = None
+        if "eval_count" in data:
+            tokens = data.get("prompt_eval_count", 0) + data["eval_count"]
+        return data.get("response", ""), tokens
+
+    choices = data.get("choices") or []
+    content = choices[0].get("message", {}).get("content", "") if choices else data.get("response", "")
+    return content or "", (data.get("usage") or {}).get("total_tokens")
+
+class ProviderTestExecutor:
+    """Runs one prompt against many providers concurrently.
+
+    All requests share one pooled async HTTP client, so connections to a
+    provider are reused across tests. Concurrency is capped per provider type,
+    every provider has its own timeout, and results are yielded as they
+    finish, so a slow or hung provider neither delays nor discards the others.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None, provider_concurrency: Optional[int] = None):
+        self.max_connections = max_connections or settings.model_test_max_connections
+        self.provider_concurrency = provider_concurrency or settings.model_test_provider_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def _bind_loop(self) -> None:
+        # The client and semaphores belong to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        previous, previous_loop = self._client, self._loop
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+        self._semaphores = {}
+
+        if previous is not None:
+            await self._close_client(previous, previous_loop)
+
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client, including one left behind by another event loop"""
+        if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+            # Its connections can only be closed on the loop that opened them
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Its loop has finished; the client is marked closed and its pool emptied
+            logger.debug("Provider test client closed after its event loop finished", error=str(e))
+
+    def _semaphore(self, provider_type: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider_type)
+        if semaphore is None:
+            semaphore = self._semaphores[provider_type] = asyncio.Semaphore(self.provider_concurrency)
+        return semaphore
+
+    def _result(self, target: Dict[str, Any], started: float, status: str, content: str = "",
+                tokens: Optional[int] = None, error: Optional[str] = None) -> ModelTestResult:
+        return ModelTestResult(
+            provider_id=target["id"],
+            provider_name=target["name"],
+            provider_type=target["provider_type"],
+            response_content=content,
+            response_time_ms=int((time.perf_counter() - started) * 1000),
+            tokens_used=tokens,
+            error=error,
+            status=status
+        )
+
+    async def _call(self, target: Dict[str, Any], system_prompt: str, user_message: str, timeout: float) -> ModelTestResult:
+        started = time.perf_counter()
+        if not target.get("api_key") and target["provider_type"] != "ollama":
+            return self._result(target, started, "error", error="No API key configured")
+
+        try:
+            url, headers, payload = build_provider_request(target, system_prompt, user_message)
+        except ValueError as e:
+            return self._result(target, started, "error", error=str(e))
+
+        try:
+            async with self._semaphore(target["provider_type"]):
+                # The timeout and response time start once a slot is free, not while queued for one
+                started = time.perf_counter()
+                response = await asyncio.wait_for(
+                    self._client.post(url, headers=headers, json=payload, timeout=timeout),
+                    timeout=timeout
+                )
+            if response.status_code >= 400:
+                return self._result(
+                    target, started, "error", error=f"HTTP {response.status_code}: {response.text[:500]}"
+                )
+            content, tokens = parse_provider_response(target["provider_type"], response.json())
+            return self._result(target, started, "success", content=content, tokens=tokens)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            return self._result(target, started, "timeout", error=f"No response within {timeout:g}s")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("Provider test failed", provider_id=target["id"], error=str(e))
+            return self._result(target, started, "error", error=str(e) or type(e).__name__)
+
+    async def stream(
+        self,
+        targets: List[Dict[str, Any]],
+        system_prompt: str,
+        user_message: str,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[ModelTestResult]:
+        """Yield each provider's result as soon as it is available"""
+        await self._bind_loop()
+        timeout = timeout or settings.model_test_timeout_seconds
+        tasks = [
+            asyncio.create_task(self._call(target, system_prompt, user_message, timeout))
+            for target in targets
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(
+        self,
+        targets: List[Dict[str, Any]],
+        system_prompt: str,
+        user_message: str,
+        timeout: Optional[float] = None
+    ) -> List[ModelTestResult]:
+        """Run all tests and return results in the order of `targets`"""
+        results = {}
+        async for result in self.stream(targets, system_prompt, user_message, timeout):
+            results[result.provider_id] = result
+        return [results[target["id"]] for target in targets]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._close_client(self._client, self._loop)
+        self._client = None
+        self._loop = None
+        self._semaphores = {}
+
+provider_test_executor = ProviderTestExecutor()
@@ -7,10 +7,14 @@ import structlog
 
 from app.config import settings
 from app.database import get_db
-from app.models import Prompt
+from app.models import Prompt, Module
+from app.utils import get_base_prompt_id
 
 logger = structlog.get_logger()
 
+# Redis stream holding recent prompt update events for resumable subscribers
+PROMPT_UPDATE_STREAM = "prompt_updates:stream"
+
 class RedisPromptService:
     """Redis service for low-latency prompt delivery and caching"""
 
@@ -132,19 +136,43 @@ class RedisPromptService:
             logger.error(f"Failed to get latest cached prompt: {str(e)}", prompt_id=prompt_id)
             return None
 
-    async def publish_prompt_update(self, prompt_id: str, version: str, action: str = "update"):
-        """Publish prompt update via Redis pub/sub for real-time notifications"""
+    async def publish_prompt_update(
+        self,
+        prompt_id: str,
+        version: str,
+        action: str = "update",
+        project_id: Optional[str] = None,
+        module_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Publish prompt update via Redis pub/sub for real-time notifications
+
+        The event is also appended to the prompt update stream; the returned
+        stream entry ID is the resume token clients use to catch up after
+        reconnecting.
+        """
         if not self.redis_client:
-            return
+            return None
 
         try:
             message = {
                 "prompt_id": prompt_id,
+                "base_prompt_id": get_base_prompt_id(prompt_id),
                 "version": version,
                 "action": action,
+                "project_id": project_id,
+                "module_id": module_id,
                 "timestamp": datetime.utcnow().isoformat()
             }
 
+            # Append to the bounded stream that backs resumable subscriptions
+            event_id = await self.redis_client.xadd(
+                PROMPT_UPDATE_STREAM,
+                {"data": json.dumps(message)},
+                maxlen=settings.prompt_update_stream_maxlen,
+                approximate=True
+            )
+            message["event_id"] = event_id
+
             # Publish to prompt-specific channel
             await self.redis_client.publish(f"prompt_updates:{prompt_id}", json.dumps(message))
 
@@ -152,9 +180,11 @@ class RedisPromptService:
             await self.redis_client.publish("prompt_updates", json.dumps(message))
 
             logger.info("Prompt update published", prompt_id=prompt_id, version=version, action=action)
+            return event_id
 
         except Exception as e:
             logger.error(f"Failed to publish prompt update: {str(e)}", prompt_id=prompt_id, version=version)
+            return None
 
     async def rollback_prompt(self, prompt_id: str, target_version: str) -> bool:
         """Rollback prompt to specific version"""
@@ -192,7 +222,12 @@ class RedisPromptService:
 
             if success:
                 # Publish rollback event
-                await self.publish_prompt_update(prompt_id, target_version, "rollback")
+                module = db.query(Module).filter(Module.id == prompt.module_id).first()
+                await self.publish_prompt_update(
+                    prompt_id, target_version, "rollback",
+                    project_id=module.project_id if module else None,
+                    module_id=prompt.module_id
+                )
                 logger.info("Prompt rollback completed", prompt_id=prompt_id, target_version=target_version)
 
             return success
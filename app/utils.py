@@ -10,6 +10,7 @@ from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import os
+import re
 
 from app.config import settings
 
@@ -128,6 +129,50 @@ def validate_project_id(project_id: str) -> bool:
     """Validate project ID format"""
     return validate_prompt_id(project_id)  # Same format as prompt ID
 
+SEMVER_PATTERN = re.compile(r'^(\d+)\.(\d+)\.(\d+)$')
+VERSIONED_PROMPT_ID_PATTERN = re.compile(r'^(.+)-v\d+\.\d+\.\d+$')
+
+def parse_semver(version: Optional[str]) -> Optional[tuple[int, int, int]]:
+    """Parse a MAJOR.MINOR.PATCH version string into integer components"""
+    if not isinstance(version, str):
+        return None
+    match = SEMVER_PATTERN.match(version.strip())
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+def get_base_prompt_id(prompt_id: str) -> str:
+    """Strip the `-vX.Y.Z` suffix used by versioned prompt IDs"""
+    match = VERSIONED_PROMPT_ID_PATTERN.match(prompt_id)
+    return match.group(1) if match else prompt_id
+
+def compute_prompt_etag(prompt_id: str, version: str, updated_at: Any, *qualifiers: Any) -> str:
+    """Compute a strong ETag from a prompt's identity, version and last update time
+
+    Every write path stamps updated_at, so any field change moves the ETag, while
+    conditional requests are answered from three columns without building or
+    serializing the response body. Qualifiers cover response fields that are not
+    stored on the prompt row.
+    """
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    digest = hashlib.sha256()
+    for part in (prompt_id, version, updated_at or "", *qualifiers):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
 def calculate_cost_estimate(
     tokens_used: int,
     model_provider: str = "openai",
@@ -11,6 +11,7 @@ __email__ = "team@promptops.ai"
 
 # Core classes
 from .client import PromptOpsClient, create_client, create_client_for_environment
+from .updates import PromptUpdateSubscriber
 from .models import (
     # Configuration
     ClientConfig,
@@ -78,6 +79,7 @@ __all__ = [
     "PromptOpsClient",
     "create_client",
     "create_client_for_environment",
+    "PromptUpdateSubscriber",
 
     # Configuration
     "ClientConfig",
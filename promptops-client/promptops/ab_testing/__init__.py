@@ -3,6 +3,8 @@ A/B Testing Framework for PromptOps Python Client
 """
 
 from .manager import ABTestingManager
+from .events import BufferedEventSink
+from .stats import NumpyStatsBackend, PythonStatsBackend, create_stats_backend
 from .models import (
     ExperimentStatus,
     TrafficAllocationStrategy,
@@ -31,6 +33,10 @@ from .models import (
 
 __all__ = [
     "ABTestingManager",
+    "BufferedEventSink",
+    "NumpyStatsBackend",
+    "PythonStatsBackend",
+    "create_stats_backend",
     "ExperimentStatus",
     "TrafficAllocationStrategy",
     "EventType",
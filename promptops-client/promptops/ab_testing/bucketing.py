@@ -0,0 +1,55 @@
+"""
+Deterministic bucketing for A/B testing assignment
+
+Mirrors app/services/experiment_assignment_service.py on the server so that a
+variant assigned locally by the SDK matches the one the server would assign.
+Keep the two implementations identical.
+"""
+
+import hashlib
+from typing import Optional, Sequence, Tuple
+
+BUCKET_COUNT = 10000
+
+
+def assignment_unit(user_id: Optional[str], session_id: str, device_id: Optional[str] = None) -> str:
+    """The key a unit is bucketed by: user, then device, then session"""
+    return user_id or device_id or session_id
+
+
+def bucket(namespace: str, experiment_id: str, salt: str, unit: str) -> int:
+    """Map a unit to one of BUCKET_COUNT buckets"""
+    digest = hashlib.sha256(f"{namespace}:{experiment_id}:{salt}:{unit}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % BUCKET_COUNT
+
+
+def stateless_assignment_id(experiment_id: str, salt: str, unit: str) -> str:
+    """Stable assignment id shared with the server"""
+    digest = hashlib.sha256(f"assignment:{experiment_id}:{salt}:{unit}".encode("utf-8")).hexdigest()
+    return f"sa_{digest[:32]}"
+
+
+def choose_variant(
+    experiment_id: str,
+    salt: str,
+    unit: str,
+    traffic_percentage: int,
+    weights: Sequence[int]
+) -> Tuple[int, str]:
+    """
+    Pick a variant index for a unit
+
+    Returns:
+        Variant index (0 is control) and the assignment reason
+    """
+    if bucket("traffic", experiment_id, salt, unit) >= traffic_percentage * BUCKET_COUNT // 100:
+        return 0, "control_fallback"
+
+    total = sum(weights)
+    point = bucket("variant", experiment_id, salt, unit) * total // BUCKET_COUNT
+    accumulated = 0
+    for index, weight in enumerate(weights):
+        accumulated += weight
+        if point < accumulated:
+            return index, "weighted_allocation"
+    return 0, "control_fallback"
@@ -0,0 +1,138 @@
+"""
+Buffered event sink for A/B testing events
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import structlog
+
+from ..exceptions import ValidationError
+
+logger = structlog.get_logger(__name__)
+
+BatchSender = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+
+
+class BufferedEventSink:
+    """Buffers events and sends them in batches by size and by time
+
+    A batch whose delivery fails is kept for the next flush, unless the sender
+    raises ValidationError: the server rejected the batch itself, so it is
+    dropped and counted instead of blocking every later batch.
+    """
+
+    def __init__(
+        self,
+        send_batch: BatchSender,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        buffer_limit: int = 10000
+    ):
+        """
+        Initialize the sink
+
+        Args:
+            send_batch: Coroutine that delivers one batch of event payloads
+            batch_size: Events per batch; a full batch is flushed immediately
+            flush_interval: Seconds between background flushes
+            buffer_limit: Maximum buffered events; the oldest are dropped beyond it
+        """
+        self.send_batch = send_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_limit = buffer_limit
+        self.sent = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.rejected = 0
+        self.rejected_batches = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._size_flush: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def add(self, event: Dict[str, Any]) -> None:
+        """Buffer an event, flushing in the background once a batch is full"""
+        self._buffer.append(event)
+        while len(self._buffer) > self.buffer_limit:
+            self._buffer.popleft()
+            self.dropped += 1
+
+        self.start()
+        if len(self._buffer) >= self.batch_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush(full_batches_only=True))
+
+    async def flush(self, full_batches_only: bool = False) -> int:
+        """
+        Send buffered events
+
+        Args:
+            full_batches_only: Leave a trailing partial batch for the timer
+
+        Returns:
+            Number of events delivered
+        """
+        delivered = 0
+        async with self._flush_lock:
+            while self._buffer:
+                if full_batches_only and len(self._buffer) < self.batch_size:
+                    break
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    await self.send_batch(batch)
+                except ValidationError as e:
+                    self.rejected += len(batch)
+                    self.rejected_batches += 1
+                    logger.warning("Event batch rejected, dropping it", events=len(batch), error=str(e))
+                    continue
+                except Exception as e:
+                    # Put the batch back in order for the next flush, within the buffer limit
+                    self.failed_batches += 1
+                    room = max(0, self.buffer_limit - len(self._buffer))
+                    self.dropped += len(batch) - min(room, len(batch))
+                    self._buffer.extendleft(reversed(batch[:room]))
+                    logger.warning("Event batch delivery failed", events=len(batch), error=str(e))
+                    break
+                delivered += len(batch)
+                self.sent += len(batch)
+        return delivered
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer:
+                await self.flush()
+
+    async def close(self) -> None:
+        """Stop the periodic flush and send what is left"""
+        for task in (self._flush_task, self._size_flush):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = None
+        self._size_flush = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get sink statistics"""
+        return {
+            "buffered": len(self._buffer),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "rejected": self.rejected,
+            "rejected_batches": self.rejected_batches
+        }
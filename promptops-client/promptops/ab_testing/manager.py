@@ -13,11 +13,19 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import aiohttp
 import structlog
 
+try:
+    import msgpack
+except ImportError:  # event batches fall back to JSON Lines
+    msgpack = None
+
 from ..auth import AuthenticationManager
 from ..cache import CacheManager
-from ..exceptions import PromptOpsError, NetworkError
+from ..exceptions import PromptOpsError, NetworkError, RateLimitError, ValidationError
 from ..models import PromptResponse, PromptRequest
 from ..telemetry import TelemetryManager
+from .bucketing import assignment_unit, choose_variant, stateless_assignment_id
+from .events import BufferedEventSink
+from .stats import create_stats_backend
 from .models import (
     Experiment,
     ExperimentCreateRequest,
@@ -82,6 +90,17 @@ class ABTestingManager:
         # In-memory session assignments
         self._session_assignments: Dict[str, Dict[str, ExperimentAssignment]] = {}
 
+        # Buffered events, flushed to the batch endpoint by size and time
+        self.event_sink = BufferedEventSink(
+            self._send_event_batch,
+            batch_size=self.config.event_batch_size,
+            flush_interval=self.config.event_flush_interval / 1000,
+            buffer_limit=self.config.event_buffer_limit
+        )
+
+        # Incremental statistics over locally recorded outcomes
+        self.local_statistics = create_stats_backend(self.config.stats_backend)
+
     async def __aenter__(self):
         """Async context manager entry"""
         self.session = aiohttp.ClientSession(
@@ -93,6 +112,7 @@ class ABTestingManager:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         if self.session:
+            await self.event_sink.close()
             await self.session.close()
 
     async def _make_request(
@@ -125,17 +145,6 @@ class ABTestingManager:
         except aiohttp.ClientError as e:
             raise NetworkError(f"Network error: {str(e)}")
 
-    def _generate_assignment_key(self, experiment_id: str, context: ExperimentContext) -> str:
-        """Generate consistent assignment key for user/session"""
-        key_data = {
-            "experiment_id": experiment_id,
-            "session_id": context.session_id,
-            "user_id": context.user_id or "anonymous",
-            "device_id": context.device_id or "unknown"
-        }
-        key_string = json.dumps(key_data, sort_keys=True)
-        return hashlib.sha256(key_string.encode()).hexdigest()[:16]
-
     async def _assign_to_variant(
         self,
         experiment: Experiment,
@@ -285,86 +294,53 @@ class ABTestingManager:
 
         return True
 
-    async def _uniform_allocation(
+    def _stateless_assignment(
         self,
         experiment: Experiment,
-        context: ExperimentContext
+        context: ExperimentContext,
+        weights: List[int]
     ) -> ExperimentAssignment:
-        """Uniform random allocation"""
-        assignment_key = self._generate_assignment_key(experiment.id, context)
-        hash_value = int(assignment_key[:8], 16)
-        hash_percentage = (hash_value / 0xffffffff) * 100
-
-        # Check if user is in traffic allocation
-        if hash_percentage > experiment.traffic_percentage:
-            return self._create_control_assignment(experiment, context, "control_fallback")
-
-        # Uniform allocation among all variants
-        all_variants = [
-            experiment.control_variant,
-            *experiment.treatment_variants
-        ]
-
-        variant_index = hash_value % len(all_variants)
-        selected_variant = all_variants[variant_index]
+        """Assign with the bucketing scheme shared with the server"""
+        salt = experiment.assignment_salt or ""
+        unit = assignment_unit(context.user_id, context.session_id, context.device_id)
+        index, reason = choose_variant(experiment.id, salt, unit, experiment.traffic_percentage, weights)
+        variant = [experiment.control_variant, *experiment.treatment_variants][index]
 
         return ExperimentAssignment(
-            id=str(uuid.uuid4()),
+            id=stateless_assignment_id(experiment.id, salt, unit),
             experiment_id=experiment.id,
             session_id=context.session_id,
             user_id=context.user_id,
             device_id=context.device_id,
-            variant_id=selected_variant.id,
-            variant_name=selected_variant.name,
-            variant_config=selected_variant.prompt_config,
+            variant_id=variant.id,
+            variant_name=variant.name,
+            variant_config=variant.prompt_config,
             assigned_at=datetime.now(),
-            assignment_reason="uniform_allocation",
+            assignment_reason=reason,
             is_consistent=True
         )
 
-    async def _weighted_allocation(
+    async def _uniform_allocation(
         self,
         experiment: Experiment,
         context: ExperimentContext
     ) -> ExperimentAssignment:
-        """Weighted random allocation based on variant weights"""
-        assignment_key = self._generate_assignment_key(experiment.id, context)
-        hash_value = int(assignment_key[:8], 16)
-        hash_percentage = (hash_value / 0xffffffff) * 100
-
-        # Check if user is in traffic allocation
-        if hash_percentage > experiment.traffic_percentage:
-            return self._create_control_assignment(experiment, context, "control_fallback")
-
-        # Calculate which variant based on weights
-        all_variants = [
-            experiment.control_variant,
-            *experiment.treatment_variants
-        ]
-
-        total_weight = sum(variant.weight for variant in all_variants)
-        accumulated_weight = 0
-        random_value = (hash_value / 0xffffffff) * total_weight
-
-        for variant in all_variants:
-            accumulated_weight += variant.weight
-            if random_value <= accumulated_weight:
-                return ExperimentAssignment(
-                    id=str(uuid.uuid4()),
-                    experiment_id=experiment.id,
-                    session_id=context.session_id,
-                    user_id=context.user_id,
-                    device_id=context.device_id,
-                    variant_id=variant.id,
-                    variant_name=variant.name,
-                    variant_config=variant.prompt_config,
-                    assigned_at=datetime.now(),
-                    assignment_reason="weighted_allocation",
-                    is_consistent=True
-                )
+        """Uniform allocation: every variant gets the same share of traffic"""
+        return self._stateless_assignment(
+            experiment, context, [1] * (1 + len(experiment.treatment_variants))
+        )
 
-        # Fallback to control variant
-        return self._create_control_assignment(experiment, context, "weighted_fallback")
+    async def _weighted_allocation(
+        self,
+        experiment: Experiment,
+        context: ExperimentContext
+    ) -> ExperimentAssignment:
+        """Weighted allocation based on variant weights"""
+        return self._stateless_assignment(
+            experiment,
+            context,
+            [variant.weight for variant in [experiment.control_variant, *experiment.treatment_variants]]
+        )
 
     async def _sticky_allocation(
         self,
@@ -372,14 +348,6 @@ class ABTestingManager:
         context: ExperimentContext
     ) -> ExperimentAssignment:
         """Sticky allocation - keeps users in the same variant across sessions"""
-        assignment_key = self._generate_assignment_key(experiment.id, context)
-        hash_value = int(assignment_key[:8], 16)
-        hash_percentage = (hash_value / 0xffffffff) * 100
-
-        # Check if user is in traffic allocation
-        if hash_percentage > experiment.traffic_percentage:
-            return self._create_control_assignment(experiment, context, "control_fallback")
-
         # Try to find existing assignment for this user
         if context.user_id:
             cache_key = f"ab_sticky_{experiment.id}_{context.user_id}"
@@ -387,7 +355,7 @@ class ABTestingManager:
             if cached_assignment:
                 return ExperimentAssignment(**cached_assignment)
 
-        # Create new assignment (same as weighted)
+        # Bucketing by user id is already stable across sessions
         return await self._weighted_allocation(experiment, context)
 
     async def _geographic_allocation(
@@ -683,35 +651,89 @@ class ABTestingManager:
                 ))
             raise e
 
+    def _event_payload(self, event: ExperimentEventCreateRequest) -> Dict[str, Any]:
+        """Serialize an event for the events API"""
+        if event.occurred_at is None:
+            event.occurred_at = datetime.now()
+
+        return {
+            "experiment_id": event.experiment_id,
+            "assignment_id": event.assignment_id,
+            "event_type": event.event_type.value,
+            "event_name": event.event_name,
+            "event_data": event.event_data,
+            "user_id": event.user_id,
+            "session_id": event.session_id,
+            "device_id": event.device_id,
+            "response_time_ms": event.response_time_ms,
+            "tokens_used": event.tokens_used,
+            "cost_usd": event.cost_usd,
+            "conversion_value": event.conversion_value,
+            "success_indicator": event.success_indicator,
+            "error_message": event.error_message,
+            "occurred_at": event.occurred_at.isoformat()
+        }
+
+    async def _send_event_batch(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Post a batch of event payloads to the batch ingestion endpoint"""
+        if not self.session:
+            raise PromptOpsError("Manager not initialized. Use async context manager.")
+
+        if self.config.event_batch_format == "msgpack" and msgpack is not None:
+            body = msgpack.packb(events, use_bin_type=True)
+            content_type = "application/msgpack"
+        else:
+            body = "\n".join(json.dumps(event, separators=(",", ":")) for event in events).encode()
+            content_type = "application/x-ndjson"
+
+        endpoint = "/v1/ab-testing/events/batch"
+        headers = dict(await self.auth_manager.get_auth_headers(endpoint, "POST"))
+        headers["Content-Type"] = content_type
+
+        try:
+            async with self.session.post(
+                f"{self.base_url}{endpoint}",
+                data=body,
+                headers=headers
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    message = f"API request failed: {response.status} - {error_text}"
+                    if response.status == 429:
+                        raise RateLimitError(message)
+                    if 400 <= response.status < 500 and response.status != 408:
+                        # The server refused this body; sending it again cannot succeed
+                        raise ValidationError(message, error_code=str(response.status))
+                    raise PromptOpsError(message)
+                result = await response.json()
+        except aiohttp.ClientError as e:
+            raise NetworkError(f"Network error: {str(e)}")
+
+        if result.get("rejected"):
+            logger.warning("Events rejected by server", rejected=len(result["rejected"]))
+        return result
+
+    async def queue_event(self, event: ExperimentEventCreateRequest) -> None:
+        """Buffer an event for batched delivery"""
+        if not self.config.enable_event_tracking:
+            raise PromptOpsError("Event tracking is disabled")
+
+        await self.event_sink.add(self._event_payload(event))
+
+    async def flush_events(self) -> int:
+        """Send all buffered events now, returning how many were delivered"""
+        return await self.event_sink.flush()
+
     async def track_event(self, event: ExperimentEventCreateRequest) -> ExperimentEvent:
         """Track an event for A/B testing analytics"""
         if not self.config.enable_event_tracking:
             raise PromptOpsError("Event tracking is disabled")
 
         try:
-            if event.occurred_at is None:
-                event.occurred_at = datetime.now()
-
             response = await self._make_request(
                 "POST",
                 "/v1/ab-testing/events",
-                data={
-                    "experiment_id": event.experiment_id,
-                    "assignment_id": event.assignment_id,
-                    "event_type": event.event_type.value,
-                    "event_name": event.event_name,
-                    "event_data": event.event_data,
-                    "user_id": event.user_id,
-                    "session_id": event.session_id,
-                    "device_id": event.device_id,
-                    "response_time_ms": event.response_time_ms,
-                    "tokens_used": event.tokens_used,
-                    "cost_usd": event.cost_usd,
-                    "conversion_value": event.conversion_value,
-                    "success_indicator": event.success_indicator,
-                    "error_message": event.error_message,
-                    "occurred_at": event.occurred_at.isoformat()
-                }
+                data=self._event_payload(event)
             )
 
             tracked_event = ExperimentEvent(**response)
@@ -1272,6 +1294,39 @@ class ABTestingManager:
             return max(winners, key=lambda x: x[1])[0]
         return None
 
+    def record_outcomes(
+        self,
+        variant_ids: List[str],
+        converted: List[bool],
+        values: Optional[List[Optional[float]]] = None
+    ) -> None:
+        """Record per-unit outcomes for local analysis; statistics update incrementally"""
+        self.local_statistics.add_events(variant_ids, converted, values)
+
+    def analyze_local_outcomes(
+        self,
+        control_variant_id: str,
+        confidence_level: float = 0.95,
+        sequential: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Analyze locally recorded outcomes without rescanning them
+
+        Args:
+            control_variant_id: Variant the others are compared with
+            confidence_level: Confidence level for intervals and fixed-horizon tests
+            sequential: Also report always-valid p-values, safe to check repeatedly
+        """
+        analysis = self.local_statistics.analyze(control_variant_id, confidence_level)
+        if sequential:
+            analysis["sequential_tests"] = {
+                variant_id: self.local_statistics.sequential_test(
+                    control_variant_id, variant_id, alpha=1 - confidence_level
+                )
+                for variant_id in analysis["variant_comparisons"]
+            }
+        return analysis
+
     async def get_required_sample_size(
         self,
         baseline_rate: float,
@@ -115,6 +115,7 @@ class Experiment:
     created_by: str
     created_at: datetime
     updated_at: datetime
+    assignment_salt: Optional[str] = None
 
 
 @dataclass
@@ -205,8 +206,8 @@ class ExperimentResult:
 class FeatureFlagCreateRequest:
     """Feature flag creation request"""
     name: str
-    description: Optional[str] = None
     project_id: str
+    description: Optional[str] = None
     prompt_id: Optional[str] = None
     enabled: bool = False
     rollout_percentage: int = 0
@@ -273,10 +274,10 @@ class FeatureFlag:
 class UserSegmentCreateRequest:
     """User segment creation request"""
     name: str
-    description: Optional[str] = None
     project_id: str
     segment_conditions: Dict[str, Any]
     segment_type: str
+    description: Optional[str] = None
     estimated_user_count: int = 0
 
 
@@ -343,6 +344,11 @@ class ABTestingConfig:
     cache_ttl: int = 300000  # 5 minutes
     assignment_consistency: bool = True
     default_session_timeout: int = 3600000  # 1 hour
+    event_batch_size: int = 500  # Buffered events per batch request
+    event_flush_interval: int = 5000  # 5 seconds
+    event_buffer_limit: int = 10000  # Oldest buffered events are dropped beyond this
+    event_batch_format: str = "jsonl"  # "jsonl" or "msgpack"
+    stats_backend: str = "auto"  # "auto", "numpy" or "python"
 
 
 @dataclass
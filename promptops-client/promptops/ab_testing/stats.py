@@ -0,0 +1,388 @@
+"""
+Statistics backends for local A/B testing analysis
+
+Both backends keep per-variant sufficient statistics (units, conversions and
+the count, sum and sum of squares of conversion values) that are updated as
+events arrive, so analysis never rescans the event log. The NumPy backend
+stores events in columnar arrays and updates the statistics a batch at a time
+with bincount; the pure-Python backend is used when NumPy is not installed.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # The pure-Python backend is used instead
+    np = None
+
+_STANDARD_NORMAL = NormalDist()
+
+# Index of each sufficient statistic in a variant's totals
+UNITS, CONVERSIONS, VALUE_COUNT, VALUE_SUM, VALUE_SUM_SQUARES = range(5)
+
+
+def _z_critical(confidence_level: float) -> float:
+    return _STANDARD_NORMAL.inv_cdf(1 - (1 - confidence_level) / 2)
+
+
+def _normal_two_sided_p(z: float) -> float:
+    return 2 * (1 - _STANDARD_NORMAL.cdf(abs(z)))
+
+
+def wilson_interval(conversions: float, units: float, confidence_level: float = 0.95) -> Dict[str, float]:
+    """Wilson score interval for a conversion rate"""
+    if units <= 0:
+        return {"lower": 0.0, "upper": 0.0, "margin_of_error": 0.0}
+
+    z = _z_critical(confidence_level)
+    p = conversions / units
+    denominator = 1 + z * z / units
+    center = (p + z * z / (2 * units)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / units + z * z / (4 * units * units)) / denominator
+    return {"lower": max(0.0, center - margin), "upper": min(1.0, center + margin), "margin_of_error": margin}
+
+
+def two_proportion_tests(
+    control_conversions: float,
+    control_units: float,
+    treatment_conversions: float,
+    treatment_units: float,
+    confidence_level: float = 0.95
+) -> Dict[str, Any]:
+    """Pooled z-test, 2x2 chi-square test and the interval of the rate difference"""
+    result: Dict[str, Any] = {"z_score": 0.0, "p_value": 1.0, "chi_square_statistic": 0.0, "chi_square_p_value": 1.0}
+    if control_units <= 0 or treatment_units <= 0:
+        result.update({"confidence_interval_lower": 0.0, "confidence_interval_upper": 0.0})
+        return result
+
+    p_control = control_conversions / control_units
+    p_treatment = treatment_conversions / treatment_units
+    pooled = (control_conversions + treatment_conversions) / (control_units + treatment_units)
+
+    if 0 < pooled < 1:
+        standard_error = math.sqrt(pooled * (1 - pooled) * (1 / control_units + 1 / treatment_units))
+        z = (p_treatment - p_control) / standard_error
+        # For a 2x2 table without continuity correction, chi-square equals z squared
+        result.update({
+            "z_score": z,
+            "p_value": _normal_two_sided_p(z),
+            "chi_square_statistic": z * z,
+            "chi_square_p_value": math.erfc(abs(z) / math.sqrt(2))
+        })
+
+    margin = _z_critical(confidence_level) * math.sqrt(
+        p_control * (1 - p_control) / control_units + p_treatment * (1 - p_treatment) / treatment_units
+    )
+    result["confidence_interval_lower"] = (p_treatment - p_control) - margin
+    result["confidence_interval_upper"] = (p_treatment - p_control) + margin
+    return result
+
+
+def msprt_likelihood_ratio(difference: float, variance: float, tau_squared: float) -> float:
+    """
+    Mixture SPRT likelihood ratio for a difference of means.
+
+    Uses a normal mixing distribution N(0, tau^2) over the effect, with the
+    difference treated as normal with known variance (Johari et al., "Always
+    Valid Inference").
+    """
+    if variance <= 0:
+        return 1.0
+    exponent = difference * difference * tau_squared / (2 * variance * (variance + tau_squared))
+    return math.sqrt(variance / (variance + tau_squared)) * math.exp(min(exponent, 700.0))
+
+
+class _StatsBackend:
+    """Analysis shared by the storage backends; subclasses maintain the totals"""
+
+    name = "base"
+
+    def __init__(self):
+        self._sequential_p: Dict[Tuple[str, str], float] = {}
+
+    # Storage interface
+
+    def add_events(
+        self,
+        variant_ids: Sequence[str],
+        converted: Sequence[bool],
+        values: Optional[Sequence[Optional[float]]] = None
+    ) -> None:
+        raise NotImplementedError
+
+    def totals(self) -> Dict[str, List[float]]:
+        """Sufficient statistics per variant, indexed by UNITS, CONVERSIONS, ..."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    # Analysis
+
+    def add_event(self, variant_id: str, converted: bool, value: Optional[float] = None) -> None:
+        """Record one unit's outcome"""
+        self.add_events([variant_id], [converted], [value])
+
+    def variant_statistics(self, variant_id: str, confidence_level: float = 0.95) -> Dict[str, Any]:
+        """Statistics for one variant"""
+        totals = self.totals().get(variant_id)
+        if totals is None:
+            return {}
+
+        units, conversions = totals[UNITS], totals[CONVERSIONS]
+        value_count = totals[VALUE_COUNT]
+        statistics_data: Dict[str, Any] = {
+            "total_sample_size": int(units),
+            "total_conversions": int(conversions),
+            "conversion_rate": conversions / units if units else 0.0,
+            "confidence_interval": wilson_interval(conversions, units, confidence_level)
+        }
+        if value_count:
+            mean = totals[VALUE_SUM] / value_count
+            statistics_data["value_mean"] = mean
+            statistics_data["value_variance"] = (
+                max(0.0, (totals[VALUE_SUM_SQUARES] - value_count * mean * mean) / (value_count - 1))
+                if value_count > 1 else 0.0
+            )
+        return statistics_data
+
+    def compare(self, control_id: str, treatment_id: str, confidence_level: float = 0.95) -> Dict[str, Any]:
+        """Fixed-horizon comparison of a treatment against control"""
+        totals = self.totals()
+        control = totals.get(control_id, [0.0] * 5)
+        treatment = totals.get(treatment_id, [0.0] * 5)
+        control_rate = control[CONVERSIONS] / control[UNITS] if control[UNITS] else 0.0
+        treatment_rate = treatment[CONVERSIONS] / treatment[UNITS] if treatment[UNITS] else 0.0
+
+        comparison = {
+            "control_conversion_rate": control_rate,
+            "treatment_conversion_rate": treatment_rate,
+            "absolute_difference": treatment_rate - control_rate,
+            "relative_difference": ((treatment_rate - control_rate) / control_rate * 100) if control_rate > 0 else 0,
+            "control_sample_size": int(control[UNITS]),
+            "treatment_sample_size": int(treatment[UNITS]),
+            "confidence_level": confidence_level
+        }
+        comparison.update(two_proportion_tests(
+            control[CONVERSIONS], control[UNITS], treatment[CONVERSIONS], treatment[UNITS], confidence_level
+        ))
+        comparison["is_significant"] = comparison["p_value"] < 1 - confidence_level
+        return comparison
+
+    def sequential_test(
+        self,
+        control_id: str,
+        treatment_id: str,
+        alpha: float = 0.05,
+        tau: float = 0.05
+    ) -> Dict[str, Any]:
+        """
+        Always-valid p-value for the conversion rate difference.
+
+        The p-value is the running minimum of 1 / likelihood ratio over every
+        call, so it can be checked after each batch of events without
+        inflating the false positive rate. Each call is O(1) in the number of
+        events.
+
+        Args:
+            control_id: Control variant
+            treatment_id: Treatment variant
+            alpha: Significance level
+            tau: Standard deviation of the mixing distribution over effects
+        """
+        totals = self.totals()
+        control = totals.get(control_id, [0.0] * 5)
+        treatment = totals.get(treatment_id, [0.0] * 5)
+        previous = self._sequential_p.get((control_id, treatment_id), 1.0)
+
+        if not control[UNITS] or not treatment[UNITS]:
+            return {"p_value": previous, "likelihood_ratio": 1.0, "is_significant": previous < alpha}
+
+        p_control = control[CONVERSIONS] / control[UNITS]
+        p_treatment = treatment[CONVERSIONS] / treatment[UNITS]
+        variance = (
+            p_control * (1 - p_control) / control[UNITS]
+            + p_treatment * (1 - p_treatment) / treatment[UNITS]
+        )
+        ratio = msprt_likelihood_ratio(p_treatment - p_control, variance, tau * tau)
+        p_value = min(previous, 1.0 / ratio if ratio > 0 else 1.0)
+        self._sequential_p[(control_id, treatment_id)] = p_value
+
+        return {
+            "p_value": p_value,
+            "likelihood_ratio": ratio,
+            "difference": p_treatment - p_control,
+            "is_significant": p_value < alpha
+        }
+
+    def analyze(self, control_id: str, confidence_level: float = 0.95) -> Dict[str, Any]:
+        """Statistics for every variant and comparisons of each treatment with control"""
+        variant_ids = list(self.totals())
+        return {
+            "backend": self.name,
+            "events": len(self),
+            "variants": {
+                variant_id: self.variant_statistics(variant_id, confidence_level) for variant_id in variant_ids
+            },
+            "variant_comparisons": {
+                variant_id: self.compare(control_id, variant_id, confidence_level)
+                for variant_id in variant_ids if variant_id != control_id
+            }
+        }
+
+
+class PythonStatsBackend(_StatsBackend):
+    """Backend in pure Python; statistics are updated one event at a time"""
+
+    name = "python"
+
+    def __init__(self):
+        super().__init__()
+        self._variant_ids: List[str] = []
+        self._converted: List[bool] = []
+        self._values: List[Optional[float]] = []
+        self._totals: Dict[str, List[float]] = {}
+
+    def add_events(
+        self,
+        variant_ids: Sequence[str],
+        converted: Sequence[bool],
+        values: Optional[Sequence[Optional[float]]] = None
+    ) -> None:
+        values = values if values is not None else [None] * len(variant_ids)
+        for variant_id, did_convert, value in zip(variant_ids, converted, values):
+            self._variant_ids.append(variant_id)
+            self._converted.append(bool(did_convert))
+            self._values.append(value)
+            totals = self._totals.get(variant_id)
+            if totals is None:
+                totals = self._totals[variant_id] = [0.0] * 5
+            totals[UNITS] += 1
+            if did_convert:
+                totals[CONVERSIONS] += 1
+            if value is not None and not math.isnan(value):
+                totals[VALUE_COUNT] += 1
+                totals[VALUE_SUM] += value
+                totals[VALUE_SUM_SQUARES] += value * value
+
+    def totals(self) -> Dict[str, List[float]]:
+        return self._totals
+
+    def __len__(self) -> int:
+        return len(self._variant_ids)
+
+
+class NumpyStatsBackend(_StatsBackend):
+    """Columnar backend; events are appended to growable NumPy arrays"""
+
+    name = "numpy"
+
+    def __init__(self, initial_capacity: int = 1024):
+        if np is None:
+            raise ImportError("NumpyStatsBackend requires numpy")
+        super().__init__()
+        self._size = 0
+        self._codes = np.empty(initial_capacity, dtype=np.int32)
+        self._converted = np.empty(initial_capacity, dtype=np.bool_)
+        self._values = np.empty(initial_capacity, dtype=np.float64)
+        self._variant_codes: Dict[str, int] = {}
+        self._variant_ids: List[str] = []
+        self._totals = np.zeros((0, 5), dtype=np.float64)
+
+    def _encode(self, variant_ids: Sequence[str]) -> "np.ndarray":
+        """Map variant ids to integer codes; experiments have few variants, so compare per variant"""
+        ids = np.asarray(variant_ids)
+        codes = np.full(len(ids), -1, dtype=np.int32)
+        for variant_id, code in self._variant_codes.items():
+            codes[ids == variant_id] = code
+
+        unknown = codes < 0
+        if unknown.any():
+            new_ids, inverse = np.unique(ids[unknown], return_inverse=True)
+            first_code = len(self._variant_ids)
+            for variant_id in new_ids.tolist():
+                self._variant_codes[variant_id] = len(self._variant_ids)
+                self._variant_ids.append(variant_id)
+            codes[unknown] = first_code + inverse
+        return codes
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = len(self._codes)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for column in ("_codes", "_converted", "_values"):
+            grown = np.empty(capacity, dtype=getattr(self, column).dtype)
+            grown[:self._size] = getattr(self, column)[:self._size]
+            setattr(self, column, grown)
+
+    def add_events(
+        self,
+        variant_ids: Sequence[str],
+        converted: Sequence[bool],
+        values: Optional[Sequence[Optional[float]]] = None
+    ) -> None:
+        count = len(variant_ids)
+        if not count:
+            return
+
+        codes = self._encode(variant_ids)
+        converted_array = np.asarray(converted, dtype=np.bool_)
+        if values is None:
+            value_array = np.full(count, np.nan)
+        elif isinstance(values, np.ndarray):
+            value_array = values.astype(np.float64, copy=False)
+        else:
+            value_array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        self._reserve(count)
+        end = self._size + count
+        self._codes[self._size:end] = codes
+        self._converted[self._size:end] = converted_array
+        self._values[self._size:end] = value_array
+        self._size = end
+
+        variants = len(self._variant_ids)
+        if len(self._totals) < variants:
+            self._totals = np.vstack([self._totals, np.zeros((variants - len(self._totals), 5))])
+
+        has_value = ~np.isnan(value_array)
+        clean_values = np.where(has_value, value_array, 0.0)
+        self._totals[:, UNITS] += np.bincount(codes, minlength=variants)
+        self._totals[:, CONVERSIONS] += np.bincount(codes, weights=converted_array, minlength=variants)
+        self._totals[:, VALUE_COUNT] += np.bincount(codes, weights=has_value, minlength=variants)
+        self._totals[:, VALUE_SUM] += np.bincount(codes, weights=clean_values, minlength=variants)
+        self._totals[:, VALUE_SUM_SQUARES] += np.bincount(codes, weights=clean_values * clean_values, minlength=variants)
+
+    def totals(self) -> Dict[str, List[float]]:
+        return {variant_id: self._totals[code].tolist() for variant_id, code in self._variant_codes.items()}
+
+    def columns(self) -> Dict[str, Any]:
+        """Views of the stored event columns"""
+        return {
+            "variant_code": self._codes[:self._size],
+            "converted": self._converted[:self._size],
+            "value": self._values[:self._size],
+            "variant_ids": list(self._variant_ids)
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def create_stats_backend(backend: str = "auto") -> _StatsBackend:
+    """
+    Create a statistics backend
+
+    Args:
+        backend: "numpy", "python", or "auto" for NumPy when it is installed
+    """
+    if backend == "numpy" or (backend == "auto" and np is not None):
+        return NumpyStatsBackend()
+    if backend in ("python", "auto"):
+        return PythonStatsBackend()
+    raise ValueError(f"Unknown statistics backend: {backend}")
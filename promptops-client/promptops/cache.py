@@ -1,30 +1,240 @@
 """
 Cache manager for PromptOps client with multi-level caching support
+
+The memory tier is an LRU (an ordered dict, so reads, writes and evictions are
+O(1)) whose entries expire lazily: an expired entry is dropped when it is read,
+and a timing wheel of one-second buckets reclaims entries that are never read
+again. The Redis tier uses `redis.asyncio` over a connection pool, so cache
+calls never block the event loop, and batches go out as single pipelines.
+
+With a stale grace window, expired entries are kept that much longer and
+`lookup` serves them, flagged stale, so callers can refresh in the background
+instead of blocking on the network. The optional disk tier is a SQLite file
+that survives restarts; it is opened on first use and, beyond the grace
+window, still provides the last known value while the server is unreachable.
 """
 
+import asyncio
+import heapq
 import json
+import sqlite3
 import threading
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import structlog
+from pydantic import BaseModel
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .exceptions import CacheError
 from .models import CacheConfig, CacheLevel, CacheStats
 
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
 logger = structlog.get_logger(__name__)
 
+# Keys per DEL/SCAN round trip when deleting by prefix
+REDIS_SCAN_BATCH = 500
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_value(value: Any) -> str:
+    """Serialize a cache value for the Redis and disk tiers"""
+    return json.dumps(value, default=_json_default)
+
+
+class MemoryCache:
+    """O(1) LRU with lazily expired TTLs"""
+
+    def __init__(self, max_size: int, grace: float = 0):
+        self.max_size = max_size
+        # Seconds an expired entry is kept so it can still be served stale
+        self.grace = grace
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        # Timing wheel: expiry second -> keys, with a heap of the seconds in use
+        self._wheel: Dict[int, Set[str]] = {}
+        self._wheel_slots: List[int] = []
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def lookup(self, key: str, now: float) -> Optional[Tuple[Any, bool]]:
+        """Get a value and whether it has expired, or None once past the grace window"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and now >= expires_at + self.grace:
+            del self._entries[key]
+            self.evictions += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value, expires_at is not None and now >= expires_at
+
+    def get(self, key: str, now: float) -> Optional[Any]:
+        entry = self.lookup(key, now)
+        if entry is None or entry[1]:
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, expires_at: Optional[float], now: float) -> None:
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if expires_at is not None:
+            slot = int(expires_at + self.grace) + 1
+            keys = self._wheel.get(slot)
+            if keys is None:
+                keys = self._wheel[slot] = set()
+                heapq.heappush(self._wheel_slots, slot)
+            keys.add(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        self.expire(now)
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._wheel.clear()
+        self._wheel_slots.clear()
+
+    def expire(self, now: float) -> int:
+        """Drop entries in every wheel slot that has passed; O(1) when none has"""
+        expired = 0
+        while self._wheel_slots and self._wheel_slots[0] <= now:
+            slot = heapq.heappop(self._wheel_slots)
+            for key in self._wheel.pop(slot, ()):
+                entry = self._entries.get(key)
+                # The key may since have been rewritten with a later expiry
+                if entry is not None and entry[1] is not None and entry[1] + self.grace <= now:
+                    del self._entries[key]
+                    expired += 1
+        self.evictions += expired
+        return expired
+
+
+class DiskCache:
+    """SQLite cache tier that survives process restarts
+
+    Values are stored encoded with wall-clock expiry times. Expired rows are
+    kept as last known values until the table grows past its size limit,
+    when the least recently written rows are pruned.
+    """
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so clients that never miss the memory tier never touch the disk
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Get a value and its expiry time, however old it is"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set_many(self, items: Dict[str, str], expires_at: Optional[float]) -> None:
+        """Write encoded values that share an expiry time"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, expires_at, now) for key, value in items.items()]
+                )
+                self._writes_since_prune += len(items)
+                if self._writes_since_prune >= max(100, self.max_size // 10):
+                    self._writes_since_prune = 0
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE key IN "
+                        "(SELECT key FROM cache_entries ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_size,)
+                    )
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,)).rowcount > 0
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute(
+                    "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                ).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM cache_entries")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
 
 class CacheManager:
     """Multi-level cache manager for PromptOps client"""
 
     def __init__(self, config: CacheConfig):
         self.config = config
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+        self._memory_cache = MemoryCache(config.max_size, config.stale_ttl)
         self._memory_cache_lock = threading.RLock()
         self._redis_client = None
+        self._redis_checked = False
+        self._disk = DiskCache(config.disk_path, config.disk_max_size) if config.disk_path else None
         self._stats = CacheStats()
 
         # Initialize Redis if configured
@@ -32,12 +242,14 @@ class CacheManager:
             self._init_redis()
 
     def _init_redis(self) -> None:
-        """Initialize Redis client"""
+        """Initialize the Redis client; the connection is verified on first use"""
         try:
-            import redis
-            self._redis_client = redis.from_url(self.config.redis_url)
-            # Test connection
-            self._redis_client.ping()
+            if redis is None:
+                raise ImportError("redis is not installed")
+            self._redis_client = redis.from_url(
+                self.config.redis_url,
+                max_connections=self.config.redis_max_connections
+            )
             logger.info("Redis cache initialized", url=self.config.redis_url)
         except ImportError:
             logger.warning("Redis not available, falling back to memory cache")
@@ -46,6 +258,38 @@ class CacheManager:
             logger.error("Redis initialization failed", error=str(e))
             self.config.level = CacheLevel.MEMORY
 
+    async def _redis(self):
+        """Get the Redis client, falling back to memory cache if Redis is unreachable"""
+        if self._redis_client is None:
+            return None
+
+        if not self._redis_checked:
+            self._redis_checked = True
+            try:
+                await self._redis_client.ping()
+            except Exception as e:
+                logger.error("Redis connection failed, falling back to memory cache", error=str(e))
+                await self._close_redis()
+                self.config.level = CacheLevel.MEMORY
+                return None
+
+        return self._redis_client
+
+    def _uses_memory(self) -> bool:
+        return self.config.level in [CacheLevel.MEMORY, CacheLevel.HYBRID]
+
+    def _uses_redis(self) -> bool:
+        return self.config.level in [CacheLevel.REDIS, CacheLevel.HYBRID]
+
+    def _record(self, hit: bool, stale: bool = False) -> None:
+        if hit:
+            self._stats.hits += 1
+            if stale:
+                self._stats.stale_hits += 1
+        else:
+            self._stats.misses += 1
+        self._stats.update_hit_rate()
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -61,38 +305,138 @@ class CacheManager:
         Returns:
             Cached value or None if not found
         """
+        value, _ = await self._get(key, allow_stale=False)
+        return value
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        reraise=True
+    )
+    async def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Get value from cache, including expired values within the stale grace window
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found, and whether the value is stale
+        """
+        return await self._get(key, allow_stale=True)
+
+    async def _get(self, key: str, allow_stale: bool) -> Tuple[Optional[Any], bool]:
         try:
             # Try memory cache first
-            if self.config.level in [CacheLevel.MEMORY, CacheLevel.HYBRID]:
-                value = self._get_memory(key)
-                if value is not None:
-                    self._stats.hits += 1
-                    self._stats.update_hit_rate()
-                    logger.debug("Cache hit (memory)", key=key)
-                    return value
+            if self._uses_memory():
+                if allow_stale:
+                    with self._memory_cache_lock:
+                        entry = self._memory_cache.lookup(key, time.monotonic())
+                else:
+                    value = self._get_memory(key)
+                    entry = (value, False) if value is not None else None
+                if entry is not None:
+                    self._record(True, stale=entry[1])
+                    logger.debug("Cache hit (memory)", key=key, stale=entry[1])
+                    return entry
 
             # Try Redis cache
-            if self.config.level in [CacheLevel.REDIS, CacheLevel.HYBRID]:
+            if self._uses_redis():
                 value = await self._get_redis(key)
                 if value is not None:
                     # Store in memory cache for faster access
                     if self.config.level == CacheLevel.HYBRID:
                         self._set_memory(key, value)
-                    self._stats.hits += 1
-                    self._stats.update_hit_rate()
+                    self._record(True)
                     logger.debug("Cache hit (redis)", key=key)
-                    return value
+                    return value, False
+
+            # Try disk cache
+            if self._disk is not None:
+                entry = await self._get_disk(key, allow_stale)
+                if entry is not None:
+                    self._record(True, stale=entry[1])
+                    logger.debug("Cache hit (disk)", key=key, stale=entry[1])
+                    return entry
 
             # Cache miss
-            self._stats.misses += 1
-            self._stats.update_hit_rate()
+            self._record(False)
             logger.debug("Cache miss", key=key)
-            return None
+            return None, False
 
         except Exception as e:
             logger.error("Cache get failed", key=key, error=str(e))
             raise CacheError(f"Cache get failed: {str(e)}")
 
+    async def get_last_known(self, key: str) -> Optional[Any]:
+        """
+        Get the last cached value for a key however long ago it expired
+
+        Used to keep serving while the server is unreachable. Looks in memory
+        within the stale grace window, then on disk at any age.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Last known value or None
+        """
+        with self._memory_cache_lock:
+            entry = self._memory_cache.lookup(key, time.monotonic())
+        if entry is not None:
+            return entry[0]
+
+        if self._disk is not None:
+            try:
+                entry = await asyncio.get_running_loop().run_in_executor(None, self._disk.get, key)
+            except Exception as e:
+                logger.error("Disk cache get failed", key=key, error=str(e))
+                return None
+            if entry is not None:
+                return entry[0]
+        return None
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get many values at once
+
+        Keys missing from memory are fetched from Redis with a single MGET.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of each cached key to its value; missing keys are left out
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        try:
+            if self._uses_memory():
+                now = time.monotonic()
+                with self._memory_cache_lock:
+                    for key in keys:
+                        value = self._memory_cache.get(key, now)
+                        if value is not None:
+                            found[key] = value
+
+            missing = [key for key in keys if key not in found]
+            if missing and self._uses_redis():
+                from_redis = await self._get_many_redis(missing)
+                if from_redis and self.config.level == CacheLevel.HYBRID:
+                    with self._memory_cache_lock:
+                        for key, value in from_redis.items():
+                            self._set_memory(key, value)
+                found.update(from_redis)
+
+            self._stats.hits += len(found)
+            self._stats.misses += len(keys) - len(found)
+            self._stats.update_hit_rate()
+            return found
+
+        except Exception as e:
+            logger.error("Cache bulk get failed", count=len(keys), error=str(e))
+            raise CacheError(f"Cache bulk get failed: {str(e)}")
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -105,20 +449,24 @@ class CacheManager:
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time-to-live in seconds (overrides config)
+            ttl: Time-to-live in seconds (overrides config); 0 means no expiry
         """
         try:
             if ttl is None:
                 ttl = self.config.ttl
 
             # Set in memory cache
-            if self.config.level in [CacheLevel.MEMORY, CacheLevel.HYBRID]:
+            if self._uses_memory():
                 self._set_memory(key, value, ttl)
 
             # Set in Redis cache
-            if self.config.level in [CacheLevel.REDIS, CacheLevel.HYBRID]:
+            if self._uses_redis():
                 await self._set_redis(key, value, ttl)
 
+            # Write through to disk cache
+            if self._disk is not None:
+                await self._set_disk({key: value}, ttl)
+
             self._stats.size = len(self._memory_cache)
             logger.debug("Cache set", key=key, ttl=ttl)
 
@@ -126,6 +474,46 @@ class CacheManager:
             logger.error("Cache set failed", key=key, error=str(e))
             raise CacheError(f"Cache set failed: {str(e)}")
 
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Set many values in cache at once
+
+        Used to bulk-load snapshot bundles. The memory tier is filled under a
+        single lock and Redis writes go out in one pipeline.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: Time-to-live in seconds (overrides config)
+        """
+        if not items:
+            return
+
+        try:
+            if ttl is None:
+                ttl = self.config.ttl
+
+            if self._uses_memory():
+                with self._memory_cache_lock:
+                    for key, value in items.items():
+                        self._set_memory(key, value, ttl)
+
+            client = await self._redis() if self._uses_redis() else None
+            if client is not None:
+                async with client.pipeline(transaction=False) as pipeline:
+                    for key, value in items.items():
+                        pipeline.set(self._redis_key(key), encode_value(value), ex=ttl or None)
+                    await pipeline.execute()
+
+            if self._disk is not None:
+                await self._set_disk(items, ttl)
+
+            self._stats.size = len(self._memory_cache)
+            logger.debug("Cache bulk set", count=len(items), ttl=ttl)
+
+        except Exception as e:
+            logger.error("Cache bulk set failed", count=len(items), error=str(e))
+            raise CacheError(f"Cache bulk set failed: {str(e)}")
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -145,15 +533,20 @@ class CacheManager:
             deleted = False
 
             # Delete from memory cache
-            if self.config.level in [CacheLevel.MEMORY, CacheLevel.HYBRID]:
+            if self._uses_memory():
                 if self._delete_memory(key):
                     deleted = True
 
             # Delete from Redis cache
-            if self.config.level in [CacheLevel.REDIS, CacheLevel.HYBRID]:
+            if self._uses_redis():
                 if await self._delete_redis(key):
                     deleted = True
 
+            # Delete from disk cache
+            if self._disk is not None:
+                if await asyncio.get_running_loop().run_in_executor(None, self._disk.delete, key):
+                    deleted = True
+
             self._stats.size = len(self._memory_cache)
             logger.debug("Cache delete", key=key, deleted=deleted)
             return deleted
@@ -162,20 +555,56 @@ class CacheManager:
             logger.error("Cache delete failed", key=key, error=str(e))
             raise CacheError(f"Cache delete failed: {str(e)}")
 
+    async def delete_prefix(self, prefix: str) -> int:
+        """
+        Delete every cache entry whose key starts with a prefix
+
+        Args:
+            prefix: Cache key prefix
+
+        Returns:
+            Number of memory entries deleted
+        """
+        try:
+            deleted = 0
+
+            if self._uses_memory():
+                with self._memory_cache_lock:
+                    for key in [key for key in self._memory_cache.keys() if key.startswith(prefix)]:
+                        self._memory_cache.delete(key)
+                        deleted += 1
+
+            client = await self._redis() if self._uses_redis() else None
+            if client is not None:
+                await self._delete_redis_matching(client, f"{self.config.redis_prefix}{prefix}*")
+
+            if self._disk is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self._disk.delete_prefix, prefix)
+
+            self._stats.size = len(self._memory_cache)
+            logger.debug("Cache prefix delete", prefix=prefix, deleted=deleted)
+            return deleted
+
+        except Exception as e:
+            logger.error("Cache prefix delete failed", prefix=prefix, error=str(e))
+            raise CacheError(f"Cache prefix delete failed: {str(e)}")
+
     async def clear(self) -> None:
         """Clear all cache entries"""
         try:
             # Clear memory cache
-            if self.config.level in [CacheLevel.MEMORY, CacheLevel.HYBRID]:
+            if self._uses_memory():
                 with self._memory_cache_lock:
                     self._memory_cache.clear()
 
-            # Clear Redis cache
-            if self.config.level in [CacheLevel.REDIS, CacheLevel.HYBRID] and self._redis_client:
-                # Clear keys with our prefix
-                keys = self._redis_client.keys(f"{self.config.redis_prefix}*")
-                if keys:
-                    self._redis_client.delete(*keys)
+            # Clear keys with our prefix from Redis
+            client = await self._redis() if self._uses_redis() else None
+            if client is not None:
+                await self._delete_redis_matching(client, f"{self.config.redis_prefix}*")
+
+            # Clear disk cache
+            if self._disk is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self._disk.clear)
 
             self._stats.size = 0
             logger.info("Cache cleared")
@@ -187,109 +616,165 @@ class CacheManager:
     def _get_memory(self, key: str) -> Optional[Any]:
         """Get value from memory cache"""
         with self._memory_cache_lock:
-            if key not in self._memory_cache:
-                return None
+            return self._memory_cache.get(key, time.monotonic())
 
-            entry = self._memory_cache[key]
-            if datetime.utcnow() > entry['expires_at']:
-                # Entry expired
-                del self._memory_cache[key]
-                self._stats.evictions += 1
-                return None
-
-            return entry['value']
-
-    def _set_memory(self, key: str, value: Any, ttl: int) -> None:
-        """Set value in memory cache"""
+    def _set_memory(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value in memory cache; a TTL of 0 means no expiry"""
+        if ttl is None:
+            ttl = self.config.ttl
         with self._memory_cache_lock:
-            # Check cache size limit
-            if len(self._memory_cache) >= self.config.max_size:
-                # Evict oldest entries
-                oldest_key = min(
-                    self._memory_cache.keys(),
-                    key=lambda k: self._memory_cache[k]['expires_at']
-                )
-                del self._memory_cache[oldest_key]
-                self._stats.evictions += 1
-
-            self._memory_cache[key] = {
-                'value': value,
-                'expires_at': datetime.utcnow() + timedelta(seconds=ttl),
-                'created_at': datetime.utcnow()
-            }
+            now = time.monotonic()
+            self._memory_cache.set(key, value, now + ttl if ttl else None, now)
 
     def _delete_memory(self, key: str) -> bool:
         """Delete value from memory cache"""
         with self._memory_cache_lock:
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-                return True
-            return False
+            return self._memory_cache.delete(key)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.config.redis_prefix}{key}"
 
     async def _get_redis(self, key: str) -> Optional[Any]:
         """Get value from Redis cache"""
-        if not self._redis_client:
+        client = await self._redis()
+        if client is None:
             return None
 
         try:
-            full_key = f"{self.config.redis_prefix}{key}"
-            value = self._redis_client.get(full_key)
+            value = await client.get(self._redis_key(key))
             if value is not None:
-                return json.loads(value.decode('utf-8'))
+                return json.loads(value)
             return None
         except Exception as e:
             logger.error("Redis get failed", key=key, error=str(e))
             return None
 
+    async def _get_many_redis(self, keys: List[str]) -> Dict[str, Any]:
+        """Get many values from Redis in one round trip"""
+        client = await self._redis()
+        if client is None:
+            return {}
+
+        try:
+            values = await client.mget([self._redis_key(key) for key in keys])
+            return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+        except Exception as e:
+            logger.error("Redis bulk get failed", count=len(keys), error=str(e))
+            return {}
+
     async def _set_redis(self, key: str, value: Any, ttl: int) -> None:
         """Set value in Redis cache"""
-        if not self._redis_client:
+        client = await self._redis()
+        if client is None:
             return
 
         try:
-            full_key = f"{self.config.redis_prefix}{key}"
-            serialized_value = json.dumps(value, default=str)
-            self._redis_client.setex(full_key, ttl, serialized_value)
+            await client.set(self._redis_key(key), encode_value(value), ex=ttl or None)
         except Exception as e:
             logger.error("Redis set failed", key=key, error=str(e))
             raise CacheError(f"Redis set failed: {str(e)}")
 
     async def _delete_redis(self, key: str) -> bool:
         """Delete value from Redis cache"""
-        if not self._redis_client:
+        client = await self._redis()
+        if client is None:
             return False
 
         try:
-            full_key = f"{self.config.redis_prefix}{key}"
-            return bool(self._redis_client.delete(full_key))
+            return bool(await client.delete(self._redis_key(key)))
         except Exception as e:
             logger.error("Redis delete failed", key=key, error=str(e))
             return False
 
+    async def _delete_redis_matching(self, client, pattern: str) -> None:
+        """Delete keys matching a pattern with incremental SCAN rather than a blocking KEYS"""
+        batch = []
+        async for key in client.scan_iter(match=pattern, count=REDIS_SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= REDIS_SCAN_BATCH:
+                await client.unlink(*batch)
+                batch = []
+        if batch:
+            await client.unlink(*batch)
+
+    async def _get_disk(self, key: str, allow_stale: bool) -> Optional[Tuple[Any, bool]]:
+        """Get value from disk cache and promote it to memory"""
+        try:
+            entry = await asyncio.get_running_loop().run_in_executor(None, self._disk.get, key)
+        except Exception as e:
+            logger.error("Disk cache get failed", key=key, error=str(e))
+            return None
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        remaining = None if expires_at is None else expires_at - time.time()
+        stale = remaining is not None and remaining <= 0
+        if stale and (not allow_stale or remaining <= -self.config.stale_ttl):
+            return None
+
+        if self._uses_memory():
+            with self._memory_cache_lock:
+                now = time.monotonic()
+                self._memory_cache.set(key, value, None if remaining is None else now + remaining, now)
+        return value, stale
+
+    async def _set_disk(self, items: Dict[str, Any], ttl: int) -> None:
+        """Set values in disk cache"""
+        try:
+            expires_at = time.time() + ttl if ttl else None
+            encoded = {key: encode_value(value) for key, value in items.items()}
+            await asyncio.get_running_loop().run_in_executor(None, self._disk.set_many, encoded, expires_at)
+        except Exception as e:
+            # The disk tier is a fallback; losing a write must not fail the caller
+            logger.error("Disk cache set failed", count=len(items), error=str(e))
+
+    async def _close_redis(self) -> None:
+        client, self._redis_client = self._redis_client, None
+        if client is not None:
+            try:
+                close = getattr(client, "aclose", None) or client.close
+                await close()
+            except Exception as e:
+                logger.debug("Redis close failed", error=str(e))
+
+    async def health_check(self) -> bool:
+        """Check that every configured cache tier is usable"""
+        if not self._uses_redis():
+            return True
+        client = await self._redis()
+        if client is None:
+            return False
+        try:
+            return bool(await client.ping())
+        except Exception as e:
+            logger.error("Redis health check failed", error=str(e))
+            return False
+
+    async def close(self) -> None:
+        """Close the Redis connection pool and the disk cache"""
+        await self._close_redis()
+        if self._disk is not None:
+            self._disk.close()
+
     def get_stats(self) -> CacheStats:
         """Get cache statistics"""
         # Update current size
         self._stats.size = len(self._memory_cache)
+        self._stats.evictions = self._memory_cache.evictions
         return self._stats.copy()
 
     def reset_stats(self) -> None:
         """Reset cache statistics"""
         self._stats = CacheStats()
+        self._memory_cache.evictions = 0
 
     async def cleanup_expired(self) -> None:
         """Clean up expired entries from memory cache"""
         with self._memory_cache_lock:
-            now = datetime.utcnow()
-            expired_keys = [
-                key for key, entry in self._memory_cache.items()
-                if now > entry['expires_at']
-            ]
-
-            for key in expired_keys:
-                del self._memory_cache[key]
-                self._stats.evictions += 1
+            cleaned = self._memory_cache.expire(time.monotonic())
 
-        logger.info("Cache cleanup completed", cleaned=len(expired_keys))
+        logger.info("Cache cleanup completed", cleaned=cleaned)
 
     def is_enabled(self) -> bool:
         """Check if caching is enabled"""
@@ -297,4 +782,4 @@ class CacheManager:
 
     def get_cache_level(self) -> CacheLevel:
         """Get current cache level"""
-        return self.config.level
\ No newline at end of file
+        return self.config.level
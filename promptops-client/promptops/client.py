@@ -28,6 +28,7 @@ from .models import (
 )
 from .prompts import PromptManager
 from .telemetry import TelemetryManager
+from .updates import PromptUpdateSubscriber, EventCallback
 from .ab_testing import ABTestingManager, ABTestPromptRequest, ExperimentContext
 from .environment import Environment, create_environment_config, ConnectionManager
 
@@ -65,8 +66,11 @@ class PromptOpsClient:
             self.cache_manager,
             self.telemetry_manager,
             self.config.base_url,
-            self.config.timeout
+            self.config.timeout,
+            batch_window=self.config.batch_window_ms / 1000,
+            max_batch_size=self.config.max_batch_size
         )
+        self.telemetry_manager.attach(self.config.base_url, self.prompt_manager._client, self.auth_manager)
         self.ab_testing_manager = ABTestingManager(
             self.auth_manager,
             self.cache_manager,
@@ -75,6 +79,7 @@ class PromptOpsClient:
             self.config.timeout,
             self.config.ab_testing
         )
+        self._update_subscribers: Dict[str, PromptUpdateSubscriber] = {}
 
     def _resolve_config(self, config: ClientConfig) -> ClientConfig:
         """
@@ -382,6 +387,105 @@ class PromptOpsClient:
             })
             raise
 
+    async def load_snapshot(
+        self,
+        project_id: str,
+        module_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Warm the prompt cache with a project snapshot in a single request
+
+        Call again to refresh; only the changes since the last load are fetched.
+
+        Args:
+            project_id: Project ID
+            module_id: Only load prompts of this module (optional)
+            tag: Only load prompts of modules with this tag (optional)
+
+        Returns:
+            Snapshot summary
+
+        Raises:
+            PromptOpsError: If operation fails
+        """
+        self._ensure_initialized()
+        start_time = datetime.utcnow()
+
+        try:
+            result = await self.prompt_manager.load_snapshot(project_id, module_id, tag)
+
+            # Update stats
+            self._stats.total_requests += 1
+            self._stats.successful_requests += 1
+            self._stats.last_request_time = datetime.utcnow()
+
+            # Track telemetry
+            duration = (datetime.utcnow() - start_time).total_seconds()
+            self.telemetry_manager.track_user_action("load_snapshot", {
+                "project_id": project_id,
+                "module_id": module_id,
+                "tag": tag,
+                "loaded": result["loaded"],
+                "duration_ms": duration * 1000
+            })
+
+            return result
+
+        except Exception as e:
+            self._stats.total_requests += 1
+            self._stats.failed_requests += 1
+            self.telemetry_manager.track_error("load_snapshot", str(e), {
+                "project_id": project_id,
+                "module_id": module_id,
+                "tag": tag
+            })
+            raise
+
+    def subscribe_to_updates(
+        self,
+        project_id: str,
+        refresh: bool = False,
+        on_event: Optional[EventCallback] = None
+    ) -> PromptUpdateSubscriber:
+        """
+        Follow a project's prompt changes so cached prompts never go stale
+
+        Changed prompts are evicted from the cache as soon as the server reports
+        them, which lets long cache TTLs coexist with fast propagation. The
+        subscriber reconnects on its own and resumes where it left off.
+
+        Args:
+            project_id: Project ID
+            refresh: Re-fetch changed prompts instead of only evicting them
+            on_event: Callback invoked with (event type, data) for every event
+
+        Returns:
+            The running subscriber
+        """
+        self._ensure_initialized()
+
+        subscriber = self._update_subscribers.get(project_id)
+        if subscriber is None:
+            subscriber = PromptUpdateSubscriber(
+                self.auth_manager,
+                self.cache_manager,
+                self.config.base_url,
+                project_id,
+                prompt_manager=self.prompt_manager,
+                refresh=refresh,
+                on_event=on_event
+            )
+            self._update_subscribers[project_id] = subscriber
+        subscriber.start()
+        return subscriber
+
+    async def unsubscribe_from_updates(self, project_id: str) -> None:
+        """Stop following a project's prompt changes"""
+        subscriber = self._update_subscribers.pop(project_id, None)
+        if subscriber:
+            await subscriber.stop()
+
     async def create_prompt(self, prompt_data: Dict[str, Any]) -> PromptResponse:
         """
         Create a new prompt
@@ -847,12 +951,19 @@ class PromptOpsClient:
             return
 
         try:
-            # Flush telemetry
-            self.telemetry_manager.flush()
+            # Send pending telemetry before the HTTP client closes
+            await self.telemetry_manager.close()
+
+            # Stop update subscribers
+            for project_id in list(self._update_subscribers):
+                await self.unsubscribe_from_updates(project_id)
 
             # Close HTTP client
             await self.prompt_manager.close()
 
+            # Close Redis connection pool
+            await self.cache_manager.close()
+
             self._closed = True
             logger.info("PromptOps client closed successfully")
 
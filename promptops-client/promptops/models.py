@@ -135,6 +135,10 @@ class CacheConfig(BaseModel):
     max_size: int = Field(1000, ge=0, description="Maximum cache size")
     redis_url: Optional[str] = None
     redis_prefix: str = "promptops:"
+    redis_max_connections: int = Field(10, ge=1, description="Maximum Redis connections in the pool")
+    stale_ttl: int = Field(0, ge=0, description="Seconds an expired entry may still be served while it is refreshed")
+    disk_path: Optional[str] = Field(None, description="SQLite file for a cache tier that survives restarts")
+    disk_max_size: int = Field(10000, ge=1, description="Maximum disk cache size")
 
     @validator('ttl')
     def validate_ttl(cls, v):
@@ -162,6 +166,9 @@ class TelemetryConfig(BaseModel):
     sample_rate: float = Field(1.0, ge=0.0, le=1.0)
     batch_size: int = Field(100, ge=1)
     flush_interval: float = Field(30.0, ge=1.0)
+    max_buffer_size: int = Field(10000, ge=1, description="Maximum events held in memory, including batches awaiting retry")
+    max_retries: int = Field(5, ge=0, description="Retries of a failed batch before it is dropped")
+    compress: bool = Field(True, description="Gzip-compress batches before sending")
 
     class Config:
         extra = "forbid"
@@ -270,6 +277,7 @@ class CacheStats(BaseModel):
     hits: int = 0
     misses: int = 0
     evictions: int = 0
+    stale_hits: int = 0
     size: int = 0
     hit_rate: float = 0.0
 
@@ -348,6 +356,8 @@ class ClientConfig(BaseModel):
     environment: EnvironmentConfig = Field(default_factory=EnvironmentConfig)
     user_agent: str = "promptops-client/1.0.0"
     verify_ssl: bool = True
+    batch_window_ms: float = Field(2.0, ge=0.0, le=1000.0, description="Window for merging prompt misses into one batch request (0 disables)")
+    max_batch_size: int = Field(100, ge=1, le=100, description="Most prompts fetched per batch request")
     auto_detect_environment: bool = Field(default=True, description="Auto-detect environment if not specified")
 
     @validator('base_url')
@@ -3,8 +3,10 @@ Adaptive retry mechanisms with intelligent backoff strategies
 """
 
 import asyncio
+import math
 import random
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -36,11 +38,14 @@ class RetryDecision(Enum):
 class RetryOutcome:
     """Outcome of a retry attempt"""
     def __init__(self, success: bool, attempts: int, total_time: float,
-                 last_error: Optional[Exception] = None):
+                 last_error: Optional[Exception] = None, result: Any = None,
+                 hedges: int = 0):
         self.success = success
         self.attempts = attempts
         self.total_time = total_time
         self.last_error = last_error
+        self.result = result
+        self.hedges = hedges
         self.timestamp = datetime.utcnow()
 
 
@@ -59,7 +64,14 @@ class AdaptiveRetryConfig:
                  circuit_breaker_timeout: float = 60.0,
                  enable_rate_limit_detection: bool = True,
                  success_rate_threshold: float = 0.5,
-                 error_rate_threshold: float = 0.3):
+                 error_rate_threshold: float = 0.3,
+                 enable_hedging: bool = False,
+                 hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 max_hedges: int = 1,
+                 enable_retry_budget: bool = True,
+                 retry_budget_ratio: float = 0.1,
+                 retry_budget_burst: float = 10.0):
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
@@ -73,6 +85,15 @@ class AdaptiveRetryConfig:
         self.enable_rate_limit_detection = enable_rate_limit_detection
         self.success_rate_threshold = success_rate_threshold
         self.error_rate_threshold = error_rate_threshold
+        # Hedging: send a duplicate once an attempt outlives the operation's observed quantile latency
+        self.enable_hedging = enable_hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedges = max_hedges
+        # Retries and hedges spend tokens; each call earns retry_budget_ratio of one
+        self.enable_retry_budget = enable_retry_budget
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_burst = retry_budget_burst
 
 
 class CircuitBreaker:
@@ -110,6 +131,63 @@ class CircuitBreaker:
             self.state = "open"
 
 
+class RetryBudget:
+    """
+    Token bucket shared by retries and hedges
+
+    Every call earns `ratio` of a token, up to `burst`, and every retry or
+    hedge spends a whole one, so extra requests stay within `ratio` of the
+    call rate plus the burst. During an outage the bucket drains and calls
+    are sent once instead of multiplying the load.
+    """
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self.spent = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        """Credit the budget for one call"""
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take a token for a retry or hedge, if one is available"""
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.spent += 1
+            return True
+        self.denied += 1
+        return False
+
+
+class LatencyTracker:
+    """Recent successful latencies of one operation, with a cached quantile"""
+    def __init__(self, window: int = 500, refresh_every: int = 10):
+        self.samples: deque = deque(maxlen=window)
+        self.refresh_every = refresh_every
+        self._quantiles: Dict[float, float] = {}
+        self._stale = 0
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+        self._stale += 1
+        if self._stale >= self.refresh_every:
+            self._quantiles.clear()
+            self._stale = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency below which a fraction q of recent samples fall"""
+        if not self.samples:
+            return None
+        value = self._quantiles.get(q)
+        if value is None:
+            ordered = sorted(self.samples)
+            value = ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+            self._quantiles[q] = value
+        return value
+
+
 class AdaptiveRetryManager:
     """Adaptive retry manager with intelligent backoff strategies"""
 
@@ -130,6 +208,12 @@ class AdaptiveRetryManager:
         self.rate_limit_windows: Dict[str, List[datetime]] = {}
         self.rate_limit_detected: Dict[str, bool] = {}
 
+        # Hedging and the retry budget
+        self.latency_trackers: Dict[str, LatencyTracker] = {}
+        self.retry_budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_burst)
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
         self._history_max_size = 1000
 
     async def execute_with_retry(self,
@@ -151,6 +235,7 @@ class AdaptiveRetryManager:
         """
         start_time = time.time()
         attempts = 0
+        hedges = 0
         last_error = None
 
         # Check circuit breaker
@@ -162,7 +247,14 @@ class AdaptiveRetryManager:
                 last_error=Exception("Circuit breaker is open")
             )
 
+        self.retry_budget.deposit()
+
         for attempt in range(self.config.max_attempts):
+            # Retries come out of the budget
+            if attempt > 0 and not self._spend_budget():
+                logger.debug("Retry budget exhausted", operation=operation_name)
+                break
+
             attempts += 1
             attempt_start = time.time()
 
@@ -171,9 +263,11 @@ class AdaptiveRetryManager:
                 if attempt > 0:
                     delay = self._calculate_delay(operation_name, attempt, last_error)
                     await asyncio.sleep(delay)
+                    attempt_start = time.time()
 
                 # Execute the function
-                result = await func(*args, **kwargs)
+                result, attempt_hedges = await self._execute_attempt(func, operation_name, args, kwargs)
+                hedges += attempt_hedges
 
                 # Record success
                 execution_time = time.time() - attempt_start
@@ -184,7 +278,9 @@ class AdaptiveRetryManager:
                     success=True,
                     attempts=attempts,
                     total_time=time.time() - start_time,
-                    last_error=None
+                    last_error=None,
+                    result=result,
+                    hedges=hedges
                 )
 
             except Exception as e:
@@ -208,9 +304,91 @@ class AdaptiveRetryManager:
             success=False,
             attempts=attempts,
             total_time=time.time() - start_time,
-            last_error=last_error
+            last_error=last_error,
+            hedges=hedges
         )
 
+    def _spend_budget(self) -> bool:
+        """Whether a retry or hedge may be sent"""
+        return not self.config.enable_retry_budget or self.retry_budget.try_spend()
+
+    def _hedge_delay(self, operation_name: str) -> Optional[float]:
+        """How long an attempt may run before it is hedged, or None to not hedge"""
+        if not self.config.enable_hedging or self.config.max_hedges < 1:
+            return None
+        tracker = self.latency_trackers.get(operation_name)
+        if tracker is None or len(tracker.samples) < self.config.hedge_min_samples:
+            return None
+        return tracker.quantile(self.config.hedge_quantile)
+
+    async def _execute_attempt(self, func: Callable, operation_name: str,
+                               args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, int]:
+        """
+        Run one attempt, hedging it when it outlives the operation's observed latency
+
+        The first successful response wins and the other requests are
+        cancelled. The attempt fails only when every request has failed.
+
+        Returns:
+            The result and the number of hedges sent
+        """
+        hedge_delay = self._hedge_delay(operation_name)
+        if hedge_delay is None:
+            started = time.perf_counter()
+            result = await func(*args, **kwargs)
+            self._track_latency(operation_name, time.perf_counter() - started)
+            return result, 0
+
+        loop = asyncio.get_running_loop()
+        primary = asyncio.ensure_future(func(*args, **kwargs))
+        started = {primary: loop.time()}
+        pending = {primary}
+        hedges = 0
+        can_hedge = True
+        first_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                timeout = None
+                if can_hedge:
+                    timeout = max(0.0, started[primary] + hedge_delay * (hedges + 1) - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self._track_latency(operation_name, loop.time() - started[task])
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result(), hedges
+                    first_error = first_error or error
+
+                if not done and can_hedge:
+                    if self._spend_budget():
+                        hedge = asyncio.ensure_future(func(*args, **kwargs))
+                        started[hedge] = loop.time()
+                        pending.add(hedge)
+                        hedges += 1
+                        self.hedges_sent += 1
+                    can_hedge = hedges < self.config.max_hedges and (
+                        not self.config.enable_retry_budget or self.retry_budget.tokens >= 1.0
+                    )
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary in pending:
+                # The primary ran at least this long; keeps the quantile from drifting down under hedging
+                self._track_latency(operation_name, loop.time() - started[primary])
+
+        raise first_error
+
+    def _track_latency(self, operation_name: str, latency: float) -> None:
+        """Add a request latency to the operation's tracker"""
+        tracker = self.latency_trackers.get(operation_name)
+        if tracker is None:
+            tracker = self.latency_trackers[operation_name] = LatencyTracker()
+        tracker.add(latency)
+
     def _calculate_delay(self, operation_name: str, attempt: int, error: Optional[Exception]) -> float:
         """Calculate delay for next retry attempt"""
         base_delay = self.config.base_delay
@@ -473,7 +651,8 @@ class AdaptiveRetryManager:
             "avg_execution_time": sum(r["execution_time"] for r in records) / total_requests,
             "circuit_breaker_state": self.circuit_breaker.state,
             "adaptive_params": self.adaptive_params.get(operation_name, {}),
-            "rate_limited": self._is_rate_limited(operation_name)
+            "rate_limited": self._is_rate_limited(operation_name),
+            "hedge_delay": self._hedge_delay(operation_name)
         }
 
     def _get_global_summary(self) -> Dict[str, Any]:
@@ -491,7 +670,14 @@ class AdaptiveRetryManager:
             "operations_tracked": len(set(r["operation"] for r in self.request_history)),
             "circuit_breaker_state": self.circuit_breaker.state,
             "rate_limit_detected": len(self.rate_limit_detected),
-            "adaptive_params": self.adaptive_params
+            "adaptive_params": self.adaptive_params,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "retry_budget": {
+                "tokens": self.retry_budget.tokens,
+                "spent": self.retry_budget.spent,
+                "denied": self.retry_budget.denied
+            }
         }
 
     def reset_operation(self, operation_name: str) -> None:
@@ -507,6 +693,9 @@ class AdaptiveRetryManager:
         if operation_name in self.rate_limit_detected:
             del self.rate_limit_detected[operation_name]
 
+        # Forget observed latencies
+        self.latency_trackers.pop(operation_name, None)
+
         if operation_name in self.rate_limit_windows:
             del self.rate_limit_windows[operation_name]
 
@@ -0,0 +1,140 @@
+"""
+Compression codecs for the smart cache
+
+zlib is always available; lz4 and zstd are used when their packages are
+installed. `CodecSelector` picks a codec per entry: payloads that barely
+compress are stored as they are, large payloads use the fastest codec and the
+rest use the codec with the best ratio.
+"""
+
+import zlib
+from typing import Dict, Optional, Tuple
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Codec:
+    """Compresses and decompresses bytes; the name is stored with each entry"""
+
+    name = "identity"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    """zlib at a given level; every level decompresses the same way"""
+
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Codec(Codec):
+    """lz4 frames, the fastest codec when installed"""
+
+    name = "lz4"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """zstd, the best ratio for its speed when installed"""
+
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # Compressor objects are not thread-safe, so one is made per call
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+def available_codecs() -> Dict[str, Codec]:
+    """Codecs usable in this environment, keyed by name"""
+    codecs: Dict[str, Codec] = {"zlib": ZlibCodec()}
+    if lz4_frame is not None:
+        codecs["lz4"] = Lz4Codec()
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCodec()
+    return codecs
+
+
+CODECS = available_codecs()
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a codec by name"""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Codec '{name}' is not available; install its package or use one of {sorted(CODECS)}")
+    return codec
+
+
+class CodecSelector:
+    """Chooses how to compress each payload from its compressibility and size"""
+
+    def __init__(self, preferred: str = "auto", min_ratio: float = 0.9,
+                 probe_size: int = 4096, fast_threshold: int = 256 * 1024):
+        """
+        Args:
+            preferred: Codec name, or "auto" to pick per payload
+            min_ratio: Payloads compressing to more than this fraction of their size are stored as they are
+            probe_size: Leading bytes compressed to estimate compressibility
+            fast_threshold: Payloads at least this large use the fastest codec
+        """
+        if preferred == "auto":
+            self.fast = CODECS.get("lz4") or ZlibCodec(level=1)
+            self.dense = CODECS.get("zstd") or ZlibCodec(level=6)
+        else:
+            self.fast = self.dense = get_codec(preferred)
+        self.min_ratio = min_ratio
+        self.probe_size = probe_size
+        self.fast_threshold = fast_threshold
+
+    def encode(self, data: bytes) -> Tuple[Optional[str], bytes]:
+        """
+        Compress a payload if it is worth it
+
+        Returns:
+            The codec name and compressed payload, or None and the payload unchanged
+        """
+        probe = data[:self.probe_size]
+        compressed_probe = self.fast.compress(probe)
+        if len(compressed_probe) > len(probe) * self.min_ratio:
+            return None, data
+
+        codec = self.fast if len(data) >= self.fast_threshold else self.dense
+        if codec is self.fast and len(probe) == len(data):
+            payload = compressed_probe
+        else:
+            payload = codec.compress(data)
+        if len(payload) > len(data) * self.min_ratio:
+            return None, data
+        return codec.name, payload
@@ -3,10 +3,12 @@ Advanced connection pooling optimization for PromptOps client
 """
 
 import asyncio
+import itertools
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple, Callable
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Callable
 from dataclasses import dataclass, field
 import logging
 import weakref
@@ -99,21 +101,37 @@ class PoolConfig:
     auto_prune: bool = True
     prune_interval: float = 30.0
     adaptive_threshold: float = 0.8  # 80% utilization
+    connector_limit: int = 100  # Keep-alive TCP connections shared by all pooled sessions
+    limit_per_host: int = 10  # Shared connections per host
+    keepalive_timeout: float = 30.0
 
 
 class ConnectionPool:
-    """Advanced connection pool with adaptive sizing and health monitoring"""
-
-    def __init__(self, config: PoolConfig, connection_factory: Callable):
+    """
+    Advanced connection pool with adaptive sizing and health monitoring
+
+    Acquirers that find no idle connection and no room to create one wait in
+    a FIFO queue; a released connection is handed straight to the oldest
+    waiter, so waiters are served in order and never lose a connection to a
+    newer acquirer. Without a connection factory, pooled sessions share one
+    keep-alive connector, so they reuse TCP/TLS connections instead of each
+    opening its own.
+    """
+
+    def __init__(self, config: PoolConfig, connection_factory: Optional[Callable] = None):
         self.config = config
-        self.connection_factory = connection_factory
+        self.connection_factory = connection_factory or self._create_session
         self.connections: Dict[str, Tuple[aiohttp.ClientSession, ConnectionInfo]] = {}
         self.idle_connections: Set[str] = set()
         self.active_connections: Set[str] = set()
+        self._session_ids: Dict[int, str] = {}
+        self._connection_counter = itertools.count()
+        self._creating = 0
+        self._connector: Optional[aiohttp.TCPConnector] = None
 
-        # Request queue
-        self.request_queue: asyncio.Queue = asyncio.Queue()
-        self.pending_requests: List[asyncio.Future] = []
+        # Acquirers waiting for a connection, oldest first; each future gets a
+        # connection ID, or None when a slot frees up for a new connection
+        self._waiters: Deque[asyncio.Future] = deque()
 
         # Metrics
         self.metrics = PoolMetrics()
@@ -165,10 +183,30 @@ class ConnectionPool:
         async with self._lock:
             for i in range(self.config.min_size):
                 try:
-                    await self._create_connection()
+                    _, info = await self._create_connection()
+                    self._make_idle(info.id)
                 except Exception as e:
                     logger.error("Failed to create initial connection", error=str(e))
 
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """Keep-alive connector shared by the sessions this pool creates"""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.config.connector_limit,
+                limit_per_host=self.config.limit_per_host,
+                keepalive_timeout=self.config.keepalive_timeout
+            )
+        return self._connector
+
+    async def _create_session(self) -> aiohttp.ClientSession:
+        """Default connection factory: a session over the shared connector"""
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=False,
+            timeout=aiohttp.ClientTimeout(total=self.config.connection_timeout)
+        )
+
     async def acquire(self, timeout: Optional[float] = None) -> aiohttp.ClientSession:
         """
         Acquire a connection from the pool
@@ -184,67 +222,111 @@ class ConnectionPool:
             Exception: If connection acquisition fails
         """
         acquire_timeout = timeout or self.config.acquire_timeout
-        start_time = time.time()
-
-        async with self._lock:
-            # Try to get an idle connection
-            if self.idle_connections:
-                connection_id = self.idle_connections.pop()
-                self.active_connections.add(connection_id)
-                session, info = self.connections[connection_id]
-
-                # Update connection info
-                info.state = ConnectionState.ACTIVE
-                info.last_used = datetime.utcnow()
-                info.total_requests += 1
-
-                return session
-
-            # Check if we can create a new connection
-            if len(self.connections) < self.config.max_size:
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + acquire_timeout
+
+        reserved = False
+        while True:
+            if not reserved:
+                # Idle connections and free slots go to queued waiters first
+                if self.idle_connections and not self._has_waiters():
+                    return self._checkout(self.idle_connections.pop(), start_time)
+                if len(self.connections) + self._creating < self.config.max_size and not self._has_waiters():
+                    self._creating += 1
+                    reserved = True
+
+            if reserved:
+                info = None
                 try:
-                    session, info = await self._create_connection()
-                    self.active_connections.add(info.id)
-                    return session
+                    _, info = await self._create_connection()
                 except Exception as e:
                     logger.error("Failed to create new connection", error=str(e))
-
-        # If no connections available, wait for one to be released
+                    self.metrics.failed_requests += 1
+                    raise
+                finally:
+                    self._creating -= 1
+                    if info is None:
+                        # The slot is free again; let the next waiter try
+                        self._notify_slot()
+                return self._checkout(info.id, start_time)
+
+            connection_id = await self._wait_for_connection(deadline, acquire_timeout)
+            if connection_id is not None:
+                return self._checkout(connection_id, start_time)
+            # Woken with a slot reserved for this acquirer
+            reserved = True
+
+    async def _wait_for_connection(self, deadline: float, acquire_timeout: float) -> Optional[str]:
+        """Queue for the next released connection, or for a free slot to create one in"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append(future)
         self.metrics.pending_requests += 1
         try:
-            # Wait for connection to be released
-            await asyncio.wait_for(self._wait_for_connection(), timeout=acquire_timeout)
-
-            # Try again to get a connection
-            async with self._lock:
-                if self.idle_connections:
-                    connection_id = self.idle_connections.pop()
-                    self.active_connections.add(connection_id)
-                    session, info = self.connections[connection_id]
-
-                    info.state = ConnectionState.ACTIVE
-                    info.last_used = datetime.utcnow()
-                    info.total_requests += 1
-
-                    return session
-
-                raise Exception("No connections available after waiting")
-
+            return await asyncio.wait_for(future, timeout=max(0.0, deadline - loop.time()))
         except asyncio.TimeoutError:
+            self._return_handoff(future)
             self.metrics.failed_requests += 1
             raise asyncio.TimeoutError(f"Failed to acquire connection within {acquire_timeout}s")
+        except asyncio.CancelledError:
+            self._return_handoff(future)
+            raise
         finally:
             self.metrics.pending_requests -= 1
+            self._has_waiters()
+
+    def _return_handoff(self, future: asyncio.Future) -> None:
+        """Pass on whatever a waiter was handed after it gave up waiting"""
+        if not future.done():
+            future.cancel()
+        elif not future.cancelled() and future.exception() is None:
+            connection_id = future.result()
+            if connection_id is None:
+                self._creating -= 1
+                self._notify_slot()
+            elif connection_id in self.connections:
+                self._make_idle(connection_id)
+
+    def _checkout(self, connection_id: str, start_time: float) -> aiohttp.ClientSession:
+        """Mark a connection active and hand its session to the caller"""
+        self.active_connections.add(connection_id)
+        session, info = self.connections[connection_id]
+        info.state = ConnectionState.ACTIVE
+        info.last_used = datetime.utcnow()
+        info.total_requests += 1
+
+        self.metrics.total_requests += 1
+        wait_time = asyncio.get_running_loop().time() - start_time
+        self.metrics.average_wait_time += (wait_time - self.metrics.average_wait_time) / self.metrics.total_requests
+        return session
+
+    def _make_idle(self, connection_id: str) -> None:
+        """Give a connection to the oldest waiter, or park it as idle"""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(connection_id)
+                return
+        self.idle_connections.add(connection_id)
 
-    async def _wait_for_connection(self) -> None:
-        """Wait for a connection to be released"""
-        future = asyncio.Future()
-        self.pending_requests.append(future)
-        try:
-            await future
-        finally:
-            if future in self.pending_requests:
-                self.pending_requests.remove(future)
+    def _notify_slot(self) -> None:
+        """Reserve a free slot for the oldest waiter to create a connection in"""
+        if len(self.connections) + self._creating >= self.config.max_size:
+            return
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._creating += 1
+                future.set_result(None)
+                return
+
+    def _has_waiters(self) -> bool:
+        """Whether any acquirer is still queued, dropping abandoned waiters at the front"""
+        waiters = self._waiters
+        while waiters and waiters[0].done():
+            waiters.popleft()
+        return bool(waiters)
 
     async def release(self, session: aiohttp.ClientSession) -> None:
         """
@@ -254,34 +336,27 @@ class ConnectionPool:
             session: Connection session to release
         """
         connection_id = self._find_connection_id(session)
-        if not connection_id:
+        if not connection_id or connection_id not in self.active_connections:
             logger.warning("Attempted to release unknown connection")
             return
 
-        async with self._lock:
-            if connection_id in self.active_connections:
-                self.active_connections.remove(connection_id)
-
-                # Check connection health before releasing
-                info = self.connections[connection_id][1]
-                if info.health_status == HealthStatus.HEALTHY:
-                    self.idle_connections.add(connection_id)
-                    info.state = ConnectionState.IDLE
-                    info.last_used = datetime.utcnow()
-                else:
-                    # Remove unhealthy connection
-                    await self._remove_connection(connection_id)
-
-        # Signal waiting requests
-        if self.pending_requests:
-            future = self.pending_requests.pop(0)
-            if not future.done():
-                future.set_result(None)
+        self.active_connections.discard(connection_id)
+        info = self.connections[connection_id][1]
+        age = (datetime.utcnow() - info.created_at).total_seconds()
+
+        # Check connection health and age before releasing
+        if info.health_status == HealthStatus.HEALTHY and age <= self.config.max_connection_age:
+            info.state = ConnectionState.IDLE
+            info.last_used = datetime.utcnow()
+            self._make_idle(connection_id)
+        else:
+            # Remove the connection; its slot goes to the oldest waiter
+            await self._remove_connection(connection_id)
 
     async def _create_connection(self) -> Tuple[aiohttp.ClientSession, ConnectionInfo]:
         """Create a new connection"""
         start_time = time.time()
-        connection_id = f"conn_{len(self.connections)}_{int(time.time() * 1000)}"
+        connection_id = f"conn_{next(self._connection_counter)}_{int(time.time() * 1000)}"
 
         try:
             # Create connection using factory
@@ -298,7 +373,7 @@ class ConnectionPool:
             )
 
             self.connections[connection_id] = (session, info)
-            self.idle_connections.add(connection_id)
+            self._session_ids[id(session)] = connection_id
 
             # Update metrics
             self.metrics.total_connections = len(self.connections)
@@ -317,7 +392,12 @@ class ConnectionPool:
         if connection_id not in self.connections:
             return
 
-        session, info = self.connections[connection_id]
+        # Remove from tracking before closing, so no one acquires it meanwhile
+        session, info = self.connections.pop(connection_id)
+        self._session_ids.pop(id(session), None)
+        self.idle_connections.discard(connection_id)
+        self.active_connections.discard(connection_id)
+        self._notify_slot()
 
         try:
             # Close the session
@@ -325,11 +405,6 @@ class ConnectionPool:
         except Exception as e:
             logger.warning("Error closing connection", connection_id=connection_id, error=str(e))
 
-        # Remove from tracking
-        del self.connections[connection_id]
-        self.idle_connections.discard(connection_id)
-        self.active_connections.discard(connection_id)
-
         # Update metrics
         self.metrics.total_connections = len(self.connections)
         self.metrics.connection_close_rate = self._calculate_connection_close_rate()
@@ -346,10 +421,7 @@ class ConnectionPool:
 
     def _find_connection_id(self, session: aiohttp.ClientSession) -> Optional[str]:
         """Find connection ID for a session"""
-        for connection_id, (conn_session, _) in self.connections.items():
-            if conn_session == session:
-                return connection_id
-        return None
+        return self._session_ids.get(id(session))
 
     async def _health_check_loop(self) -> None:
         """Background health check loop"""
@@ -417,15 +489,17 @@ class ConnectionPool:
             now = datetime.utcnow()
             connections_to_remove = []
 
-            for connection_id, (_, info) in self.connections.items():
+            # Active connections are checked for age when they are released
+            for connection_id in self.idle_connections:
+                info = self.connections[connection_id][1]
+
                 # Check max connection age
                 if (now - info.created_at).total_seconds() > self.config.max_connection_age:
                     connections_to_remove.append(connection_id)
                     continue
 
-                # Check max idle time (only for idle connections)
-                if (connection_id in self.idle_connections and
-                    (now - info.last_used).total_seconds() > self.config.max_idle_time):
+                # Check max idle time
+                if (now - info.last_used).total_seconds() > self.config.max_idle_time:
                     connections_to_remove.append(connection_id)
 
             # Remove connections
@@ -482,7 +556,8 @@ class ConnectionPool:
 
         for i in range(connections_to_add):
             try:
-                await self._create_connection()
+                _, info = await self._create_connection()
+                self._make_idle(info.id)
             except Exception as e:
                 logger.error("Failed to expand pool", error=str(e))
                 break
@@ -603,12 +678,22 @@ class ConnectionPool:
         if self.adaptive_task:
             self.adaptive_task.cancel()
 
+        # Fail queued acquirers
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError("Connection pool closed"))
+
         # Close all connections
         async with self._lock:
             connection_ids = list(self.connections.keys())
             for connection_id in connection_ids:
                 await self._remove_connection(connection_id)
 
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
         logger.info("Connection pool closed")
 
     def get_optimization_recommendations(self) -> List[Dict[str, Any]]:
@@ -617,25 +702,29 @@ class ConnectionPool:
 
         metrics = self.get_metrics()
 
-        # Check pool utilization
-        if metrics.pool_utilization > 0.9:
+        # Check pool utilization, from the connection counts of the latest metrics
+        utilization = (
+            metrics.active_connections / metrics.total_connections
+            if metrics.total_connections else 0.0
+        )
+        if utilization > 0.9:
             recommendations.append({
                 "strategy": OptimizationStrategy.CONNECTION_POOLING,
                 "title": "High pool utilization",
-                "description": f"Pool utilization is {metrics.pool_utilization:.1%}. Consider increasing max_size.",
-                "current_value": metrics.pool_utilization,
+                "description": f"Pool utilization is {utilization:.1%}. Consider increasing max_size.",
+                "current_value": utilization,
                 "target_value": 0.8,
                 "priority": "high"
             })
 
         # Check for too many idle connections
-        if metrics.idle_connections > metrics.max_size * 0.7:
+        if metrics.idle_connections > self.config.max_size * 0.7:
             recommendations.append({
                 "strategy": OptimizationStrategy.CONNECTION_POOLING,
                 "title": "Too many idle connections",
                 "description": f"High number of idle connections ({metrics.idle_connections}). Consider reducing min_size.",
                 "current_value": metrics.idle_connections,
-                "target_value": metrics.max_size * 0.3,
+                "target_value": self.config.max_size * 0.3,
                 "priority": "medium"
             })
 
@@ -7,10 +7,9 @@ import json
 import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Callable, Union
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from enum import Enum
 import logging
-import statistics
 from pathlib import Path
 import threading
 from concurrent.futures import ThreadPoolExecutor
@@ -29,6 +28,7 @@ from .monitor import PerformanceMonitor
 from .adaptive_retry import AdaptiveRetryManager
 from .connection_pool import ConnectionPool
 from .smart_cache import SmartCacheManager
+from .timeseries import TimeSeriesStore, to_epoch
 
 logger = structlog.get_logger(__name__)
 
@@ -104,11 +104,13 @@ class PerformanceDashboard:
 
         # Real-time updates
         self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        # Epoch timestamp of the last update each subscriber received; absent until its first, full update
+        self._subscriber_cursors: Dict[Callable[[Dict[str, Any]], None], float] = {}
         self._update_task: Optional[asyncio.Task] = None
         self._running = False
 
         # Data storage
-        self.historical_data: Dict[MetricType, List[Dict[str, Any]]] = {}
+        self.history = TimeSeriesStore()
         self.alert_history: List[Dict[str, Any]] = []
         self.recommendation_history: List[Dict[str, Any]] = []
 
@@ -313,18 +315,62 @@ class PerformanceDashboard:
         await self._update_historical_data(snapshot)
 
         # Notify subscribers
-        update_data = {
-            "timestamp": snapshot.timestamp.isoformat(),
-            "snapshot": asdict(snapshot),
-            "dashboards": self._get_dashboard_data()
-        }
+        self._publish(snapshot)
+
+    def _publish(self, snapshot: PerformanceSnapshot) -> None:
+        """Send each subscriber a full update first, then only what changed since its last one"""
+        pushed_at = to_epoch(snapshot.timestamp)
+        updates: Dict[Optional[float], Dict[str, Any]] = {}
+
+        for subscriber in list(self._subscribers):
+            cursor = self._subscriber_cursors.get(subscriber)
+            update_data = updates.get(cursor)
+            if update_data is None:
+                if cursor is None:
+                    update_data = self._full_update(snapshot)
+                else:
+                    update_data = self._delta_update(snapshot, cursor)
+                updates[cursor] = update_data
 
-        for subscriber in self._subscribers:
             try:
                 subscriber(update_data)
+                self._subscriber_cursors[subscriber] = pushed_at
             except Exception as e:
                 logger.error("Error notifying dashboard subscriber", error=str(e))
 
+    def _full_update(self, snapshot: PerformanceSnapshot) -> Dict[str, Any]:
+        """Everything a new subscriber needs to draw the dashboards"""
+        return {
+            "type": "dashboard_update",
+            "timestamp": snapshot.timestamp.isoformat(),
+            "snapshot": asdict(snapshot),
+            "dashboards": self._get_dashboard_data(),
+            "history": {
+                metric_type.value: self.history.query(metric_type, start=snapshot.timestamp - timedelta(hours=1))
+                for metric_type in self.history.metrics()
+            }
+        }
+
+    def _delta_update(self, snapshot: PerformanceSnapshot, cursor: float) -> Dict[str, Any]:
+        """Points recorded since the cursor and the current headline values"""
+        points = {}
+        for metric_type in self.history.metrics():
+            new_points = self.history.since(metric_type, cursor)
+            if new_points:
+                points[metric_type.value] = new_points
+
+        return {
+            "type": "dashboard_delta",
+            "timestamp": snapshot.timestamp.isoformat(),
+            "points": points,
+            "current": {
+                "active_requests": len(snapshot.request_metrics),
+                "cache_hit_rate": snapshot.cache_metrics.hit_rate,
+                "memory_usage_mb": snapshot.memory_metrics.rss_mb,
+                "recommendations": len(snapshot.recommendations)
+            }
+        }
+
     async def _update_historical_data(self, snapshot: PerformanceSnapshot) -> None:
         """Update historical data storage"""
         timestamp = snapshot.timestamp
@@ -358,7 +404,7 @@ class PerformanceDashboard:
         # Calculate and store error rate
         if snapshot.request_metrics:
             error_count = sum(1 for req in snapshot.request_metrics.values()
-                           if req.error or (req.statusCode and req.statusCode >= 400))
+                           if req.error or (req.status_code and req.status_code >= 400))
             error_rate = error_count / len(snapshot.request_metrics) if snapshot.request_metrics else 0
             self._add_historical_point(
                 MetricType.ERROR_RATE,
@@ -369,21 +415,7 @@ class PerformanceDashboard:
     def _add_historical_point(self, metric_type: MetricType, timestamp: datetime,
                              value: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Add a point to historical data"""
-        if metric_type not in self.historical_data:
-            self.historical_data[metric_type] = []
-
-        point = {
-            "timestamp": timestamp.isoformat(),
-            "value": value,
-            "tags": tags or {}
-        }
-
-        self.historical_data[metric_type].append(point)
-
-        # Limit data points
-        max_points = 1000
-        if len(self.historical_data[metric_type]) > max_points:
-            self.historical_data[metric_type] = self.historical_data[metric_type][-max_points:]
+        self.history.add(metric_type, timestamp, value, tags)
 
     def _get_dashboard_data(self) -> Dict[str, Any]:
         """Get current dashboard data for all dashboards"""
@@ -413,8 +445,8 @@ class PerformanceDashboard:
 
         # Convert to chart data format
         chart_data = {
-            "labels": [point.timestamp for point in time_series_data],
-            "data": [point.value for point in time_series_data]
+            "labels": [point["timestamp"] for point in time_series_data],
+            "data": [point["value"] for point in time_series_data]
         }
 
         # Add additional widget-specific data
@@ -490,13 +522,14 @@ class PerformanceDashboard:
                 logger.error("Error notifying subscriber of recommendation", error=str(e))
 
     def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
-        """Subscribe to real-time dashboard updates"""
+        """Subscribe to real-time dashboard updates; the first update is full, later ones are deltas"""
         self._subscribers.append(callback)
 
     def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
         """Unsubscribe from dashboard updates"""
         if callback in self._subscribers:
             self._subscribers.remove(callback)
+        self._subscriber_cursors.pop(callback, None)
 
     def get_dashboard_config(self, dashboard_type: DashboardType) -> Optional[DashboardConfig]:
         """Get configuration for a specific dashboard"""
@@ -508,45 +541,33 @@ class PerformanceDashboard:
 
     def get_historical_data(self, metric_type: MetricType,
                           start_time: Optional[datetime] = None,
-                          end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        """Get historical data for a metric type"""
-        if metric_type not in self.historical_data:
-            return []
-
-        data = self.historical_data[metric_type]
-
-        # Filter by time range
-        if start_time or end_time:
-            filtered_data = []
-            for point in data:
-                point_time = datetime.fromisoformat(point["timestamp"])
-                if start_time and point_time < start_time:
-                    continue
-                if end_time and point_time > end_time:
-                    continue
-                filtered_data.append(point)
-            return filtered_data
-
-        return data
+                          end_time: Optional[datetime] = None,
+                          resolution: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Get historical data for a metric type
+
+        Args:
+            resolution: "raw", "1m", "1h", or "auto" for the finest one still covering start_time
+        """
+        return self.history.query(metric_type, start_time, end_time, resolution)
 
     def get_summary_statistics(self, window_hours: int = 1) -> Dict[str, Any]:
         """Get summary statistics for all metrics"""
         stats = {}
+        start_time = datetime.utcnow() - timedelta(hours=window_hours)
 
         for metric_type in MetricType:
-            time_series_data = self.performance_monitor.get_time_series_data(
+            # The monitor's histograms hold every sample; dashboard-only metrics come from the rollups
+            metric_stats = self.performance_monitor.get_statistics(
                 metric_type,
-                window_hours=window_hours
-            )
+                window_minutes=window_hours * 60
+            ) or self.history.summary(metric_type, start_time)
 
-            if time_series_data:
-                values = [point.value for point in time_series_data]
+            if metric_stats:
                 stats[metric_type.value] = {
-                    "min": min(values),
-                    "max": max(values),
-                    "mean": statistics.mean(values),
-                    "median": statistics.median(values),
-                    "count": len(values)
+                    key: metric_stats[key]
+                    for key in ("min", "max", "mean", "median", "count")
+                    if key in metric_stats
                 }
 
         return stats
@@ -559,7 +580,7 @@ class PerformanceDashboard:
             "dashboards": self._get_dashboard_data(),
             "summary": self.get_summary_statistics(),
             "alerts": self.alert_history[-100:],  # Last 100 alerts
-            "recommendations": self.recommendation_history[-50]  # Last 50 recommendations
+            "recommendations": self.recommendation_history[-50:]  # Last 50 recommendations
         }
 
         if dashboard_type:
@@ -586,8 +607,8 @@ class PerformanceDashboard:
         # In a real implementation, you'd want more sophisticated CSV generation
         lines = ["timestamp,metric_type,value"]
 
-        for metric_type, points in self.historical_data.items():
-            for point in points:
+        for metric_type in self.history.metrics():
+            for point in self.history.query(metric_type, resolution="raw"):
                 lines.append(f"{point['timestamp']},{metric_type.value},{point['value']}")
 
         return "\n".join(lines)
@@ -617,8 +638,8 @@ class PerformanceDashboard:
         if report_type == "detailed":
             report["dashboard_data"] = self._get_dashboard_data()
             report["historical_data"] = {
-                metric_type.value: points[-100:]  # Last 100 points
-                for metric_type, points in self.historical_data.items()
+                metric_type.value: self.history.query(metric_type, resolution="raw")[-100:]  # Last 100 points
+                for metric_type in self.history.metrics()
             }
 
         return report
@@ -673,7 +694,7 @@ class PerformanceDashboard:
                 """Get metrics data via API"""
                 try:
                     mtype = MetricType(metric_type)
-                    data = self.get_historical_data(mtype)
+                    data = self.get_historical_data(mtype, start_time=datetime.utcnow() - timedelta(hours=hours))
                     return JSONResponse({"data": data})
                 except ValueError:
                     return JSONResponse({"error": "Invalid metric type"}, status_code=400)
@@ -757,6 +778,8 @@ class PerformanceDashboard:
                     const data = JSON.parse(event.data);
                     if (data.type === 'dashboard_update') {
                         updateDashboard(data);
+                    } else if (data.type === 'dashboard_delta') {
+                        applyDelta(data);
                     }
                 };
 
@@ -765,6 +788,11 @@ class PerformanceDashboard:
                     console.log('Dashboard updated:', data);
                 }
 
+                function applyDelta(data) {
+                    // Append the new points to the charts drawn from the last full update
+                    console.log('Dashboard delta:', data);
+                }
+
                 // Load initial dashboard data
                 fetch('/api/dashboard/overview')
                     .then(response => response.json())
@@ -0,0 +1,253 @@
+"""
+Log-bucketed histograms for performance metrics
+
+`LogHistogram` is a DDSketch-style sketch: each value is counted in a bucket
+whose bounds grow geometrically, so any quantile is returned within a fixed
+relative error and memory depends on the range of values, not their number.
+`WindowedHistogram` keeps one ring of time-slot histograms per thread, so
+recording never takes a lock, and readers merge the slots of a time window.
+"""
+
+import math
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+# Values at or below this are counted in the zero bucket
+MIN_TRACKED_VALUE = 1e-9
+
+
+class LogHistogram:
+    """Mergeable histogram with bounded relative error per quantile"""
+
+    __slots__ = (
+        "relative_accuracy", "max_buckets", "_gamma", "_log_gamma", "_layout",
+        "zero_count", "count", "sum", "sum_squares", "min", "max", "epoch"
+    )
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Args:
+            relative_accuracy: Largest relative error of a quantile
+            max_buckets: Bucket limit; beyond it the lowest buckets are merged, keeping the tail accurate
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        # (key of the first bucket, counts); replaced as a whole so readers never see a torn pair
+        self._layout: Tuple[int, List[int]] = (0, [])
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.epoch = 0
+
+    def add(self, value: float) -> None:
+        """Record one value"""
+        self.count += 1
+        self.sum += value
+        self.sum_squares += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value <= MIN_TRACKED_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        offset, counts = self._layout
+        index = key - offset
+        if 0 <= index < len(counts):
+            counts[index] += 1
+        else:
+            self._add_to_bucket(key, 1)
+
+    def _add_to_bucket(self, key: int, amount: int) -> None:
+        """Count into a bucket outside the current range, growing or collapsing the range"""
+        offset, counts = self._layout
+        if not counts:
+            self._layout = (key, [amount])
+            return
+
+        index = key - offset
+        if 0 <= index < len(counts):
+            counts[index] += amount
+        elif index < 0:
+            span = len(counts) - index
+            if span > self.max_buckets:
+                # Full: the lowest bucket absorbs everything below the range
+                grow = max(0, self.max_buckets - len(counts))
+                counts = [0] * grow + counts
+                counts[0] += amount
+                self._layout = (offset - grow, counts)
+            else:
+                counts = [0] * -index + counts
+                counts[0] += amount
+                self._layout = (key, counts)
+        else:
+            counts = counts + [0] * (index - len(counts) + 1)
+            counts[index] += amount
+            excess = len(counts) - self.max_buckets
+            if excess > 0:
+                counts[excess] += sum(counts[:excess])
+                counts = counts[excess:]
+                offset += excess
+            self._layout = (offset, counts)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add another histogram's values to this one"""
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        offset, counts = other._layout
+        for index, amount in enumerate(list(counts)):
+            if amount:
+                self._add_to_bucket(offset + index, amount)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0 to 1), or None when empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+
+        offset, counts = self._layout
+        for index, amount in enumerate(counts):
+            seen += amount
+            if rank < seen:
+                value = 2 * self._gamma ** (offset + index) / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """Values at several quantiles"""
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self._layout[1])
+
+    def get_statistics(self) -> Dict[str, float]:
+        """Summary in the shape of TimeSeriesMetrics.get_statistics"""
+        if self.count == 0:
+            return {}
+        median, p95, p99 = self.quantiles([0.5, 0.95, 0.99])
+        mean = self.sum / self.count
+        variance = 0.0
+        if self.count > 1:
+            variance = max(0.0, (self.sum_squares - self.count * mean * mean) / (self.count - 1))
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": mean,
+            "median": median,
+            "p95": p95,
+            "p99": p99,
+            "std_dev": math.sqrt(variance)
+        }
+
+
+class _SlotRing:
+    """One thread's histograms, one per time slot"""
+
+    __slots__ = ("thread", "slots")
+
+    def __init__(self, size: int):
+        self.thread = weakref.ref(threading.current_thread())
+        self.slots: List[Optional[LogHistogram]] = [None] * size
+
+
+class WindowedHistogram:
+    """
+    Histogram over a sliding time window, recorded without locks
+
+    Time is cut into slots of `slot_seconds`; each thread records into its own
+    ring of slot histograms, so writers never contend. Snapshots merge the
+    slots inside the requested window across all threads.
+    """
+
+    def __init__(self, window_seconds: int = 3600, slot_seconds: int = 60,
+                 relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.slot_seconds = slot_seconds
+        self.slot_count = max(1, math.ceil(window_seconds / slot_seconds))
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._local = threading.local()
+        self._rings: List[_SlotRing] = []
+        self._rings_lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        """Record a value in the current slot of the calling thread"""
+        epoch = int(time.monotonic() // self.slot_seconds)
+        ring = getattr(self._local, "ring", None)
+        if ring is None:
+            ring = self._register()
+        index = epoch % self.slot_count
+        histogram = ring.slots[index]
+        if histogram is None or histogram.epoch != epoch:
+            histogram = LogHistogram(self.relative_accuracy, self.max_buckets)
+            histogram.epoch = epoch
+            ring.slots[index] = histogram
+        histogram.add(value)
+
+    def _register(self) -> _SlotRing:
+        ring = _SlotRing(self.slot_count)
+        self._local.ring = ring
+        with self._rings_lock:
+            self._rings.append(ring)
+        return ring
+
+    def snapshot(self, window_seconds: Optional[float] = None) -> LogHistogram:
+        """Merge the slots that overlap the last `window_seconds` (the whole window by default)"""
+        current = int(time.monotonic() // self.slot_seconds)
+        slots = self.slot_count
+        if window_seconds is not None:
+            slots = min(slots, max(1, math.ceil(window_seconds / self.slot_seconds)))
+        oldest = current - slots + 1
+
+        merged = LogHistogram(self.relative_accuracy, self.max_buckets)
+        with self._rings_lock:
+            rings = list(self._rings)
+        for ring in rings:
+            for histogram in list(ring.slots):
+                if histogram is not None and histogram.epoch >= oldest:
+                    merged.merge(histogram)
+
+        self._prune(current - self.slot_count + 1)
+        return merged
+
+    def _prune(self, oldest: int) -> None:
+        """Drop rings of finished threads once all their slots have expired"""
+        def live(ring: _SlotRing) -> bool:
+            thread = ring.thread()
+            if thread is not None and thread.is_alive():
+                return True
+            return any(h is not None and h.epoch >= oldest for h in ring.slots)
+
+        with self._rings_lock:
+            self._rings = [ring for ring in self._rings if live(ring)]
+
+    def reset(self) -> None:
+        """Forget all recorded values"""
+        with self._rings_lock:
+            for ring in self._rings:
+                ring.slots = [None] * self.slot_count
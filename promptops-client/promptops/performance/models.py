@@ -304,4 +304,10 @@ class PerformanceConfig:
     opentelemetry_endpoint: Optional[str] = None
     custom_metrics_endpoint: Optional[str] = None
     dashboard_refresh_interval: int = 30  # seconds
+    histogram_relative_accuracy: float = 0.01  # Largest relative error of a reported percentile
+    histogram_max_buckets: int = 2048
+    histogram_window_seconds: int = 3600  # Longest window get_statistics can cover
+    histogram_slot_seconds: int = 60  # Window granularity
+    alert_window_seconds: int = 300  # Window alerts and recommendations look at
+    alert_check_interval: float = 1.0  # seconds between alert checks on the request path
     optimization_auto_apply: bool = False  # Auto-apply optimizations
\ No newline at end of file
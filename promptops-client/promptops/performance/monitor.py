@@ -12,11 +12,11 @@ from typing import Any, Dict, List, Optional, Callable, Set
 from collections import defaultdict, deque
 import json
 import logging
-import statistics
 from concurrent.futures import ThreadPoolExecutor
 
 import structlog
 
+from .histogram import WindowedHistogram
 from .models import (
     PerformanceConfig,
     PerformanceMetric,
@@ -45,7 +45,9 @@ class PerformanceMonitor:
         self._running = False
         self._lock = threading.RLock()
 
-        # Metrics storage
+        # Metrics storage: histograms take every sample, time series keep a bounded trail for charts
+        self._histograms: Dict[MetricType, WindowedHistogram] = {}
+        self._next_alert_check = 0.0
         self._metrics_buffer = deque(maxlen=config.metrics_buffer_size)
         self._time_series = defaultdict(lambda: TimeSeriesMetrics(
             metric_type=MetricType.REQUEST_LATENCY,  # Default, will be overridden
@@ -59,6 +61,8 @@ class PerformanceMonitor:
         self.memory_metrics = MemoryMetrics()
         self.network_metrics = NetworkMetrics()
         self.system_metrics = {}
+        self._process = psutil.Process()
+        self._last_net_io = None
 
         # Alerts and recommendations
         self._alerts: List[PerformanceAlert] = []
@@ -70,6 +74,7 @@ class PerformanceMonitor:
         self._executor = ThreadPoolExecutor(max_workers=4)
         self._monitor_thread = None
         self._flush_thread = None
+        self._stop_event = threading.Event()
 
         # Initialize
         self._setup_default_alerts()
@@ -82,8 +87,14 @@ class PerformanceMonitor:
             return
 
         self._running = True
+        self._stop_event.clear()
         logger.info("Starting performance monitor")
 
+        # Later cpu_percent calls report usage since this one instead of blocking for an interval
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        self.update_memory_metrics()
+
         # Start background threads
         self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._monitor_thread.start()
@@ -97,6 +108,7 @@ class PerformanceMonitor:
             return
 
         self._running = False
+        self._stop_event.set()
         logger.info("Stopping performance monitor")
 
         # Wait for threads to finish
@@ -173,8 +185,7 @@ class PerformanceMonitor:
             start_time=datetime.utcnow()
         )
 
-        with self._lock:
-            self._current_requests[request_id] = request
+        self._current_requests[request_id] = request
 
         return request_id
 
@@ -186,35 +197,33 @@ class PerformanceMonitor:
         if not self._enabled or not request_id:
             return
 
-        with self._lock:
-            if request_id not in self._current_requests:
-                return
-
-            request = self._current_requests.pop(request_id)
-            request.finish(status_code, error)
-            request.cache_hit = cache_hit
-            request.retry_count = retry_count
-            request.bytes_sent = bytes_sent
-            request.bytes_received = bytes_received
+        request = self._current_requests.pop(request_id, None)
+        if request is None:
+            return
 
-            self._completed_requests.append(request)
+        request.finish(status_code, error)
+        request.cache_hit = cache_hit
+        request.retry_count = retry_count
+        request.bytes_sent = bytes_sent
+        request.bytes_received = bytes_received
+        self._completed_requests.append(request)
 
-            # Update cache metrics
+        # Update cache metrics
+        with self._lock:
             if cache_hit:
                 self.cache_metrics.update_hit(request.duration or 0)
             else:
                 self.cache_metrics.update_miss(request.duration or 0)
 
-            # Add to time series
-            if request.duration:
-                self._add_time_series_point(MetricType.REQUEST_LATENCY, request.duration, {
-                    "endpoint": request.endpoint,
-                    "method": request.method,
-                    "status_code": str(request.status_code)
-                })
-
-            # Check alerts
-            self._check_alerts()
+        # Record into histograms; errors count as 1 so the mean is the error rate
+        if request.duration:
+            self._histogram(MetricType.REQUEST_LATENCY).record(request.duration)
+        failed = bool(error) or (status_code is not None and status_code >= 400)
+        self._histogram(MetricType.ERROR_RATE).record(1.0 if failed else 0.0)
+        if retry_count:
+            self._histogram(MetricType.RETRY_COUNT).record(retry_count)
+
+        self._maybe_check_alerts()
 
     def track_cache_operation(self, hit: bool, access_time: float) -> None:
         """Track cache operations"""
@@ -226,11 +235,7 @@ class PerformanceMonitor:
         else:
             self.cache_metrics.update_miss(access_time)
 
-        # Add to time series
-        self._add_time_series_point(
-            MetricType.CACHE_HIT_RATE,
-            self.cache_metrics.hit_rate
-        )
+        self._histogram(MetricType.CACHE_HIT_RATE).record(1.0 if hit else 0.0)
 
     def update_memory_metrics(self) -> None:
         """Update memory usage metrics"""
@@ -238,7 +243,7 @@ class PerformanceMonitor:
             return
 
         try:
-            process = psutil.Process()
+            process = self._process
             memory_info = process.memory_info()
 
             self.memory_metrics.rss_bytes = memory_info.rss
@@ -282,8 +287,34 @@ class PerformanceMonitor:
             connection_pool_size
         )
 
+    def _histogram(self, metric_type: MetricType) -> WindowedHistogram:
+        """Histogram for a metric type, created on first use"""
+        histogram = self._histograms.get(metric_type)
+        if histogram is None:
+            histogram = self._histograms.setdefault(metric_type, WindowedHistogram(
+                window_seconds=self.config.histogram_window_seconds,
+                slot_seconds=self.config.histogram_slot_seconds,
+                relative_accuracy=self.config.histogram_relative_accuracy,
+                max_buckets=self.config.histogram_max_buckets
+            ))
+        return histogram
+
+    def _recent(self, metric_type: MetricType, window_seconds: Optional[float] = None):
+        """Merged histogram of a metric over the alert window, or None without samples"""
+        histogram = self._histograms.get(metric_type)
+        if histogram is None:
+            return None
+        snapshot = histogram.snapshot(window_seconds or self.config.alert_window_seconds)
+        return snapshot if snapshot.count else None
+
     def _add_time_series_point(self, metric_type: MetricType, value: float,
                                tags: Optional[Dict[str, str]] = None) -> None:
+        """Record a sample and add it to the time series"""
+        self._histogram(metric_type).record(value)
+        self._append_time_series_point(metric_type, value, tags)
+
+    def _append_time_series_point(self, metric_type: MetricType, value: float,
+                                  tags: Optional[Dict[str, str]] = None) -> None:
         """Add a point to time series data"""
         with self._lock:
             if metric_type not in self._time_series:
@@ -295,8 +326,9 @@ class PerformanceMonitor:
             self._time_series[metric_type].add_point(value, tags)
 
     def _monitor_loop(self) -> None:
-        """Background monitoring loop"""
-        while self._running:
+        """Background monitoring loop; each pass covers the interval before it"""
+        interval = 10  # Monitor every 10 seconds
+        while not self._stop_event.wait(interval):
             try:
                 # Update system metrics
                 self._update_system_metrics()
@@ -304,32 +336,53 @@ class PerformanceMonitor:
                 # Update memory metrics
                 self.update_memory_metrics()
 
+                # Chart points summarising the recent traffic
+                self._sample_time_series()
+
                 # Generate recommendations
                 self._generate_recommendations()
 
-                # Sleep for monitoring interval
-                time.sleep(10)  # Monitor every 10 seconds
+                interval = 10
 
             except Exception as e:
                 logger.error("Error in monitor loop", error=str(e))
-                time.sleep(30)  # Longer sleep on error
+                interval = 30  # Longer sleep on error
 
     def _flush_loop(self) -> None:
         """Background flush loop for metrics"""
         while self._running:
             try:
                 self._flush_metrics()
-                time.sleep(60)  # Flush every minute
+                self._stop_event.wait(60)  # Flush every minute
             except Exception as e:
                 logger.error("Error in flush loop", error=str(e))
-                time.sleep(120)
+                self._stop_event.wait(120)
+
+    def _sample_time_series(self) -> None:
+        """Add one time series point per metric from the recent histograms"""
+        latency = self._recent(MetricType.REQUEST_LATENCY)
+        if latency is not None:
+            p50, p95, p99 = latency.quantiles([0.5, 0.95, 0.99])
+            self.network_metrics.latency_p50 = p50
+            self.network_metrics.latency_p95 = p95
+            self.network_metrics.latency_p99 = p99
+            self._append_time_series_point(MetricType.REQUEST_LATENCY, p95, {"statistic": "p95"})
+
+        errors = self._recent(MetricType.ERROR_RATE)
+        if errors is not None:
+            self._append_time_series_point(MetricType.ERROR_RATE, errors.mean)
+
+        if self.cache_metrics.hits + self.cache_metrics.misses:
+            self._append_time_series_point(MetricType.CACHE_HIT_RATE, self.cache_metrics.hit_rate)
 
     def _update_system_metrics(self) -> None:
         """Update system-level metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous pass; never blocks
+            cpu_percent = psutil.cpu_percent(interval=None)
             self.system_metrics["cpu_percent"] = cpu_percent
+            self.system_metrics["process_cpu_percent"] = self._process.cpu_percent(interval=None)
+            self._add_time_series_point(MetricType.CPU_USAGE, cpu_percent)
 
             # Memory usage
             memory = psutil.virtual_memory()
@@ -341,12 +394,26 @@ class PerformanceMonitor:
 
             # Network I/O
             net_io = psutil.net_io_counters()
+            now = time.monotonic()
             self.system_metrics["bytes_sent"] = net_io.bytes_sent
             self.system_metrics["bytes_recv"] = net_io.bytes_recv
+            if self._last_net_io is not None:
+                last_time, last_io = self._last_net_io
+                elapsed = max(now - last_time, 1e-6)
+                self.system_metrics["bytes_sent_per_sec"] = (net_io.bytes_sent - last_io.bytes_sent) / elapsed
+                self.system_metrics["bytes_recv_per_sec"] = (net_io.bytes_recv - last_io.bytes_recv) / elapsed
+            self._last_net_io = (now, net_io)
 
         except Exception as e:
             logger.warning("Failed to update system metrics", error=str(e))
 
+    def _maybe_check_alerts(self) -> None:
+        """Check alerts at most once per alert_check_interval"""
+        now = time.monotonic()
+        if now >= self._next_alert_check:
+            self._next_alert_check = now + self.config.alert_check_interval
+            self._check_alerts()
+
     def _check_alerts(self) -> None:
         """Check if any alerts should be triggered"""
         if not self.config.enable_alerting:
@@ -365,11 +432,9 @@ class PerformanceMonitor:
         """Get current value for a metric type"""
         try:
             if metric_type == MetricType.REQUEST_LATENCY:
-                if self._completed_requests:
-                    recent_requests = [r for r in self._completed_requests
-                                     if (datetime.utcnow() - r.end_time or datetime.utcnow()).total_seconds() < 300]
-                    if recent_requests:
-                        return statistics.mean(r.duration or 0 for r in recent_requests)
+                recent = self._recent(MetricType.REQUEST_LATENCY)
+                if recent is not None:
+                    return recent.mean
 
             elif metric_type == MetricType.CACHE_HIT_RATE:
                 return self.cache_metrics.hit_rate
@@ -378,11 +443,9 @@ class PerformanceMonitor:
                 return self.memory_metrics.rss_mb
 
             elif metric_type == MetricType.ERROR_RATE:
-                recent_requests = [r for r in self._completed_requests
-                                 if (datetime.utcnow() - (r.end_time or datetime.utcnow())).total_seconds() < 300]
-                if recent_requests:
-                    error_count = sum(1 for r in recent_requests if r.error or (r.status_code and r.status_code >= 400))
-                    return error_count / len(recent_requests)
+                recent = self._recent(MetricType.ERROR_RATE)
+                if recent is not None:
+                    return recent.mean
 
             elif metric_type == MetricType.CONNECTION_POOL_SIZE:
                 return self.network_metrics.connection_pool_size
@@ -428,14 +491,9 @@ class PerformanceMonitor:
             ))
 
         # Check request latency
-        recent_latencies = []
-        for request in self._completed_requests:
-            if (request.duration and
-                (datetime.utcnow() - (request.end_time or datetime.utcnow())).total_seconds() < 300):
-                recent_latencies.append(request.duration)
-
-        if recent_latencies:
-            avg_latency = statistics.mean(recent_latencies)
+        recent_latencies = self._recent(MetricType.REQUEST_LATENCY)
+        if recent_latencies is not None:
+            avg_latency = recent_latencies.mean
             if avg_latency > 2.0:
                 recommendations.append(OptimizationRecommendation(
                     strategy=OptimizationStrategy.CONNECTION_POOLING,
@@ -539,12 +597,12 @@ class PerformanceMonitor:
             return data
 
     def get_statistics(self, metric_type: MetricType, window_minutes: int = 60) -> Dict[str, float]:
-        """Get statistics for a metric type"""
-        with self._lock:
-            if metric_type not in self._time_series:
-                return {}
+        """Get statistics for a metric type from its histogram, in O(buckets)"""
+        histogram = self._histograms.get(metric_type)
+        if histogram is None:
+            return {}
 
-            return self._time_series[metric_type].get_statistics(window_minutes)
+        return histogram.snapshot(window_minutes * 60).get_statistics()
 
     def add_alert_callback(self, callback: Callable[[PerformanceAlert], None]) -> None:
         """Add callback for alerts"""
@@ -578,5 +636,8 @@ class PerformanceMonitor:
                 "alert_count": len(self._alerts),
                 "recommendation_count": len(self._recommendations),
                 "metrics_buffer_size": len(self._metrics_buffer),
-                "time_series_count": len(self._time_series)
+                "time_series_count": len(self._time_series),
+                "latency_p50": self.network_metrics.latency_p50,
+                "latency_p95": self.network_metrics.latency_p95,
+                "latency_p99": self.network_metrics.latency_p99
             }
\ No newline at end of file
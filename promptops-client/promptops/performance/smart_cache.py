@@ -5,6 +5,7 @@ Smart caching strategies with intelligent hit/miss analysis and optimization
 import asyncio
 import hashlib
 import json
+import pickle
 import time
 from datetime import datetime, timedelta
 from enum import Enum
@@ -17,6 +18,7 @@ import statistics
 
 import structlog
 
+from .codecs import CodecSelector, get_codec
 from .models import OptimizationStrategy
 
 logger = structlog.get_logger(__name__)
@@ -62,6 +64,8 @@ class CacheItem:
     tier: CacheTier = CacheTier.COLD
     tags: Set[str] = field(default_factory=set)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    codec: Optional[str] = None  # Set when value holds compressed bytes
+    value_type: str = "object"  # What compressed bytes decode to: bytes, str or pickle
 
 
 @dataclass
@@ -116,6 +120,8 @@ class SmartCacheConfig:
     enable_adaptive_ttl: bool = True
     enable_compression: bool = True
     compression_threshold: int = 1024  # 1KB
+    compression_codec: str = "auto"  # zlib, lz4, zstd, or auto to choose per entry
+    min_compression_ratio: float = 0.9  # Store entries that compress worse than this as they are
     analytics_retention_hours: int = 24
     pattern_window_minutes: int = 60
     prefetch_accuracy_threshold: float = 0.7
@@ -159,17 +165,21 @@ class SmartCacheManager:
         self._cleanup_task: Optional[asyncio.Task] = None
         self._adaptive_task: Optional[asyncio.Task] = None
 
+        # Running size totals, kept up to date on every add, remove and tier change
+        self.total_bytes = 0
+        self.tier_bytes: Dict[CacheTier, int] = {tier: 0 for tier in CacheTier}
+        self._total_accesses = 0
+
+        # Compression
+        self.codec_selector = CodecSelector(
+            preferred=self.config.compression_codec,
+            min_ratio=self.config.min_compression_ratio
+        )
+
         # Synchronization
         self._lock = asyncio.Lock()
         self._running = False
 
-        # Initialize
-        if self.config.enable_prefetching:
-            self._start_prefetcher()
-
-        if self.config.enable_pattern_analysis:
-            self._start_analytics()
-
     async def initialize(self) -> None:
         """Initialize the smart cache manager"""
         if self._running:
@@ -227,7 +237,7 @@ class SmartCacheManager:
                     if self.config.enable_prefetching:
                         await self._trigger_prefetch(key)
 
-                    return item.value
+                    return self._decode_value(item)
                 else:
                     # Item expired, remove it
                     await self._remove_item(key)
@@ -265,14 +275,8 @@ class SmartCacheManager:
             tags: Tags for categorization
         """
         async with self._lock:
-            # Calculate size
-            size_bytes = self._calculate_size(value)
-
-            # Apply compression if enabled
-            if (self.config.enable_compression and
-                size_bytes > self.config.compression_threshold):
-                value = self._compress_value(value)
-                size_bytes = len(str(value).encode('utf-8'))
+            # Calculate size, compressing if enabled and worthwhile
+            value, size_bytes, codec, value_type = self._encode_value(value)
 
             # Determine TTL
             if ttl is None:
@@ -287,16 +291,23 @@ class SmartCacheManager:
                 access_count=0,
                 size_bytes=size_bytes,
                 cost_to_fetch=cost_to_fetch,
-                tags=tags or set()
+                tags=tags or set(),
+                codec=codec,
+                value_type=value_type
             )
 
+            # Replace any previous entry so its size is no longer counted
+            self._discard(key)
+
             # Check if we need to evict items
             await self._ensure_space(size_bytes)
 
             # Add to cache
             self.cache[key] = item
+            self.total_bytes += size_bytes
             self.access_order.append(key)
             self.access_frequency[key] += 1
+            self._total_accesses += 1
 
             # Assign tier
             if self.config.enable_tiering:
@@ -307,7 +318,7 @@ class SmartCacheManager:
 
     async def _ensure_space(self, required_bytes: int) -> None:
         """Ensure there's enough space in the cache"""
-        current_size = sum(item.size_bytes for item in self.cache.values())
+        current_size = self.total_bytes
         current_count = len(self.cache)
 
         # Check size constraints
@@ -339,16 +350,12 @@ class SmartCacheManager:
                 break
 
             key = self.access_order.popleft()
-            if key in self.cache:
-                item = self.cache.pop(key)
+            item = self._discard(key)
+            if item is not None:
                 evicted_bytes += item.size_bytes
                 evicted_count += 1
                 self.analytics.size_evictions += 1
 
-                # Remove from tier
-                if self.config.enable_tiering:
-                    self.tier_cache[item.tier].discard(key)
-
         logger.debug("LRU eviction completed",
                     evicted_count=evicted_count,
                     evicted_bytes=evicted_bytes)
@@ -365,21 +372,17 @@ class SmartCacheManager:
             if evicted_bytes >= required_bytes:
                 break
 
-            if key in self.cache:
-                item = self.cache.pop(key)
+            item = self._discard(key)
+            if item is not None:
                 evicted_bytes += item.size_bytes
                 evicted_count += 1
                 self.analytics.size_evictions += 1
 
                 # Remove from tracking
-                del self.access_frequency[key]
+                self._forget_accesses(key)
                 if key in self.access_order:
                     self.access_order.remove(key)
 
-                # Remove from tier
-                if self.config.enable_tiering:
-                    self.tier_cache[item.tier].discard(key)
-
         logger.debug("LFU eviction completed",
                     evicted_count=evicted_count,
                     evicted_bytes=evicted_bytes)
@@ -396,16 +399,12 @@ class SmartCacheManager:
                 break
 
             key = self.access_order.popleft()
-            if key in self.cache:
-                item = self.cache.pop(key)
+            item = self._discard(key)
+            if item is not None:
                 evicted_bytes += item.size_bytes
                 evicted_count += 1
                 self.analytics.size_evictions += 1
 
-                # Remove from tier
-                if self.config.enable_tiering:
-                    self.tier_cache[item.tier].discard(key)
-
         logger.debug("FIFO eviction completed",
                     evicted_count=evicted_count,
                     evicted_bytes=evicted_bytes)
@@ -428,21 +427,16 @@ class SmartCacheManager:
             if evicted_bytes >= required_bytes:
                 break
 
-            self.cache.pop(key)
+            self._discard(key)
             evicted_bytes += item.size_bytes
             evicted_count += 1
             self.analytics.size_evictions += 1
 
             # Remove from tracking
-            if key in self.access_frequency:
-                del self.access_frequency[key]
+            self._forget_accesses(key)
             if key in self.access_order:
                 self.access_order.remove(key)
 
-            # Remove from tier
-            if self.config.enable_tiering:
-                self.tier_cache[item.tier].discard(key)
-
         logger.debug("Adaptive eviction completed",
                     evicted_count=evicted_count,
                     evicted_bytes=evicted_bytes)
@@ -499,11 +493,12 @@ class SmartCacheManager:
     def _assign_tier(self, item: CacheItem) -> None:
         """Assign cache tier to an item"""
         # Remove from current tier
-        if item.tier in self.tier_cache:
+        if item.key in self.tier_cache[item.tier]:
             self.tier_cache[item.tier].discard(item.key)
+            self.tier_bytes[item.tier] -= item.size_bytes
 
         # Calculate access score
-        total_accesses = sum(self.access_frequency.values())
+        total_accesses = self._total_accesses
         if total_accesses == 0:
             access_score = 0
         else:
@@ -521,6 +516,7 @@ class SmartCacheManager:
 
         # Add to new tier
         self.tier_cache[item.tier].add(item.key)
+        self.tier_bytes[item.tier] += item.size_bytes
 
         # Update analytics
         self.analytics.tier_distribution[item.tier] += 1
@@ -532,6 +528,7 @@ class SmartCacheManager:
 
         # Update frequency
         self.access_frequency[key] += 1
+        self._total_accesses += 1
 
         # Move to end of access order
         if key in self.access_order:
@@ -549,16 +546,26 @@ class SmartCacheManager:
 
     async def _remove_item(self, key: str) -> None:
         """Remove item from cache"""
-        if key in self.cache:
-            item = self.cache.pop(key)
-            if key in self.access_frequency:
-                del self.access_frequency[key]
+        if self._discard(key) is not None:
+            self._forget_accesses(key)
             if key in self.access_order:
                 self.access_order.remove(key)
 
-            # Remove from tier
-            if self.config.enable_tiering:
-                self.tier_cache[item.tier].discard(key)
+    def _discard(self, key: str) -> Optional[CacheItem]:
+        """Drop an item from storage and its tier, keeping the size totals in step"""
+        item = self.cache.pop(key, None)
+        if item is None:
+            return None
+
+        self.total_bytes -= item.size_bytes
+        if key in self.tier_cache[item.tier]:
+            self.tier_cache[item.tier].discard(key)
+            self.tier_bytes[item.tier] -= item.size_bytes
+        return item
+
+    def _forget_accesses(self, key: str) -> None:
+        """Drop the access count of a key"""
+        self._total_accesses -= self.access_frequency.pop(key, 0)
 
     async def _record_access(self, key: str, hit: bool, access_time: float) -> None:
         """Record cache access for analytics"""
@@ -785,30 +792,77 @@ class SmartCacheManager:
 
     def _calculate_size(self, value: Any) -> int:
         """Calculate size of cached value in bytes"""
+        if isinstance(value, bytes):
+            return len(value)
+        if isinstance(value, str):
+            return len(value) if value.isascii() else len(value.encode('utf-8'))
         try:
             return len(str(value).encode('utf-8'))
         except Exception:
             return 1024  # Default size
 
-    def _compress_value(self, value: Any) -> Any:
-        """Compress value for storage"""
-        # Simple compression - in production, use proper compression libraries
-        try:
-            import zlib
-            compressed = zlib.compress(str(value).encode('utf-8'))
-            return compressed.decode('latin-1')
-        except ImportError:
-            return value
+    def _encode_value(self, value: Any) -> Tuple[Any, int, Optional[str], str]:
+        """
+        Prepare a value for storage
+
+        Values above the compression threshold are serialized to bytes (bytes
+        as they are, str as UTF-8, anything else pickled) and compressed when
+        the codec selector finds it worthwhile. Everything else is stored as is.
+
+        Returns:
+            Stored value, its size in bytes, codec name or None, and what the bytes decode to
+        """
+        threshold = self.config.compression_threshold
+        if not self.config.enable_compression:
+            return value, self._calculate_size(value), None, "object"
+
+        if isinstance(value, bytes):
+            data, value_type = value, "bytes"
+        elif isinstance(value, str):
+            data, value_type = value.encode('utf-8'), "str"
+        else:
+            size_bytes = self._calculate_size(value)
+            if size_bytes <= threshold:
+                return value, size_bytes, None, "object"
+            try:
+                data, value_type = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), "pickle"
+            except Exception:
+                return value, size_bytes, None, "object"
+
+        if len(data) <= threshold:
+            return value, len(data), None, "object"
+
+        codec, payload = self.codec_selector.encode(data)
+        if codec is None:
+            return value, len(data), None, "object"
+        return payload, len(payload), codec, value_type
+
+    def _decode_value(self, item: CacheItem) -> Any:
+        """Return the value an item was stored with"""
+        if item.codec is None:
+            return item.value
+
+        data = get_codec(item.codec).decompress(item.value)
+        if item.value_type == "str":
+            return data.decode('utf-8')
+        if item.value_type == "pickle":
+            return pickle.loads(data)
+        return data
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get detailed cache statistics"""
-        total_size = sum(item.size_bytes for item in self.cache.values())
+        total_size = self.total_bytes
         total_items = len(self.cache)
 
         return {
             "total_items": total_items,
             "total_size_bytes": total_size,
             "total_size_mb": total_size / (1024 * 1024),
+            "tier_size_bytes": {
+                tier.name: size for tier, size in self.tier_bytes.items()
+            },
+            "hits": self.analytics.hits,
+            "misses": self.analytics.misses,
             "hit_rate": self.analytics.average_hit_rate,
             "miss_rate": self.analytics.average_miss_rate,
             "average_access_time": self.analytics.average_access_time,
@@ -881,6 +935,10 @@ class SmartCacheManager:
             for tier_keys in self.tier_cache.values():
                 tier_keys.clear()
 
+            self.total_bytes = 0
+            self.tier_bytes = {tier: 0 for tier in CacheTier}
+            self._total_accesses = 0
+
     async def close(self) -> None:
         """Close the smart cache manager"""
         self._running = False
@@ -0,0 +1,266 @@
+"""
+Ring-buffer time series with multi-resolution rollups for the dashboard
+
+Each metric keeps its raw points plus 1-minute and 1-hour rollups in
+fixed-size rings, so memory stays constant however long the process runs
+while older history survives at coarser resolution. Points arrive in time
+order, which keeps every ring sorted: time-range queries bisect it in
+O(log n) and then read only the points in range.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Rollup resolutions and their bucket length in seconds
+ROLLUP_PERIODS = {"1m": 60, "1h": 3600}
+
+
+def to_epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken as UTC like the rest of the client"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def from_epoch(seconds: float) -> datetime:
+    """Naive UTC datetime for seconds since the epoch"""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+class RingSeries:
+    """Fixed-capacity ring of (timestamp, value) entries in time order"""
+
+    __slots__ = ("capacity", "size", "_start", "_times", "_values")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.size = 0
+        self._start = 0
+        self._times: List[float] = [0.0] * capacity
+        self._values: List[Any] = [None] * capacity
+
+    def append(self, timestamp: float, value: Any) -> None:
+        """Add an entry, overwriting the oldest once full"""
+        if self.size < self.capacity:
+            index = (self._start + self.size) % self.capacity
+            self.size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[index] = timestamp
+        self._values[index] = value
+
+    @property
+    def wrapped(self) -> bool:
+        """Whether older entries have been overwritten"""
+        return self.size == self.capacity
+
+    def time_at(self, position: int) -> float:
+        return self._times[(self._start + position) % self.capacity]
+
+    def value_at(self, position: int) -> Any:
+        return self._values[(self._start + position) % self.capacity]
+
+    @property
+    def first_time(self) -> Optional[float]:
+        return self.time_at(0) if self.size else None
+
+    @property
+    def last_time(self) -> Optional[float]:
+        return self.time_at(self.size - 1) if self.size else None
+
+    @property
+    def last_value(self) -> Any:
+        return self.value_at(self.size - 1) if self.size else None
+
+    def bisect(self, timestamp: float, after: bool = False) -> int:
+        """Position of the first entry at (or, with after, past) timestamp"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            current = self.time_at(middle)
+            if current < timestamp or (after and current == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None,
+              after: bool = False) -> List[Tuple[float, Any]]:
+        """Entries from start to end inclusive; with after, strictly past start"""
+        low = self.bisect(start, after) if start is not None else 0
+        high = self.bisect(end, after=True) if end is not None else self.size
+        if low >= high:
+            return []
+        first = (self._start + low) % self.capacity
+        last = first + (high - low)
+        if last <= self.capacity:
+            return list(zip(self._times[first:last], self._values[first:last]))
+        last -= self.capacity
+        return list(zip(self._times[first:] + self._times[:last], self._values[first:] + self._values[:last]))
+
+
+class Rollup:
+    """Fixed-period buckets of count, sum, min, max and the ISO start time"""
+
+    __slots__ = ("period", "ring")
+
+    def __init__(self, period: int, capacity: int):
+        self.period = period
+        self.ring = RingSeries(capacity)
+
+    def add(self, timestamp: float, value: float) -> None:
+        bucket_start = timestamp - timestamp % self.period
+        last = self.ring.last_time
+        if last is not None and bucket_start <= last:
+            bucket = self.ring.last_value
+            bucket[0] += 1
+            bucket[1] += value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+        else:
+            self.ring.append(bucket_start, [1, value, value, value, from_epoch(bucket_start).isoformat()])
+
+
+class MetricHistory:
+    """Raw points and rollups of one metric"""
+
+    def __init__(self, raw_capacity: int, minute_capacity: int, hour_capacity: int):
+        self.raw = RingSeries(raw_capacity)
+        self.rollups = {
+            "1m": Rollup(ROLLUP_PERIODS["1m"], minute_capacity),
+            "1h": Rollup(ROLLUP_PERIODS["1h"], hour_capacity)
+        }
+
+    def add(self, timestamp: float, value: float, tags: Optional[Dict[str, str]],
+            iso_timestamp: str) -> None:
+        # Rings stay sorted: a point older than the newest is filed at the newest time
+        last = self.raw.last_time
+        if last is not None and timestamp < last:
+            timestamp = last
+            iso_timestamp = from_epoch(last).isoformat()
+        self.raw.append(timestamp, (value, tags or {}, iso_timestamp))
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, value)
+
+    def ring_for(self, resolution: str, start: Optional[float]) -> Tuple[str, RingSeries]:
+        """The ring to read; "auto" picks the finest one still holding data from start"""
+        if resolution == "raw":
+            return "raw", self.raw
+        if resolution in self.rollups:
+            return resolution, self.rollups[resolution].ring
+        if resolution != "auto":
+            raise ValueError(f"Unknown resolution '{resolution}'; use auto, raw, 1m or 1h")
+
+        candidates = [("raw", self.raw)] + [(name, rollup.ring) for name, rollup in self.rollups.items()]
+        for name, ring in candidates:
+            if not ring.wrapped or (start is not None and ring.first_time <= start):
+                return name, ring
+        return candidates[-1]
+
+
+class TimeSeriesStore:
+    """Bounded per-metric history with raw, 1-minute and 1-hour resolutions"""
+
+    def __init__(self, raw_capacity: int = 1000, minute_capacity: int = 1440, hour_capacity: int = 720):
+        """
+        Args:
+            raw_capacity: Raw points kept per metric
+            minute_capacity: 1-minute rollups kept per metric (a day by default)
+            hour_capacity: 1-hour rollups kept per metric (30 days by default)
+        """
+        self.raw_capacity = raw_capacity
+        self.minute_capacity = minute_capacity
+        self.hour_capacity = hour_capacity
+        self._series: Dict[Hashable, MetricHistory] = {}
+
+    def add(self, metric: Hashable, timestamp: datetime, value: float,
+            tags: Optional[Dict[str, str]] = None) -> None:
+        """Record a point"""
+        history = self._series.get(metric)
+        if history is None:
+            history = self._series[metric] = MetricHistory(
+                self.raw_capacity, self.minute_capacity, self.hour_capacity
+            )
+        epoch = to_epoch(timestamp)
+        iso_timestamp = timestamp.isoformat() if timestamp.tzinfo is None else from_epoch(epoch).isoformat()
+        history.add(epoch, value, tags, iso_timestamp)
+
+    def metrics(self) -> List[Hashable]:
+        return list(self._series)
+
+    def query(self, metric: Hashable, start: Optional[datetime] = None,
+              end: Optional[datetime] = None, resolution: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Points of a metric between start and end
+
+        Raw points carry their value and tags; rollup points carry the mean
+        as the value along with min, max and count.
+        """
+        history = self._series.get(metric)
+        if history is None:
+            return []
+        start_epoch = to_epoch(start) if start is not None else None
+        end_epoch = to_epoch(end) if end is not None else None
+        name, ring = history.ring_for(resolution, start_epoch)
+        if name != "raw" and start_epoch is not None:
+            # Include the bucket that start falls in
+            start_epoch -= start_epoch % ROLLUP_PERIODS[name]
+        return self._points(name, ring.range(start_epoch, end_epoch))
+
+    def since(self, metric: Hashable, after: float) -> List[Dict[str, Any]]:
+        """Raw points recorded strictly after an epoch timestamp"""
+        history = self._series.get(metric)
+        if history is None:
+            return []
+        return self._points("raw", history.raw.range(after, after=True))
+
+    def summary(self, metric: Hashable, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> Dict[str, float]:
+        """Count, min, max and mean between start and end from the finest ring covering start"""
+        history = self._series.get(metric)
+        if history is None:
+            return {}
+        start_epoch = to_epoch(start) if start is not None else None
+        end_epoch = to_epoch(end) if end is not None else None
+        name, ring = history.ring_for("auto", start_epoch)
+
+        count, total, low, high = 0, 0.0, float("inf"), float("-inf")
+        if name == "raw":
+            for _, (value, _, _) in ring.range(start_epoch, end_epoch):
+                count += 1
+                total += value
+                low = min(low, value)
+                high = max(high, value)
+        else:
+            if start_epoch is not None:
+                start_epoch -= start_epoch % ROLLUP_PERIODS[name]
+            for _, (bucket_count, bucket_sum, bucket_min, bucket_max, _) in ring.range(start_epoch, end_epoch):
+                count += bucket_count
+                total += bucket_sum
+                low = min(low, bucket_min)
+                high = max(high, bucket_max)
+
+        if count == 0:
+            return {}
+        return {"min": low, "max": high, "mean": total / count, "count": count}
+
+    @staticmethod
+    def _points(name: str, entries: List[Tuple[float, Any]]) -> List[Dict[str, Any]]:
+        if name == "raw":
+            return [
+                {"timestamp": iso_timestamp, "value": value, "tags": tags}
+                for _, (value, tags, iso_timestamp) in entries
+            ]
+        return [
+            {
+                "timestamp": iso_timestamp,
+                "value": bucket_sum / bucket_count,
+                "min": bucket_min,
+                "max": bucket_max,
+                "count": bucket_count
+            }
+            for _, (bucket_count, bucket_sum, bucket_min, bucket_max, iso_timestamp) in entries
+        ]
@@ -2,8 +2,9 @@
 Prompt manager for PromptOps client operations
 """
 
-import re
+import asyncio
 import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -30,10 +31,17 @@ from .models import (
 )
 from .auth import AuthenticationManager
 from .cache import CacheManager
+from .rendering import TemplateCache, variables_digest
 from .telemetry import TelemetryManager
 
 logger = structlog.get_logger(__name__)
 
+# Snapshot bundle layout this client understands
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Most prompt IDs the server accepts in one batch request
+MAX_BATCH_SIZE = 100
+
 
 class PromptManager:
     """Manages prompt operations for PromptOps client"""
@@ -44,7 +52,9 @@ class PromptManager:
         cache_manager: CacheManager,
         telemetry_manager: TelemetryManager,
         base_url: str,
-        timeout: float
+        timeout: float,
+        batch_window: float = 0.0,
+        max_batch_size: int = MAX_BATCH_SIZE
     ):
         self.auth_manager = auth_manager
         self.cache_manager = cache_manager
@@ -52,6 +62,19 @@ class PromptManager:
         self.base_url = base_url
         self.timeout = timeout
         self._client = httpx.AsyncClient(timeout=timeout)
+        # ETag validators kept past cache expiry so refreshes can be conditional
+        self._validators: "OrderedDict[str, Tuple[str, PromptResponse]]" = OrderedDict()
+        # Loaded snapshots by (project_id, module_id, tag): snapshot ID, manifest and prompts
+        self._snapshots: Dict[Tuple[str, Optional[str], Optional[str]], Dict[str, Any]] = {}
+        # Concurrent misses for the same cache key share one in-flight fetch
+        self._inflight: Dict[str, "asyncio.Task[PromptResponse]"] = {}
+        # Latest-version misses within the batch window are merged into one batch request
+        self.batch_window = batch_window
+        self.max_batch_size = max(1, min(max_batch_size, MAX_BATCH_SIZE))
+        self._pending_batches: Dict[Optional[str], Dict[str, "asyncio.Future[PromptResponse]"]] = {}
+        self._batch_tasks: set = set()
+        # Prompt contents tokenized once, shared by every render of that content
+        self._templates = TemplateCache()
 
     async def get_prompt(
         self,
@@ -63,6 +86,15 @@ class PromptManager:
         """
         Get a prompt by ID and version
 
+        Concurrent cache misses for the same prompt share a single request. With
+        a batch window configured, misses for the latest version of different
+        prompts are merged into one request to the batch endpoint.
+
+        A stale cached prompt (expired, but within the cache's stale grace
+        window) is returned at once while a background request refreshes it.
+        If the server cannot be reached, the last known cached prompt is
+        returned instead of failing.
+
         Args:
             prompt_id: Prompt ID
             version: Prompt version (if None, gets latest version)
@@ -78,18 +110,80 @@ class PromptManager:
             ServerError: If server error occurs
         """
         cache_key = f"prompt:{prompt_id}:{version or 'latest'}:{project_id or 'all'}"
-        start_time = time.time()
 
         # Try cache first
         if use_cache and self.cache_manager.is_enabled():
-            cached_prompt = await self.cache_manager.get(cache_key)
+            cached_prompt, stale = await self.cache_manager.lookup(cache_key)
             if cached_prompt:
-                logger.debug("Prompt cache hit", prompt_id=prompt_id, version=version)
+                logger.debug("Prompt cache hit", prompt_id=prompt_id, version=version, stale=stale)
                 self.telemetry_manager.track_cache_hit("memory", cache_key)
-                return cached_prompt
+                if stale and cache_key not in self._inflight:
+                    self._start_fetch(prompt_id, version, project_id, cache_key)
+                return self._as_prompt(cached_prompt)
             else:
                 self.telemetry_manager.track_cache_miss("memory", cache_key)
 
+        if not use_cache:
+            return await self._request_prompt(prompt_id, version, project_id, cache_key, use_cache)
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = self._start_fetch(prompt_id, version, project_id, cache_key)
+        else:
+            logger.debug("Joining in-flight prompt request", prompt_id=prompt_id, version=version)
+
+        try:
+            # Shielded so one caller giving up does not cancel the fetch for the others
+            return await asyncio.shield(task)
+        except (NetworkError, ServerError) as e:
+            fallback = await self.cache_manager.get_last_known(cache_key) if self.cache_manager.is_enabled() else None
+            if not fallback:
+                raise
+            logger.warning("Serving last known prompt while the server is unavailable",
+                           prompt_id=prompt_id, version=version, error=str(e))
+            return self._as_prompt(fallback)
+
+    def _start_fetch(
+        self,
+        prompt_id: str,
+        version: Optional[str],
+        project_id: Optional[str],
+        cache_key: str
+    ) -> "asyncio.Task[PromptResponse]":
+        """Start the shared fetch for a cache key"""
+        task = asyncio.ensure_future(self._fetch_prompt(prompt_id, version, project_id, cache_key))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda done: self._forget_inflight(cache_key, done))
+        return task
+
+    @staticmethod
+    def _as_prompt(value: Any) -> PromptResponse:
+        # The Redis and disk tiers return prompts as decoded JSON
+        return PromptResponse(**value) if isinstance(value, dict) else value
+
+    async def _fetch_prompt(
+        self,
+        prompt_id: str,
+        version: Optional[str],
+        project_id: Optional[str],
+        cache_key: str
+    ) -> PromptResponse:
+        """Fetch a missed prompt, through the batch window when it asks for the latest version"""
+        if version is None and self.batch_window > 0:
+            return await self._enqueue_batch(prompt_id, project_id)
+        return await self._request_prompt(prompt_id, version, project_id, cache_key, True)
+
+    async def _request_prompt(
+        self,
+        prompt_id: str,
+        version: Optional[str],
+        project_id: Optional[str],
+        cache_key: str,
+        use_cache: bool
+    ) -> PromptResponse:
+        """Fetch one prompt from the server and cache it"""
+        start_time = time.time()
+
         # Make API request
         try:
             if version:
@@ -102,21 +196,33 @@ class PromptManager:
                 params["project_id"] = project_id
 
             headers = await self.auth_manager.get_auth_headers(endpoint, "GET")
+            validator = self._validators.get(cache_key) if use_cache else None
+            if validator:
+                # Copy so the conditional header does not leak into cached auth headers
+                headers = {**headers, "If-None-Match": validator[0]}
+
             response = await self._client.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 params=params if params else None
             )
 
-            if response.status_code == 404:
+            if response.status_code == 304 and validator:
+                # Unchanged on the server - reuse the body we already have
+                prompt = validator[1]
+                self._validators.move_to_end(cache_key)
+            elif response.status_code == 404:
+                self._validators.pop(cache_key, None)
                 raise PromptNotFoundError(f"Prompt not found: {prompt_id}@{version}")
             elif response.status_code >= 500:
                 raise ServerError(f"Server error: {response.status_code}")
             elif response.status_code >= 400:
                 raise ValidationError(f"Validation error: {response.text}")
-
-            prompt_data = response.json()
-            prompt = PromptResponse(**prompt_data)
+            else:
+                prompt_data = response.json()
+                prompt = PromptResponse(**prompt_data)
+                if use_cache:
+                    self._store_validator(cache_key, response.headers.get("etag"), prompt)
 
             # Cache the result
             if use_cache and self.cache_manager.is_enabled():
@@ -143,6 +249,273 @@ class PromptManager:
             )
             raise
 
+    def _store_validator(self, cache_key: str, etag: Optional[str], prompt: PromptResponse) -> None:
+        """Remember a response's ETag for later conditional requests"""
+        if not etag:
+            self._validators.pop(cache_key, None)
+            return
+
+        self._validators[cache_key] = (etag, prompt)
+        self._validators.move_to_end(cache_key)
+        max_size = max(self.cache_manager.config.max_size, 1)
+        while len(self._validators) > max_size:
+            self._validators.popitem(last=False)
+
+    def _forget_inflight(self, cache_key: str, task: "asyncio.Task[PromptResponse]") -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Background refreshes have no caller to see their failure
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Prompt fetch failed", cache_key=cache_key, error=str(task.exception()))
+
+    def _enqueue_batch(self, prompt_id: str, project_id: Optional[str]) -> "asyncio.Future[PromptResponse]":
+        """Add a latest-version miss to the project's pending batch"""
+        loop = asyncio.get_running_loop()
+        pending = self._pending_batches.get(project_id)
+        if pending is None:
+            pending = self._pending_batches[project_id] = {}
+            loop.call_later(self.batch_window, self._flush_batch, project_id, pending)
+
+        future = pending.get(prompt_id)
+        if future is None:
+            future = pending[prompt_id] = loop.create_future()
+        if len(pending) >= self.max_batch_size:
+            self._flush_batch(project_id, pending)
+        return future
+
+    def _flush_batch(self, project_id: Optional[str], pending: Dict[str, "asyncio.Future[PromptResponse]"]) -> None:
+        # The window timer also fires for batches already flushed for being full
+        if self._pending_batches.get(project_id) is not pending:
+            return
+        del self._pending_batches[project_id]
+        task = asyncio.ensure_future(self._run_batch(project_id, pending))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, project_id: Optional[str], pending: Dict[str, "asyncio.Future[PromptResponse]"]) -> None:
+        """Fetch a pending batch and resolve each waiting miss"""
+        try:
+            if len(pending) == 1:
+                # A lone miss keeps the single-prompt endpoint and its conditional requests
+                (prompt_id,) = pending
+                cache_key = f"prompt:{prompt_id}:latest:{project_id or 'all'}"
+                results = {prompt_id: await self._request_prompt(prompt_id, None, project_id, cache_key, True)}
+            else:
+                results = await self._request_batch(list(pending), project_id)
+        except Exception as e:
+            results = {prompt_id: e for prompt_id in pending}
+
+        for prompt_id, future in pending.items():
+            if future.done():
+                continue
+            result = results[prompt_id]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _request_batch(
+        self,
+        prompt_ids: List[str],
+        project_id: Optional[str]
+    ) -> Dict[str, Union[PromptResponse, Exception]]:
+        """Fetch the latest version of several prompts in one request and cache them"""
+        start_time = time.time()
+        endpoint = "/v1/client/prompts/batch"
+        payload = {"prompt_ids": prompt_ids, "project_id": project_id, "include_metadata": True}
+
+        try:
+            headers = await self.auth_manager.get_auth_headers(endpoint, "POST", str(payload))
+            response = await self._client.post(f"{self.base_url}{endpoint}", headers=headers, json=payload)
+
+            if response.status_code >= 500:
+                raise ServerError(f"Server error: {response.status_code}")
+            elif response.status_code >= 400:
+                raise ValidationError(f"Validation error: {response.text}")
+
+            body = response.json()
+            results: Dict[str, Union[PromptResponse, Exception]] = {}
+            for prompt_id, prompt_data in body.get("prompts", {}).items():
+                try:
+                    results[prompt_id] = PromptResponse(**prompt_data)
+                except Exception as e:
+                    results[prompt_id] = ValidationError(f"Invalid prompt {prompt_id}: {str(e)}")
+            for error in body.get("errors", []):
+                if error.get("error") == "Prompt not found":
+                    results[error["prompt_id"]] = PromptNotFoundError(f"Prompt not found: {error['prompt_id']}@None")
+                else:
+                    results[error["prompt_id"]] = ValidationError(f"Validation error: {error.get('error')}")
+            for prompt_id in prompt_ids:
+                results.setdefault(prompt_id, PromptNotFoundError(f"Prompt not found: {prompt_id}@None"))
+
+            if self.cache_manager.is_enabled():
+                await self.cache_manager.set_many({
+                    f"prompt:{prompt_id}:latest:{project_id or 'all'}": result
+                    for prompt_id, result in results.items()
+                    if isinstance(result, PromptResponse)
+                })
+
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, "POST", duration, response.status_code)
+
+            logger.info("Prompt batch retrieved", requested=len(prompt_ids),
+                        found=sum(isinstance(result, PromptResponse) for result in results.values()))
+            return results
+
+        except httpx.RequestError as e:
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, "POST", duration, 0, str(e))
+            raise NetworkError(f"Network error: {str(e)}")
+        except Exception as e:
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, "POST", duration, 0, str(e))
+            raise
+
+    async def load_snapshot(
+        self,
+        project_id: str,
+        module_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Warm the cache with every active prompt of a project in one request
+
+        The first call downloads the full snapshot bundle. Later calls for the same
+        project send the held manifest and apply only the changes since then.
+        Prompts are cached under the keys `get_prompt` uses for the exact version,
+        both with and without the project ID. The snapshot holds active versions
+        while `get_prompt` without a version asks for the highest one, so a prompt
+        is also cached under the latest-version keys only when the server marks
+        its active version as the latest.
+
+        Args:
+            project_id: Project ID
+            module_id: Only load prompts of this module (optional)
+            tag: Only load prompts of modules with this tag (optional)
+
+        Returns:
+            Summary with the snapshot ID and the number of loaded, changed and removed prompts
+        """
+        state_key = (project_id, module_id, tag)
+        previous = self._snapshots.get(state_key)
+        start_time = time.time()
+
+        if previous:
+            endpoint = f"/v1/client/projects/{project_id}/snapshot/delta"
+            method = "POST"
+            payload = {"manifest": previous["manifest"], "module_id": module_id, "tag": tag}
+        else:
+            endpoint = f"/v1/client/projects/{project_id}/snapshot"
+            method = "GET"
+            payload = None
+
+        try:
+            headers = await self.auth_manager.get_auth_headers(endpoint, method, str(payload) if payload else None)
+            if payload:
+                response = await self._client.post(f"{self.base_url}{endpoint}", headers=headers, json=payload)
+            else:
+                params = {key: value for key, value in (("module_id", module_id), ("tag", tag)) if value}
+                response = await self._client.get(
+                    f"{self.base_url}{endpoint}", headers=headers, params=params or None
+                )
+
+            if response.status_code == 404:
+                raise PromptNotFoundError(f"Project not found: {project_id}")
+            elif response.status_code >= 500:
+                raise ServerError(f"Server error: {response.status_code}")
+            elif response.status_code >= 400:
+                raise ValidationError(f"Validation error: {response.text}")
+
+            bundle = response.json()
+            if bundle.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                raise ValidationError(f"Unsupported snapshot format: {bundle.get('format_version')}")
+
+            prompts = dict(previous["prompts"]) if previous else {}
+            manifest = dict(previous["manifest"]) if previous else {}
+            latest = set(previous["latest"]) if previous else set()
+            # Latest-version keys this snapshot filled that no longer hold the latest version
+            stale_latest = []
+            changed = bundle["changed"] if previous else bundle["prompts"]
+            removed = bundle.get("removed", [])
+
+            for key in removed:
+                dropped = prompts.pop(key, None)
+                manifest.pop(key, None)
+                if key in latest:
+                    latest.discard(key)
+                    stale_latest.append(key)
+                if dropped and self.cache_manager.is_enabled():
+                    for cache_key in self._snapshot_cache_keys(key, [dropped.version], project_id):
+                        await self.cache_manager.delete(cache_key)
+                        self._validators.pop(cache_key, None)
+
+            for key, prompt_data in changed.items():
+                try:
+                    prompts[key] = PromptResponse(**prompt_data)
+                    manifest[key] = bundle["manifest"][key]
+                    is_latest = bool(prompt_data.get("is_latest"))
+                except Exception as e:
+                    # One malformed prompt should not block the rest of the warm start
+                    prompts.pop(key, None)
+                    manifest.pop(key, None)
+                    is_latest = False
+                    logger.warning("Skipping snapshot prompt", prompt_id=key, error=str(e))
+                if is_latest:
+                    latest.add(key)
+                elif key in latest:
+                    latest.discard(key)
+                    stale_latest.append(key)
+
+            if self.cache_manager.is_enabled():
+                for key in stale_latest:
+                    for cache_key in self._snapshot_cache_keys(key, ["latest"], project_id):
+                        await self.cache_manager.delete(cache_key)
+                        self._validators.pop(cache_key, None)
+                await self.cache_manager.set_many({
+                    cache_key: prompt
+                    for key, prompt in prompts.items()
+                    for cache_key in self._snapshot_cache_keys(
+                        key, ["latest", prompt.version] if key in latest else [prompt.version], project_id
+                    )
+                })
+
+            self._snapshots[state_key] = {
+                "snapshot_id": bundle["snapshot_id"],
+                "manifest": manifest,
+                "prompts": prompts,
+                "latest": latest
+            }
+
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, method, duration, response.status_code)
+
+            summary = {
+                "snapshot_id": bundle["snapshot_id"],
+                "loaded": len(prompts),
+                "changed": len(changed),
+                "removed": len(removed),
+                "delta": previous is not None
+            }
+            logger.info("Prompt snapshot loaded", project_id=project_id, **summary)
+            return summary
+
+        except httpx.RequestError as e:
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, method, duration, 0, str(e))
+            raise NetworkError(f"Network error: {str(e)}")
+        except Exception as e:
+            duration = time.time() - start_time
+            self.telemetry_manager.track_request(endpoint, method, duration, 0, str(e))
+            raise
+
+    def _snapshot_cache_keys(self, prompt_id: str, versions: List[str], project_id: str) -> List[str]:
+        """Cache keys under which `get_prompt` looks up a snapshot prompt by these versions"""
+        return [
+            f"prompt:{prompt_id}:{prompt_version}:{scope}"
+            for prompt_version in versions
+            for scope in (project_id, "all")
+        ]
+
     async def render_prompt(
         self,
         request: RenderRequest,
@@ -163,7 +536,11 @@ class PromptManager:
             ValidationError: If validation fails
             PromptRenderingError: If rendering fails
         """
-        cache_key = f"render:{request.prompt_id}:{request.version or 'latest'}:{hash(str(request.variables))}"
+        cache_key = (
+            f"render:{request.prompt_id}:{request.version or 'latest'}:"
+            f"{request.model_provider or 'any'}:{request.model_name or 'any'}:"
+            f"{variables_digest(request.variables.variables)}"
+        )
         start_time = time.time()
 
         # Try cache first
@@ -172,12 +549,14 @@ class PromptManager:
             if cached_response:
                 logger.debug("Render cache hit", prompt_id=request.prompt_id)
                 self.telemetry_manager.track_cache_hit("memory", cache_key)
+                if isinstance(cached_response, dict):
+                    cached_response = RenderResponse(**cached_response)
                 return cached_response
             else:
                 self.telemetry_manager.track_cache_miss("memory", cache_key)
 
         # Get the prompt first
-        prompt = await self.get_prompt(request.prompt_id, request.version, use_cache)
+        prompt = await self.get_prompt(request.prompt_id, request.version, use_cache=use_cache)
 
         # Select appropriate model-specific prompt
         model_prompt = self._select_model_prompt(prompt, request.model_provider, request.model_name)
@@ -254,20 +633,12 @@ class PromptManager:
     def _render_content(self, content: str, variables: PromptVariables) -> str:
         """Render content with variable substitution"""
         try:
-            # Simple variable substitution
-            for key, value in variables.variables.items():
-                placeholder = f"{{{key}}}"
-                if placeholder in content:
-                    content = content.replace(placeholder, str(value))
-
-            # Validate that all variables were substituted
-            remaining_vars = re.findall(r'\{([^}]+)\}', content)
-            if remaining_vars:
-                missing_vars = [var for var in remaining_vars if var not in variables.variables]
-                if missing_vars:
-                    raise ValidationError(f"Missing required variables: {missing_vars}")
+            template = self._templates.compile(content)
+            missing_vars = template.missing(variables.variables)
+            if missing_vars:
+                raise ValidationError(f"Missing required variables: {missing_vars}")
 
-            return content
+            return template.render(variables.variables)
 
         except Exception as e:
             raise PromptRenderingError(f"Content rendering failed: {str(e)}")
@@ -388,6 +759,7 @@ class PromptManager:
 
             # Clear cache
             await self.cache_manager.clear()
+            self._validators.clear()
 
             duration = time.time() - start_time
             self.telemetry_manager.track_request(
@@ -437,6 +809,7 @@ class PromptManager:
 
             # Clear cache
             await self.cache_manager.clear()
+            self._validators.clear()
 
             duration = time.time() - start_time
             self.telemetry_manager.track_request(
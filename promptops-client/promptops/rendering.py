@@ -0,0 +1,91 @@
+"""
+Compiled prompt templates for PromptOps client rendering
+
+A template is tokenized once into literal and placeholder segments, so
+rendering is a single join and missing variables are found by comparing the
+supplied names with the placeholders collected at compile time.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Tuple
+
+# Placeholders are `{name}`, where the name is anything up to the closing brace
+PLACEHOLDER_PATTERN = re.compile(r"\{([^}]+)\}")
+
+# Compiled templates kept per process
+DEFAULT_TEMPLATE_CACHE_SIZE = 1024
+
+
+class CompiledTemplate:
+    """A template split into literal and placeholder segments"""
+
+    __slots__ = ("content", "variables", "_parts", "_slots")
+
+    def __init__(self, content: str):
+        self.content = content
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(content):
+            if match.start() > position:
+                parts.append(content[position:match.start()])
+            slots.append((len(parts), match.group(1)))
+            parts.append("")
+            position = match.end()
+        if position < len(content):
+            parts.append(content[position:])
+
+        self._parts = parts
+        self._slots = slots
+        # Placeholder names in order of first appearance
+        self.variables: Tuple[str, ...] = tuple(dict.fromkeys(name for _, name in slots))
+
+    def missing(self, values: Mapping[str, Any]) -> List[str]:
+        """Names of placeholders without a value"""
+        return [name for name in self.variables if name not in values]
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Substitute every placeholder; callers check `missing` first"""
+        if not self._slots:
+            return self.content
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            parts[index] = str(values[name])
+        return "".join(parts)
+
+
+class TemplateCache:
+    """Bounded LRU of compiled templates keyed by template content"""
+
+    def __init__(self, max_size: int = DEFAULT_TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._templates: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def compile(self, content: str) -> CompiledTemplate:
+        """Get the compiled template for some content, compiling it on first use"""
+        with self._lock:
+            template = self._templates.get(content)
+            if template is not None:
+                self._templates.move_to_end(content)
+                return template
+
+        template = CompiledTemplate(content)
+        with self._lock:
+            self._templates[content] = template
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+
+def variables_digest(variables: Dict[str, Any]) -> str:
+    """Digest of render variables that is independent of key order and stable across processes"""
+    payload = json.dumps(variables, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
@@ -1,22 +1,45 @@
 """
 Telemetry manager for PromptOps client usage tracking
+
+Tracking an event only appends a tuple to a bounded buffer, so the caller's
+path does no serialization or I/O. An exporter drains the buffer in batches,
+encodes each batch as gzip-compressed JSON Lines and posts it to the server's
+usage ingestion endpoint. The exporter runs as a task on the caller's event
+loop when there is one and in a background thread with its own loop when
+there is not. Failed batches are retried with exponential backoff; when the
+buffer or the retry queue is full the oldest events are dropped and counted.
 """
 
+import asyncio
+import gzip
 import json
+import random
+import sys
 import threading
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
+import httpx
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-from .exceptions import TelemetryError
-from .models import TelemetryConfig, TelemetryEvent
+from .models import TelemetryConfig
 
 logger = structlog.get_logger(__name__)
 
+# Batch usage ingestion endpoint of the PromptOps server
+USAGE_BATCH_ENDPOINT = "/v1/client/usage/batch"
+
+# Longest wait between retries of a failed batch
+MAX_RETRY_DELAY = 60.0
+
+# Shared encoder; json.dumps builds a new one per call when given options
+_encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+
+# (event type, unix time, properties, measurements)
+BufferedEvent = Tuple[str, float, Optional[Dict[str, Any]], Optional[Dict[str, float]]]
+
 
 class TelemetryManager:
     """Manages telemetry and usage analytics for PromptOps client"""
@@ -24,14 +47,46 @@ class TelemetryManager:
     def __init__(self, config: TelemetryConfig):
         self.config = config
         self._session_id = str(uuid.uuid4())
-        self._events: List[TelemetryEvent] = []
+        self._user_id: Optional[str] = None
+        self._events: Deque[BufferedEvent] = deque(maxlen=config.max_buffer_size)
         self._lock = threading.Lock()
         self._last_flush_time = time.time()
         self._disabled = not config.enabled
 
-        # Start background flush thread if enabled
-        if not self._disabled and config.endpoint:
-            self._start_flush_thread()
+        # Exporter state; the endpoint may also come from `attach`
+        self._endpoint = config.endpoint
+        self._auth_manager = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._worker: Optional[Union[asyncio.Task, threading.Thread]] = None
+        self._worker_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        # Buffer length at which the caller wakes the exporter; the first event starts it
+        self._wake_at = 1 if self._endpoint else sys.maxsize
+        # Encoded batches awaiting retry: [payload, event count, attempts]
+        self._retry_batches: Deque[List[Any]] = deque()
+        self._retry_events = 0
+        self._retry_at = 0.0
+
+        self.delivered = 0
+        self.dropped = 0
+        self.failed_attempts = 0
+
+    def attach(self, base_url: str, client: Optional[httpx.AsyncClient] = None, auth_manager=None) -> None:
+        """
+        Deliver events to a PromptOps server
+
+        Args:
+            base_url: Server base URL, used when no telemetry endpoint is configured
+            client: HTTP client to send batches with when exporting on the caller's event loop
+            auth_manager: Authentication manager that signs batch requests
+        """
+        if not self._endpoint and base_url:
+            self._endpoint = f"{base_url}{USAGE_BATCH_ENDPOINT}"
+        self._client = client
+        self._auth_manager = auth_manager
+        if self._endpoint and self._worker is None:
+            self._wake_at = 1
 
     def track_event(self, event_type: str, properties: Optional[Dict[str, Any]] = None, measurements: Optional[Dict[str, float]] = None) -> None:
         """
@@ -46,23 +101,17 @@ class TelemetryManager:
             return
 
         # Apply sampling
-        if self.config.sample_rate < 1.0 and time.random() > self.config.sample_rate:
+        if self.config.sample_rate < 1.0 and random.random() > self.config.sample_rate:
             return
 
-        event = TelemetryEvent(
-            event_type=event_type,
-            timestamp=datetime.utcnow(),
-            session_id=self._session_id,
-            properties=properties or {},
-            measurements=measurements or {}
-        )
-
-        with self._lock:
-            self._events.append(event)
+        events = self._events
+        if len(events) == events.maxlen:
+            # The deque drops the oldest event on append
+            self.dropped += 1
+        events.append((event_type, time.time(), properties, measurements))
 
-        # Flush if batch size reached
-        if len(self._events) >= self.config.batch_size:
-            self._flush_events()
+        if len(events) >= self._wake_at:
+            self._wake()
 
     def track_request(self, endpoint: str, method: str, duration: float, status_code: int, error: Optional[str] = None) -> None:
         """
@@ -176,67 +225,192 @@ class TelemetryManager:
 
     def set_user_id(self, user_id: str) -> None:
         """Set user ID for telemetry events"""
-        with self._lock:
-            for event in self._events:
-                if event.user_id is None:
-                    event.user_id = user_id
-
-    def _start_flush_thread(self) -> None:
-        """Start background thread for periodic flushing"""
-        def flush_worker():
-            while not self._disabled:
-                time.sleep(self.config.flush_interval)
-                try:
-                    self._flush_events()
-                except Exception as e:
-                    logger.error("Telemetry flush failed", error=str(e))
-
-        thread = threading.Thread(target=flush_worker, daemon=True)
-        thread.start()
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True
-    )
-    def _flush_events(self) -> None:
-        """Flush events to telemetry endpoint"""
-        if self._disabled or not self.config.endpoint:
-            return
-
-        with self._lock:
-            if not self._events:
-                return
+        self._user_id = user_id
 
-            events_to_flush = self._events.copy()
-            self._events.clear()
+    def _wake(self) -> None:
+        """Start the exporter if needed and have it drain the buffer"""
+        # No further wakeups until the exporter has taken a batch
+        self._wake_at = sys.maxsize
+        if not self._endpoint:
+            return
 
+        if not self._stopping and not self._worker_alive():
+            self._start_worker()
+
+        loop, wakeup = self._worker_loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The exporter's loop closed; the next wakeup starts a new exporter
+                pass
+
+    def _worker_alive(self) -> bool:
+        worker = self._worker
+        if worker is None:
+            return False
+        if isinstance(worker, threading.Thread):
+            return worker.is_alive()
+        # A task left behind by an event loop that has since closed will never run
+        return not worker.done() and not worker.get_loop().is_closed()
+
+    def _start_worker(self) -> None:
+        """Run the exporter on the running event loop, or in a thread when there is none"""
         try:
-            # This would typically make an HTTP request to the telemetry endpoint
-            # For now, we'll just log the events
-            logger.info(
-                "Flushing telemetry events",
-                count=len(events_to_flush),
-                endpoint=self.config.endpoint
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._worker = loop.create_task(self._export_loop(self._client))
+        else:
+            thread = threading.Thread(
+                target=lambda: asyncio.run(self._export_loop(None)),
+                name="promptops-telemetry",
+                daemon=True
             )
+            self._worker = thread
+            thread.start()
 
-            # In a real implementation, this would be:
-            # async with httpx.AsyncClient() as client:
-            #     response = await client.post(
-            #         self.config.endpoint,
-            #         json=[event.dict() for event in events_to_flush],
-            #         timeout=10.0
-            #     )
-            #     response.raise_for_status()
+    async def _export_loop(self, client: Optional[httpx.AsyncClient]) -> None:
+        """Export pending events whenever woken and at least every flush interval"""
+        self._worker_loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        own_client = client is None
+        if own_client:
+            client = httpx.AsyncClient(timeout=10.0)
 
-            self._last_flush_time = time.time()
+        try:
+            while True:
+                try:
+                    await self._export_pending(client)
+                except Exception as e:
+                    logger.error("Telemetry export failed", error=str(e))
+                if self._stopping:
+                    break
+                timeout = self.config.flush_interval
+                if self._retry_batches:
+                    timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            self._worker_loop = None
+            self._wakeup = None
+            if own_client:
+                await client.aclose()
+
+    async def _export_pending(self, client: httpx.AsyncClient) -> None:
+        """Send queued retries, then buffered events, until both are empty or a send fails"""
+        while True:
+            if self._retry_batches:
+                # Closing makes one last attempt without waiting out the backoff
+                if not self._stopping and time.monotonic() < self._retry_at:
+                    return
+                entry = self._retry_batches[0]
+                if not await self._send(client, entry[0], entry[1]):
+                    self._schedule_retry(entry)
+                    return
+                self._retry_batches.popleft()
+                self._retry_events -= entry[1]
+                continue
+
+            batch = self._take_batch()
+            if not batch:
+                self._wake_at = self.config.batch_size
+                return
+
+            payload = self._encode_batch(batch)
+            if not await self._send(client, payload, len(batch)):
+                entry = [payload, len(batch), 0]
+                self._retry_batches.append(entry)
+                self._retry_events += len(batch)
+                self._schedule_retry(entry)
+                return
 
+    def _take_batch(self) -> List[BufferedEvent]:
+        events = self._events
+        batch = []
+        for _ in range(min(len(events), self.config.batch_size)):
+            batch.append(events.popleft())
+        if len(events) < self.config.batch_size:
+            self._wake_at = self.config.batch_size
+        return batch
+
+    def _schedule_retry(self, entry: List[Any]) -> None:
+        """Back off after a failed send, dropping batches out of attempts or over the memory bound"""
+        self.failed_attempts += 1
+        entry[2] += 1
+        if entry[2] > self.config.max_retries:
+            self._drop_retry(self._retry_batches.index(entry))
+        while self._retry_batches and self._retry_events > self.config.max_buffer_size:
+            self._drop_retry(0)
+        self._retry_at = time.monotonic() + min(MAX_RETRY_DELAY, 2 ** entry[2])
+
+    def _drop_retry(self, index: int) -> None:
+        entry = self._retry_batches[index]
+        del self._retry_batches[index]
+        self._retry_events -= entry[1]
+        self.dropped += entry[1]
+        logger.warning("Dropping telemetry batch", events=entry[1], attempts=entry[2])
+
+    def _usage_record(self, event: BufferedEvent) -> Dict[str, Any]:
+        """Map an event onto a usage log record, leaving out fields it has no value for"""
+        event_type, timestamp, properties, measurements = event
+        properties = properties or {}
+        record = {
+            "endpoint": properties.get("endpoint") or f"sdk:{event_type}",
+            "method": properties.get("method") or "EVENT",
+            "status_code": properties.get("status_code", 0 if event_type == "error" else 200),
+            "request_id": self._session_id,
+            # Unix seconds; the server parses these as UTC datetimes
+            "timestamp": timestamp
+        }
+        for field in ("prompt_id", "project_id"):
+            if field in properties:
+                record[field] = properties[field]
+        error = properties.get("error") or properties.get("error_message")
+        if error:
+            record["error_message"] = error
+        if measurements and "duration_ms" in measurements:
+            record["processing_time_ms"] = int(measurements["duration_ms"])
+        return record
+
+    def _encode_batch(self, batch: List[BufferedEvent]) -> bytes:
+        """Encode events as JSON Lines, gzip-compressed unless compression is off"""
+        encode = _encoder.encode
+        record = self._usage_record
+        lines = "\n".join([encode(record(event)) for event in batch]).encode("utf-8")
+        return gzip.compress(lines, compresslevel=6) if self.config.compress else lines
+
+    async def _send(self, client: httpx.AsyncClient, payload: bytes, count: int) -> bool:
+        """Post one batch; False means it should be retried"""
+        headers = {"Content-Type": "application/x-ndjson"}
+        if self.config.compress:
+            headers["Content-Encoding"] = "gzip"
+        try:
+            if self._auth_manager is not None:
+                headers.update(await self._auth_manager.get_auth_headers(USAGE_BATCH_ENDPOINT, "POST"))
+            response = await client.post(self._endpoint, content=payload, headers=headers)
         except Exception as e:
-            logger.error("Telemetry flush failed", error=str(e))
-            # Re-queue failed events
-            with self._lock:
-                self._events.extend(events_to_flush)
-            raise TelemetryError(f"Telemetry flush failed: {str(e)}")
+            logger.warning("Telemetry batch failed", events=count, error=str(e))
+            return False
+
+        if response.status_code == 429 or response.status_code >= 500:
+            logger.warning("Telemetry batch failed", events=count, status_code=response.status_code)
+            return False
+        if response.status_code >= 400:
+            # The server will not accept this batch however often it is sent
+            self.dropped += count
+            logger.error("Telemetry batch rejected", events=count, status_code=response.status_code)
+            return True
+
+        self.delivered += count
+        self._last_flush_time = time.time()
+        logger.debug("Telemetry batch delivered", events=count, bytes=len(payload))
+        return True
 
     def get_session_id(self) -> str:
         """Get current session ID"""
@@ -244,12 +418,31 @@ class TelemetryManager:
 
     def get_event_count(self) -> int:
         """Get number of pending events"""
-        with self._lock:
-            return len(self._events)
+        return len(self._events) + self._retry_events
 
     def flush(self) -> None:
-        """Manually flush pending events"""
-        self._flush_events()
+        """Ask the exporter to send pending events now, without waiting for it"""
+        self._wake()
+
+    async def close(self) -> None:
+        """Send pending events and stop the exporter"""
+        self._stopping = True
+        worker = self._worker
+        if worker is None:
+            return
+
+        loop, wakeup = self._worker_loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass
+
+        if isinstance(worker, threading.Thread):
+            await asyncio.get_running_loop().run_in_executor(None, worker.join, 10.0)
+        elif not worker.done() and worker.get_loop() is asyncio.get_running_loop():
+            await worker
+        self._worker = None
 
     def disable(self) -> None:
         """Disable telemetry"""
@@ -269,15 +462,17 @@ class TelemetryManager:
 
     def get_summary(self) -> Dict[str, Any]:
         """Get telemetry summary"""
-        with self._lock:
-            event_types = {}
-            for event in self._events:
-                event_types[event.event_type] = event_types.get(event.event_type, 0) + 1
+        event_types: Dict[str, int] = {}
+        for event in list(self._events):
+            event_types[event[0]] = event_types.get(event[0], 0) + 1
 
         return {
             "session_id": self._session_id,
             "enabled": not self._disabled,
-            "pending_events": len(self._events),
+            "pending_events": self.get_event_count(),
             "event_types": event_types,
+            "delivered_events": self.delivered,
+            "dropped_events": self.dropped,
+            "failed_attempts": self.failed_attempts,
             "last_flush": self._last_flush_time
-        }
\ No newline at end of file
+        }
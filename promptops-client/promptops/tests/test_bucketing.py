@@ -0,0 +1,65 @@
+"""
+Tests for deterministic A/B testing bucketing
+"""
+
+import pytest
+
+from promptops.ab_testing.bucketing import assignment_unit, choose_variant, stateless_assignment_id
+from promptops.ab_testing.manager import ABTestingManager
+from promptops.ab_testing.models import (
+    ExperimentContext,
+    ExperimentStatus,
+    ExperimentVariant,
+    TrafficAllocationStrategy,
+    Experiment,
+)
+
+
+# Pinned on the server side as well, in tests/test_experiment_assignment.py
+GOLDEN_VECTORS = [
+    (("exp-1", "", "user-1", 100, [1, 1]), (0, "weighted_allocation", "sa_9aba7c5179438fb917d7a950c6139ea4")),
+    (("exp-1", "", "user-2", 100, [1, 1]), (1, "weighted_allocation", "sa_9b37a515fd1f76075fb99de2584bbed3")),
+    (("exp-1", "v2", "user-1", 100, [1, 1]), (1, "weighted_allocation", "sa_fbb7b7485d9b9074715598fe6edffa96")),
+    (("checkout", "", "user-42", 50, [50, 30, 20]), (2, "weighted_allocation", "sa_744075bf101c847558da23cda60b4ad9")),
+    (("checkout", "", "session-9", 50, [50, 30, 20]), (0, "weighted_allocation", "sa_645cc493baa0e46ab71d792adbfe2b5d")),
+    (("checkout", "s", "user-7", 10, [1, 1, 1]), (0, "control_fallback", "sa_803970719609dcdc85f2f510eb30ca29")),
+]
+
+
+@pytest.mark.parametrize("inputs,expected", GOLDEN_VECTORS)
+def test_golden_vectors(inputs, expected):
+    """Test bucketing matches the vectors pinned by the server"""
+    experiment_id, salt, unit, traffic, weights = inputs
+    index, reason = choose_variant(experiment_id, salt, unit, traffic, weights)
+    assert (index, reason, stateless_assignment_id(experiment_id, salt, unit)) == expected
+
+
+def test_assignment_unit_precedence():
+    """Test units prefer user, then device, then session"""
+    assert assignment_unit("user-1", "session-1", "device-1") == "user-1"
+    assert assignment_unit(None, "session-1", "device-1") == "device-1"
+    assert assignment_unit(None, "session-1") == "session-1"
+
+
+@pytest.mark.asyncio
+async def test_manager_assigns_like_server():
+    """Test local weighted allocation uses the shared scheme and ids"""
+    experiment = Experiment(
+        id="checkout", name="Checkout", description=None, project_id="p", prompt_id="prompt",
+        status=ExperimentStatus.RUNNING, start_time=None, end_time=None, traffic_percentage=50,
+        allocation_strategy=TrafficAllocationStrategy.WEIGHTED, target_audience=None,
+        geographic_targeting=None, user_attributes=None, min_sample_size=100,
+        statistical_significance=95, primary_metric="conversion", secondary_metrics=None,
+        control_variant=ExperimentVariant(id="control", name="Control", weight=50),
+        treatment_variants=[ExperimentVariant(id="b", name="B", weight=30), ExperimentVariant(id="c", name="C", weight=20)],
+        results=None, winner_determined=False, winning_variant=None, created_by="u",
+        created_at=None, updated_at=None
+    )
+    manager = ABTestingManager.__new__(ABTestingManager)
+
+    assignment = await manager._weighted_allocation(
+        experiment, ExperimentContext(session_id="s1", user_id="user-42")
+    )
+
+    assert assignment.variant_id == "c"
+    assert assignment.id == "sa_744075bf101c847558da23cda60b4ad9"
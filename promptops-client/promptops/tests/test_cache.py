@@ -4,7 +4,7 @@ Tests for cache manager
 
 import asyncio
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 from promptops.cache import CacheManager
 from promptops.models import CacheConfig, CacheLevel
@@ -222,17 +222,54 @@ async def test_redis_fallback(redis_config):
         assert result == "test_value"
 
 
+class FakeRedis:
+    """In-memory stand-in for a redis.asyncio client"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.calls.append(("mget", tuple(keys)))
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.calls.append(("set", key, ex))
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def unlink(self, *keys):
+        self.calls.append(("unlink", len(keys)))
+        return await self.delete(*keys)
+
+    async def scan_iter(self, match, count=None):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    async def aclose(self):
+        self.calls.append(("aclose",))
+
+
 @pytest.mark.asyncio
 async def test_hybrid_cache_operations(hybrid_config):
     """Test hybrid cache operations"""
     with patch('promptops.cache.redis') as mock_redis:
         # Mock Redis client
-        mock_redis_client = MagicMock()
+        mock_redis_client = AsyncMock()
         mock_redis_client.ping.return_value = True
         mock_redis_client.get.return_value = None
-        mock_redis_client.setex.return_value = True
-        mock_redis_client.delete.return_value = 1
-        mock_redis_client.keys.return_value = []
+        mock_redis_client.set.return_value = True
         mock_redis.from_url.return_value = mock_redis_client
 
         cache = CacheManager(hybrid_config)
@@ -245,9 +282,89 @@ async def test_hybrid_cache_operations(hybrid_config):
         result = await cache.get("test_key")
         assert result == "test_value"
 
-        # Verify Redis operations were called
-        mock_redis_client.setex.assert_called_once()
-        mock_redis_client.get.assert_called()
+        # Verify Redis operations were awaited
+        mock_redis_client.set.assert_awaited_once_with("promptops:test_key", '"test_value"', ex=300)
+        assert await cache.health_check() is True
+
+        await cache.close()
+        mock_redis_client.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_redis_unreachable_falls_back(hybrid_config):
+    """Test the first failed Redis call falls back to memory cache"""
+    with patch('promptops.cache.redis') as mock_redis:
+        mock_redis_client = AsyncMock()
+        mock_redis_client.ping.side_effect = ConnectionError("refused")
+        mock_redis.from_url.return_value = mock_redis_client
+
+        cache = CacheManager(hybrid_config)
+        await cache.set("test_key", "test_value")
+
+        assert cache.get_cache_level() == CacheLevel.MEMORY
+        assert await cache.get("test_key") == "test_value"
+        mock_redis_client.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redis_batches(hybrid_config):
+    """Test bulk reads use one MGET and deletes scan by prefix"""
+    fake = FakeRedis()
+    with patch('promptops.cache.redis') as mock_redis:
+        mock_redis.from_url.return_value = fake
+        cache = CacheManager(hybrid_config)
+
+        # Written by another client, so only Redis has them
+        for i in range(3):
+            fake.data[f"promptops:p:{i}"] = f'"value{i}"'
+        await cache.set("memory_key", "memory_value")
+        fake.calls.clear()
+
+        found = await cache.get_many(["memory_key", "p:0", "p:1", "p:2", "missing"])
+        assert found == {"memory_key": "memory_value", "p:0": "value0", "p:1": "value1", "p:2": "value2"}
+        assert fake.calls == [("mget", ("promptops:p:0", "promptops:p:1", "promptops:p:2", "promptops:missing"))]
+
+        # Redis hits are promoted to memory
+        assert await cache.get("p:1") == "value1"
+        assert fake.calls[-1][0] == "mget"
+
+        await cache.delete_prefix("p:")
+        assert list(fake.data) == ["promptops:memory_key"]
+
+        await cache.clear()
+        assert fake.data == {}
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    """Test reads refresh an entry's position in the eviction order"""
+    cache = CacheManager(CacheConfig(level=CacheLevel.MEMORY, ttl=300, max_size=2))
+
+    await cache.set("key1", "value1")
+    await cache.set("key2", "value2")
+    assert await cache.get("key1") == "value1"
+    await cache.set("key3", "value3")  # Should evict key2
+
+    assert await cache.get("key2") is None
+    assert await cache.get("key1") == "value1"
+    assert cache.get_stats().evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_unread_entries_expire(memory_config):
+    """Test expired entries are reclaimed without being read"""
+    cache = CacheManager(memory_config)
+
+    await cache.set("short", "value", ttl=1)
+    await cache.set("rewritten", "value", ttl=1)
+    await cache.set("rewritten", "value", ttl=300)
+    await asyncio.sleep(2.1)
+
+    # Any later write expires the wheel slots that have passed
+    await cache.set("other", "value")
+    assert "short" not in cache._memory_cache
+    assert await cache.get("rewritten") == "value"
+    assert cache.get_stats().size == 2
 
 
 @pytest.mark.asyncio
@@ -315,4 +432,59 @@ async def test_cache_reset_stats(memory_config):
     stats = cache.get_stats()
     assert stats.hits == 0
     assert stats.misses == 0
-    assert stats.hit_rate == 0.0
\ No newline at end of file
+    assert stats.hit_rate == 0.0
+
+@pytest.mark.asyncio
+async def test_cache_set_many(memory_config):
+    """Test bulk-loading entries"""
+    cache = CacheManager(memory_config)
+
+    await cache.set_many({f"key{i}": f"value{i}" for i in range(10)})
+
+    assert await cache.get("key0") == "value0"
+    assert await cache.get("key9") == "value9"
+    assert cache.get_stats().size == 10
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_within_grace():
+    """Test expired entries are served flagged stale until the grace window ends"""
+    cache = CacheManager(CacheConfig(level=CacheLevel.MEMORY, ttl=1, max_size=100, stale_ttl=1))
+
+    await cache.set("key1", "value1")
+    assert await cache.lookup("key1") == ("value1", False)
+
+    await asyncio.sleep(1.1)
+    assert await cache.get("key1") is None
+    assert await cache.lookup("key1") == ("value1", True)
+    assert cache.get_stats().stale_hits == 1
+
+    await asyncio.sleep(1.0)
+    assert await cache.lookup("key1") == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Test the disk tier is opened lazily and serves entries to a new cache manager"""
+    path = tmp_path / "cache.db"
+    config = CacheConfig(level=CacheLevel.MEMORY, ttl=1, max_size=100, stale_ttl=1, disk_path=str(path))
+
+    cache = CacheManager(config)
+    assert not path.exists()
+    await cache.set("key1", {"nested": ["value1"]})
+    await cache.set("key2", "forever", ttl=0)
+    await cache.close()
+
+    restarted = CacheManager(config.copy())
+    assert await restarted.get("key1") == {"nested": ["value1"]}
+    assert "key1" in restarted._memory_cache
+
+    await asyncio.sleep(2.1)
+    # Past the grace window, only the last known value remains
+    assert await restarted.lookup("key1") == (None, False)
+    assert await restarted.get_last_known("key1") == {"nested": ["value1"]}
+    assert await restarted.get("key2") == "forever"
+
+    await restarted.delete_prefix("key")
+    assert await restarted.get_last_known("key1") is None
+    await restarted.close()
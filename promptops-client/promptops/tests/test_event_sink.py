@@ -0,0 +1,110 @@
+"""
+Tests for the buffered A/B testing event sink
+"""
+
+import asyncio
+import pytest
+
+from promptops.ab_testing.events import BufferedEventSink
+from promptops.exceptions import ValidationError
+
+
+class RecordingSender:
+    """Collects delivered batches, optionally failing the first calls"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+
+    async def __call__(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("server unavailable")
+        self.batches.append(batch)
+
+
+@pytest.mark.asyncio
+async def test_flush_by_size():
+    """Test a full batch is sent without waiting for the interval"""
+    sender = RecordingSender()
+    sink = BufferedEventSink(sender, batch_size=3, flush_interval=60)
+
+    for i in range(7):
+        await sink.add({"i": i})
+    await asyncio.sleep(0)
+
+    assert [len(batch) for batch in sender.batches] == [3, 3]
+    assert len(sink) == 1
+
+    await sink.close()
+    assert [event["i"] for batch in sender.batches for event in batch] == list(range(7))
+
+
+@pytest.mark.asyncio
+async def test_flush_by_time():
+    """Test a partial batch is sent after the flush interval"""
+    sender = RecordingSender()
+    sink = BufferedEventSink(sender, batch_size=100, flush_interval=0.05)
+
+    await sink.add({"i": 0})
+    await sink.add({"i": 1})
+    assert sender.batches == []
+
+    await asyncio.sleep(0.12)
+    assert sender.batches == [[{"i": 0}, {"i": 1}]]
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_requeued():
+    """Test a failed batch stays buffered in order for the next flush"""
+    sender = RecordingSender(failures=1)
+    sink = BufferedEventSink(sender, batch_size=10, flush_interval=60)
+
+    for i in range(3):
+        await sink.add({"i": i})
+
+    assert await sink.flush() == 0
+    assert len(sink) == 3
+    assert await sink.flush() == 3
+    assert sender.batches == [[{"i": 0}, {"i": 1}, {"i": 2}]]
+    assert sink.get_stats()["failed_batches"] == 1
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_dropped():
+    """Test a batch the server rejects is counted and dropped, not retried"""
+    calls = []
+
+    async def sender(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise ValidationError("API request failed: 400 - bad batch", error_code="400")
+
+    sink = BufferedEventSink(sender, batch_size=2, flush_interval=60)
+    sink._buffer.extend({"i": i} for i in range(4))
+
+    assert await sink.flush() == 2
+    assert calls == [[{"i": 0}, {"i": 1}], [{"i": 2}, {"i": 3}]]
+    assert len(sink) == 0
+    stats = sink.get_stats()
+    assert stats["rejected"] == 2 and stats["rejected_batches"] == 1
+    assert stats["failed_batches"] == 0
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_buffer_limit_drops_oldest():
+    """Test the buffer is bounded and drops are counted"""
+    sender = RecordingSender(failures=100)
+    sink = BufferedEventSink(sender, batch_size=100, flush_interval=60, buffer_limit=5)
+
+    for i in range(8):
+        await sink.add({"i": i})
+
+    assert len(sink) == 5
+    assert sink.get_stats()["dropped"] == 3
+    await sink.flush()
+    assert len(sink) == 5
+    sink._flush_task.cancel()
@@ -0,0 +1,248 @@
+"""
+Tests for prompt request coalescing, batching and stale serving against a local stub server
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from promptops.cache import CacheManager
+from promptops.exceptions import PromptNotFoundError, ServerError
+from promptops.models import CacheConfig, CacheLevel, TelemetryConfig
+from promptops.prompts import PromptManager
+from promptops.telemetry import TelemetryManager
+
+
+class StubAuth:
+    """Authentication manager that signs nothing"""
+
+    async def get_auth_headers(self, endpoint, method="GET", body=None):
+        return {"Authorization": "Bearer test"}
+
+
+def prompt_body(prompt_id):
+    return {
+        "id": prompt_id, "version": "1.0.0", "module_id": "mod-1", "name": prompt_id,
+        "content": f"Content of {prompt_id}", "target_models": ["openai"], "model_specific_prompts": [],
+        "mas_intent": "testing", "mas_fairness_notes": "none", "mas_risk_level": "low",
+        "created_by": "test-user", "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00"
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves single and batch prompt lookups slowly enough for requests to pile up"""
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        server.calls.append(("GET", self.path))
+        time.sleep(server.delay)
+        prompt_id = self.path.split("?")[0].rsplit("/", 1)[-1]
+        if server.status != 200:
+            self._reply(server.status, {"detail": "unavailable"})
+        elif prompt_id.startswith("missing"):
+            self._reply(404, {"detail": "Prompt not found"})
+        else:
+            self._reply(200, prompt_body(prompt_id))
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.calls.append(("POST", tuple(request["prompt_ids"])))
+        time.sleep(server.delay)
+        found = [p for p in request["prompt_ids"] if not p.startswith("missing")]
+        self._reply(200, {
+            "prompts": {prompt_id: prompt_body(prompt_id) for prompt_id in found},
+            "errors": [{"prompt_id": p, "error": "Prompt not found"} for p in request["prompt_ids"] if p not in found],
+            "total_requested": len(request["prompt_ids"]),
+            "total_found": len(found)
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.calls = []
+    server.delay = 0.05
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_manager(server, batch_window=0.005, max_batch_size=100, **cache_options):
+    cache_options = {"ttl": 300, **cache_options}
+    return PromptManager(
+        StubAuth(),
+        CacheManager(CacheConfig(level=CacheLevel.MEMORY, max_size=1000, **cache_options)),
+        TelemetryManager(TelemetryConfig(enabled=False)),
+        f"http://127.0.0.1:{server.server_address[1]}",
+        10.0,
+        batch_window=batch_window,
+        max_batch_size=max_batch_size
+    )
+
+
+@pytest.mark.asyncio
+async def test_thundering_herd_makes_one_request(stub_server):
+    """Test concurrent misses for one prompt share a single upstream request"""
+    manager = make_manager(stub_server)
+
+    prompts = await asyncio.gather(*(manager.get_prompt("greeting") for _ in range(200)))
+
+    assert stub_server.calls == [("GET", "/api/prompts/greeting")]
+    assert {prompt.id for prompt in prompts} == {"greeting"}
+    assert manager._inflight == {}
+
+    # Later calls are served from cache
+    await manager.get_prompt("greeting")
+    assert len(stub_server.calls) == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_distinct_misses_are_batched(stub_server):
+    """Test misses for different prompts inside the window become one batch request"""
+    manager = make_manager(stub_server)
+    prompt_ids = [f"prompt-{i}" for i in range(10)]
+
+    prompts = await asyncio.gather(*(
+        manager.get_prompt(prompt_id) for _ in range(20) for prompt_id in prompt_ids
+    ))
+
+    assert stub_server.calls == [("POST", tuple(prompt_ids))]
+    assert Counter(prompt.id for prompt in prompts) == {prompt_id: 20 for prompt_id in prompt_ids}
+    assert await manager.cache_manager.get("prompt:prompt-3:latest:all") is not None
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_full_batches_flush_early(stub_server):
+    """Test a batch is sent as soon as it reaches the maximum size"""
+    manager = make_manager(stub_server, batch_window=10.0, max_batch_size=4)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(manager.get_prompt(f"prompt-{i}") for i in range(8))), timeout=5
+    )
+
+    assert [len(prompt_ids) for _, prompt_ids in stub_server.calls] == [4, 4]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_missing_prompts(stub_server):
+    """Test a prompt missing from a batch fails only its own callers"""
+    manager = make_manager(stub_server)
+
+    found, missing = await asyncio.gather(
+        manager.get_prompt("greeting"), manager.get_prompt("missing-one"), return_exceptions=True
+    )
+
+    assert found.id == "greeting"
+    assert isinstance(missing, PromptNotFoundError)
+    assert len(stub_server.calls) == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_versioned_misses_are_coalesced_not_batched(stub_server):
+    """Test exact-version misses use the single endpoint, one request per prompt"""
+    manager = make_manager(stub_server)
+
+    await asyncio.gather(*(manager.get_prompt(f"prompt-{i % 3}", "1.0.0") for i in range(30)))
+
+    assert sorted(stub_server.calls) == [("GET", f"/api/prompts/prompt-{i}/1.0.0") for i in range(3)]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_then_retried(stub_server):
+    """Test a failed fetch fails every waiter once and the next miss fetches again"""
+    manager = make_manager(stub_server, batch_window=0)
+    stub_server.status = 503
+
+    results = await asyncio.gather(*(manager.get_prompt("greeting") for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(result, ServerError) for result in results)
+    assert len(stub_server.calls) == 1
+
+    stub_server.status = 200
+    assert (await manager.get_prompt("greeting")).id == "greeting"
+    assert len(stub_server.calls) == 2
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others(stub_server):
+    """Test one caller timing out leaves the shared fetch running for the rest"""
+    manager = make_manager(stub_server)
+
+    impatient = asyncio.ensure_future(manager.get_prompt("greeting"))
+    patient = asyncio.ensure_future(manager.get_prompt("greeting"))
+    await asyncio.sleep(0.01)
+    impatient.cancel()
+
+    assert (await patient).id == "greeting"
+    assert impatient.cancelled()
+    assert len(stub_server.calls) == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_prompt_served_while_refreshing(stub_server):
+    """Test an expired prompt in the grace window returns at once and refreshes in the background"""
+    manager = make_manager(stub_server, batch_window=0, ttl=1, stale_ttl=60)
+    await manager.get_prompt("greeting")
+    await asyncio.sleep(1.1)
+
+    started = time.perf_counter()
+    prompt = await manager.get_prompt("greeting")
+    assert time.perf_counter() - started < stub_server.delay
+    assert prompt.id == "greeting"
+    assert "prompt:greeting:latest:all" in manager._inflight
+
+    # Callers during the refresh keep getting the stale prompt without more requests
+    await manager.get_prompt("greeting")
+    await manager._inflight["prompt:greeting:latest:all"]
+    assert len(stub_server.calls) == 2
+    assert (await manager.cache_manager.lookup("prompt:greeting:latest:all"))[1] is False
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_outage_after_restart_serves_disk_cache(stub_server, tmp_path):
+    """Test a restarted client serves known prompts from disk while the server is down"""
+    options = {"ttl": 1, "disk_path": str(tmp_path / "prompts.db")}
+    manager = make_manager(stub_server, batch_window=0, **options)
+    await manager.get_prompt("greeting")
+    await manager.cache_manager.close()
+    await manager.close()
+
+    await asyncio.sleep(1.1)
+    stub_server.status = 503
+    restarted = make_manager(stub_server, batch_window=0, **options)
+
+    prompt = await restarted.get_prompt("greeting")
+    assert prompt.id == "greeting" and prompt.content == "Content of greeting"
+    assert len(stub_server.calls) == 2
+    with pytest.raises(ServerError):
+        await restarted.get_prompt("farewell")
+    await restarted.cache_manager.close()
+    await restarted.close()
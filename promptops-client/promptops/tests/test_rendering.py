@@ -0,0 +1,124 @@
+"""
+Tests for compiled prompt templates and render cache keys
+"""
+
+import random
+import re
+import subprocess
+import sys
+
+import pytest
+
+from promptops.cache import CacheManager
+from promptops.exceptions import PromptRenderingError
+from promptops.models import CacheConfig, CacheLevel, PromptResponse, PromptVariables, RenderRequest, TelemetryConfig
+from promptops.prompts import PromptManager
+from promptops.rendering import CompiledTemplate, TemplateCache, variables_digest
+from promptops.telemetry import TelemetryManager
+
+
+def replace_render(content, variables):
+    """The previous renderer: one replace per variable, then a scan for leftovers"""
+    for key, value in variables.items():
+        content = content.replace(f"{{{key}}}", str(value))
+    remaining = [var for var in re.findall(r'\{([^}]+)\}', content) if var not in variables]
+    return content, remaining
+
+
+def make_template(rng):
+    pieces = []
+    for _ in range(rng.randint(0, 12)):
+        pieces.append(rng.choice(["Hello ", "dear ", " text ", "\n", "{name}", "{ticket id}", "{tier}", "{}", '{"a": 1}']))
+    return "".join(pieces)
+
+
+class StubAuth:
+    """Authentication manager that signs nothing"""
+
+    async def get_auth_headers(self, endpoint, method="GET", body=None):
+        return {"Authorization": "Bearer test"}
+
+
+def test_matches_replace_renderer():
+    """Test compiled rendering matches the replace-based renderer"""
+    rng = random.Random(1)
+    for _ in range(2000):
+        content = make_template(rng)
+        variables = {name: rng.choice(["Ann", 42, None]) for name in ("name", "ticket id", "tier") if rng.random() < 0.8}
+        template = CompiledTemplate(content)
+        expected, remaining = replace_render(content, variables)
+
+        assert template.missing(variables) == list(dict.fromkeys(remaining))
+        if not remaining:
+            assert template.render(variables) == expected
+
+
+def test_values_are_not_rescanned():
+    """Test substituted values that look like placeholders are left alone"""
+    template = CompiledTemplate("Reply to {name} about {topic}")
+
+    assert template.variables == ("name", "topic")
+    assert template.render({"name": "{topic}", "topic": "billing"}) == "Reply to {topic} about billing"
+
+
+def test_template_cache_compiles_once():
+    """Test templates are compiled once per content and evicted least recently used first"""
+    cache = TemplateCache(max_size=2)
+
+    first = cache.compile("Hi {name}")
+    assert cache.compile("Hi {name}") is first
+    cache.compile("Bye {name}")
+    cache.compile("Hi {name}")
+    cache.compile("Welcome {name}")
+
+    assert len(cache) == 2
+    assert cache.compile("Hi {name}") is first
+
+
+def test_variables_digest_is_canonical():
+    """Test the digest ignores key order and is the same in every process"""
+    variables = {"name": "Ann", "tickets": [1, 2], "meta": {"b": 1, "a": 2}}
+    reordered = {"meta": {"a": 2, "b": 1}, "tickets": [1, 2], "name": "Ann"}
+
+    assert variables_digest(variables) == variables_digest(reordered)
+    assert variables_digest(variables) != variables_digest({**variables, "name": "Bob"})
+
+    other_process = subprocess.run(
+        [sys.executable, "-c", f"from promptops.rendering import variables_digest; print(variables_digest({reordered!r}))"],
+        capture_output=True, text=True, check=True
+    )
+    assert other_process.stdout.strip() == variables_digest(variables)
+
+
+@pytest.mark.asyncio
+async def test_render_prompt_cache_key_ignores_variable_order():
+    """Test identical renders share a cache entry whatever the variable order"""
+    manager = PromptManager(
+        StubAuth(),
+        CacheManager(CacheConfig(level=CacheLevel.MEMORY, ttl=300, max_size=100)),
+        TelemetryManager(TelemetryConfig(enabled=False)),
+        "http://test",
+        10.0
+    )
+    await manager.cache_manager.set("prompt:greeting:latest:all", PromptResponse(
+        id="greeting", version="1.0.0", module_id="mod-1", name="greeting", content="Hi {name}, about {topic}",
+        target_models=["openai"], model_specific_prompts=[], mas_intent="testing", mas_fairness_notes="none",
+        mas_risk_level="low", created_by="test-user", created_at="2026-01-01T00:00:00", updated_at="2026-01-01T00:00:00"
+    ))
+
+    first = await manager.render_prompt(RenderRequest(
+        prompt_id="greeting", variables=PromptVariables(variables={"name": "Ann", "topic": "billing"})
+    ))
+    second = await manager.render_prompt(RenderRequest(
+        prompt_id="greeting", variables=PromptVariables(variables={"topic": "billing", "name": "Ann"})
+    ))
+
+    assert first.rendered_content == "Hi Ann, about billing"
+    assert second.cache_key == first.cache_key
+    assert manager.cache_manager.get_stats().hits == 2
+
+    with pytest.raises(PromptRenderingError, match="topic"):
+        await manager.render_prompt(RenderRequest(
+            prompt_id="greeting", variables=PromptVariables(variables={"name": "Ann"})
+        ))
+    await manager.close()
@@ -0,0 +1,101 @@
+"""
+Tests for the A/B testing statistics backends
+"""
+
+import random
+
+import pytest
+
+from promptops.ab_testing.stats import PythonStatsBackend, create_stats_backend
+
+
+def simulate(backend, rates, units, seed=1, values=False):
+    """Record `units` outcomes per variant at the given conversion rates"""
+    rng = random.Random(seed)
+    variant_ids, converted, conversion_values = [], [], []
+    for variant_id, rate in rates.items():
+        for _ in range(units):
+            did_convert = rng.random() < rate
+            variant_ids.append(variant_id)
+            converted.append(did_convert)
+            conversion_values.append(rng.uniform(5, 15) if values and did_convert else None)
+    backend.add_events(variant_ids, converted, conversion_values)
+    return backend
+
+
+def test_compare_matches_reference_values():
+    """Test the z-test, chi-square test and intervals against known values"""
+    backend = PythonStatsBackend()
+    backend.add_events(["control"] * 1000, [True] * 100 + [False] * 900)
+    backend.add_events(["treatment"] * 1000, [True] * 130 + [False] * 870)
+
+    comparison = backend.compare("control", "treatment")
+
+    assert comparison["z_score"] == pytest.approx(2.10274, abs=1e-4)
+    assert comparison["p_value"] == pytest.approx(0.03549, abs=1e-4)
+    assert comparison["chi_square_p_value"] == pytest.approx(comparison["p_value"])
+    assert comparison["is_significant"]
+    interval = backend.variant_statistics("control")["confidence_interval"]
+    assert interval["lower"] == pytest.approx(0.08289, abs=1e-4)
+
+
+def test_incremental_updates_match_one_batch():
+    """Test statistics built event by event equal statistics built in one batch"""
+    batch = simulate(PythonStatsBackend(), {"a": 0.1, "b": 0.2}, 500, values=True)
+
+    incremental = PythonStatsBackend()
+    reference = simulate(PythonStatsBackend(), {"a": 0.1, "b": 0.2}, 500, values=True)
+    for variant_id, converted, value in zip(
+        reference._variant_ids, reference._converted, reference._values
+    ):
+        incremental.add_event(variant_id, converted, value)
+
+    assert incremental.totals() == pytest.approx(batch.totals())
+    assert len(incremental) == len(batch) == 1000
+    assert incremental.variant_statistics("b")["value_mean"] == pytest.approx(10, abs=0.5)
+
+
+def test_sequential_p_value_is_monotone_and_detects_effect():
+    """Test the always-valid p-value never increases and rejects a real effect"""
+    backend = PythonStatsBackend()
+    p_values = []
+    for step in range(20):
+        simulate(backend, {"control": 0.10, "treatment": 0.15}, 250, seed=step)
+        p_values.append(backend.sequential_test("control", "treatment")["p_value"])
+
+    assert p_values == sorted(p_values, reverse=True)
+    assert p_values[-1] < 0.05
+
+
+def test_sequential_test_controls_false_positives_under_peeking():
+    """Test repeated peeks at an A/A test rarely reject"""
+    rejections = 0
+    for trial in range(60):
+        backend = PythonStatsBackend()
+        for step in range(20):
+            simulate(backend, {"a": 0.1, "b": 0.1}, 100, seed=trial * 100 + step)
+            if backend.sequential_test("a", "b")["is_significant"]:
+                rejections += 1
+                break
+
+    assert rejections / 60 <= 0.05
+
+
+def test_numpy_backend_matches_python():
+    """Test the vectorized backend produces the same analysis"""
+    pytest.importorskip("numpy")
+    python_backend = simulate(PythonStatsBackend(), {"a": 0.1, "b": 0.13, "c": 0.08}, 2000, values=True)
+    numpy_backend = simulate(create_stats_backend("numpy"), {"a": 0.1, "b": 0.13, "c": 0.08}, 2000, values=True)
+
+    assert numpy_backend.name == "numpy"
+    for variant_id, totals in python_backend.totals().items():
+        assert numpy_backend.totals()[variant_id] == pytest.approx(totals)
+    assert numpy_backend.analyze("a")["variant_comparisons"]["b"]["p_value"] == pytest.approx(
+        python_backend.analyze("a")["variant_comparisons"]["b"]["p_value"]
+    )
+
+
+def test_unknown_backend():
+    """Test an unknown backend name is rejected"""
+    with pytest.raises(ValueError):
+        create_stats_backend("fortran")
@@ -0,0 +1,168 @@
+"""
+Tests for the batching telemetry exporter against a local stub ingestion server
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from promptops import telemetry
+from promptops.models import TelemetryConfig
+from promptops.telemetry import TelemetryManager
+
+
+class StubAuth:
+    """Authentication manager that signs nothing"""
+
+    async def get_auth_headers(self, endpoint, method="GET", body=None):
+        return {"Authorization": "Bearer test"}
+
+
+class IngestionHandler(BaseHTTPRequestHandler):
+    """Accepts usage batches, failing with each queued status first"""
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        status = server.statuses.pop(0) if server.statuses else 200
+        server.attempts.append((self.path, self.headers.get("Authorization"), status))
+        if status == 200:
+            server.records.extend(json.loads(line) for line in body.decode().splitlines())
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IngestionHandler)
+    server.daemon_threads = True
+    server.statuses = []
+    server.attempts = []
+    server.records = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(telemetry, "MAX_RETRY_DELAY", 0.05)
+
+
+def make_manager(server, client=None, **options):
+    manager = TelemetryManager(TelemetryConfig(**{"batch_size": 10, "flush_interval": 1.0, **options}))
+    manager.attach(f"http://127.0.0.1:{server.server_address[1]}", client, StubAuth())
+    return manager
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_events_are_delivered_in_batches(stub_server):
+    """Test events reach the ingestion endpoint as gzip JSON Lines usage records"""
+    async with httpx.AsyncClient() as client:
+        manager = make_manager(stub_server, client)
+        for i in range(25):
+            manager.track_prompt_usage(f"prompt-{i}", "1.0.0", "openai", "gpt-4", 0.012)
+        manager.track_error("timeout", "upstream timed out")
+
+        await wait_for(lambda: len(stub_server.records) >= 20)
+        await manager.close()
+
+    assert len(stub_server.records) == 26
+    assert {path for path, _, _ in stub_server.attempts} == {"/v1/client/usage/batch"}
+    assert {auth for _, auth, _ in stub_server.attempts} == {"Bearer test"}
+    usage = stub_server.records[0]
+    assert usage["endpoint"] == "sdk:prompt_usage" and usage["method"] == "EVENT"
+    assert usage["prompt_id"] == "prompt-0" and usage["processing_time_ms"] == 12
+    error = stub_server.records[-1]
+    assert error["status_code"] == 0 and error["error_message"] == "upstream timed out"
+    assert manager.delivered == 26 and manager.dropped == 0
+    assert manager.get_event_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried(stub_server):
+    """Test server errors and throttling are retried until the batch is accepted"""
+    stub_server.statuses = [503, 429]
+    async with httpx.AsyncClient() as client:
+        manager = make_manager(stub_server, client)
+        for i in range(10):
+            manager.track_user_action("get_prompt", {"prompt_id": f"prompt-{i}"})
+
+        await wait_for(lambda: manager.delivered == 10)
+        await manager.close()
+
+    assert [status for _, _, status in stub_server.attempts] == [503, 429, 200]
+    assert manager.failed_attempts == 2 and manager.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_dropped_and_counted(stub_server):
+    """Test batches out of retries or refused by the server are dropped, never resent forever"""
+    stub_server.statuses = [500, 500, 400]
+    async with httpx.AsyncClient() as client:
+        manager = make_manager(stub_server, client, max_retries=1)
+        for _ in range(10):
+            manager.track_event("custom")
+        await wait_for(lambda: manager.dropped == 10)
+
+        for _ in range(10):
+            manager.track_event("custom")
+        await wait_for(lambda: manager.dropped == 20)
+        await manager.close()
+
+    assert len(stub_server.attempts) == 3
+    assert manager.get_summary()["dropped_events"] == 20
+    assert manager.get_event_count() == 0
+
+
+def test_buffer_is_bounded():
+    """Test a full buffer keeps the newest events and counts the ones it drops"""
+    manager = TelemetryManager(TelemetryConfig(max_buffer_size=5))
+
+    for i in range(8):
+        manager.track_event("custom", {"index": i})
+
+    assert manager.dropped == 3
+    assert manager.get_event_count() == 5
+    assert manager.get_summary()["event_types"] == {"custom": 5}
+
+
+def test_exports_from_a_thread_without_an_event_loop(stub_server):
+    """Test synchronous callers get a background exporter thread with its own client"""
+    manager = make_manager(stub_server)
+
+    for _ in range(10):
+        manager.track_event("custom")
+
+    deadline = time.monotonic() + 5
+    while manager.delivered < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert isinstance(manager._worker, threading.Thread)
+
+    manager.track_event("custom")
+    asyncio.run(manager.close())
+
+    assert manager.delivered == 11
+    assert not manager._worker_alive()
@@ -0,0 +1,82 @@
+"""
+Tests for the prompt update subscriber
+"""
+
+import pytest
+import httpx
+
+from promptops.cache import CacheManager
+from promptops.models import CacheConfig, CacheLevel
+from promptops.updates import PromptUpdateSubscriber
+
+
+class StubAuth:
+    """Authentication manager that signs nothing"""
+
+    async def get_auth_headers(self, endpoint, method="GET", body=None):
+        return {"Authorization": "Bearer test"}
+
+
+SSE_BODY = (
+    "retry: 1000\n\n"
+    "event: ready\ndata: {\"project_id\": \"project-a\"}\n\n"
+    ": heartbeat\n\n"
+    "id: 1000-1\nevent: prompt_update\n"
+    "data: {\"prompt_id\": \"greeting-v1.1.0\", \"base_prompt_id\": \"greeting\", \"version\": \"1.1.0\", \"action\": \"activate\"}\n\n"
+)
+
+
+@pytest.fixture
+def cache():
+    """Create memory cache"""
+    return CacheManager(CacheConfig(level=CacheLevel.MEMORY, ttl=3600, max_size=100))
+
+
+@pytest.mark.asyncio
+async def test_update_event_invalidates_prompt(cache):
+    """Test that prompt update events evict the prompt's cache entries"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text=SSE_BODY, headers={"Content-Type": "text/event-stream"})
+
+    await cache.set("prompt:greeting:latest:project-a", "old")
+    await cache.set("render:greeting:latest:123", "old")
+    await cache.set("prompt:farewell:latest:project-a", "kept")
+
+    events = []
+    subscriber = PromptUpdateSubscriber(
+        StubAuth(), cache, "http://test", "project-a",
+        on_event=lambda event_type, data: events.append(event_type)
+    )
+    subscriber._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await subscriber._consume()
+
+    assert requests[0].url.path == "/v1/client/projects/project-a/updates"
+    assert events == ["ready", "prompt_update"]
+    assert subscriber.last_event_id == "1000-1"
+    assert subscriber.reconnect_delay == 1.0
+    assert await cache.get("prompt:greeting:latest:project-a") is None
+    assert await cache.get("render:greeting:latest:123") is None
+    assert await cache.get("prompt:farewell:latest:project-a") == "kept"
+
+    # Reconnects resume from the last applied event
+    await subscriber._consume()
+    assert requests[1].headers["Last-Event-ID"] == "1000-1"
+    await subscriber.stop()
+
+
+@pytest.mark.asyncio
+async def test_reset_event_clears_prompts(cache):
+    """Test that a reset event drops every cached prompt"""
+    await cache.set("prompt:greeting:latest:all", "old")
+    await cache.set("other:key", "kept")
+
+    subscriber = PromptUpdateSubscriber(StubAuth(), cache, "http://test", "project-a")
+    await subscriber.handle_event("reset", {"reason": "history_expired"})
+
+    assert await cache.get("prompt:greeting:latest:all") is None
+    assert await cache.get("other:key") == "kept"
+    await subscriber.stop()
@@ -0,0 +1,218 @@
+"""
+Prompt update subscriber for PromptOps client
+
+Keeps the local cache in step with the server by consuming the project's
+server-sent event stream of prompt changes.
+"""
+
+import asyncio
+import inspect
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import httpx
+import structlog
+
+from .auth import AuthenticationManager
+from .cache import CacheManager
+from .exceptions import AuthenticationError, AuthorizationError, PromptNotFoundError
+
+logger = structlog.get_logger(__name__)
+
+EventCallback = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class PromptUpdateSubscriber:
+    """Invalidates or refreshes cached prompts as the server reports changes"""
+
+    def __init__(
+        self,
+        auth_manager: AuthenticationManager,
+        cache_manager: CacheManager,
+        base_url: str,
+        project_id: str,
+        prompt_manager: Optional[Any] = None,
+        refresh: bool = False,
+        on_event: Optional[EventCallback] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        read_timeout: float = 60.0
+    ):
+        """
+        Initialize the subscriber
+
+        Args:
+            auth_manager: Authentication manager used to sign the stream request
+            cache_manager: Cache whose prompt entries are invalidated
+            base_url: API base URL
+            project_id: Project whose updates to follow
+            prompt_manager: Prompt manager used to re-fetch changed prompts (optional)
+            refresh: Re-fetch changed prompts instead of only invalidating them
+            on_event: Callback invoked with (event type, data) for every event
+            reconnect_delay: Initial delay before reconnecting
+            max_reconnect_delay: Upper bound for the reconnect backoff
+            read_timeout: Seconds without data (including heartbeats) before reconnecting
+        """
+        self.auth_manager = auth_manager
+        self.cache_manager = cache_manager
+        self.base_url = base_url
+        self.project_id = project_id
+        self.prompt_manager = prompt_manager
+        self.refresh = refresh and prompt_manager is not None
+        self.on_event = on_event
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.last_event_id: Optional[str] = None
+        self.events_received = 0
+        self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=read_timeout))
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def endpoint(self) -> str:
+        return f"/v1/client/projects/{self.project_id}/updates"
+
+    def is_running(self) -> bool:
+        """Check if the subscriber task is running"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start consuming updates in the background"""
+        if not self.is_running():
+            self._task = asyncio.create_task(self.run())
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        """Wait until the stream has been established"""
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    async def stop(self) -> None:
+        """Stop consuming updates and close the HTTP client"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+    async def run(self) -> None:
+        """Consume the stream, reconnecting with backoff and resuming from the last event"""
+        delay = self.reconnect_delay
+        while True:
+            try:
+                await self._consume()
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except (AuthenticationError, AuthorizationError) as e:
+                logger.error("Prompt update stream rejected", project_id=self.project_id, error=str(e))
+                return
+            except Exception as e:
+                logger.warning("Prompt update stream interrupted", project_id=self.project_id, error=str(e))
+            finally:
+                self._connected.clear()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _consume(self) -> None:
+        """Read one stream connection until it ends"""
+        headers = await self.auth_manager.get_auth_headers(self.endpoint, "GET")
+        headers = {**headers, "Accept": "text/event-stream"}
+        if self.last_event_id:
+            headers["Last-Event-ID"] = self.last_event_id
+
+        async with self._client.stream("GET", f"{self.base_url}{self.endpoint}", headers=headers) as response:
+            if response.status_code == 401:
+                raise AuthenticationError("Prompt update stream authentication failed")
+            elif response.status_code == 403:
+                raise AuthorizationError(f"No access to project: {self.project_id}")
+            elif response.status_code >= 400:
+                raise httpx.HTTPStatusError(
+                    f"Prompt update stream failed: {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
+
+            self._connected.set()
+            logger.info("Prompt update stream connected", project_id=self.project_id, resumed_from=self.last_event_id)
+
+            event_type, event_id, data_lines = "message", None, []
+            async for line in response.aiter_lines():
+                if line == "":
+                    if data_lines:
+                        await self._dispatch(event_type, event_id, "\n".join(data_lines))
+                    event_type, event_id, data_lines = "message", None, []
+                    continue
+                if line.startswith(":"):
+                    continue  # heartbeat comment
+
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event_type = value
+                elif field == "id":
+                    event_id = value
+                elif field == "data":
+                    data_lines.append(value)
+                elif field == "retry" and value.isdigit():
+                    self.reconnect_delay = int(value) / 1000
+
+    async def _dispatch(self, event_type: str, event_id: Optional[str], raw_data: str) -> None:
+        try:
+            data = json.loads(raw_data)
+        except ValueError:
+            logger.warning("Malformed prompt update event", event_type=event_type)
+            return
+
+        await self.handle_event(event_type, data)
+        # Only advance the resume token once the event has been applied
+        if event_id:
+            self.last_event_id = event_id
+        self.events_received += 1
+
+        if self.on_event:
+            result = self.on_event(event_type, data)
+            if inspect.isawaitable(result):
+                await result
+
+    async def handle_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Apply a stream event to the cache
+
+        Args:
+            event_type: SSE event type (`prompt_update`, `reset` or `ready`)
+            data: Event payload
+        """
+        if event_type == "reset":
+            # Updates were missed - nothing cached can be trusted
+            await self.cache_manager.delete_prefix("prompt:")
+            await self.cache_manager.delete_prefix("render:")
+            logger.info("Prompt cache reset from update stream", project_id=self.project_id, reason=data.get("reason"))
+            return
+
+        if event_type != "prompt_update":
+            return
+
+        prompt_id = data.get("prompt_id")
+        base_prompt_id = data.get("base_prompt_id") or prompt_id
+        if not prompt_id:
+            return
+
+        for key in {base_prompt_id, prompt_id}:
+            await self.cache_manager.delete_prefix(f"prompt:{key}:")
+            await self.cache_manager.delete_prefix(f"render:{key}:")
+
+        logger.debug(
+            "Prompt cache invalidated from update stream",
+            prompt_id=prompt_id, version=data.get("version"), action=data.get("action")
+        )
+
+        if self.refresh:
+            try:
+                await self.prompt_manager.get_prompt(base_prompt_id, project_id=self.project_id)
+            except PromptNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning("Prompt refresh after update failed", prompt_id=base_prompt_id, error=str(e))
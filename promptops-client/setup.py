@@ -51,6 +51,8 @@ setup(
             "opentelemetry-api>=1.21.0",
             "opentelemetry-sdk>=1.21.0",
         ],
+        "stats": ["numpy>=1.24.0"],
+        "msgpack": ["msgpack>=1.0.0"],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,75 @@
+"""
+Benchmarks for the memory tier of the cache manager
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from promptops.cache import CacheManager
+from promptops.models import CacheConfig, CacheLevel
+
+
+class ScanEvictionCache:
+    """The previous memory tier: a dict that scans every entry to pick each eviction"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = {}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or datetime.utcnow() > entry["expires_at"]:
+            return None
+        return entry["value"]
+
+    def set(self, key, value, ttl):
+        if len(self.entries) >= self.max_size:
+            oldest = min(self.entries, key=lambda k: self.entries[k]["expires_at"])
+            del self.entries[oldest]
+        self.entries[key] = {"value": value, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)}
+
+
+class TestMemoryCacheBenchmarks:
+    """Get and evicting set throughput of a full memory tier at increasing scale"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**4, 10**5, 10**6])
+    def test_get_and_set(self, count):
+        """Benchmark reads of every entry, then writes that each evict one entry"""
+        cache = CacheManager(CacheConfig(level=CacheLevel.MEMORY, ttl=300, max_size=count))
+        keys = [f"prompt:{i}" for i in range(count)]
+        asyncio.run(cache.set_many({key: key for key in keys}))
+
+        started = time.perf_counter()
+        for key in keys:
+            cache._get_memory(key)
+        get_us = (time.perf_counter() - started) / count * 1e6
+
+        started = time.perf_counter()
+        for i in range(count):
+            cache._set_memory(f"new:{i}", i)
+        set_us = (time.perf_counter() - started) / count * 1e6
+
+        stats = cache.get_stats()
+        assert stats.size == count
+        assert stats.evictions == count
+
+        line = f"\n{count:>9,} entries: get {get_us:.2f} us, evicting set {set_us:.2f} us"
+
+        # The scanning tier is O(n) per eviction, so sample a few hundred writes
+        if count <= 10**5:
+            previous = ScanEvictionCache(count)
+            for key in keys:
+                previous.set(key, key, 300)
+            samples = 200
+            started = time.perf_counter()
+            for i in range(samples):
+                previous.set(f"new:{i}", i, 300)
+            previous_us = (time.perf_counter() - started) / samples * 1e6
+            line += f" (scanning eviction {previous_us:.0f} us)"
+            assert set_us < previous_us
+
+        print(line)
@@ -0,0 +1,101 @@
+"""
+Benchmarks for dashboard history: appends, time-range queries and push size
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from promptops.performance import MetricType, PerformanceConfig, PerformanceMonitor
+from promptops.performance.dashboard import PerformanceDashboard
+from promptops.performance.timeseries import TimeSeriesStore
+
+
+class PreviousHistory:
+    """The previous storage: a list of dicts per metric, trimmed by slicing and filtered by parsing every timestamp"""
+
+    def __init__(self):
+        self.historical_data = {}
+
+    def add(self, metric_type, timestamp, value, tags=None):
+        points = self.historical_data.setdefault(metric_type, [])
+        points.append({"timestamp": timestamp.isoformat(), "value": value, "tags": tags or {}})
+        if len(points) > 1000:
+            self.historical_data[metric_type] = points[-1000:]
+
+    def query(self, metric_type, start_time=None, end_time=None):
+        filtered = []
+        for point in self.historical_data.get(metric_type, []):
+            point_time = datetime.fromisoformat(point["timestamp"])
+            if start_time and point_time < start_time:
+                continue
+            if end_time and point_time > end_time:
+                continue
+            filtered.append(point)
+        return filtered
+
+
+def measure(history, count: int):
+    """Add a point per second for `count` seconds, then read back the last five minutes"""
+    origin = datetime(2024, 1, 1)
+    timestamps = [origin + timedelta(seconds=i) for i in range(count)]
+
+    started = time.perf_counter()
+    for i, timestamp in enumerate(timestamps):
+        history.add(MetricType.MEMORY_USAGE, timestamp, float(i))
+    add_cost = (time.perf_counter() - started) / count
+
+    window_start = timestamps[-1] - timedelta(minutes=5)
+    queries = 200
+    started = time.perf_counter()
+    for _ in range(queries):
+        points = history.query(MetricType.MEMORY_USAGE, window_start)
+    query_cost = (time.perf_counter() - started) / queries
+    assert len(points) == 301
+
+    oldest = history.query(MetricType.MEMORY_USAGE, origin)[0]["timestamp"]
+    covered = timestamps[-1] - datetime.fromisoformat(oldest)
+    return add_cost, query_cost, covered
+
+
+async def push_sizes(updates: int):
+    """Bytes sent to a subscriber for its first update and for each update after it"""
+    dashboard = PerformanceDashboard(PerformanceMonitor(PerformanceConfig(enabled=False)))
+    payloads = []
+    dashboard.subscribe(payloads.append)
+    for _ in range(updates):
+        await dashboard._update_dashboards()
+        await asyncio.sleep(0.001)
+    sizes = [len(json.dumps(payload, default=str)) for payload in payloads]
+    return sizes[0], sum(sizes[1:]) / (len(sizes) - 1)
+
+
+class TestDashboardBenchmarks:
+    """History append and time-range query cost, and WebSocket push size"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**3, 10**4, 10**5])
+    def test_history_queries(self, count):
+        """Benchmark a five-minute range query after `count` seconds of history"""
+        results = {"before": measure(PreviousHistory(), count), "after": measure(TimeSeriesStore(), count)}
+
+        print(f"\n{count:>7} points")
+        for name, (add_cost, query_cost, covered) in results.items():
+            print(
+                f"  {name:>6}: add {add_cost * 1e6:6.2f}us, last 5 min query {query_cost * 1e3:7.3f}ms, "
+                f"history reaches back {covered}"
+            )
+        before, after = results["before"], results["after"]
+        assert after[1] < before[1]
+        assert after[2] >= before[2]
+
+    @pytest.mark.benchmark
+    def test_push_size(self):
+        """Benchmark the bytes pushed per update once a subscriber has its first update"""
+        first, later = asyncio.run(push_sizes(20))
+
+        print(f"\n  first update {first:,} bytes, later updates {later:,.0f} bytes each")
+        assert later < first / 2
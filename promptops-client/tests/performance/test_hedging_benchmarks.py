@@ -0,0 +1,99 @@
+"""
+Tail latency of hedged requests against a stub server with injected slow responses
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from promptops.performance.adaptive_retry import AdaptiveRetryConfig, AdaptiveRetryManager
+
+FAST_DELAY = 0.005
+SLOW_DELAY = 0.3
+SLOW_EVERY = 20
+
+
+class SlowTailHandler(BaseHTTPRequestHandler):
+    """Answers quickly, except every SLOW_EVERY-th request which stalls"""
+
+    counter = itertools.count(1)
+
+    def do_GET(self):
+        slow = next(self.counter) % SLOW_EVERY == 0
+        time.sleep(SLOW_DELAY if slow else FAST_DELAY)
+        body = b'{"content": "Hello"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def run_requests(url: str, hedging: bool, count: int, concurrency: int):
+    """Issue requests through the retry manager and return each call's latency"""
+    manager = AdaptiveRetryManager(AdaptiveRetryConfig(enable_hedging=hedging, hedge_min_samples=20))
+    latencies = []
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency * 2)) as client:
+        async def fetch():
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.json()
+
+        async def worker(calls: int):
+            for _ in range(calls):
+                started = time.perf_counter()
+                outcome = await manager.execute_with_retry(fetch, "get_prompt")
+                assert outcome.success
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker(count // concurrency) for _ in range(concurrency)))
+
+    latencies.sort()
+    return latencies, manager.hedges_sent
+
+
+def percentile(ordered, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class TestHedgingBenchmarks:
+    """p50/p99 latency with and without hedging"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [400])
+    def test_hedging_tail_latency(self, count):
+        """Benchmark 5% slow responses with and without hedging"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SlowTailHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/client/prompts/greeting"
+
+        try:
+            results = {
+                name: asyncio.run(run_requests(url, hedging, count, concurrency=4))
+                for name, hedging in (("plain", False), ("hedged", True))
+            }
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        print(f"\n{count} requests, every {SLOW_EVERY}th stalls {SLOW_DELAY * 1e3:.0f}ms")
+        for name, (latencies, hedges) in results.items():
+            print(
+                f"  {name:>6}: p50 {percentile(latencies, 0.5) * 1e3:7.1f}ms, "
+                f"p99 {percentile(latencies, 0.99) * 1e3:7.1f}ms, {hedges} hedges "
+                f"({hedges / count:.1%} extra load)"
+            )
+        plain, hedged = results["plain"][0], results["hedged"][0]
+        assert percentile(hedged, 0.99) < percentile(plain, 0.99) / 2
+        # The retry budget caps hedges at a tenth of calls plus the burst
+        assert results["hedged"][1] <= count * 0.1 + 10
@@ -0,0 +1,103 @@
+"""
+Benchmarks for PerformanceMonitor overhead as traffic grows
+"""
+
+import statistics
+import time
+from datetime import datetime
+
+import psutil
+import pytest
+
+from promptops.performance import MetricType, PerformanceConfig, PerformanceMonitor
+
+
+class PreviousPerformanceMonitor(PerformanceMonitor):
+    """The previous metrics core: raw samples in time series, alert checks scanning recent requests"""
+
+    def track_request_end(self, request_id, status_code, cache_hit=False, retry_count=0,
+                          bytes_sent=0, bytes_received=0, error=None):
+        with self._lock:
+            request = self._current_requests.pop(request_id)
+            request.finish(status_code, error)
+            request.cache_hit = cache_hit
+            self._completed_requests.append(request)
+            self.cache_metrics.update_hit(request.duration or 0)
+            if request.duration:
+                self._append_time_series_point(MetricType.REQUEST_LATENCY, request.duration, {
+                    "endpoint": request.endpoint,
+                    "method": request.method,
+                    "status_code": str(request.status_code)
+                })
+            self._check_alerts()
+
+    def _get_metric_value(self, metric_type):
+        if metric_type in (MetricType.REQUEST_LATENCY, MetricType.ERROR_RATE):
+            now = datetime.utcnow()
+            recent = [r for r in self._completed_requests
+                      if (now - (r.end_time or now)).total_seconds() < 300]
+            if recent:
+                return statistics.mean(r.duration or 0 for r in recent)
+            return None
+        return super()._get_metric_value(metric_type)
+
+    def get_statistics(self, metric_type, window_minutes=60):
+        with self._lock:
+            if metric_type not in self._time_series:
+                return {}
+            return self._time_series[metric_type].get_statistics(window_minutes)
+
+    def _update_system_metrics(self):
+        self.system_metrics["cpu_percent"] = psutil.cpu_percent(interval=1)
+
+
+def measure(monitor_class, count: int):
+    monitor = monitor_class(PerformanceConfig(enabled=False, time_series_max_points=count))
+    monitor._enabled = True
+    request_ids = [monitor.track_request_start("/v1/client/prompts/greeting", "GET") for _ in range(count)]
+
+    started = time.perf_counter()
+    for request_id in request_ids:
+        monitor.track_request_end(request_id, status_code=200, cache_hit=True)
+    per_request = (time.perf_counter() - started) / count
+
+    # Latency state kept: raw points before, histogram buckets after
+    if monitor._histograms:
+        retained = monitor._histograms[MetricType.REQUEST_LATENCY].snapshot().bucket_count
+    else:
+        retained = len(monitor._time_series[MetricType.REQUEST_LATENCY].data_points)
+
+    started = time.perf_counter()
+    stats = monitor.get_statistics(MetricType.REQUEST_LATENCY)
+    read = time.perf_counter() - started
+    assert stats["count"] == count
+
+    started = time.perf_counter()
+    monitor._update_system_metrics()
+    sample = time.perf_counter() - started
+    return per_request, retained, read, sample
+
+
+class TestPerformanceMonitorBenchmarks:
+    """Per-request cost, retained latency state, percentile reads and system sampling, before and after"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**3, 10**4])
+    def test_request_overhead(self, count):
+        """Benchmark completing requests with latency recording and alert checks"""
+        results = {
+            "before": measure(PreviousPerformanceMonitor, count),
+            "after": measure(PerformanceMonitor, count)
+        }
+
+        print(f"\n{count:>7} requests")
+        for name, (per_request, retained, read, sample) in results.items():
+            print(
+                f"  {name:>6}: {per_request * 1e6:8.1f}us/request, {retained:>6} latency entries kept, "
+                f"percentiles in {read * 1e3:7.2f}ms, system sample {sample * 1e3:7.1f}ms"
+            )
+        before, after = results["before"], results["after"]
+        assert after[0] < before[0]
+        assert after[1] < before[1]
+        assert after[2] < 0.05
+        assert after[3] < 0.5
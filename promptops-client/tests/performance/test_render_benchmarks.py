@@ -0,0 +1,64 @@
+"""
+Benchmarks for compiled prompt rendering
+"""
+
+import re
+import time
+
+import pytest
+
+from promptops.rendering import TemplateCache
+
+
+def replace_render(content, variables):
+    """The previous renderer: one replace per variable, then a scan for leftovers"""
+    for key, value in variables.items():
+        placeholder = f"{{{key}}}"
+        if placeholder in content:
+            content = content.replace(placeholder, str(value))
+    remaining_vars = re.findall(r'\{([^}]+)\}', content)
+    if [var for var in remaining_vars if var not in variables]:
+        raise ValueError("Missing required variables")
+    return content
+
+
+def make_template(size: int, placeholders: int):
+    """A template of roughly `size` characters with placeholders spread through it"""
+    names = [f"var_{i}" for i in range(placeholders)]
+    filler = "Answer the customer politely and cite the policy section. " * max(1, size // (60 * placeholders))
+    content = "".join(f"{filler}{{{name}}} " for name in names)
+    return content, {name: f"value {i}" for i, name in enumerate(names)}
+
+
+class TestRenderBenchmarks:
+    """Renders per second of replace-based and compiled rendering"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("size,placeholders", [(500, 5), (5000, 20), (50000, 50)])
+    def test_renders_per_second(self, size, placeholders):
+        """Benchmark repeated renders of one template with fixed variables"""
+        content, variables = make_template(size, placeholders)
+        templates = TemplateCache()
+        renders = max(200, 200000 // size)
+
+        started = time.perf_counter()
+        for _ in range(renders):
+            expected = replace_render(content, variables)
+        replace_rate = renders / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(renders):
+            template = templates.compile(content)
+            if template.missing(variables):
+                raise ValueError("Missing required variables")
+            rendered = template.render(variables)
+        compiled_rate = renders / (time.perf_counter() - started)
+
+        assert rendered == expected
+        print(
+            f"\n{len(content):>6} chars, {placeholders:>2} placeholders: replace {replace_rate:,.0f}/s, "
+            f"compiled {compiled_rate:,.0f}/s ({compiled_rate / replace_rate:.1f}x)"
+        )
+        # Short templates with few placeholders render at about the same rate either way
+        if placeholders >= 20:
+            assert compiled_rate > replace_rate
@@ -0,0 +1,84 @@
+"""
+Benchmarks for smart cache storage: size accounting and compression
+"""
+
+import asyncio
+import time
+import tracemalloc
+import zlib
+
+import pytest
+
+from promptops.performance.smart_cache import SmartCacheConfig, SmartCacheManager
+
+
+class PreviousSmartCache(SmartCacheManager):
+    """The previous storage: sums every entry per set and keeps compressed payloads as latin-1 text"""
+
+    async def _ensure_space(self, required_bytes: int) -> None:
+        sum(item.size_bytes for item in self.cache.values())
+        await super()._ensure_space(required_bytes)
+
+    def _assign_tier(self, item) -> None:
+        sum(self.access_frequency.values())
+        super()._assign_tier(item)
+
+    def _encode_value(self, value):
+        size_bytes = len(str(value).encode('utf-8'))
+        if self.config.enable_compression and size_bytes > self.config.compression_threshold:
+            value = zlib.compress(str(value).encode('utf-8')).decode('latin-1')
+            size_bytes = len(str(value).encode('utf-8'))
+        return value, size_bytes, None, "object"
+
+
+async def no_fetch(key):
+    return None
+
+
+def make_value(i: int) -> str:
+    """A prompt-sized value, mostly repetitive text"""
+    return f"Prompt {i}: answer the customer politely and cite the policy section. " * 40
+
+
+async def measure(cache_class, count: int):
+    cache = cache_class(
+        SmartCacheConfig(max_size=count * 2, max_memory_bytes=1 << 40, enable_prefetching=False,
+                         enable_pattern_analysis=False),
+        no_fetch
+    )
+    values = [make_value(i) for i in range(count)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i, value in enumerate(values):
+        await cache.set(f"prompt:{i}", value)
+    set_latency = (time.perf_counter() - started) / count
+    memory_per_entry = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+
+    gets = min(count, 2000)
+    started = time.perf_counter()
+    for i in range(gets):
+        await cache.get(f"prompt:{i}")
+    get_latency = (time.perf_counter() - started) / gets
+    return set_latency, get_latency, memory_per_entry
+
+
+class TestSmartCacheBenchmarks:
+    """Memory per entry and get/set latency of the previous and current storage"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**3, 10**4])
+    def test_storage(self, count):
+        """Benchmark filling the cache with compressible prompts, then reading some back"""
+        before = asyncio.run(measure(PreviousSmartCache, count))
+        after = asyncio.run(measure(SmartCacheManager, count))
+
+        print(f"\n{count:>6} entries")
+        for name, (set_latency, get_latency, memory) in (("before", before), ("after", after)):
+            print(
+                f"  {name:>6}: set {set_latency * 1e6:8.1f}us, get {get_latency * 1e6:8.1f}us, "
+                f"{memory / 1024:6.2f}KB/entry"
+            )
+        assert after[2] < before[2]
+        assert after[0] < before[0]
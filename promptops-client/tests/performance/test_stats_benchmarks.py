@@ -0,0 +1,56 @@
+"""
+Benchmarks for the A/B testing statistics backends
+"""
+
+import time
+
+import pytest
+
+from promptops.ab_testing.stats import NumpyStatsBackend, PythonStatsBackend
+
+np = pytest.importorskip("numpy")
+
+
+def make_events(count: int):
+    """Columnar synthetic events across three variants"""
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, 3, size=count)
+    variant_ids = np.array(["control", "treatment_a", "treatment_b"])[codes]
+    converted = rng.random(count) < np.array([0.10, 0.11, 0.12])[codes]
+    values = np.where(converted, rng.uniform(5, 15, size=count), np.nan)
+    return variant_ids, converted, values
+
+
+class TestStatisticsBackendBenchmarks:
+    """Pure-Python and vectorized ingest plus analysis at increasing scale"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**4, 10**6, 10**7])
+    def test_ingest_and_analyze(self, count):
+        """Benchmark ingesting events in 10 batches and analyzing after each"""
+        variant_ids, converted, values = make_events(count)
+        batches = np.array_split(np.arange(count), 10)
+        timings = {}
+
+        for backend in (PythonStatsBackend(), NumpyStatsBackend()):
+            if isinstance(backend, PythonStatsBackend):
+                columns = (variant_ids.tolist(), converted.tolist(), [None if v != v else v for v in values.tolist()])
+                slices = [tuple(column[batch[0]:batch[-1] + 1] for column in columns) for batch in batches]
+            else:
+                slices = [(variant_ids[batch], converted[batch], values[batch]) for batch in batches]
+
+            started = time.perf_counter()
+            for batch in slices:
+                backend.add_events(*batch)
+                analysis = backend.analyze("control")
+                backend.sequential_test("control", "treatment_b")
+            timings[backend.name] = time.perf_counter() - started
+
+            assert analysis["events"] == count
+
+        print(
+            f"\n{count:>10,} events: python {timings['python'] * 1000:.0f} ms, "
+            f"numpy {timings['numpy'] * 1000:.0f} ms ({timings['python'] / timings['numpy']:.1f}x)"
+        )
+        if count >= 10**6:
+            assert timings["numpy"] < timings["python"]
@@ -0,0 +1,88 @@
+"""
+Benchmarks for the caller's path of telemetry tracking
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from promptops.models import TelemetryConfig, TelemetryEvent
+from promptops.telemetry import TelemetryManager
+
+
+class AcceptingHandler(BaseHTTPRequestHandler):
+    """Accepts every usage batch"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def model_track(events, session_id, event_type, properties, measurements):
+    """The previous caller's path: build a telemetry model per event"""
+    events.append(TelemetryEvent(
+        event_type=event_type,
+        timestamp=datetime.utcnow(),
+        session_id=session_id,
+        properties=properties or {},
+        measurements=measurements or {}
+    ))
+
+
+async def track_and_close(manager, count, properties, measurements):
+    """Track events without yielding to the loop, then let the exporter ship them"""
+    started = time.perf_counter()
+    for _ in range(count):
+        manager.track_event("prompt_usage", properties, measurements)
+    track_cost = (time.perf_counter() - started) / count
+
+    started = time.perf_counter()
+    await manager.close()
+    return track_cost, (time.perf_counter() - started) / count
+
+
+class TestTelemetryBenchmarks:
+    """Per-event cost of tracking, and of exporting afterwards"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("count", [10**4, 10**5])
+    def test_track_event_overhead(self, count):
+        """Benchmark track_event against building a model per event"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), AcceptingHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        properties = {"prompt_id": "greeting", "version": "1.0.0"}
+        measurements = {"duration_ms": 12.0}
+
+        try:
+            events = []
+            started = time.perf_counter()
+            for _ in range(count):
+                model_track(events, "session", "prompt_usage", properties, measurements)
+            model_cost = (time.perf_counter() - started) / count
+            # Keep the collector from walking the models while tracking is timed
+            del events
+
+            manager = TelemetryManager(TelemetryConfig(batch_size=1000, max_buffer_size=count))
+            manager.attach(f"http://127.0.0.1:{server.server_address[1]}")
+            track_cost, export_cost = asyncio.run(track_and_close(manager, count, properties, measurements))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert manager.delivered == count
+        print(
+            f"\n{count:>7} events: model {model_cost * 1e6:.2f}us/event, "
+            f"track {track_cost * 1e6:.2f}us/event ({model_cost / track_cost:.1f}x), "
+            f"export {export_cost * 1e6:.2f}us/event off the caller's path"
+        )
+        assert track_cost < model_cost
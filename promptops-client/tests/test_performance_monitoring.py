@@ -5,7 +5,7 @@ Comprehensive tests for performance monitoring components
 import pytest
 import asyncio
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, AsyncMock
 from typing import Dict, Any
 
@@ -40,8 +40,13 @@ from promptops.performance.smart_cache import (
     CacheStrategy,
     CacheTier
 )
+from promptops.performance.codecs import CodecSelector, get_codec
+from promptops.performance.histogram import LogHistogram, WindowedHistogram
+from promptops.performance.timeseries import TimeSeriesStore
+from promptops.performance.dashboard import PerformanceDashboard
 from promptops.performance.connection_pool import (
     ConnectionPool,
+    HealthStatus,
     PoolConfig,
     PoolStrategy,
     PoolMetrics
@@ -249,6 +254,177 @@ class TestPerformanceMonitor:
         assert "memory_usage_mb" in summary
         assert isinstance(summary["timestamp"], str)  # Returns ISO format string
 
+    def test_request_latency_percentiles(self, performance_monitor):
+        """Test request latencies land in a histogram with percentiles within its accuracy"""
+        for i in range(1, 1001):
+            performance_monitor._histogram(MetricType.REQUEST_LATENCY).record(i / 1000)
+
+        stats = performance_monitor.get_statistics(MetricType.REQUEST_LATENCY)
+
+        assert stats["count"] == 1000
+        assert stats["p95"] == pytest.approx(0.95, rel=0.02)
+        assert stats["p99"] == pytest.approx(0.99, rel=0.02)
+        assert performance_monitor._get_metric_value(MetricType.REQUEST_LATENCY) == pytest.approx(0.5005)
+
+    def test_error_rate_from_histogram(self, performance_monitor):
+        """Test the error rate is the mean of recorded outcomes"""
+        for i in range(10):
+            request_id = performance_monitor.track_request_start("/api/test", "GET")
+            performance_monitor.track_request_end(request_id, status_code=500 if i < 3 else 200)
+
+        assert performance_monitor._get_metric_value(MetricType.ERROR_RATE) == pytest.approx(0.3)
+
+    def test_system_metrics_do_not_block(self, performance_monitor):
+        """Test system sampling reads CPU deltas instead of waiting for an interval"""
+        started = time.perf_counter()
+        performance_monitor._update_system_metrics()
+        performance_monitor._update_system_metrics()
+
+        assert time.perf_counter() - started < 0.5
+        assert "cpu_percent" in performance_monitor.system_metrics
+        assert "bytes_sent_per_sec" in performance_monitor.system_metrics
+
+
+class TestLogHistogram:
+    """Test cases for the log-bucketed histograms"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test quantiles of a wide distribution stay within the configured error"""
+        histogram = LogHistogram(relative_accuracy=0.01)
+        values = [1.0001 ** i for i in range(100000)]
+        for value in values:
+            histogram.add(value)
+
+        for q in (0.5, 0.9, 0.99, 0.999):
+            exact = values[int(q * (len(values) - 1))]
+            assert histogram.quantile(q) == pytest.approx(exact, rel=0.01)
+        assert histogram.bucket_count < 1000
+
+    def test_merge_matches_single_histogram(self):
+        """Test merging two histograms equals recording everything in one"""
+        combined, left, right = LogHistogram(), LogHistogram(), LogHistogram()
+        for i in range(1, 2001):
+            combined.add(i / 100)
+            (left if i % 2 else right).add(i / 100)
+
+        left.merge(right)
+
+        assert left.get_statistics() == pytest.approx(combined.get_statistics())
+        with pytest.raises(ValueError):
+            left.merge(LogHistogram(relative_accuracy=0.05))
+
+    def test_bucket_limit_keeps_the_tail(self):
+        """Test the lowest buckets collapse once the limit is reached"""
+        histogram = LogHistogram(relative_accuracy=0.01, max_buckets=100)
+        for i in range(1, 10001):
+            histogram.add(i / 1000)
+
+        assert histogram.bucket_count == 100
+        assert histogram.quantile(0.99) == pytest.approx(9.9, rel=0.01)
+        assert histogram.count == 10000
+
+    def test_windowed_histogram_merges_threads(self):
+        """Test values recorded from several threads all appear in the snapshot"""
+        import threading
+
+        histogram = WindowedHistogram(window_seconds=60, slot_seconds=10)
+
+        def record():
+            for i in range(1000):
+                histogram.record(i + 1)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snapshot = histogram.snapshot()
+        assert snapshot.count == 4000
+        assert snapshot.max == 1000
+
+
+class TestTimeSeriesStore:
+    """Test cases for the dashboard's time-series store"""
+
+    def test_raw_ring_keeps_latest_points(self):
+        """Test the raw ring overwrites the oldest points and range queries bisect it"""
+        store = TimeSeriesStore(raw_capacity=100)
+        start = datetime(2024, 1, 1)
+        for i in range(250):
+            store.add(MetricType.MEMORY_USAGE, start + timedelta(seconds=i), float(i))
+
+        points = store.query(MetricType.MEMORY_USAGE, resolution="raw")
+        assert len(points) == 100
+        assert points[0]["value"] == 150.0
+
+        window = store.query(
+            MetricType.MEMORY_USAGE,
+            start + timedelta(seconds=200),
+            start + timedelta(seconds=209),
+            resolution="raw"
+        )
+        assert [p["value"] for p in window] == [float(i) for i in range(200, 210)]
+
+    def test_rollups_cover_evicted_history(self):
+        """Test older ranges fall back to minute rollups once raw points are gone"""
+        store = TimeSeriesStore(raw_capacity=60)
+        start = datetime(2024, 1, 1)
+        for i in range(600):
+            store.add(MetricType.CACHE_HIT_RATE, start + timedelta(seconds=i), float(i % 60))
+
+        points = store.query(MetricType.CACHE_HIT_RATE, start=start)
+        assert len(points) == 10
+        assert points[0]["count"] == 60
+        assert points[0]["value"] == pytest.approx(29.5)
+        assert points[0]["min"] == 0.0 and points[0]["max"] == 59.0
+
+        hourly = store.query(MetricType.CACHE_HIT_RATE, resolution="1h")
+        assert len(hourly) == 1 and hourly[0]["count"] == 600
+
+        summary = store.summary(MetricType.CACHE_HIT_RATE, start)
+        assert summary["count"] == 600
+        assert summary["mean"] == pytest.approx(29.5)
+
+    def test_since_returns_only_new_points(self):
+        """Test points after a cursor are read without the earlier ones"""
+        store = TimeSeriesStore()
+        start = datetime(2024, 1, 1)
+        for i in range(10):
+            store.add(MetricType.ERROR_RATE, start + timedelta(seconds=i), float(i))
+
+        cursor = (start + timedelta(seconds=6)).replace(tzinfo=timezone.utc).timestamp()
+        assert [p["value"] for p in store.since(MetricType.ERROR_RATE, cursor)] == [7.0, 8.0, 9.0]
+
+
+class TestPerformanceDashboard:
+    """Test cases for PerformanceDashboard updates"""
+
+    @pytest.mark.asyncio
+    async def test_subscribers_get_full_update_then_deltas(self):
+        """Test a new subscriber gets everything once and only new points afterwards"""
+        monitor = PerformanceMonitor(PerformanceConfig(enabled=False))
+        dashboard = PerformanceDashboard(monitor)
+        updates = []
+        dashboard.subscribe(updates.append)
+
+        await dashboard._update_dashboards()
+        await asyncio.sleep(0.01)
+        await dashboard._update_dashboards()
+
+        assert updates[0]["type"] == "dashboard_update"
+        assert "dashboards" in updates[0]
+        assert len(updates[0]["history"][MetricType.MEMORY_USAGE.value]) == 1
+
+        delta = updates[1]
+        assert delta["type"] == "dashboard_delta"
+        assert "dashboards" not in delta
+        assert len(delta["points"][MetricType.MEMORY_USAGE.value]) == 1
+        assert delta["points"][MetricType.MEMORY_USAGE.value][0]["timestamp"] == delta["timestamp"]
+
+        dashboard.unsubscribe(updates.append)
+        assert not dashboard._subscriber_cursors
+
 
 class TestAdaptiveRetryManager:
     """Test cases for AdaptiveRetryManager"""
@@ -387,6 +563,88 @@ class TestAdaptiveRetryManager:
         assert len(recommendations) > 0
         assert any("Low success rate" in rec["title"] for rec in recommendations)
 
+    @pytest.mark.asyncio
+    async def test_hedge_after_p95_first_response_wins(self):
+        """Test a slow attempt is hedged once it outlives the p95 and the loser is cancelled"""
+        manager = AdaptiveRetryManager(AdaptiveRetryConfig(enable_hedging=True, hedge_min_samples=5))
+        for _ in range(20):
+            manager._track_latency("fetch", 0.01)
+
+        calls = []
+        cancelled = []
+
+        async def fetch():
+            index = len(calls)
+            calls.append(index)
+            try:
+                await asyncio.sleep(1.0 if index == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+            return f"response {index}"
+
+        started = time.time()
+        result = await manager.execute_with_retry(fetch, "fetch")
+        await asyncio.sleep(0)
+
+        assert result.success is True
+        assert result.result == "response 1"
+        assert result.hedges == 1
+        assert result.attempts == 1
+        assert time.time() - started < 0.5
+        assert cancelled == [0]
+        assert manager.hedge_wins == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_samples(self):
+        """Test hedging waits until the operation has enough observed latencies"""
+        manager = AdaptiveRetryManager(AdaptiveRetryConfig(enable_hedging=True, hedge_min_samples=5))
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        result = await manager.execute_with_retry(fetch, "fetch")
+
+        assert result.result == "ok"
+        assert calls == 1
+        assert manager.hedges_sent == 0
+        assert len(manager.latency_trackers["fetch"].samples) == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_budget_limits_retries_and_hedges(self):
+        """Test an empty retry budget stops both retries and hedges"""
+        manager = AdaptiveRetryManager(AdaptiveRetryConfig(
+            max_attempts=3, base_delay=0.01, circuit_breaker_threshold=100, enable_hedging=True,
+            hedge_min_samples=1, retry_budget_ratio=0.1, retry_budget_burst=2.0
+        ))
+
+        async def always_failing():
+            raise Exception("Service unavailable")
+
+        outcomes = [await manager.execute_with_retry(always_failing, "outage") for _ in range(5)]
+
+        # The burst covers two retries; afterwards every call is sent once
+        assert sum(outcome.attempts for outcome in outcomes) == 7
+        assert manager.retry_budget.denied > 0
+
+        manager._track_latency("slow", 0.001)
+        calls = 0
+
+        async def slow():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        result = await manager.execute_with_retry(slow, "slow")
+        assert result.success is True
+        assert result.hedges == 0
+        assert calls == 1
+
 
 class TestSmartCacheManager:
     """Test cases for SmartCacheManager"""
@@ -432,9 +690,10 @@ class TestSmartCacheManager:
         value = await cache_manager.get("test_key")
         assert value == "test_value"
 
-        # Get non-existent value
+        # A miss reads through to the fetch function and caches the result
         value = await cache_manager.get("non_existent")
-        assert value is None
+        assert value == "value_for_non_existent"
+        assert "non_existent" in cache_manager.cache
 
     @pytest.mark.asyncio
     async def test_cache_eviction(self, cache_manager):
@@ -489,8 +748,9 @@ class TestSmartCacheManager:
     @pytest.mark.asyncio
     async def test_cache_cleanup(self, cache_manager):
         """Test cache cleanup functionality"""
-        # Set short TTL for testing
+        # Set short TTL for testing; a fixed strategy keeps adaptive tuning from raising it
         cache_manager.config.default_ttl = 0.1  # 100ms
+        cache_manager.config.strategy = CacheStrategy.LRU
 
         await cache_manager.initialize()
 
@@ -500,9 +760,15 @@ class TestSmartCacheManager:
         # Wait for expiration
         await asyncio.sleep(0.2)
 
-        # Try to get expired value
+        # Cleanup drops the expired value
+        await cache_manager._cleanup_expired_items()
+        assert "test_key" not in cache_manager.cache
+        assert cache_manager.analytics.ttl_evictions == 1
+
+        # The next read misses and fetches it again
         value = await cache_manager.get("test_key")
-        assert value is None  # Should be expired and removed
+        assert value == "value_for_test_key"
+        assert cache_manager.analytics.misses == 1
 
     @pytest.mark.asyncio
     async def test_optimization_recommendations(self, cache_manager):
@@ -532,6 +798,75 @@ class TestSmartCacheManager:
 
         assert len(cache_manager.cache) == 0
         assert len(cache_manager.access_order) == 0
+        assert cache_manager.total_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_size_totals_stay_in_step(self, cache_manager):
+        """Test running byte totals match the stored items through sets, replacements and evictions"""
+        cache_manager.config.max_size = 5
+        await cache_manager.initialize()
+
+        for i in range(12):
+            await cache_manager.set(f"key{i % 8}", "x" * (10 * i + 1))
+            if i % 3 == 0:
+                await cache_manager.get(f"key{i % 8}")
+        await cache_manager._remove_item("key3")
+
+        items = cache_manager.cache.values()
+        assert cache_manager.total_bytes == sum(item.size_bytes for item in items)
+        for tier, keys in cache_manager.tier_cache.items():
+            assert cache_manager.tier_bytes[tier] == sum(cache_manager.cache[key].size_bytes for key in keys)
+        assert cache_manager._total_accesses == sum(cache_manager.access_frequency.values())
+        assert cache_manager.get_cache_stats()["total_size_bytes"] == cache_manager.total_bytes
+
+    @pytest.mark.asyncio
+    async def test_compressed_values_round_trip(self, cache_manager):
+        """Test compressed entries are stored as bytes and read back as the original value"""
+        cache_manager.config.enable_compression = True
+        await cache_manager.initialize()
+        values = {
+            "text": "Answer the customer politely. " * 200,
+            "blob": b"\x00\x01" * 4000,
+            "record": {"id": "greeting", "content": "Hello {name}. " * 300}
+        }
+
+        for key, value in values.items():
+            await cache_manager.set(key, value)
+
+        for key, value in values.items():
+            item = cache_manager.cache[key]
+            assert item.codec == "zlib"
+            assert isinstance(item.value, bytes)
+            assert item.size_bytes == len(item.value) < len(str(value))
+            assert await cache_manager.get(key) == value
+
+    @pytest.mark.asyncio
+    async def test_incompressible_values_stored_as_is(self, cache_manager):
+        """Test values that barely compress skip compression"""
+        cache_manager.config.enable_compression = True
+        await cache_manager.initialize()
+        noise = os.urandom(8192)
+
+        await cache_manager.set("noise", noise)
+
+        item = cache_manager.cache["noise"]
+        assert item.codec is None and item.value is noise
+        assert item.size_bytes == 8192
+
+    def test_codec_selection(self):
+        """Test codec choice by compressibility and unavailable codecs"""
+        selector = CodecSelector(fast_threshold=64 * 1024)
+
+        noise = os.urandom(4096)
+        assert selector.encode(noise) == (None, noise)
+        codec, payload = selector.encode(b"prompt " * 20000)
+        assert codec == selector.fast.name
+        codec, payload = selector.encode(b"prompt " * 2000)
+        assert codec == selector.dense.name
+        assert get_codec(codec).decompress(payload) == b"prompt " * 2000
+
+        with pytest.raises(ValueError):
+            CodecSelector(preferred="brotli")
 
 
 class TestConnectionPool:
@@ -544,7 +879,7 @@ class TestConnectionPool:
             min_size=2,
             max_size=5,
             max_idle_time=300,
-            strategy=PoolStrategy.FIXED,
+            strategy=PoolStrategy.FIXED_SIZE,
             enable_health_checks=False  # Disable for testing
         )
 
@@ -577,7 +912,7 @@ class TestConnectionPool:
         # Release connection
         await connection_pool.release(connection)
         assert len(connection_pool.active_connections) == 0
-        assert len(connection_pool.idle_connections) == 1
+        assert len(connection_pool.idle_connections) == connection_pool.config.min_size
 
     @pytest.mark.asyncio
     async def test_pool_exhaustion(self, connection_pool):
@@ -632,8 +967,8 @@ class TestConnectionPool:
 
     def test_optimization_recommendations(self, connection_pool):
         """Test pool optimization recommendations"""
-        # Simulate high utilization
-        connection_pool.metrics.active_connections = 4
+        # Simulate high utilization: every connection in use
+        connection_pool.metrics.active_connections = 5
         connection_pool.metrics.total_connections = 5
 
         recommendations = connection_pool.get_optimization_recommendations()
@@ -641,6 +976,78 @@ class TestConnectionPool:
         assert len(recommendations) > 0
         assert any("High pool utilization" in rec["title"] for rec in recommendations)
 
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_order(self, connection_pool):
+        """Test released connections go to the longest-waiting acquirer"""
+        await connection_pool.initialize()
+        held = [await connection_pool.acquire() for _ in range(connection_pool.config.max_size)]
+        served = []
+
+        async def wait_turn(index):
+            session = await connection_pool.acquire(timeout=5)
+            served.append(index)
+            await connection_pool.release(session)
+
+        waiters = [asyncio.create_task(wait_turn(i)) for i in range(20)]
+        await asyncio.sleep(0.01)
+        for session in held:
+            await connection_pool.release(session)
+        await asyncio.gather(*waiters)
+
+        assert served == list(range(20))
+        assert len(connection_pool.idle_connections) == connection_pool.config.max_size
+        assert connection_pool.metrics.pending_requests == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_waiters_do_not_leak_connections(self, connection_pool):
+        """Test a connection handed to a waiter that timed out goes back to the pool"""
+        await connection_pool.initialize()
+        held = [await connection_pool.acquire() for _ in range(connection_pool.config.max_size)]
+
+        with pytest.raises(asyncio.TimeoutError):
+            await connection_pool.acquire(timeout=0.05)
+        patient = asyncio.create_task(connection_pool.acquire(timeout=5))
+        await asyncio.sleep(0)
+        await connection_pool.release(held[0])
+
+        assert await patient is held[0]
+        assert len(connection_pool.active_connections) == connection_pool.config.max_size
+
+    @pytest.mark.asyncio
+    async def test_removed_connection_frees_slot_for_waiter(self, connection_pool):
+        """Test an unhealthy connection dropped on release lets a waiter create a new one"""
+        await connection_pool.initialize()
+        held = [await connection_pool.acquire() for _ in range(connection_pool.config.max_size)]
+        waiter = asyncio.create_task(connection_pool.acquire(timeout=5))
+        await asyncio.sleep(0)
+
+        connection_id = connection_pool._find_connection_id(held[0])
+        connection_pool.connections[connection_id][1].health_status = HealthStatus.UNHEALTHY
+        await connection_pool.release(held[0])
+
+        session = await waiter
+        assert session is not held[0]
+        assert connection_id not in connection_pool.connections
+        assert len(connection_pool.connections) == connection_pool.config.max_size
+
+    @pytest.mark.asyncio
+    async def test_default_sessions_share_connector(self):
+        """Test sessions created by the pool share one keep-alive connector"""
+        pool = ConnectionPool(PoolConfig(min_size=2, max_size=3, limit_per_host=4, enable_health_checks=False,
+                                         auto_prune=False, enable_metrics=False, enable_adaptive_sizing=False))
+        await pool.initialize()
+        try:
+            sessions = [await pool.acquire() for _ in range(3)]
+
+            assert {id(session.connector) for session in sessions} == {id(pool.connector)}
+            assert pool.connector.limit_per_host == 4
+            for session in sessions:
+                await pool.release(session)
+        finally:
+            await pool.close()
+
+        assert all(session.closed for session in sessions)
+
 
 class TestOpenTelemetryIntegration:
     """Test cases for OpenTelemetry integration"""
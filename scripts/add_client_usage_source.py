@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Script to add the usage source column.
+SDK telemetry uploads are stored as client usage rows with source "sdk" so
+that request counts, which the server logs itself, leave them out.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+SCHEMA_STATEMENTS = [
+    "ALTER TABLE client_usage_logs ADD COLUMN IF NOT EXISTS source VARCHAR NOT NULL DEFAULT 'request'",
+    # Telemetry uploaded before the column existed used synthetic sdk:* endpoints
+    "UPDATE client_usage_logs SET source = 'sdk' WHERE endpoint LIKE 'sdk:%' AND method = 'EVENT'",
+]
+
+def add_client_usage_source():
+    """Upgrade the client_usage_logs table."""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(text(statement))
+    print("client_usage_logs.source is present")
+
+if __name__ == "__main__":
+    add_client_usage_source()
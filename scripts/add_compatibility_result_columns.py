@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script to add the typed compatibility result columns.
+Results were previously kept as a JSON blob in compatibility_notes; automated
+tests now append typed rows keyed by prompt content hash.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+SCHEMA_STATEMENTS = [
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS prompt_version VARCHAR",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS status VARCHAR",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS response_time DOUBLE PRECISION",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS quality_score DOUBLE PRECISION",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS estimated_cost DOUBLE PRECISION",
+    "ALTER TABLE model_compatibilities ADD COLUMN IF NOT EXISTS error VARCHAR",
+    "CREATE INDEX IF NOT EXISTS idx_model_compat_prompt_created ON model_compatibilities (prompt_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_model_compat_hash_provider_created ON model_compatibilities (content_hash, model_provider, created_at)",
+]
+
+def add_compatibility_result_columns():
+    """Upgrade the model_compatibilities table."""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(text(statement))
+    print("model_compatibilities result columns are present")
+
+if __name__ == "__main__":
+    add_compatibility_result_columns()
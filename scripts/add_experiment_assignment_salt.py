@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script to add the experiment assignment salt column.
+Stateless assignment hashes (experiment id, salt, unit); existing experiments
+keep an empty salt so their buckets do not move.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+SCHEMA_STATEMENTS = [
+    "ALTER TABLE experiments ADD COLUMN IF NOT EXISTS assignment_salt VARCHAR",
+]
+
+def add_experiment_assignment_salt():
+    """Upgrade the experiments table."""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(text(statement))
+    print("experiments.assignment_salt is present")
+
+if __name__ == "__main__":
+    add_experiment_assignment_salt()
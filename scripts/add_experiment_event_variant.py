@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script to attribute experiment events to variants without assignment rows.
+Stateless assignment ids are valid before (or without) an assignment row, so
+experiment_events.assignment_id drops its foreign key and events carry the
+variant resolved at ingest. Existing events are backfilled from their
+assignments.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import engine
+
+SCHEMA_STATEMENTS = [
+    "ALTER TABLE experiment_events DROP CONSTRAINT IF EXISTS experiment_events_assignment_id_fkey",
+    "ALTER TABLE experiment_events ADD COLUMN IF NOT EXISTS variant_id VARCHAR",
+    """
+    UPDATE experiment_events AS e SET variant_id = a.variant_id
+    FROM experiment_assignments AS a
+    WHERE e.assignment_id = a.id AND e.variant_id IS NULL
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_event_experiment_variant ON experiment_events (experiment_id, variant_id)",
+]
+
+def add_experiment_event_variant():
+    """Upgrade the experiment_events table."""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(text(statement))
+    print("experiment_events.variant_id is present and backfilled")
+
+if __name__ == "__main__":
+    add_experiment_event_variant()
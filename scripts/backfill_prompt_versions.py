@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the prompt latest-version index.
+Adds the normalized semantic version columns to an existing prompts table and
+rebuilds the per-prompt latest/active version pointers.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models import Base, PromptVersionPointer
+from app.services.prompt_version_service import PromptVersionService
+
+SCHEMA_STATEMENTS = [
+    "ALTER TABLE prompts ADD COLUMN IF NOT EXISTS base_prompt_id VARCHAR",
+    "ALTER TABLE prompts ADD COLUMN IF NOT EXISTS version_major INTEGER",
+    "ALTER TABLE prompts ADD COLUMN IF NOT EXISTS version_minor INTEGER",
+    "ALTER TABLE prompts ADD COLUMN IF NOT EXISTS version_patch INTEGER",
+    "CREATE INDEX IF NOT EXISTS idx_prompt_base_semver ON prompts (base_prompt_id, version_major, version_minor, version_patch)",
+    "CREATE INDEX IF NOT EXISTS idx_prompt_module_semver ON prompts (module_id, version_major, version_minor, version_patch)",
+]
+
+def backfill_prompt_versions():
+    """Upgrade the schema and rebuild all version pointers."""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS:
+            conn.execute(text(statement))
+
+    Base.metadata.create_all(bind=engine, tables=[PromptVersionPointer.__table__])
+
+    db = SessionLocal()
+    try:
+        result = PromptVersionService(db).rebuild_index()
+        print(f"Prompts indexed: {result['prompts']}")
+        print(f"Version pointers rebuilt: {result['pointers']}")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_prompt_versions()
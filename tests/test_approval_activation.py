@@ -0,0 +1,116 @@
+"""
+Test suite for prompt activation through approval requests
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_user
+from app.database import Base, get_db
+from app.models import ApprovalRequest, Module, Project, Prompt, PromptVersionPointer, User
+from app.routers import approval_requests
+from app.services import prompt_update_stream
+from app.services.prompt_version_service import PromptVersionService
+
+def make_prompt(prompt_id: str, version: str, is_active: bool) -> Prompt:
+    """Build a prompt with every field activation requires"""
+    return Prompt(
+        id=prompt_id,
+        version=version,
+        module_id="support",
+        content=f"Content of {prompt_id}",
+        name=prompt_id,
+        created_by="author",
+        target_models=["openai"],
+        model_specific_prompts=[{"model": "openai", "content": "hi"}],
+        mas_intent="testing",
+        mas_fairness_notes="none",
+        mas_risk_level="low",
+        is_active=is_active
+    )
+
+@pytest.fixture
+def session_factory():
+    """Create a SQLite database with an active prompt and a pending request for its next version"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = SessionLocal()
+    session.add_all([
+        User(id="author", email="author@example.com", name="Author"),
+        User(id="approver", email="approver@example.com", name="Approver"),
+        Project(id="project-a", name="Project A", owner="author"),
+        Module(id="support", version="1.0.0", project_id="project-a", slot="main", render_body="")
+    ])
+    session.commit()
+
+    for prompt in (make_prompt("greeting", "1.0.0", True), make_prompt("greeting-v1.1.0", "1.1.0", False)):
+        session.add(prompt)
+        PromptVersionService(session).refresh_pointer(prompt.id)
+    session.add(ApprovalRequest(
+        id="request-1", prompt_id="greeting-v1.1.0", requested_by="author", status="pending", tenant_id="tenant"
+    ))
+    session.commit()
+    session.close()
+
+    yield SessionLocal
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def published(monkeypatch):
+    """Record prompt updates instead of writing them to Redis"""
+    events = []
+
+    async def record(prompt_id, version, action, project_id=None, module_id=None):
+        events.append({"prompt_id": prompt_id, "version": version, "action": action, "project_id": project_id})
+        return "1-1"
+
+    monkeypatch.setattr(prompt_update_stream.redis_service, "redis_client", object())
+    monkeypatch.setattr(prompt_update_stream.redis_service, "publish_prompt_update", record)
+    return events
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    """Create a test client for the approval requests router"""
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def approver_access(request_id, current_user, db):
+        return {"user_id": "approver", "tenant": "tenant", "has_approval_permissions": True,
+                "can_approve": True, "can_reject": True}
+
+    monkeypatch.setattr(approval_requests, "check_workflow_approval_permission", approver_access)
+
+    app = FastAPI()
+    app.include_router(approval_requests.router, prefix="/v1/approval-requests")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": "approver", "tenant": "tenant", "tenant_id": "tenant", "roles": ["approver"]
+    }
+    return TestClient(app)
+
+class TestApprovalActivation:
+    """Test approving a request activates the prompt for runtime lookups"""
+
+    def test_approval_moves_pointer_and_publishes(self, client, session_factory, published):
+        response = client.put("/v1/approval-requests/request-1", json={"status": "approved"})
+
+        assert response.status_code == 200
+        assert response.json()["prompt_is_active"] is True
+
+        with session_factory() as db:
+            pointer = db.get(PromptVersionPointer, "greeting")
+            assert (pointer.active_prompt_id, pointer.active_version) == ("greeting-v1.1.0", "1.1.0")
+
+        assert published == [
+            {"prompt_id": "greeting-v1.1.0", "version": "1.1.0", "action": "activate", "project_id": "project-a"}
+        ]
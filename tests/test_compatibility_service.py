@@ -0,0 +1,215 @@
+"""
+Test suite for compatibility test scheduling, result caching and history
+"""
+
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base
+from app.models import ModelCompatibility, Module, Prompt
+from app.services.compatibility_service import CompatibilityService, content_hash
+from app.services.model_service import ModelProviderService
+
+class CountingModelService(ModelProviderService):
+    """Simulated providers that record every prompt tested and the peak concurrency"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run_compatibility_tests(self, prompt, providers=None):
+        self.calls.append((prompt, providers))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().run_compatibility_tests(prompt, providers)
+        finally:
+            self.in_flight -= 1
+
+@pytest.fixture
+def Session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = Session()
+    session.add(Module(id="mod-1", version="1.0.0", project_id="project-a", slot="system",
+                       render_body=""))
+    for prompt_id, version, content in [
+        ("greeting-v1.0.0", "1.0.0", "Say hello"),
+        ("greeting-v1.1.0", "1.1.0", "Say hello warmly"),
+        ("welcome", "1.0.0", "Say hello"),
+        ("farewell", "1.0.0", "Say goodbye"),
+        ("thanks", "1.0.0", "Say thanks"),
+        ("sorry", "1.0.0", "Say sorry"),
+    ]:
+        session.add(Prompt(
+            id=prompt_id, version=version, module_id="mod-1", content=content, name=prompt_id,
+            created_by="test-user", target_models=[], model_specific_prompts=[], mas_intent="testing",
+            mas_fairness_notes="none", mas_risk_level="low"
+        ))
+    session.commit()
+    session.close()
+    return Session
+
+@pytest.fixture
+def models():
+    return CountingModelService()
+
+@pytest.fixture
+def service(Session, models):
+    return CompatibilityService(session_factory=Session, model_service=models)
+
+class TestCompatibilityScheduling:
+    """Test identical content is tested once and fresh results are reused"""
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_by_content(self, service, models):
+        first = await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        second = await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        same_content = await service.test_prompt_compatibility("welcome", "1.0.0")
+
+        assert len(models.calls) == 1
+        assert first["cached"] is False
+        assert second["cached"] is True and same_content["cached"] is True
+        assert {p: r["status"] for p, r in second["results"].items()} == \
+            {p: r["status"] for p, r in first["results"].items()}
+
+    @pytest.mark.asyncio
+    async def test_only_missing_providers_are_tested(self, service, models):
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0", providers=["openai"])
+        result = await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0", providers=["openai", "qwen"])
+
+        assert models.calls[1] == ("Say hello", ["qwen"])
+        assert set(result["results"]) == {"openai", "qwen"}
+
+    @pytest.mark.asyncio
+    async def test_force_refresh_and_expiry(self, service, models, monkeypatch):
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0", force_refresh=True)
+        assert len(models.calls) == 2
+
+        monkeypatch.setattr(settings, "compatibility_cache_ttl_hours", 0)
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        assert len(models.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_missing_prompt(self, service):
+        with pytest.raises(ValueError):
+            await service.test_prompt_compatibility("missing", "1.0.0")
+
+    @pytest.mark.asyncio
+    async def test_batch_dedupes_and_bounds_concurrency(self, service, models, monkeypatch):
+        monkeypatch.setattr(settings, "compatibility_batch_concurrency", 2)
+        batch = await service.run_batch_compatibility_tests(
+            ["greeting-v1.1.0", "welcome", "farewell", "thanks", "sorry", "missing"]
+        )
+
+        assert sorted(prompt for prompt, _ in models.calls) == [
+            "Say goodbye", "Say hello", "Say hello warmly", "Say sorry", "Say thanks"
+        ]
+        assert models.max_in_flight == 2
+        assert set(batch["results"]) == {
+            "greeting-v1.1.0@1.1.0", "welcome@1.0.0", "farewell@1.0.0", "thanks@1.0.0", "sorry@1.0.0"
+        }
+        assert batch["errors"] == {"missing": "Prompt not found"}
+        assert batch["total_prompts_tested"] == 5
+        assert batch["summary"]["provider_success_rates"]["openai"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_batch_tests_identical_content_once(self, service, models):
+        batch = await service.run_batch_compatibility_tests(
+            ["greeting-v1.0.0", "welcome"], versions=["1.0.0", "1.0.0"]
+        )
+
+        assert [prompt for prompt, _ in models.calls] == ["Say hello"]
+        assert batch["results"]["greeting-v1.0.0@1.0.0"]["results"] == batch["results"]["welcome@1.0.0"]["results"]
+
+        with service.session_factory() as db:
+            rows = db.query(ModelCompatibility).filter(ModelCompatibility.content_hash == content_hash("Say hello"))
+            assert {row.prompt_id for row in rows} == {"greeting-v1.0.0", "welcome"}
+
+    @pytest.mark.asyncio
+    async def test_batch_benchmark(self, service, models):
+        """Benchmark a batch against testing the same prompts one after another"""
+        prompt_ids = ["greeting-v1.1.0", "welcome", "farewell", "thanks", "sorry"]
+
+        started = time.perf_counter()
+        for prompt_id in prompt_ids:
+            await service.model_service.run_compatibility_tests(f"sequential {prompt_id}")
+        sequential_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        await service.run_batch_compatibility_tests(prompt_ids)
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        await service.run_batch_compatibility_tests(prompt_ids)
+        cached_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n{len(prompt_ids)} prompts: sequential {sequential_ms:.1f} ms, "
+              f"batch {batch_ms:.1f} ms, cached batch {cached_ms:.1f} ms")
+        assert batch_ms < sequential_ms
+        assert cached_ms < batch_ms
+
+class TestCompatibilityHistory:
+    """Test results are appended and aggregated for matrix, summary and trends"""
+
+    @pytest.mark.asyncio
+    async def test_history_is_kept(self, service):
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0", force_refresh=True)
+
+        with service.session_factory() as db:
+            assert db.query(ModelCompatibility).filter(ModelCompatibility.prompt_id == "greeting-v1.0.0").count() == 8
+
+        trends = await service.get_compatibility_trends("greeting-v1.0.0")
+        assert trends["data_points"] == 8
+        (day,) = trends["trends"].values()
+        assert day["openai"]["tests"] == 2
+        assert day["openai"]["status"] == "works"
+
+    @pytest.mark.asyncio
+    async def test_matrix_uses_latest_result_per_provider(self, service):
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0")
+        await service.test_prompt_compatibility("greeting-v1.0.0", "1.0.0", providers=["openai"], force_refresh=True)
+
+        matrix = await service.get_prompt_compatibility_matrix("greeting-v1.0.0")
+        with service.session_factory() as db:
+            newest = db.query(ModelCompatibility).filter(
+                ModelCompatibility.model_provider == "openai"
+            ).order_by(ModelCompatibility.created_at.desc()).first()
+        assert matrix["matrix"]["openai"]["1.0.0"]["last_tested"] == newest.created_at.isoformat()
+        assert matrix["last_updated"] == newest.created_at.isoformat()
+        assert matrix["summary"]["total_providers"] == 4
+
+        pinned = await service.get_prompt_compatibility_matrix("greeting-v1.0.0", "1.0.0")
+        assert pinned["prompt_preview"] == "Say hello"
+        assert await service.get_prompt_compatibility_matrix("greeting-v1.0.0", "2.0.0") == {
+            "error": "No compatibility data found for this prompt"
+        }
+
+    @pytest.mark.asyncio
+    async def test_project_summary(self, service):
+        await service.run_batch_compatibility_tests(["greeting-v1.0.0", "farewell"])
+
+        summary = await service.get_project_compatibility_summary("project-a")
+        assert summary["total_tests"] == 8
+        assert summary["provider_summary"]["openai"] == {"compatible": 2, "incompatible": 0}
+        assert (await service.get_project_compatibility_summary("other"))["total_tests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_project_summary_counts_latest_results(self, service):
+        await service.test_prompt_compatibility("farewell", "1.0.0")
+        time.sleep(0.01)
+        await service.test_prompt_compatibility("farewell", "1.0.0", force_refresh=True)
+
+        summary = await service.get_project_compatibility_summary("project-a")
+        assert summary["total_tests"] == 4
+        assert sum(summary["provider_summary"]["openai"].values()) == 1
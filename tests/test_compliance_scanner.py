@@ -0,0 +1,154 @@
+"""
+Test suite for the compiled compliance scanner, scan cache and batch worker pool
+"""
+
+import os
+import random
+import re
+import time
+import pytest
+
+from app.config import settings
+from app.services.compliance_service import MASComplianceService
+
+WORDS = (
+    "the assistant should answer questions about the product and help customers with their "
+    "account settings politely accurately and without speculation"
+).split()
+FLAGGED = [
+    "all users", "Personal Data", "harm", "EMAIL", "obviously", "women should", "never harm",
+    "medical records", "credit card", "every", "discriminatory", "sensitive details", "bully"
+]
+
+def make_content(rng: random.Random, size: int) -> str:
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(FLAGGED) if rng.random() < 0.01 else rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def reference_issues(service: MASComplianceService, content: str):
+    """The content checks as a separate case-insensitive re.finditer per rule"""
+    issues = []
+    for rule in service.content_rules:
+        for match in re.finditer(rule.pattern, content, re.IGNORECASE):
+            issues.append({
+                "type": rule.issue_type,
+                "field": "content",
+                "message": f"{rule.label}: '{match.group()}'",
+                "severity": rule.severity,
+                "context": content[max(0, match.start()-20):match.end()+20]
+            })
+    return issues
+
+def make_prompt(content: str, prompt_id: str = "greeting-v1.0.0"):
+    return {
+        "id": prompt_id, "version": "1.0.0", "content": content,
+        "mas_intent": "Greets customers and routes them to the right support queue for their request",
+        "mas_fairness_notes": "Reviewed for consistent tone across customer groups",
+        "mas_risk_level": "low"
+    }
+
+@pytest.fixture
+def service():
+    service = MASComplianceService()
+    yield service
+    service.close()
+
+class TestComplianceScanner:
+    """Test the single-pass scanner reports exactly what per-rule scans report"""
+
+    def test_matches_per_rule_scans(self, service):
+        rng = random.Random(3)
+        for _ in range(200):
+            content = make_content(rng, rng.randint(0, 3000))
+            assert service.scanner.issues(content) == reference_issues(service, content)
+
+    def test_overlapping_rules_all_reported(self, service):
+        issues = service.scanner.issues("Never harm anyone. All women should apply.")
+        assert [(i["type"], i["message"]) for i in issues] == [
+            ("inappropriate_language", "Potentially inappropriate language detected: 'harm'"),
+            ("bias_detected", "Potential bias indicator detected: 'Never harm'"),
+            ("bias_detected", "Potential bias indicator detected: 'All women'"),
+            ("bias_detected", "Potential bias indicator detected: 'women should'"),
+        ]
+
+    def test_text_that_changes_length_when_lowercased(self, service):
+        content = "İstanbul office: never share Personal Information or the EMAIL list"
+        assert len(content.lower()) != len(content)
+        assert service.scanner.issues(content) == reference_issues(service, content)
+
+    def test_report_unchanged(self, service):
+        report = service.generate_compliance_report(make_prompt("Collect the customer email and phone, obviously."))
+        assert report["issue_summary"] == {"total_issues": 3, "high_severity": 0, "medium_severity": 3, "low_severity": 0}
+        assert report["risk_score"] == 15.0
+        assert report["approval_status"] == "needs_review"
+
+class TestComplianceBatches:
+    """Test batches scan each distinct content once, from cache or across worker processes"""
+
+    def test_scans_are_cached_by_content(self, service, monkeypatch):
+        calls = []
+        scan = service.scanner.issues
+        monkeypatch.setattr(service.scanner, "issues", lambda content: calls.append(content) or scan(content))
+
+        content = "Never store personal data in prompts used by the assistant."
+        batch = service.batch_validate_prompts([make_prompt(content, f"p{i}") for i in range(5)])
+        service.generate_compliance_report(make_prompt(content))
+
+        assert calls == [content]
+        assert batch["total_issues"] == 10
+        assert service.scan_cache.hits == 1
+
+        # Reports never share issue dicts
+        first, second = batch["results"][0]["issues"], batch["results"][1]["issues"]
+        first[0]["message"] = "edited"
+        assert second[0]["message"] != "edited"
+
+    def test_worker_pool_matches_inline(self, service, monkeypatch):
+        rng = random.Random(5)
+        prompts = [make_prompt(make_content(rng, 2000), f"p{i}") for i in range(40)]
+        inline = MASComplianceService().get_compliance_statistics(prompts)
+
+        monkeypatch.setattr(settings, "compliance_scan_workers", 2)
+        monkeypatch.setattr(settings, "compliance_parallel_min_batch", 10)
+        pooled = service.get_compliance_statistics(prompts)
+
+        assert service._pool is not None
+        assert pooled == inline
+
+    def test_scan_benchmark(self, service, monkeypatch):
+        """Benchmark batch validation of 20KB prompts against per-rule scans.
+
+        Set COMPLIANCE_BENCH_PROMPTS=10000 for the full-size run.
+        """
+        count = int(os.environ.get("COMPLIANCE_BENCH_PROMPTS", "200"))
+        rng = random.Random(11)
+        contents = [make_content(rng, 20000) for _ in range(min(count, 200))]
+        prompts = [make_prompt(contents[i % len(contents)] + f" #{i}", f"p{i}") for i in range(count)]
+
+        started = time.perf_counter()
+        for prompt in prompts:
+            reference_issues(service, prompt["content"])
+        reference_ms = (time.perf_counter() - started) * 1000
+
+        monkeypatch.setattr(settings, "compliance_parallel_min_batch", 10**9)
+        started = time.perf_counter()
+        service.batch_validate_prompts(prompts)
+        compiled_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        service.batch_validate_prompts(prompts)
+        cached_ms = (time.perf_counter() - started) * 1000
+
+        monkeypatch.setattr(settings, "compliance_parallel_min_batch", 1)
+        service.scan_cache.clear()
+        started = time.perf_counter()
+        service.batch_validate_prompts(prompts)
+        pooled_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n{count} x 20KB prompts: per-rule scans {reference_ms:.0f} ms, compiled {compiled_ms:.0f} ms, "
+              f"cached {cached_ms:.0f} ms, worker pool {pooled_ms:.0f} ms ({os.cpu_count()} CPUs)")
+        assert compiled_ms < reference_ms
+        assert cached_ms < compiled_ms
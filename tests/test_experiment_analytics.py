@@ -0,0 +1,166 @@
+"""
+Test suite for SQL-aggregated experiment analytics
+"""
+
+import statistics
+import time
+import uuid
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Experiment, ExperimentAssignment, ExperimentEvent, EventType
+from app.services.experiment_analytics_service import (
+    ExperimentAnalyticsService, experiment_result_cache, student_t_two_sided_p,
+    two_proportion_z_test, welch_t_test, wilson_interval
+)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def make_experiment(db, experiment_id="exp-1") -> Experiment:
+    experiment = Experiment(
+        id=experiment_id, name="Greeting test", project_id="project-a", prompt_id="greeting-v1.0.0",
+        primary_metric="conversion", created_by="test-user",
+        control_variant={"id": "control", "name": "Control", "weight": 50},
+        treatment_variants=[{"id": "treatment", "name": "Treatment", "weight": 50}]
+    )
+    db.add(experiment)
+    db.commit()
+    experiment_result_cache.invalidate(experiment_id)
+    return experiment
+
+def seed(engine, experiment_id, variant_id, units, converting, values=(), response_times=()):
+    """Bulk insert assignments, one request event per unit and a conversion event per converting unit"""
+    assignments, events = [], []
+    for i in range(units):
+        assignment_id = f"{variant_id}-{i}-{uuid.uuid4().hex[:8]}"
+        assignments.append({
+            "id": assignment_id, "experiment_id": experiment_id, "session_id": assignment_id,
+            "variant_id": variant_id, "variant_name": variant_id.title(), "variant_config": {}
+        })
+        events.append({
+            "id": f"{assignment_id}-req", "experiment_id": experiment_id, "assignment_id": assignment_id,
+            "variant_id": variant_id,
+            "event_type": EventType.PROMPT_REQUEST, "event_name": "request", "session_id": assignment_id,
+            "response_time_ms": response_times[i] if i < len(response_times) else None, "conversion_value": None
+        })
+        if i < converting:
+            events.append({
+                "id": f"{assignment_id}-conv", "experiment_id": experiment_id, "assignment_id": assignment_id,
+                "variant_id": variant_id,
+                "event_type": EventType.CONVERSION, "event_name": "purchase", "session_id": assignment_id,
+                "response_time_ms": None, "conversion_value": str(values[i]) if i < len(values) else None
+            })
+    with engine.begin() as connection:
+        connection.execute(insert(ExperimentAssignment), assignments)
+        connection.execute(insert(ExperimentEvent), events)
+
+class TestStatistics:
+    """Test closed-form statistics against reference values"""
+
+    def test_wilson_interval(self):
+        lower, upper = wilson_interval(50, 100, 0.95)
+        assert lower == pytest.approx(0.40383, abs=1e-5)
+        assert upper == pytest.approx(0.59617, abs=1e-5)
+        assert wilson_interval(0, 0) == (0.0, 0.0)
+
+    def test_two_proportion_z_test(self):
+        z, p_value = two_proportion_z_test(100, 1000, 130, 1000)
+        assert z == pytest.approx(2.10274, abs=1e-4)
+        assert p_value == pytest.approx(0.03549, abs=1e-4)
+
+    def test_student_t_p_values(self):
+        assert student_t_two_sided_p(2.0, 10) == pytest.approx(0.07339, abs=1e-5)
+        assert student_t_two_sided_p(2.228, 10) == pytest.approx(0.05, abs=1e-4)
+        assert student_t_two_sided_p(1.0, 1) == pytest.approx(0.5)
+
+    def test_welch_from_sufficient_statistics(self):
+        a = [12.1, 14.3, 11.8, 13.9, 12.7, 15.2, 13.3]
+        b = [15.4, 16.1, 14.9, 17.3, 15.8, 16.6]
+        result = welch_t_test(
+            len(a), sum(a), sum(x * x for x in a),
+            len(b), sum(b), sum(x * x for x in b)
+        )
+
+        se = (statistics.variance(a) / len(a) + statistics.variance(b) / len(b)) ** 0.5
+        assert result["t"] == pytest.approx((statistics.mean(b) - statistics.mean(a)) / se)
+        assert result["p_value"] < 0.01
+
+class TestExperimentAnalyticsService:
+    """Test aggregation, significance and watermark caching"""
+
+    def test_variant_results(self, engine, db):
+        experiment = make_experiment(db)
+        seed(engine, "exp-1", "control", 1000, 100, values=[10.0] * 100, response_times=[200] * 1000)
+        seed(engine, "exp-1", "treatment", 1000, 130, values=[12.0] * 130, response_times=[180] * 1000)
+
+        analysis = ExperimentAnalyticsService(db).analyze(experiment)
+        control, treatment = analysis["variants"]["control"], analysis["variants"]["treatment"]
+
+        assert control["sample_size"] == 1000 and control["conversion_count"] == 100
+        assert control["events"] == 1100
+        assert treatment["conversion_rate"] == pytest.approx(0.13)
+        assert treatment["z_score"] == pytest.approx(2.10274, abs=1e-4)
+        assert treatment["statistical_significance"]
+        assert treatment["improvement_over_control"] == pytest.approx(0.3)
+        assert treatment["average_response_time"] == pytest.approx(180)
+        assert treatment["welch_tests"]["conversion_value"]["mean_difference"] == pytest.approx(2.0)
+        assert analysis["winning_variant"] == "treatment"
+
+    def test_cached_until_watermark_moves(self, engine, db):
+        experiment = make_experiment(db)
+        seed(engine, "exp-1", "control", 50, 5)
+        seed(engine, "exp-1", "treatment", 50, 10)
+        service = ExperimentAnalyticsService(db)
+        db.refresh(experiment)
+
+        queries = []
+        event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+        first = service.analyze(experiment)
+        assert len(queries) == 4  # two watermark reads, two aggregates
+
+        queries.clear()
+        assert service.analyze(experiment) is first
+        assert len(queries) == 2  # watermark only
+
+        db.add(ExperimentEvent(
+            id="late", experiment_id="exp-1", assignment_id=None, event_type=EventType.CUSTOM,
+            event_name="late", session_id="s"
+        ))
+        db.commit()
+        # Writes through the router invalidate explicitly, covering same-timestamp writes
+        experiment_result_cache.invalidate("exp-1")
+        assert service.analyze(experiment) is not first
+
+    def test_results_benchmark(self, engine, db):
+        """Benchmark cold aggregation and warm watermark hits over 100,000 events"""
+        experiment = make_experiment(db)
+        seed(engine, "exp-1", "control", 25000, 2500, values=[10.0] * 2500, response_times=[200] * 25000)
+        seed(engine, "exp-1", "treatment", 25000, 2750, values=[11.0] * 2750, response_times=[190] * 25000)
+        service = ExperimentAnalyticsService(db)
+
+        started = time.perf_counter()
+        analysis = service.analyze(experiment)
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(100):
+            service.analyze(experiment)
+        warm_ms = (time.perf_counter() - started) * 1000 / 100
+
+        assert analysis["variants"]["treatment"]["events"] == 27750
+        print(f"\ncold: {cold_ms:.1f} ms, warm: {warm_ms:.2f} ms (105,250 events)")
+        assert warm_ms < cold_ms
@@ -0,0 +1,236 @@
+"""
+Test suite for stateless experiment assignment and server/SDK bucketing parity
+"""
+
+import importlib.util
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base, get_db
+from app.models import Experiment, ExperimentAssignment, ExperimentStatus, TrafficAllocationStrategy
+from app.routers import ab_testing
+from app.services import experiment_assignment_service as server
+from app.services.experiment_analytics_service import ExperimentAnalyticsService
+from app.services.experiment_assignment_service import experiment_config_cache
+
+SDK_BUCKETING = Path(__file__).resolve().parents[1] / "promptops-client" / "promptops" / "ab_testing" / "bucketing.py"
+
+# (experiment_id, salt, unit, traffic_percentage, weights) -> (variant index, reason, assignment id)
+# promptops-client/promptops/tests/test_bucketing.py pins the same vectors
+GOLDEN_VECTORS = [
+    (("exp-1", "", "user-1", 100, [1, 1]), (0, "weighted_allocation", "sa_9aba7c5179438fb917d7a950c6139ea4")),
+    (("exp-1", "", "user-2", 100, [1, 1]), (1, "weighted_allocation", "sa_9b37a515fd1f76075fb99de2584bbed3")),
+    (("exp-1", "v2", "user-1", 100, [1, 1]), (1, "weighted_allocation", "sa_fbb7b7485d9b9074715598fe6edffa96")),
+    (("checkout", "", "user-42", 50, [50, 30, 20]), (2, "weighted_allocation", "sa_744075bf101c847558da23cda60b4ad9")),
+    (("checkout", "", "session-9", 50, [50, 30, 20]), (0, "weighted_allocation", "sa_645cc493baa0e46ab71d792adbfe2b5d")),
+    (("checkout", "s", "user-7", 10, [1, 1, 1]), (0, "control_fallback", "sa_803970719609dcdc85f2f510eb30ca29")),
+]
+
+@pytest.fixture(scope="module")
+def sdk():
+    """Load the SDK bucketing module on its own, without the rest of the client"""
+    spec = importlib.util.spec_from_file_location("sdk_bucketing", SDK_BUCKETING)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.add(Experiment(
+        id="exp-1", name="Greeting test", project_id="project-a", prompt_id="greeting-v1.0.0",
+        primary_metric="conversion", created_by="test-user", status=ExperimentStatus.RUNNING,
+        traffic_percentage=100, allocation_strategy=TrafficAllocationStrategy.WEIGHTED,
+        control_variant={"id": "control", "name": "Control", "weight": 50, "prompt_config": {}},
+        treatment_variants=[{"id": "treatment", "name": "Treatment", "weight": 50, "prompt_config": {"tone": "warm"}}]
+    ))
+    session.commit()
+    experiment_config_cache.invalidate()
+    yield session
+    session.close()
+    experiment_config_cache.invalidate()
+
+@pytest.fixture
+def client(engine, db):
+    app = FastAPI()
+    app.include_router(ab_testing.router, prefix="/v1")
+    Session = sessionmaker(bind=engine)
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+class TestBucketingParity:
+    """Test the server and SDK bucket identically"""
+
+    @pytest.mark.parametrize("inputs,expected", GOLDEN_VECTORS)
+    def test_golden_vectors(self, sdk, inputs, expected):
+        experiment_id, salt, unit, traffic, weights = inputs
+        for implementation in (server, sdk):
+            index, reason = implementation.choose_variant(experiment_id, salt, unit, traffic, weights)
+            assert (index, reason, implementation.stateless_assignment_id(experiment_id, salt, unit)) == expected
+
+    def test_random_inputs_agree(self, sdk):
+        rng = random.Random(7)
+        for _ in range(5000):
+            experiment_id = f"exp-{rng.randrange(50)}"
+            salt = rng.choice(["", "v2", "rerun"])
+            unit = sdk.assignment_unit(
+                rng.choice([None, f"user-{rng.randrange(10**6)}"]),
+                f"session-{rng.randrange(10**6)}",
+                rng.choice([None, f"device-{rng.randrange(10**6)}"])
+            )
+            traffic = rng.randint(1, 100)
+            weights = [rng.randint(1, 100) for _ in range(rng.randint(2, 5))]
+
+            assert server.bucket("traffic", experiment_id, salt, unit) == sdk.bucket("traffic", experiment_id, salt, unit)
+            assert server.choose_variant(experiment_id, salt, unit, traffic, weights) == \
+                sdk.choose_variant(experiment_id, salt, unit, traffic, weights)
+
+    def test_split_follows_weights_and_traffic(self):
+        counts = Counter(
+            server.choose_variant("exp-split", "", f"user-{i}", 40, [50, 30, 20]) for i in range(20000)
+        )
+        in_traffic = 20000 - counts[(0, "control_fallback")]
+
+        assert in_traffic / 20000 == pytest.approx(0.40, abs=0.02)
+        assert counts[(1, "weighted_allocation")] / in_traffic == pytest.approx(0.30, abs=0.02)
+        assert counts[(2, "weighted_allocation")] / in_traffic == pytest.approx(0.20, abs=0.02)
+
+class TestStatelessAssignmentEndpoint:
+    """Test the assign endpoint never reads assignments and audits asynchronously"""
+
+    def test_assignment_is_deterministic_and_audited(self, client, db):
+        first = client.post("/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s1", "user_id": "user-1"})
+        second = client.post("/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s2", "user_id": "user-1"})
+
+        assert first.status_code == 200
+        assert first.json()["id"] == second.json()["id"] == server.stateless_assignment_id("exp-1", "", "user-1")
+        assert first.json()["variant_id"] == second.json()["variant_id"]
+
+        rows = db.query(ExperimentAssignment).all()
+        assert [row.id for row in rows] == [first.json()["id"]]
+
+    def test_no_reads_once_config_cached(self, engine, client, monkeypatch):
+        client.post("/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "warm"})
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        monkeypatch.setattr(settings, "ab_assignment_audit", False)
+        for i in range(20):
+            client.post("/v1/ab-testing/experiments/exp-1/assign", json={"session_id": f"s{i}"})
+
+        assert statements == []
+
+    def test_events_reference_stateless_ids(self, client, db, monkeypatch):
+        monkeypatch.setattr(settings, "ab_assignment_audit", False)
+        assignment = client.post(
+            "/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s1", "user_id": "user-9"}
+        ).json()
+        event = {
+            "experiment_id": "exp-1", "assignment_id": assignment["id"], "event_type": "conversion",
+            "event_name": "purchase", "session_id": "s1", "user_id": "user-9"
+        }
+        response = client.post("/v1/ab-testing/events/batch", json=[event, {**event, "user_id": "user-10"}])
+        assert response.json() == {"accepted": 1, "rejected": [{"index": 1, "error": "Assignment not found"}]}
+        assert client.post("/v1/ab-testing/events", json=event).json()["variant_id"] == assignment["variant_id"]
+
+        # No assignment row was written, yet the events count toward the assigned variant
+        assert db.query(ExperimentAssignment).count() == 0
+        experiment = db.query(Experiment).filter(Experiment.id == "exp-1").one()
+        stats = ExperimentAnalyticsService(db).variant_statistics(experiment)
+        assert stats[assignment["variant_id"]]["sample_size"] == 1
+        assert stats[assignment["variant_id"]]["events"] == 2
+
+    def test_events_use_audited_variant(self, client, db):
+        assignment = client.post(
+            "/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s1", "user_id": "user-audit"}
+        ).json()
+
+        # Re-salting changes what the unit hashes to; the audit row still records what was served
+        db.query(Experiment).filter(Experiment.id == "exp-1").update({"assignment_salt": "v2"})
+        db.commit()
+        experiment_config_cache.invalidate()
+
+        event = {
+            "experiment_id": "exp-1", "assignment_id": assignment["id"], "event_type": "conversion",
+            "event_name": "purchase", "session_id": "s1", "user_id": "user-audit"
+        }
+        assert client.post("/v1/ab-testing/events", json=event).json()["variant_id"] == assignment["variant_id"]
+
+    def test_events_accepted_within_grace_after_stop(self, client, db, monkeypatch):
+        monkeypatch.setattr(settings, "ab_assignment_audit", False)
+        assignment = client.post(
+            "/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s1", "user_id": "user-grace"}
+        ).json()
+        event = {
+            "experiment_id": "exp-1", "assignment_id": assignment["id"], "event_type": "conversion",
+            "event_name": "purchase", "session_id": "s1", "user_id": "user-grace"
+        }
+
+        experiment = db.query(Experiment).filter(Experiment.id == "exp-1").one()
+        experiment.status = ExperimentStatus.COMPLETED
+        experiment.end_time = datetime.now(timezone.utc) - timedelta(minutes=5)
+        db.commit()
+        experiment_config_cache.invalidate()
+
+        assert client.post("/v1/ab-testing/experiments/exp-1/assign", json={"session_id": "s2"}).status_code == 404
+        assert client.post("/v1/ab-testing/events/batch", json=[event]).json() == {"accepted": 1, "rejected": []}
+
+        experiment.end_time = datetime.now(timezone.utc) - timedelta(seconds=settings.ab_event_grace_seconds + 60)
+        db.commit()
+        experiment_config_cache.invalidate()
+        assert client.post("/v1/ab-testing/events/batch", json=[event]).json()["rejected"] == [
+            {"index": 0, "error": "Assignment not found"}
+        ]
+
+    def test_inactive_experiment(self, client, db):
+        assert client.post("/v1/ab-testing/experiments/missing/assign", json={"session_id": "s"}).status_code == 404
+
+    def test_assignment_benchmark(self, db):
+        """Benchmark stateless assignment against a lookup-then-insert per assignment"""
+        count = 500
+        service = server.ExperimentAssignmentService(db)
+
+        started = time.perf_counter()
+        for i in range(count):
+            service.assign("exp-1", f"s{i}", user_id=f"user-{i}")
+        stateless_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for i in range(count):
+            existing = db.query(ExperimentAssignment).filter(
+                ExperimentAssignment.experiment_id == "exp-1", ExperimentAssignment.session_id == f"s{i}"
+            ).first()
+            if not existing:
+                db.add(ExperimentAssignment(
+                    id=f"row-{i}", experiment_id="exp-1", session_id=f"s{i}", user_id=f"user-{i}",
+                    variant_id="control", variant_name="Control", variant_config={}
+                ))
+                db.commit()
+        stored_ms = (time.perf_counter() - started) * 1000
+
+        print(f"\n{count} assignments: stateless {stateless_ms:.1f} ms, stored {stored_ms:.1f} ms")
+        assert stateless_ms < stored_ms
@@ -0,0 +1,165 @@
+"""
+Test suite for batched A/B testing event ingestion
+"""
+
+import json
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base, get_db
+from app.models import Experiment, ExperimentAssignment, ExperimentEvent
+from app.routers import ab_testing
+from app.services import experiment_event_ingest
+from app.services.experiment_event_ingest import experiment_assignment_map
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    for experiment_id in ("exp-1", "exp-2"):
+        session.add(Experiment(
+            id=experiment_id, name=experiment_id, project_id="project-a", prompt_id="greeting-v1.0.0",
+            primary_metric="conversion", created_by="test-user",
+            control_variant={"id": "control", "name": "Control", "weight": 50},
+            treatment_variants=[{"id": "treatment", "name": "Treatment", "weight": 50}]
+        ))
+        session.add(ExperimentAssignment(
+            id=f"{experiment_id}-assignment", experiment_id=experiment_id, session_id="s1",
+            variant_id="control", variant_name="Control", variant_config={}
+        ))
+    session.commit()
+    experiment_assignment_map.forget_experiment("exp-1")
+    experiment_assignment_map.forget_experiment("exp-2")
+    yield session
+    session.close()
+
+@pytest.fixture
+def client(engine, db):
+    app = FastAPI()
+    app.include_router(ab_testing.router, prefix="/v1")
+    Session = sessionmaker(bind=engine)
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+def make_event(experiment_id="exp-1", **fields):
+    event = {
+        "experiment_id": experiment_id, "event_type": "conversion",
+        "event_name": "purchase", "session_id": "s1"
+    }
+    event.update(fields)
+    return event
+
+def post_jsonl(client, events):
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in events)
+    return client.post(
+        "/v1/ab-testing/events/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+class TestEventBatchIngestion:
+    """Test decoding, per-event validation and the bulk insert"""
+
+    def test_jsonl_batch_reports_rejections_by_index(self, client, db):
+        response = post_jsonl(client, [
+            make_event(),
+            "{not json",
+            make_event(event_type="not-a-type"),
+            make_event(experiment_id="missing"),
+            make_event(assignment_id="exp-1-assignment", conversion_value="9.5"),
+        ])
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["accepted"] == 2
+        assert [item["index"] for item in result["rejected"]] == [1, 2, 3]
+        assert result["rejected"][2]["error"] == "Experiment not found"
+
+        stored = db.query(ExperimentEvent).filter(ExperimentEvent.experiment_id == "exp-1").all()
+        assert len(stored) == 2
+        assert sorted(stored_event.variant_id or "" for stored_event in stored) == ["", "control"]
+        assert all(stored_event.occurred_at is not None for stored_event in stored)
+
+    def test_assignment_must_belong_to_experiment(self, client):
+        response = post_jsonl(client, [
+            make_event(assignment_id="exp-2-assignment"),
+            make_event(assignment_id="unknown"),
+            make_event(experiment_id="exp-2", assignment_id="exp-2-assignment"),
+        ])
+
+        result = response.json()
+        assert result["accepted"] == 1
+        assert [item["error"] for item in result["rejected"]] == ["Assignment not found", "Assignment not found"]
+
+    def test_json_array_body(self, client):
+        response = client.post("/v1/ab-testing/events/batch", json=[make_event(), make_event()])
+        assert response.json() == {"accepted": 2, "rejected": []}
+
+    def test_msgpack_body(self, client):
+        msgpack = pytest.importorskip("msgpack")
+        response = client.post(
+            "/v1/ab-testing/events/batch",
+            content=msgpack.packb([make_event(), make_event()]),
+            headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.json()["accepted"] == 2
+
+    def test_msgpack_body_without_msgpack(self, client, monkeypatch):
+        monkeypatch.setattr(experiment_event_ingest, "msgpack", None)
+        response = client.post(
+            "/v1/ab-testing/events/batch", content=b"\x90", headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.status_code == 400
+
+    def test_undecodable_batches_rejected(self, client, monkeypatch):
+        response = client.post(
+            "/v1/ab-testing/events/batch", content=b"a,b", headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 400
+
+        monkeypatch.setattr(settings, "ab_event_batch_max_events", 2)
+        assert post_jsonl(client, [make_event()] * 3).status_code == 400
+
+    def test_lookups_cached_across_batches(self, engine, client):
+        post_jsonl(client, [make_event(assignment_id="exp-1-assignment")])
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        post_jsonl(client, [make_event(assignment_id="exp-1-assignment")] * 50)
+
+        assert not [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len([s for s in statements if s.lstrip().upper().startswith("INSERT")]) == 1
+
+    def test_batch_benchmark(self, client):
+        """Benchmark one request per event against one JSONL batch"""
+        count = 200
+
+        started = time.perf_counter()
+        for _ in range(count):
+            post_jsonl(client, [make_event()])
+        single_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        result = post_jsonl(client, [make_event()] * count).json()
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        assert result["accepted"] == count
+        print(f"\n{count} single-event posts: {single_ms:.1f} ms, one batch: {batch_ms:.1f} ms")
+        assert batch_ms < single_ms
@@ -0,0 +1,121 @@
+"""
+Test suite for conditional prompt delivery
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_user
+from app.database import Base, get_db
+from app.models import Prompt
+from app.routers import delivery
+from app.services.redis_service import get_redis_service
+from app.utils import compute_prompt_etag, etag_matches
+
+class StubRedisService:
+    """In-memory stand-in for the Redis prompt cache"""
+
+    def __init__(self):
+        self.prompts = {}
+
+    async def get_cached_prompt(self, prompt_id, version):
+        return self.prompts.get((prompt_id, version))
+
+    async def cache_prompt(self, prompt_id, version, prompt_data):
+        self.prompts[(prompt_id, version)] = prompt_data
+        return True
+
+@pytest.fixture
+def test_client():
+    """Create a test client backed by SQLite and a stub cache"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = SessionLocal()
+    session.add(Prompt(
+        id="greeting",
+        version="1.0.0",
+        module_id="test-module",
+        content="Hello {name}",
+        name="Greeting",
+        created_by="test-user",
+        target_models=[],
+        model_specific_prompts=[],
+        mas_intent="testing",
+        mas_fairness_notes="none",
+        mas_risk_level="low"
+    ))
+    session.commit()
+    session.close()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(delivery.router, prefix="/v1")
+
+    redis_service = StubRedisService()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "test-user", "roles": ["admin"]}
+    app.dependency_overrides[get_redis_service] = lambda: redis_service
+    yield TestClient(app)
+    Base.metadata.drop_all(engine)
+
+class TestETags:
+    """Test ETag helpers"""
+
+    def test_etag_follows_identity_and_update_time(self):
+        updated_at = datetime(2024, 1, 1, 12, 0, 0)
+        etag = compute_prompt_etag("greeting", "1.0.0", updated_at)
+        assert etag.startswith('"') and etag.endswith('"')
+        # Cached bodies carry updated_at as ISO text and must validate the same
+        assert etag == compute_prompt_etag("greeting", "1.0.0", updated_at.isoformat())
+        assert etag != compute_prompt_etag("greeting", "1.0.1", updated_at)
+        assert etag != compute_prompt_etag("greeting", "1.0.0", updated_at + timedelta(microseconds=1))
+        assert etag != compute_prompt_etag("greeting", "1.0.0", updated_at, True)
+
+    def test_if_none_match_parsing(self):
+        etag = '"abc"'
+        assert etag_matches('"xyz", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"xyz"', etag)
+
+class TestConditionalRuntimeDelivery:
+    """Test If-None-Match handling on the runtime endpoint"""
+
+    def test_not_modified_from_database_and_cache(self, test_client):
+        first = test_client.get("/v1/runtime/greeting/1.0.0")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.json()["source"] == "database"
+
+        # Second request is served from the cache path with the same validator
+        cached = test_client.get("/v1/runtime/greeting/1.0.0", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+
+    def test_not_modified_from_database_without_cache(self, test_client):
+        etag = test_client.get("/v1/runtime/greeting/1.0.0").headers["etag"]
+        test_client.app.dependency_overrides[get_redis_service] = lambda: StubRedisService()
+
+        response = test_client.get("/v1/runtime/greeting/1.0.0", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+    def test_stale_validator_gets_full_body(self, test_client):
+        response = test_client.get("/v1/runtime/greeting/1.0.0", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.json()["prompt"]["content"] == "Hello {name}"
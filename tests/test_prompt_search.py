@@ -0,0 +1,199 @@
+"""
+Test suite for the prompt full-text search index
+"""
+
+import os
+import time
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Prompt
+from app.services.prompt_search_service import (
+    PromptSearchService, ensure_search_index, encode_cursor, decode_cursor
+)
+
+# Test database setup
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+# Seeded rows for the search benchmark; set to 1000000 for the full-size run
+BENCHMARK_ROWS = int(os.environ.get("PROMPTOPS_SEARCH_BENCHMARK_ROWS", "20000"))
+
+@pytest.fixture
+def test_engine():
+    """Create test database engine with the search index"""
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    assert ensure_search_index(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_session(test_engine):
+    """Create test database session"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def prompt_row(i: int, name: str, content: str, description: str = None) -> dict:
+    """Build a minimal prompt row for bulk inserts"""
+    return {
+        "id": f"prompt-{i}",
+        "version": "1.0.0",
+        "module_id": f"module-{i % 10}",
+        "content": content,
+        "name": name,
+        "description": description,
+        "created_by": "test-user",
+        "target_models": [],
+        "model_specific_prompts": [],
+        "mas_intent": "testing",
+        "mas_fairness_notes": "none",
+        "mas_risk_level": "low",
+        "is_active": True
+    }
+
+class TestPromptSearchService:
+    """Test ranked search and keyset pagination"""
+
+    def test_ranked_results(self, test_session):
+        test_session.execute(insert(Prompt), [
+            prompt_row(1, "Customer support", "Answer billing questions politely"),
+            prompt_row(2, "Billing assistant", "Billing billing billing invoices", "Handles billing"),
+            prompt_row(3, "Translator", "Translate the text into French")
+        ])
+        test_session.commit()
+
+        results = PromptSearchService(test_session).search("billing")
+        ids = [prompt.id for prompt in results["prompts"]]
+        assert ids == ["prompt-2", "prompt-1"]
+        assert results["total"] == 2
+        assert results["scores"][0] > results["scores"][1]
+
+    def test_index_follows_updates_and_deletes(self, test_session):
+        test_session.execute(insert(Prompt), [prompt_row(1, "Summarizer", "Summarize the document")])
+        test_session.commit()
+
+        prompt = test_session.get(Prompt, ("prompt-1", "1.0.0"))
+        prompt.content = "Classify the sentiment"
+        test_session.commit()
+
+        service = PromptSearchService(test_session)
+        assert service.search("document")["total"] == 0
+        assert service.search("sentiment")["total"] == 1
+
+        test_session.delete(prompt)
+        test_session.commit()
+        assert service.search("sentiment")["total"] == 0
+
+    def test_keyset_pagination_covers_all_results(self, test_session):
+        test_session.execute(insert(Prompt), [
+            prompt_row(i, f"Email writer {i}", "email " * (i % 5 + 1)) for i in range(25)
+        ])
+        test_session.commit()
+
+        service = PromptSearchService(test_session)
+        seen, cursor = [], None
+        while True:
+            page = service.search("email", limit=10, cursor=cursor)
+            seen.extend(prompt.id for prompt in page["prompts"])
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                break
+
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+
+    def test_filters_and_special_characters(self, test_session):
+        test_session.execute(insert(Prompt), [
+            prompt_row(1, "Alpha", "shared text"),
+            prompt_row(2, "Beta", "shared text")
+        ])
+        test_session.commit()
+
+        service = PromptSearchService(test_session)
+        assert service.search("shared", module_id="module-1")["total"] == 1
+        assert service.search('"shared* (')["total"] == 2
+
+    def test_index_survives_vacuum(self, test_engine, test_session):
+        test_session.execute(insert(Prompt), [
+            prompt_row(1, "Alpha", "apples"),
+            prompt_row(2, "Beta", "bananas"),
+            prompt_row(3, "Gamma", "cherries")
+        ])
+        test_session.commit()
+        test_session.delete(test_session.get(Prompt, ("prompt-1", "1.0.0")))
+        test_session.commit()
+        test_session.close()
+
+        # VACUUM may renumber the implicit rowids of prompts, which has no INTEGER PRIMARY KEY
+        with test_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+
+        service = PromptSearchService(test_session)
+        assert [prompt.id for prompt in service.search("cherries")["prompts"]] == ["prompt-3"]
+        assert [prompt.id for prompt in service.search("bananas")["prompts"]] == ["prompt-2"]
+
+    def test_legacy_index_is_replaced(self):
+        engine = create_engine(TEST_DATABASE_URL)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE prompts_fts USING fts5(name, description, content, "
+                "content='prompts', content_rowid='rowid')"
+            ))
+            conn.execute(insert(Prompt), [prompt_row(1, "Alpha", "apples")])
+
+        assert ensure_search_index(engine)
+        session = sessionmaker(bind=engine)()
+        assert [prompt.id for prompt in PromptSearchService(session).search("apples")["prompts"]] == ["prompt-1"]
+        session.close()
+
+    def test_total_only_counted_without_cursor(self, test_session):
+        test_session.execute(insert(Prompt), [prompt_row(i, f"Report {i}", "report") for i in range(3)])
+        test_session.commit()
+
+        service = PromptSearchService(test_session)
+        first = service.search("report", limit=2)
+        assert first["total"] == 3
+        assert service.search("report", limit=2, cursor=first["next_cursor"])["total"] is None
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(1.25, "prompt-1")) == (1.25, "prompt-1")
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+class TestPromptSearchBenchmarks:
+    """Benchmarks for indexed search against ILIKE scans"""
+
+    def test_search_over_seeded_prompts(self, test_session):
+        words = ["billing", "support", "translate", "summarize", "classify", "extract", "email", "report"]
+        rows = [
+            prompt_row(
+                i,
+                f"{words[i % len(words)]} prompt {i}",
+                f"Please {words[(i * 7) % len(words)]} the input {i}" + (" with escalation" if i % 500 == 0 else "")
+            )
+            for i in range(BENCHMARK_ROWS)
+        ]
+        for start in range(0, len(rows), 10000):
+            test_session.execute(insert(Prompt), rows[start:start + 10000])
+        test_session.commit()
+
+        service = PromptSearchService(test_session)
+
+        start = time.perf_counter()
+        indexed = service.search("escalation", limit=20)
+        indexed_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        scan_query = test_session.query(Prompt).filter(Prompt.content.ilike("%escalation%"))
+        scan_count = scan_query.count()
+        scanned = scan_query.offset(0).limit(20).all()
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        assert indexed["total"] == scan_count == BENCHMARK_ROWS // 500
+        assert len(indexed["prompts"]) == len(scanned)
+        print(f"\nSearch over {BENCHMARK_ROWS} prompts: indexed {indexed_ms:.1f} ms, ILIKE scan {scan_ms:.1f} ms")
@@ -0,0 +1,195 @@
+"""
+Test suite for project snapshot bundles
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.client_auth import get_current_client_user
+from app.database import Base, get_db
+from app.models import Prompt, Module, Project
+from app.routers import client_api
+from app.services.prompt_snapshot_service import PromptSnapshotService, compute_manifest_hash
+from app.services.prompt_version_service import PromptVersionService
+
+def make_prompt(prompt_id: str, version: str, module_id: str, is_active: bool = True) -> Prompt:
+    """Build a minimal prompt row"""
+    return Prompt(
+        id=prompt_id,
+        version=version,
+        module_id=module_id,
+        content=f"Content of {prompt_id}",
+        name=prompt_id,
+        created_by="test-user",
+        target_models=["openai"],
+        model_specific_prompts=[],
+        mas_intent="testing",
+        mas_fairness_notes="none",
+        mas_risk_level="low",
+        is_active=is_active
+    )
+
+def add_version(session, prompt: Prompt) -> Prompt:
+    """Add a prompt version the same way the prompts router does"""
+    session.add(prompt)
+    PromptVersionService(session).refresh_pointer(prompt.id)
+    session.commit()
+    return prompt
+
+@pytest.fixture
+def session_factory():
+    """Create a SQLite database with two projects"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = SessionLocal()
+    session.add_all([
+        Project(id="project-a", name="Project A", owner="test-user"),
+        Project(id="project-b", name="Project B", owner="test-user"),
+        Module(id="support", version="1.0.0", project_id="project-a", slot="main", render_body="",
+               metadata_json={"tags": ["customer"]}),
+        Module(id="billing", version="1.0.0", project_id="project-a", slot="main", render_body=""),
+        Module(id="other", version="1.0.0", project_id="project-b", slot="main", render_body="")
+    ])
+    session.commit()
+
+    add_version(session, make_prompt("greeting", "1.0.0", "support"))
+    add_version(session, make_prompt("greeting-v1.1.0", "1.1.0", "support"))
+    add_version(session, make_prompt("greeting-v2.0.0", "2.0.0", "support", is_active=False))
+    add_version(session, make_prompt("invoice", "1.0.0", "billing"))
+    add_version(session, make_prompt("draft", "1.0.0", "billing", is_active=False))
+    add_version(session, make_prompt("foreign", "1.0.0", "other"))
+    session.close()
+
+    yield SessionLocal
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def test_session(session_factory):
+    """Create test database session"""
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def test_client(session_factory):
+    """Create a test client for the client API router"""
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.include_router(client_api.router, prefix="/v1/client")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_client_user] = lambda: {
+        "user_id": "test-user",
+        "tenant_id": "test-tenant",
+        "api_key_id": "test-key",
+        "scopes": ["read"],
+        "allowed_projects": ["project-a"],
+        "rate_limits": {}
+    }
+    return TestClient(app)
+
+class TestPromptSnapshotService:
+    """Test snapshot bundles and deltas"""
+
+    def test_snapshot_holds_active_version_per_family(self, test_session):
+        snapshot = PromptSnapshotService(test_session).build_snapshot("project-a")
+
+        assert snapshot["format_version"] == 1
+        assert sorted(snapshot["prompts"]) == ["greeting", "invoice"]
+        assert snapshot["prompts"]["greeting"]["version"] == "1.1.0"
+        # greeting has a newer inactive version, so its active one is not the latest
+        assert snapshot["prompts"]["greeting"]["is_latest"] is False
+        assert snapshot["prompts"]["invoice"]["is_latest"] is True
+        assert snapshot["snapshot_id"] == compute_manifest_hash(snapshot["manifest"])
+
+    def test_module_and_tag_filters(self, test_session):
+        service = PromptSnapshotService(test_session)
+        assert list(service.build_snapshot("project-a", module_id="billing")["prompts"]) == ["invoice"]
+        assert list(service.build_snapshot("project-a", tag="customer")["prompts"]) == ["greeting"]
+        assert service.build_snapshot("project-a", tag="missing")["total"] == 0
+
+    def test_delta_since_snapshot(self, test_session):
+        service = PromptSnapshotService(test_session)
+        before = service.build_snapshot("project-a")
+
+        newest = test_session.get(Prompt, ("greeting-v2.0.0", "2.0.0"))
+        newest.is_active = True
+        PromptVersionService(test_session).refresh_pointer(newest.id)
+        invoice = test_session.get(Prompt, ("invoice", "1.0.0"))
+        invoice.is_active = False
+        PromptVersionService(test_session).refresh_pointer(invoice.id)
+        test_session.commit()
+
+        delta = service.build_delta("project-a", before["manifest"])
+        assert delta["base_snapshot_id"] == before["snapshot_id"]
+        assert list(delta["changed"]) == ["greeting"]
+        assert delta["changed"]["greeting"]["version"] == "2.0.0"
+        assert delta["removed"] == ["invoice"]
+        assert delta["snapshot_id"] == service.build_snapshot("project-a")["snapshot_id"]
+
+        unchanged = service.build_delta("project-a", service.build_snapshot("project-a")["manifest"])
+        assert unchanged["changed"] == {} and unchanged["removed"] == []
+
+    def test_metadata_edit_is_a_change(self, test_session):
+        service = PromptSnapshotService(test_session)
+        before = service.build_snapshot("project-a")
+
+        edited = test_session.get(Prompt, ("greeting-v1.1.0", "1.1.0"))
+        edited.description = "Edited in place"
+        edited.updated_at = datetime.now(timezone.utc)
+        test_session.commit()
+
+        delta = service.build_delta("project-a", before["manifest"])
+        assert list(delta["changed"]) == ["greeting"]
+        assert delta["changed"]["greeting"]["description"] == "Edited in place"
+
+class TestSnapshotEndpoints:
+    """Test the client API snapshot endpoints"""
+
+    def test_snapshot_and_not_modified(self, test_client):
+        response = test_client.get("/v1/client/projects/project-a/snapshot")
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+        etag = response.headers["etag"]
+        cached = test_client.get("/v1/client/projects/project-a/snapshot", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+    def test_snapshot_is_compressed(self, test_client, session_factory):
+        session = session_factory()
+        for i in range(50):
+            add_version(session, make_prompt(f"bulk-{i}", "1.0.0", "billing"))
+        session.close()
+
+        response = test_client.get("/v1/client/projects/project-a/snapshot", headers={"Accept-Encoding": "gzip"})
+        assert response.headers.get("content-encoding") == "gzip"
+        assert response.json()["total"] == 52
+
+    def test_delta_endpoint(self, test_client):
+        snapshot = test_client.get("/v1/client/projects/project-a/snapshot").json()
+        manifest = dict(snapshot["manifest"])
+        manifest["invoice"] = '"stale"'
+        manifest["retired"] = '"gone"'
+
+        delta = test_client.post("/v1/client/projects/project-a/snapshot/delta", json={"manifest": manifest}).json()
+        assert list(delta["changed"]) == ["invoice"]
+        assert delta["removed"] == ["retired"]
+        assert delta["snapshot_id"] == snapshot["snapshot_id"]
+
+    def test_project_access_enforced(self, test_client):
+        assert test_client.get("/v1/client/projects/project-b/snapshot").status_code == 403
@@ -0,0 +1,185 @@
+"""
+Test suite for the prompt update stream
+"""
+
+import asyncio
+import json
+import pytest
+
+from app.services.prompt_update_stream import PromptUpdateBroker, format_sse, parse_event_id
+from app.services.redis_service import RedisPromptService, PROMPT_UPDATE_STREAM
+
+class StubStreamRedis:
+    """In-memory stand-in for the Redis stream and pub/sub commands"""
+
+    def __init__(self):
+        self.entries = []
+        self.published = []
+        self.sequence = 0
+        self.changed = asyncio.Event()
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.sequence += 1
+        event_id = f"1000-{self.sequence}"
+        self.entries.append((event_id, dict(fields)))
+        if maxlen is not None:
+            self.entries = self.entries[-maxlen:]
+        self.changed.set()
+        return event_id
+
+    async def publish(self, channel, message):
+        self.published.append(channel)
+
+    async def ping(self):
+        return True
+
+    def _after(self, start):
+        if start.startswith("("):
+            return [entry for entry in self.entries if parse_event_id(entry[0]) > parse_event_id(start[1:])]
+        return list(self.entries)
+
+    async def xrange(self, key, min="-", max="+", count=None):
+        entries = self._after(min)
+        return entries[:count] if count else entries
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        entries = list(reversed(self.entries))
+        return entries[:count] if count else entries
+
+    async def xread(self, streams, block=None, count=None):
+        last_id = streams[PROMPT_UPDATE_STREAM]
+        if last_id == "$":
+            last_id = self.entries[-1][0] if self.entries else "0-0"
+        while True:
+            entries = self._after(f"({last_id}")
+            if entries:
+                return [(PROMPT_UPDATE_STREAM, entries[:count])]
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=block / 1000)
+            except asyncio.TimeoutError:
+                return []
+
+@pytest.fixture
+def redis_service():
+    """Redis prompt service backed by the stub"""
+    service = RedisPromptService()
+    service.redis_client = StubStreamRedis()
+    return service
+
+async def next_frame(stream, timeout=2.0):
+    return await asyncio.wait_for(stream.__anext__(), timeout)
+
+def frame_data(frame):
+    return json.loads(frame.split("data: ", 1)[1])
+
+class TestPublishing:
+    """Test that published updates land on the stream"""
+
+    @pytest.mark.asyncio
+    async def test_publish_appends_to_stream(self, redis_service):
+        event_id = await redis_service.publish_prompt_update(
+            "greeting-v1.1.0", "1.1.0", "activate", project_id="project-a", module_id="support"
+        )
+
+        assert event_id == "1000-1"
+        _, fields = redis_service.redis_client.entries[0]
+        event = json.loads(fields["data"])
+        assert event["base_prompt_id"] == "greeting"
+        assert event["project_id"] == "project-a"
+        assert redis_service.redis_client.published == ["prompt_updates:greeting-v1.1.0", "prompt_updates"]
+
+    def test_sse_frame_format(self):
+        frame = format_sse({"prompt_id": "greeting"}, event_id="1000-1")
+        assert frame == 'id: 1000-1\nevent: prompt_update\ndata: {"prompt_id": "greeting"}\n\n'
+
+class TestPromptUpdateBroker:
+    """Test fan-out, filtering, resume and heartbeats"""
+
+    @pytest.mark.asyncio
+    async def test_live_events_filtered_by_project(self, redis_service):
+        broker = PromptUpdateBroker(redis_service, block_ms=50)
+        stream = broker.stream("project-a", heartbeat_seconds=1)
+        assert (await next_frame(stream)).startswith("retry:")
+        assert "event: ready" in await next_frame(stream)
+
+        await redis_service.publish_prompt_update("other", "1.0.0", project_id="project-b")
+        await redis_service.publish_prompt_update("greeting", "1.0.0", project_id="project-a")
+
+        frame = await next_frame(stream)
+        assert frame.startswith("id: 1000-2")
+        assert frame_data(frame)["prompt_id"] == "greeting"
+        await stream.aclose()
+        assert broker.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_events(self, redis_service):
+        first = await redis_service.publish_prompt_update("greeting", "1.0.0", project_id="project-a")
+        await redis_service.publish_prompt_update("greeting", "1.1.0", project_id="project-a")
+        await redis_service.publish_prompt_update("other", "1.0.0", project_id="project-b")
+
+        broker = PromptUpdateBroker(redis_service, block_ms=50)
+        stream = broker.stream("project-a", last_event_id=first, heartbeat_seconds=1)
+        await next_frame(stream)
+        await next_frame(stream)
+
+        frame = await next_frame(stream)
+        assert frame_data(frame)["version"] == "1.1.0"
+
+        await redis_service.publish_prompt_update("greeting", "1.2.0", project_id="project-a")
+        assert frame_data(await next_frame(stream))["version"] == "1.2.0"
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_reset_when_history_expired(self, redis_service):
+        redis_service.redis_client.sequence = 10
+        await redis_service.publish_prompt_update("greeting", "1.0.0", project_id="project-a")
+
+        broker = PromptUpdateBroker(redis_service, block_ms=50)
+        stream = broker.stream("project-a", last_event_id="1000-2", heartbeat_seconds=1)
+        await next_frame(stream)
+        await next_frame(stream)
+        assert "event: reset" in await next_frame(stream)
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_when_idle(self, redis_service):
+        broker = PromptUpdateBroker(redis_service, block_ms=50)
+        stream = broker.stream("project-a", heartbeat_seconds=0.05)
+        await next_frame(stream)
+        await next_frame(stream)
+        assert (await next_frame(stream)).startswith(": heartbeat")
+        await stream.aclose()
+
+class TestUnavailableRedis:
+    """Test the stream without a Redis connection"""
+
+    @pytest.fixture
+    def offline_service(self, monkeypatch):
+        service = RedisPromptService()
+
+        async def fail():
+            raise ConnectionError("connection refused")
+
+        monkeypatch.setattr(service, "initialize", fail)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_availability_checked_before_streaming(self, redis_service, offline_service):
+        assert await PromptUpdateBroker(redis_service).available()
+        assert not await PromptUpdateBroker(offline_service).available()
+
+    @pytest.mark.asyncio
+    async def test_reader_stops_and_subscribers_reset(self, offline_service):
+        broker = PromptUpdateBroker(offline_service, block_ms=50)
+        stream = broker.stream("project-a", heartbeat_seconds=0.05)
+        await next_frame(stream)
+        await next_frame(stream)
+
+        assert broker._reader_task.done()
+        frame = await next_frame(stream)
+        assert "event: reset" in frame
+        assert frame_data(frame)["reason"] == "stream_unavailable"
+        with pytest.raises(StopAsyncIteration):
+            await next_frame(stream)
+        assert broker.subscriber_count == 0
@@ -0,0 +1,173 @@
+"""
+Test suite for the prompt latest-version index
+"""
+
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Prompt, PromptVersionPointer
+from app.services.prompt_version_service import PromptVersionService
+from app.utils import parse_semver, get_base_prompt_id
+
+# Test database setup
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+@pytest.fixture
+def test_session():
+    """Create test database session"""
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+def make_prompt(prompt_id: str, version: str, is_active: bool = True, module_id: str = "test-module") -> Prompt:
+    """Build a minimal prompt row"""
+    return Prompt(
+        id=prompt_id,
+        version=version,
+        module_id=module_id,
+        content=f"Content for {version}",
+        name="Test Prompt",
+        created_by="test-user",
+        target_models=[],
+        model_specific_prompts=[],
+        mas_intent="testing",
+        mas_fairness_notes="none",
+        mas_risk_level="low",
+        is_active=is_active
+    )
+
+def add_version(session, prompt_id: str, version: str, is_active: bool = True) -> Prompt:
+    """Add a prompt version the same way the prompts router does"""
+    prompt = make_prompt(prompt_id, version, is_active)
+    session.add(prompt)
+    PromptVersionService(session).refresh_pointer(prompt.id)
+    session.commit()
+    return prompt
+
+class TestVersionNormalization:
+    """Test normalized version columns"""
+
+    def test_parse_semver(self):
+        assert parse_semver("1.10.0") == (1, 10, 0)
+        assert parse_semver("v1.0") is None
+        assert parse_semver(None) is None
+
+    def test_base_prompt_id(self):
+        assert get_base_prompt_id("greeting-v1.2.3") == "greeting"
+        assert get_base_prompt_id("greeting") == "greeting"
+
+    def test_columns_follow_id_and_version(self):
+        prompt = make_prompt("greeting-v1.9.0", "1.9.0")
+        assert prompt.base_prompt_id == "greeting"
+        assert (prompt.version_major, prompt.version_minor, prompt.version_patch) == (1, 9, 0)
+
+        prompt.version = "draft"
+        assert prompt.version_major is None
+
+class TestPromptVersionService:
+    """Test latest/active pointer maintenance"""
+
+    def test_latest_uses_semantic_order(self, test_session):
+        add_version(test_session, "greeting", "1.0.0")
+        add_version(test_session, "greeting-v1.10.0", "1.10.0")
+        add_version(test_session, "greeting-v1.9.0", "1.9.0")
+
+        service = PromptVersionService(test_session)
+        assert service.get_latest_prompt("greeting").version == "1.10.0"
+        assert service.get_latest_prompt("greeting-v1.9.0").version == "1.10.0"
+        assert service.get_pointer("greeting").version_count == 3
+
+    def test_active_pointer_tracks_activation(self, test_session):
+        add_version(test_session, "greeting", "1.0.0")
+        newest = add_version(test_session, "greeting-v2.0.0", "2.0.0", is_active=False)
+
+        service = PromptVersionService(test_session)
+        assert service.get_latest_prompt("greeting", active_only=True).version == "1.0.0"
+
+        newest.is_active = True
+        service.refresh_pointer(newest.id)
+        test_session.commit()
+        assert service.get_latest_prompt("greeting", active_only=True).version == "2.0.0"
+
+    def test_delete_moves_pointer_back(self, test_session):
+        add_version(test_session, "greeting", "1.0.0")
+        newest = add_version(test_session, "greeting-v1.1.0", "1.1.0")
+
+        service = PromptVersionService(test_session)
+        test_session.delete(newest)
+        service.refresh_pointer(newest.id)
+        test_session.commit()
+        assert service.get_latest_prompt("greeting").version == "1.0.0"
+
+    def test_pointer_removed_with_last_version(self, test_session):
+        only = add_version(test_session, "greeting", "1.0.0")
+
+        service = PromptVersionService(test_session)
+        test_session.delete(only)
+        service.refresh_pointer(only.id)
+        test_session.commit()
+        assert test_session.get(PromptVersionPointer, "greeting") is None
+        assert service.get_latest_prompt("greeting") is None
+
+    def test_module_latest_version(self, test_session):
+        add_version(test_session, "greeting", "0.9.0")
+        service = PromptVersionService(test_session)
+        assert service.get_latest_module_version("test-module") == "1.0.0"
+
+        add_version(test_session, "farewell", "1.12.3")
+        assert service.get_latest_module_version("test-module") == "1.12.3"
+
+    def test_rebuild_index_backfills_pointers(self, test_session):
+        test_session.add_all([
+            make_prompt("greeting", "1.0.0"),
+            make_prompt("greeting-v1.2.0", "1.2.0")
+        ])
+        test_session.commit()
+
+        result = PromptVersionService(test_session).rebuild_index()
+        assert result == {"prompts": 2, "pointers": 1}
+        assert test_session.get(PromptVersionPointer, "greeting").latest_version == "1.2.0"
+
+    def test_lazy_backfill_leaves_commit_to_caller(self, test_session):
+        test_session.add(make_prompt("greeting", "1.0.0"))
+        test_session.commit()
+
+        # Unrelated pending state of the caller must not be committed by a read
+        test_session.add(make_prompt("farewell", "1.0.0"))
+        assert PromptVersionService(test_session).get_latest_prompt("greeting").version == "1.0.0"
+        test_session.rollback()
+
+        assert test_session.get(Prompt, ("farewell", "1.0.0")) is None
+        assert test_session.get(PromptVersionPointer, "greeting") is None
+        assert PromptVersionService(test_session).get_pointer("greeting").latest_version == "1.0.0"
+
+class TestPromptVersionBenchmarks:
+    """Benchmarks for latest-version lookups"""
+
+    def test_latest_lookup_with_many_versions(self, test_session):
+        versions = [f"{major}.{minor}.{patch}" for major in range(3) for minor in range(20) for patch in range(20)]
+        test_session.add_all([
+            make_prompt("greeting" if i == 0 else f"greeting-v{version}", version)
+            for i, version in enumerate(versions)
+        ])
+        test_session.commit()
+        service = PromptVersionService(test_session)
+        service.rebuild_index()
+
+        iterations = 200
+        start = time.perf_counter()
+        for _ in range(iterations):
+            test_session.expire_all()
+            latest = service.get_latest_prompt("greeting")
+        elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+
+        assert len(versions) == 1200
+        assert latest.version == "2.19.19"
+        print(f"\nLatest lookup over {len(versions)} versions: {elapsed_ms:.3f} ms")
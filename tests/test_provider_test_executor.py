@@ -0,0 +1,288 @@
+"""
+Test suite for the concurrent provider test executor, run against a local stub provider
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_user
+from app.database import Base, get_db
+from app.models import AIAssistantProvider, AIAssistantProviderType, User
+from app.routers import model_testing
+from app.services.provider_test_executor import ProviderTestExecutor
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Answers chat requests after a delay taken from the path: /delay/<ms>/... or /status/<code>/..."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.connections.add(self.client_address)
+        try:
+            kind, value, *rest = self.path.strip("/").split("/")
+            if kind == "delay":
+                time.sleep(int(value) / 1000)
+                status = 200
+            else:
+                status = int(value)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        if status != 200:
+            payload = {"error": {"message": "stub failure"}}
+        elif rest[-1] == "messages":
+            payload = {"content": [{"type": "text", "text": f"anthropic:{body['model']}"}],
+                       "usage": {"input_tokens": 3, "output_tokens": 4}}
+        elif rest[-1] == "generate":
+            payload = {"response": f"ollama:{body['model']}", "prompt_eval_count": 2, "eval_count": 3}
+        else:
+            payload = {"choices": [{"message": {"content": f"chat:{body['model']}"}}],
+                       "usage": {"total_tokens": 9}}
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubProviderHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def url(stub, path):
+    return f"http://127.0.0.1:{stub.server_address[1]}/{path}"
+
+def target(stub, provider_id, path, provider_type="openai"):
+    return {
+        "id": provider_id, "name": provider_id, "provider_type": provider_type, "api_key": "key",
+        "api_base_url": url(stub, path), "model_name": f"model-{provider_id}", "organization": None
+    }
+
+class TestProviderTestExecutor:
+    """Test providers run concurrently over shared connections with independent timeouts"""
+
+    @pytest.mark.asyncio
+    async def test_wall_time_is_slowest_provider(self, stub):
+        executor = ProviderTestExecutor()
+        targets = [target(stub, f"p{i}", f"delay/{delay}") for i, delay in enumerate([300, 100, 200, 300])]
+        try:
+            started = time.perf_counter()
+            results = await executor.run(targets, "system", "hello")
+            elapsed = time.perf_counter() - started
+        finally:
+            await executor.aclose()
+
+        assert [r.provider_id for r in results] == ["p0", "p1", "p2", "p3"]
+        assert all(r.status == "success" for r in results)
+        assert results[1].response_content == "chat:model-p1"
+        assert results[1].tokens_used == 9
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_timeout_keeps_other_results(self, stub):
+        executor = ProviderTestExecutor()
+        targets = [target(stub, "fast", "delay/50"), target(stub, "hung", "delay/3000")]
+        try:
+            started = time.perf_counter()
+            fast, hung = await executor.run(targets, "system", "hello", timeout=0.5)
+            elapsed = time.perf_counter() - started
+        finally:
+            await executor.aclose()
+
+        assert fast.status == "success"
+        assert hung.status == "timeout"
+        assert hung.response_time_ms >= 500
+        assert elapsed < 1.5
+
+    @pytest.mark.asyncio
+    async def test_provider_concurrency_limit(self, stub):
+        executor = ProviderTestExecutor(provider_concurrency=2)
+        targets = [target(stub, f"p{i}", "delay/100") for i in range(6)]
+        try:
+            results = await executor.run(targets, "system", "hello")
+        finally:
+            await executor.aclose()
+
+        assert all(r.status == "success" for r in results)
+        assert stub.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_starts_after_queueing(self, stub):
+        executor = ProviderTestExecutor(provider_concurrency=1)
+        targets = [target(stub, f"p{i}", "delay/300") for i in range(2)]
+        try:
+            results = await executor.run(targets, "system", "hello", timeout=0.5)
+        finally:
+            await executor.aclose()
+
+        assert [r.status for r in results] == ["success", "success"]
+        assert all(r.response_time_ms < 500 for r in results)
+
+    def test_client_of_previous_loop_is_closed(self, stub):
+        executor = ProviderTestExecutor()
+
+        async def run_once():
+            await executor.run([target(stub, "p", "delay/0")], "system", "hello")
+            return executor._client
+
+        first = asyncio.run(run_once())
+        second = asyncio.run(run_once())
+        asyncio.run(executor.aclose())
+
+        assert first is not second
+        assert first.is_closed
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, stub):
+        executor = ProviderTestExecutor()
+        try:
+            for _ in range(5):
+                await executor.run([target(stub, "p", "delay/0")], "system", "hello")
+        finally:
+            await executor.aclose()
+
+        assert len(stub.connections) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_in_completion_order(self, stub):
+        executor = ProviderTestExecutor()
+        targets = [
+            target(stub, "slow", "delay/300"),
+            target(stub, "claude", "delay/0", provider_type="anthropic"),
+            target(stub, "local", "delay/100/api/generate", provider_type="ollama")
+        ]
+        try:
+            results = [r async for r in executor.stream(targets, "system", "hello")]
+        finally:
+            await executor.aclose()
+
+        assert [r.provider_id for r in results] == ["claude", "local", "slow"]
+        assert results[0].response_content == "anthropic:model-claude"
+        assert results[0].tokens_used == 7
+        assert results[1].response_content == "ollama:model-local"
+
+    @pytest.mark.asyncio
+    async def test_error_responses(self, stub):
+        executor = ProviderTestExecutor()
+        targets = [target(stub, "broken", "status/500"), dict(target(stub, "unkeyed", "delay/0"), api_key=None)]
+        try:
+            broken, unkeyed = await executor.run(targets, "system", "hello")
+        finally:
+            await executor.aclose()
+
+        assert broken.status == "error"
+        assert broken.error.startswith("HTTP 500")
+        assert unkeyed.status == "error"
+        assert unkeyed.error == "No API key configured"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_benchmark(self, stub):
+        """Benchmark concurrent testing against calling providers one after another"""
+        delays = [150, 100, 200, 50, 120, 80]
+        executor = ProviderTestExecutor()
+        targets = [target(stub, f"p{i}", f"delay/{delay}") for i, delay in enumerate(delays)]
+        try:
+            started = time.perf_counter()
+            await executor.run(targets, "system", "hello")
+            concurrent_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            for single in targets:
+                await executor.run([single], "system", "hello")
+            sequential_ms = (time.perf_counter() - started) * 1000
+        finally:
+            await executor.aclose()
+
+        print(f"\n{len(targets)} providers: concurrent {concurrent_ms:.1f} ms, sequential {sequential_ms:.1f} ms")
+        assert concurrent_ms < sequential_ms / 2
+
+class TestStreamingEndpoint:
+    """Test results are streamed as server-sent events as providers finish"""
+
+    @pytest.fixture
+    def client(self, stub):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        session = Session()
+        session.add(User(id="user-1", email="user@example.com", name="User"))
+        session.add_all([
+            AIAssistantProvider(id="slow", user_id="user-1", provider_type=AIAssistantProviderType.openai,
+                                name="Slow", api_key="key", api_base_url=url(stub, "delay/200")),
+            AIAssistantProvider(id="fast", user_id="user-1", provider_type=AIAssistantProviderType.openrouter,
+                                name="Fast", api_key="key", api_base_url=url(stub, "delay/0/chat/completions")),
+            AIAssistantProvider(id="down", user_id="user-1", provider_type=AIAssistantProviderType.anthropic,
+                                name="Down", api_key="key", api_base_url=url(stub, "status/503"))
+        ])
+        session.commit()
+        session.close()
+
+        app = FastAPI()
+        app.include_router(model_testing.router, prefix="/v1/model-testing")
+
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": "user-1"}
+        return TestClient(app)
+
+    def test_stream_events(self, client):
+        response = client.post(
+            "/v1/model-testing/test-prompt-across-providers/stream",
+            json={"system_prompt": "system", "user_message": "hello"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = [frame.split("\n") for frame in response.text.strip().split("\n\n")]
+        events = [(lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))) for lines in frames]
+
+        assert [name for name, _ in events] == ["result", "result", "result", "summary"]
+        assert events[-1][0] == "summary"
+        assert events[-1][1]["successful_tests"] == 2
+        assert events[-1][1]["failed_tests"] == 1
+        results = {data["provider_id"]: data for name, data in events[:-1]}
+        assert results["fast"]["response_content"] == "chat:openai/gpt-3.5-turbo"
+        assert results["down"]["status"] == "error"
+        assert events[2][1]["provider_id"] == "slow"
+
+    def test_no_providers(self, client):
+        response = client.post(
+            "/v1/model-testing/test-prompt-across-providers/stream",
+            json={"system_prompt": "system", "user_message": "hello", "providers": ["missing"]}
+        )
+        assert response.status_code == 400
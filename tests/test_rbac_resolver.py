@@ -0,0 +1,175 @@
+"""
+Test suite for the compiled RBAC permission resolver
+"""
+
+import time
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth.rbac import RBACService, rbac_service
+from app.database import Base
+from app.models import CustomRole, CustomRoleStatus, PermissionTemplate, RolePermission
+
+CHAINS = 50
+DEPTH = 10
+
+@pytest.fixture
+def engine():
+    """Create a SQLite database with 500 custom roles in 10-level inheritance chains"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    session.add(PermissionTemplate(
+        id="template-audit", name="Audit", permissions=[{"action": "view_audit_logs"}],
+        category="custom", created_by="admin", updated_by="admin", tenant_id="default"
+    ))
+    for chain in range(CHAINS):
+        for level in range(DEPTH):
+            session.add(CustomRole(
+                id=f"role-{chain}-{level}",
+                name=f"role-{chain}-{level}",
+                permissions=[f"perm_{chain}_{level}"],
+                inherited_roles=[f"role-{chain}-{level - 1}"] if level else ["viewer"],
+                permission_template_id="template-audit" if level == 0 else None,
+                tenant_id="default",
+                created_by="admin"
+            ))
+    session.add(RolePermission(
+        id="rp-1", role_name="role-0-0", resource_type="prompt", action="export_prompt",
+        created_by="admin", updated_by="admin", tenant_id="default"
+    ))
+    session.commit()
+    session.close()
+    return engine
+
+@pytest.fixture
+def service():
+    return RBACService()
+
+def count_queries(engine):
+    """Attach a counter of executed SQL statements"""
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return queries
+
+class TestPermissionResolver:
+    """Test compiled permission sets and invalidation"""
+
+    def test_inheritance_templates_and_role_permissions(self, engine, service):
+        db = sessionmaker(bind=engine)()
+        permissions = service._get_custom_role_permissions(["role-3-9"], db)
+
+        assert {f"perm_3_{level}" for level in range(DEPTH)} <= permissions
+        assert "view_audit_logs" in permissions  # from the chain root's template
+        assert "read_prompt" in permissions  # from the inherited viewer system role
+        assert "perm_4_0" not in permissions
+
+        assert "export_prompt" in service._get_custom_role_permissions(["role-0-5"], db)
+        assert "export_prompt" not in service._get_custom_role_permissions(["role-1-5"], db)
+        db.close()
+
+    def test_inheritance_cycle_terminates(self, engine, service):
+        db = sessionmaker(bind=engine)()
+        db.query(CustomRole).filter(CustomRole.id == "role-0-0").one().inherited_roles = ["role-0-9"]
+        db.commit()
+
+        permissions = service.permission_resolver.role_permissions("role-0-0", db)
+        assert "perm_0_9" in permissions and "perm_0_0" in permissions
+        for level in range(DEPTH):
+            assert service.permission_resolver.role_permissions(f"role-0-{level}", db) == permissions
+        db.close()
+
+    def test_cyclic_hierarchy_shares_permissions(self, service):
+        resolver = service.permission_resolver
+        direct = {"a": {"a"}, "b": {"b"}, "c": {"c"}}
+        parents = {"a": ["b"], "b": ["a", "viewer"], "c": ["b"]}
+
+        compiled = resolver._compile(direct, parents)
+        assert {"a", "b"} <= compiled["a"]
+        assert compiled["b"] == compiled["a"]
+        assert "read_prompt" in compiled["a"]
+        assert compiled["c"] == compiled["a"] | {"c"}
+
+        # Compiling from the other side of the cycle gives the same sets
+        assert resolver._compile(direct, {"b": ["a", "viewer"], "c": ["b"], "a": ["b"]})["b"] == compiled["b"]
+
+    def test_commit_bumps_generation(self, engine, service):
+        db = sessionmaker(bind=engine)()
+        assert not service.can_perform_action(["role-2-4"], "delete_prompt", "prompt", db=db)
+
+        generation = rbac_service.permission_resolver.generation
+        role = db.query(CustomRole).filter(CustomRole.id == "role-2-0").one()
+        role.permissions = ["perm_2_0", "delete_prompt"]
+        db.commit()
+        assert rbac_service.permission_resolver.generation == generation + 1
+
+        # The listener invalidates the global service; mirror it for this instance
+        service.permission_resolver.invalidate()
+        assert service.can_perform_action(["role-2-4"], "delete_prompt", "prompt", db=db)
+
+        role.status = CustomRoleStatus.INACTIVE
+        db.commit()
+        service.permission_resolver.invalidate()
+        assert not service.can_perform_action(["role-2-4"], "delete_prompt", "prompt", db=db)
+        db.close()
+
+    def test_rollback_does_not_bump_generation(self, engine):
+        db = sessionmaker(bind=engine)()
+        generation = rbac_service.permission_resolver.generation
+        db.query(CustomRole).filter(CustomRole.id == "role-2-0").one().permissions = []
+        db.flush()
+        db.rollback()
+        db.commit()
+        assert rbac_service.permission_resolver.generation == generation
+        db.close()
+
+    def test_in_memory_inheritance_invalidates(self, engine, service):
+        db = sessionmaker(bind=engine)()
+        assert "perm_5_0" not in service._get_custom_role_permissions(["role-6-0"], db)
+
+        service.add_role_inheritance("role-5-0", "role-6-0", created_by="admin")
+        assert "perm_5_0" in service._get_custom_role_permissions(["role-6-0"], db)
+        db.close()
+
+    def test_in_memory_edges_only_read_when_recompiling(self, engine, service, monkeypatch):
+        db = sessionmaker(bind=engine)()
+        service.add_role_inheritance("role-5-0", "role-6-0", created_by="admin")
+
+        calls = []
+        edges = service._inheritance_edges
+        monkeypatch.setattr(service.permission_resolver, "extra_edges", lambda: calls.append(1) or edges())
+        for _ in range(100):
+            assert service.can_perform_action(["role-6-0"], "perm_5_0", "prompt", db=db)
+        assert len(calls) == 1
+
+        service.permission_resolver.invalidate()
+        service.can_perform_action(["role-6-0"], "perm_5_0", "prompt", db=db)
+        assert len(calls) == 2
+        db.close()
+
+    def test_checks_do_not_query(self, engine, service):
+        """Benchmark permission checks against 500 roles once compiled"""
+        db = sessionmaker(bind=engine)()
+        queries = count_queries(engine)
+
+        started = time.perf_counter()
+        service.can_perform_action(["role-0-9"], "perm_0_0", "prompt", db=db)
+        compile_ms = (time.perf_counter() - started) * 1000
+        compile_queries = len(queries)
+        assert compile_queries == 3
+
+        checks = 20000
+        started = time.perf_counter()
+        for i in range(checks):
+            chain = i % CHAINS
+            assert service.can_perform_action(
+                ["editor", f"role-{chain}-{DEPTH - 1}"], f"perm_{chain}_0", "prompt", db=db
+            )
+        check_us = (time.perf_counter() - started) / checks * 1_000_000
+
+        assert len(queries) == compile_queries
+        print(f"\ncompile: {compile_ms:.1f} ms, check: {check_us:.2f} us/op ({checks} checks, 0 queries)")
+        db.close()
@@ -0,0 +1,166 @@
+"""
+Test suite for the JWT verification cache
+"""
+
+import time
+import uuid
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+from app.auth import authentication
+from app.auth.authentication import get_current_user, verify_token
+from app.auth.token_cache import TokenVerificationCache, token_digest, token_verification_cache
+from app.config import settings
+from app.routers import auth
+
+def make_token(exp_seconds: int = 3600, **claims) -> str:
+    payload = {"sub": "user-1", "tenant": "tenant-a", "roles": ["Editor"], "exp": int(time.time()) + exp_seconds}
+    payload.update(claims)
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    token_verification_cache.clear()
+    yield
+    token_verification_cache.clear()
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count full signature verifications"""
+    calls = []
+    original = authentication.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(authentication.jwt, "decode", counting_decode)
+    return calls
+
+class TestTokenVerificationCache:
+    """Test caching, expiry and revocation"""
+
+    def test_warm_verification_skips_decode(self, decode_calls):
+        token = make_token()
+
+        user = verify_token(token)
+        assert user == {"user_id": "user-1", "tenant": "tenant-a", "tenant_id": "tenant-a", "roles": ["editor"]}
+        assert verify_token(token) == user
+        assert len(decode_calls) == 1
+
+    def test_entry_capped_at_token_expiry(self):
+        cache = TokenVerificationCache(max_size=10, ttl_seconds=300)
+        cache.put("soon", {"user_id": "u"}, exp=time.time() + 0.05)
+        cache.put("expired", {"user_id": "u"}, exp=time.time() - 1)
+
+        assert cache.get("soon") == {"user_id": "u"}
+        assert cache.get("expired") is None
+        time.sleep(0.06)
+        assert cache.get("soon") is None
+
+    def test_bounded_lru(self):
+        cache = TokenVerificationCache(max_size=2, ttl_seconds=300)
+        cache.put("a", {"user_id": "a"})
+        cache.put("b", {"user_id": "b"})
+        cache.get("a")
+        cache.put("c", {"user_id": "c"})
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_revoked_token_rejected(self):
+        token = make_token(jti="token-1")
+        verify_token(token)
+
+        token_verification_cache.revoke(token=token)
+        with pytest.raises(JWTError):
+            verify_token(token)
+
+        other = make_token(jti="token-2")
+        verify_token(other)
+        token_verification_cache.revoke(jti="token-2")
+        with pytest.raises(JWTError):
+            verify_token(other)
+
+    def test_logout_revokes_token(self):
+        app = FastAPI()
+        app.include_router(auth.router, prefix="/api/v1/auth")
+        client = TestClient(app)
+        token = make_token(jti=str(uuid.uuid4()))
+        verify_token(token)
+
+        assert client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert token_verification_cache.is_revoked(token_digest(token))
+
+    def test_logout_rejects_unverified_token(self):
+        app = FastAPI()
+        app.include_router(auth.router, prefix="/api/v1/auth")
+        client = TestClient(app)
+        victim_jti = str(uuid.uuid4())
+        forged = jwt.encode(
+            {"sub": "attacker", "jti": victim_jti, "exp": int(time.time()) + 10**9}, "wrong-key", algorithm=settings.algorithm
+        )
+
+        assert client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+        assert client.post("/api/v1/auth/logout").status_code in (401, 403)
+        assert not token_verification_cache.is_revoked(token_digest(make_token()), victim_jti)
+
+    def test_revocation_clamped_to_token_lifetime(self):
+        cache = TokenVerificationCache(max_size=10, ttl_seconds=300)
+        cache.revoke(token="t", jti="far-future", exp=time.time() + 10**9)
+
+        assert cache._revoked_jtis["far-future"] <= time.time() + settings.access_token_expire_minutes * 60
+        cache.revoke(jti="expired", exp=time.time() - 1)
+        assert not cache.is_revoked(token_digest("x"), "expired")
+
+    def test_revocations_bounded(self):
+        cache = TokenVerificationCache(max_size=10, ttl_seconds=300, max_revocations=3)
+        for i in range(5):
+            cache.revoke(token=f"token-{i}", jti=f"jti-{i}", exp=time.time() + 60 + i)
+
+        assert len(cache._revoked_jtis) == 3
+        assert len(cache._revoked_digests) == 3
+        assert cache.is_revoked(token_digest("token-4"), "jti-4")
+        assert not cache.is_revoked(token_digest("token-0"), "jti-0")
+
+    @pytest.mark.asyncio
+    async def test_request_scoped_memo(self, monkeypatch):
+        calls = []
+
+        def counting_verify(token):
+            calls.append(token)
+            return {"user_id": "user-1", "tenant": "t", "tenant_id": "t", "roles": ["editor"]}
+
+        monkeypatch.setattr(authentication, "verify_token", counting_verify)
+        request = SimpleNamespace(state=SimpleNamespace())
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token())
+
+        first = await get_current_user(request, credentials)
+        first["roles"].append("admin")
+        second = await get_current_user(request, credentials)
+        assert second["roles"] == ["editor"]
+        assert len(calls) == 1
+
+    def test_verification_benchmark(self):
+        """Benchmark cold (full decode) against warm (cached) verification"""
+        token = make_token()
+        iterations = 2000
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            token_verification_cache.clear()
+            verify_token(token)
+        cold_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            verify_token(token)
+        warm_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+        print(f"\ncold verify: {cold_us:.1f} us, warm verify: {warm_us:.1f} us")
+        assert warm_us < cold_us / 3
@@ -0,0 +1,141 @@
+"""
+Test suite for batched usage ingestion
+"""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.client_auth import get_current_client_user
+from app.database import Base, get_db
+from app.models import ClientUsageLog
+from app.routers import client_api
+
+def usage_line(**overrides) -> str:
+    """Build one JSON Lines usage record"""
+    record = {"endpoint": "sdk:prompt_usage", "method": "EVENT", "status_code": 200, "prompt_id": "greeting"}
+    record.update(overrides)
+    return json.dumps(record)
+
+@pytest.fixture
+def session_factory():
+    """Create an empty SQLite database"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(engine)
+
+def make_client(session_factory, scopes):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(client_api.router, prefix="/v1/client")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_client_user] = lambda: {
+        "user_id": "test-user",
+        "tenant_id": "test-tenant",
+        "api_key_id": "test-key",
+        "scopes": scopes,
+        "allowed_projects": ["project-a"],
+        "rate_limits": {}
+    }
+    return TestClient(app)
+
+@pytest.fixture
+def test_client(session_factory):
+    """Create a test client whose key may write usage"""
+    return make_client(session_factory, ["read", "write"])
+
+class TestUsageBatchEndpoint:
+    """Test JSON Lines usage uploads"""
+
+    def test_gzip_batch_is_stored(self, test_client, session_factory):
+        recorded_at = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+        body = "\n".join([
+            usage_line(timestamp=recorded_at.isoformat(), processing_time_ms=12),
+            usage_line(endpoint="sdk:error", status_code=0, error_message="timeout")
+        ])
+
+        response = test_client.post(
+            "/v1/client/usage/batch",
+            content=gzip.compress(body.encode()),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/x-ndjson", "User-Agent": "promptops-sdk"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"accepted": 2, "rejected": 0}
+
+        session = session_factory()
+        logs = session.query(ClientUsageLog).order_by(ClientUsageLog.endpoint.desc()).all()
+        assert [log.endpoint for log in logs] == ["sdk:prompt_usage", "sdk:error"]
+        assert logs[0].processing_time_ms == 12
+        assert logs[0].timestamp.replace(tzinfo=timezone.utc) == recorded_at
+        assert logs[1].error_message == "timeout"
+        assert {log.user_agent for log in logs} == {"promptops-sdk"}
+        assert {log.api_key_id for log in logs} == {"test-key"}
+        session.close()
+
+    def test_invalid_lines_are_rejected_individually(self, test_client, session_factory):
+        body = "\n".join([usage_line(), "not json", json.dumps({"endpoint": "sdk:x"}), "", usage_line()])
+
+        response = test_client.post("/v1/client/usage/batch", content=body.encode())
+
+        assert response.json() == {"accepted": 2, "rejected": 2}
+        session = session_factory()
+        assert session.query(ClientUsageLog).count() == 2
+        session.close()
+
+    def test_oversized_and_corrupt_bodies(self, test_client, monkeypatch):
+        monkeypatch.setattr(client_api, "MAX_USAGE_BATCH_BYTES", 1024)
+        bomb = gzip.compress(b"\n".join([usage_line().encode()] * 100))
+
+        response = test_client.post("/v1/client/usage/batch", content=bomb, headers={"Content-Encoding": "gzip"})
+        assert response.status_code == 413
+
+        response = test_client.post("/v1/client/usage/batch", content=b"garbage", headers={"Content-Encoding": "gzip"})
+        assert response.status_code == 400
+
+        response = test_client.post("/v1/client/usage/batch", content=b"{}", headers={"Content-Encoding": "br"})
+        assert response.status_code == 415
+
+    def test_requires_write_scope(self, session_factory):
+        client = make_client(session_factory, ["read"])
+
+        response = client.post("/v1/client/usage/batch", content=usage_line().encode())
+
+        assert response.status_code == 403
+
+    def test_sdk_uploads_excluded_from_usage_stats(self, test_client, session_factory):
+        session = session_factory()
+        session.add(ClientUsageLog(
+            id="request-1", api_key_id="test-key", user_id="test-user", tenant_id="test-tenant",
+            endpoint="/v1/client/prompts/greeting", method="GET", prompt_id="greeting", status_code=200
+        ))
+        session.commit()
+        session.close()
+
+        body = "\n".join([
+            usage_line(), usage_line(endpoint="sdk:cache_hit"),
+            usage_line(endpoint="/v1/client/prompts/greeting", method="GET")
+        ])
+        assert test_client.post("/v1/client/usage/batch", content=body.encode()).json()["accepted"] == 3
+
+        session = session_factory()
+        assert {log.source for log in session.query(ClientUsageLog).all()} == {"request", "sdk"}
+        session.close()
+
+        stats = test_client.get("/v1/client/usage/stats").json()
+        assert stats["total_requests"] == 1
+        assert stats["requests_by_endpoint"] == {"/v1/client/prompts/greeting": 1}